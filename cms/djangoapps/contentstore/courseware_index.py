@@ -4,9 +4,11 @@ from __future__ import absolute_import
 import logging
 import re
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
 from datetime import timedelta
 
 from django.conf import settings
+from django.core.cache import cache
 from django.urls import resolve
 from django.utils.translation import ugettext as _
 from django.utils.translation import ugettext_lazy
@@ -20,6 +22,8 @@ from openedx.core.lib.courses import course_image_url
 from xmodule.annotator_mixin import html_to_text
 from xmodule.library_tools import normalize_key_for_search
 from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.modulestore.split_mongo import BlockKey
 
 # REINDEX_AGE is the default amount of time that we look back for changes
 # that might have happened. If we are provided with a time at which the
@@ -30,6 +34,11 @@ REINDEX_AGE = timedelta(0, 60)  # 60 seconds
 
 log = logging.getLogger('edx.modulestore')
 
+# The blocks of a course or library to index again and to remove from the
+# index, in order to bring it up to date with a new version of its split
+# structure.
+StructureChanges = namedtuple('StructureChanges', 'indexed removed')
+
 
 def strip_html_content_to_text(html_content):
     """ Gets only the textual part for html content - useful for building text to be searched """
@@ -43,6 +52,92 @@ def strip_html_content_to_text(html_content):
     return text_content
 
 
+def _get_block_parents(structure):
+    """
+    Returns a dict of the parent of each block of the split structure that
+    can be reached from its root, by block key; the parent of the root is None.
+    """
+    blocks = structure['blocks']
+    parents = {structure['root']: None}
+    block_keys = [structure['root']]
+    while block_keys:
+        block_key = block_keys.pop()
+        for child_key in blocks[block_key].fields.get('children', []):
+            child_key = BlockKey(*child_key)
+            if child_key in blocks and child_key not in parents:
+                parents[child_key] = block_key
+                block_keys.append(child_key)
+    return parents
+
+
+def _block_changed(previous_block, block):
+    """
+    Returns whether the content or settings of a block changed between two
+    versions of a split structure, ignoring its children.
+    """
+    previous_fields = dict(previous_block.fields, children=None)
+    fields = dict(block.fields, children=None)
+    return (
+        previous_block.definition != block.definition or
+        previous_fields != fields or
+        previous_block.defaults != block.defaults or
+        previous_block.get_asides() != block.get_asides()
+    )
+
+
+def get_structure_changes(previous_structure, structure):
+    """
+    Returns the StructureChanges between two versions of a split structure,
+    or None if all of its blocks must be indexed again.
+
+    The blocks that were added, moved, or whose content or settings changed
+    are indexed again along with their descendants, which inherit their
+    settings and show their display names in their location. Their ancestors,
+    and those of the blocks that lost children, are indexed again as well,
+    since their content groups depend on those of their descendants. The
+    blocks that can't be reached from the root anymore are removed.
+    """
+    root = structure['root']
+    if previous_structure['root'] != root:
+        return None
+    if _block_changed(previous_structure['blocks'][root], structure['blocks'][root]):
+        return None
+
+    previous_parents = _get_block_parents(previous_structure)
+    parents = _get_block_parents(structure)
+    moved = set(
+        block_key for block_key, parent_key in previous_parents.iteritems()
+        if parents.get(block_key, parent_key) != parent_key
+    )
+    removed = set(previous_parents) - set(parents)
+    block_keys = [
+        block_key for block_key in parents
+        if block_key not in previous_parents or block_key in moved or
+        _block_changed(previous_structure['blocks'][block_key], structure['blocks'][block_key])
+    ]
+
+    indexed = set()
+    while block_keys:
+        block_key = block_keys.pop()
+        if block_key not in indexed:
+            indexed.add(block_key)
+            for child_key in structure['blocks'][block_key].fields.get('children', []):
+                child_key = BlockKey(*child_key)
+                if child_key in parents:
+                    block_keys.append(child_key)
+
+    parent_keys = [parents[block_key] for block_key in indexed]
+    parent_keys.extend(
+        previous_parents[block_key] for block_key in moved | removed if previous_parents[block_key] in parents
+    )
+    for parent_key in parent_keys:
+        while parent_key is not None and parent_key not in indexed:
+            indexed.add(parent_key)
+            parent_key = parents[parent_key]
+
+    return StructureChanges(indexed, removed)
+
+
 def indexing_is_enabled():
     """
     Checks to see if the indexing feature is enabled
@@ -68,6 +163,7 @@ class SearchIndexerBase(object):
     INDEX_NAME = None
     DOCUMENT_TYPE = None
     ENABLE_INDEXING_KEY = None
+    PUBLISHED_BRANCH = None
 
     INDEX_EVENT = {
         'name': None,
@@ -88,7 +184,7 @@ class SearchIndexerBase(object):
 
     @classmethod
     @abstractmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
 
     @classmethod
@@ -115,6 +211,54 @@ class SearchIndexerBase(object):
         result_ids = [result["data"]["id"] for result in response["results"]]
         searcher.remove(cls.DOCUMENT_TYPE, result_ids)
 
+    @classmethod
+    def _get_published_structure(cls, modulestore, structure_key):
+        """
+        Returns the published split structure of the course or library, or None
+        if it isn't stored in split
+        """
+        if modulestore.get_modulestore_type(structure_key) != ModuleStoreEnum.Type.split:
+            return None
+        store = modulestore._get_modulestore_for_courselike(structure_key)  # pylint: disable=protected-access
+        try:
+            return store._lookup_course(  # pylint: disable=protected-access
+                structure_key.for_branch(cls.PUBLISHED_BRANCH)
+            ).structure
+        except ItemNotFoundError:
+            return None
+
+    @classmethod
+    def _get_indexed_version_cache_key(cls, structure_key):
+        """ Cache key of the version of the structure of the course or library last indexed """
+        return u'contentstore.courseware_index.indexed_version.{}.{}'.format(cls.INDEX_NAME, structure_key)
+
+    @classmethod
+    def _get_structure_changes(cls, modulestore, structure_key, structure):
+        """
+        Returns the StructureChanges since the version of the published split
+        structure of the course or library that was last indexed, or None if
+        it isn't known
+        """
+        indexed_version = cache.get(cls._get_indexed_version_cache_key(structure_key))
+        if indexed_version is None:
+            return None
+        if indexed_version == unicode(structure['_id']):
+            return StructureChanges(set(), set())
+        store = modulestore._get_modulestore_for_courselike(structure_key)  # pylint: disable=protected-access
+        indexed_structure = store.get_structure(structure_key, indexed_version)
+        if indexed_structure is None:
+            return None
+        return get_structure_changes(indexed_structure, structure)
+
+    @classmethod
+    def _get_removed_item_ids(cls, structure_key, block_keys):
+        """ Returns the ids in the index of the given blocks of the course or library """
+        structure_key = structure_key.version_agnostic().for_branch(None)
+        return [
+            unicode(cls._id_modifier(structure_key.make_usage_key(block_key.type, block_key.id)))
+            for block_key in block_keys
+        ]
+
     @classmethod
     def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE):
         """
@@ -132,6 +276,10 @@ class SearchIndexerBase(object):
             which items may need to be removed from the index
             If None, then a full reindex takes place
 
+            For split courses and libraries whose last indexed version is known, only
+            the items changed since that version are walked through and have their
+            index updated, and the items deleted since are removed from the index
+
         Returns:
         Number of items that have been added to the index
         """
@@ -159,12 +307,35 @@ class SearchIndexerBase(object):
         # instead of per item index API call.
         items_index = []
 
+        # The published structure of split courses and libraries, and the changes
+        # to index since its last indexed version, if they are known.
+        published_structure = None
+        changes = None
+
         def get_item_location(item):
             """
             Gets the version agnostic item location
             """
             return item.location.version_agnostic().replace(branch=None)
 
+        def get_children(item, all_children=False):
+            """
+            Gets the children of the item to walk through: when the changes are known,
+            only those to index again, unless all_children is set
+            """
+            if changes is None or all_children:
+                return item.get_children()
+            return item.get_children(
+                usage_id_filter=lambda usage_key: BlockKey.from_usage_key(usage_key) in changes.indexed
+            )
+
+        def is_unchanged(item):
+            """
+            Whether the index of the item, including the content groups it gets
+            from its descendants, is known to be up to date
+            """
+            return changes is not None and BlockKey.from_usage_key(item.location) not in changes.indexed
+
         def prepare_item_index(item, skip_index=False, groups_usage_info=None):
             """
             Add this item to the items_index and indexed_items list
@@ -178,7 +349,7 @@ class SearchIndexerBase(object):
                 this method has determined that it is safe to do so
 
             Returns:
-            item_content_groups - content groups assigned to indexed item
+            item_content_groups - content groups assigned to indexed or skipped item
             """
             is_indexable = hasattr(item, "index_dictionary")
             item_index_dictionary = item.index_dictionary() if is_indexable else None
@@ -211,24 +382,30 @@ class SearchIndexerBase(object):
             item_id = unicode(cls._id_modifier(item.scope_ids.usage_id))
             indexed_items.add(item_id)
             if item.has_children:
-                # determine if it's okay to skip adding the children herein based upon how recently any may have changed
-                skip_child_index = skip_index or \
+                # determine if it's okay to skip adding the children herein based upon how recently any may have
+                # changed; when the changes are known, each child is skipped only if it didn't change itself
+                skip_child_index = changes is None and (
+                    skip_index or
                     (triggered_at is not None and (triggered_at - item.subtree_edited_on) > reindex_age)
+                )
                 children_groups_usage = []
-                for child_item in item.get_children():
+                # the content groups of the item depend on those of all its children
+                for child_item in get_children(item, all_children=bool(item_content_groups)):
                     if modulestore.has_published_version(child_item):
                         children_groups_usage.append(
                             prepare_item_index(
                                 child_item,
-                                skip_index=skip_child_index,
+                                skip_index=skip_child_index or is_unchanged(child_item),
                                 groups_usage_info=groups_usage_info
                             )
                         )
                 if None in children_groups_usage:
                     item_content_groups = None
 
-            if skip_index or not item_index_dictionary:
+            if not item_index_dictionary:
                 return
+            if skip_index:
+                return item_content_groups
 
             item_index = {}
             # if it has something to add to the index, then add it
@@ -250,17 +427,25 @@ class SearchIndexerBase(object):
 
         try:
             with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
-                structure = cls._fetch_top_level(modulestore, structure_key)
+                published_structure = cls._get_published_structure(modulestore, structure_key)
+                if published_structure is not None and triggered_at is not None:
+                    changes = cls._get_structure_changes(modulestore, structure_key, published_structure)
+
+                # Only the changed items are loaded when the changes are known
+                structure = cls._fetch_top_level(modulestore, structure_key, depth=None if changes is None else 0)
                 groups_usage_info = cls.fetch_group_usage(modulestore, structure)
 
                 # First perform any additional indexing from the structure object
                 cls.supplemental_index_information(modulestore, structure)
 
                 # Now index the content
-                for item in structure.get_children():
-                    prepare_item_index(item, groups_usage_info=groups_usage_info)
+                for item in get_children(structure):
+                    prepare_item_index(item, skip_index=is_unchanged(item), groups_usage_info=groups_usage_info)
                 searcher.index(cls.DOCUMENT_TYPE, items_index)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                if changes is None:
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                elif changes.removed:
+                    searcher.remove(cls.DOCUMENT_TYPE, cls._get_removed_item_ids(structure_key, changes.removed))
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -273,6 +458,9 @@ class SearchIndexerBase(object):
         if error_list:
             raise SearchIndexingError('Error(s) present during indexing', error_list)
 
+        if published_structure is not None:
+            cache.set(cls._get_indexed_version_cache_key(structure_key), unicode(published_structure['_id']), None)
+
         return indexed_count["count"]
 
     @classmethod
@@ -346,6 +534,7 @@ class CoursewareSearchIndexer(SearchIndexerBase):
     INDEX_NAME = "courseware_index"
     DOCUMENT_TYPE = "courseware_content"
     ENABLE_INDEXING_KEY = 'ENABLE_COURSEWARE_INDEX'
+    PUBLISHED_BRANCH = ModuleStoreEnum.BranchName.published
 
     INDEX_EVENT = {
         'name': 'edx.course.index.reindexed',
@@ -360,9 +549,9 @@ class CoursewareSearchIndexer(SearchIndexerBase):
         return structure_key
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_course(structure_key, depth=None)
+        return modulestore.get_course(structure_key, depth=depth)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
@@ -436,6 +625,7 @@ class LibrarySearchIndexer(SearchIndexerBase):
     INDEX_NAME = "library_index"
     DOCUMENT_TYPE = "library_content"
     ENABLE_INDEXING_KEY = 'ENABLE_LIBRARY_INDEX'
+    PUBLISHED_BRANCH = ModuleStoreEnum.BranchName.library
 
     INDEX_EVENT = {
         'name': 'edx.library.index.reindexed',
@@ -448,9 +638,9 @@ class LibrarySearchIndexer(SearchIndexerBase):
         return normalize_key_for_search(structure_key)
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_library(structure_key, depth=None)
+        return modulestore.get_library(structure_key, depth=depth)
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
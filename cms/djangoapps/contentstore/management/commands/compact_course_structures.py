@@ -0,0 +1,76 @@
+"""
+Script for storing the version histories of split modulestore courses as deltas
+"""
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+# Snapshot interval used when delta storage isn't enabled by the
+# COURSE_STRUCTURE_DELTA_SNAPSHOT_INTERVAL setting.
+DEFAULT_SNAPSHOT_INTERVAL = 20
+
+
+# To run from command line: ./manage.py cms compact_course_structures course-v1:org+course+run
+
+
+class Command(BaseCommand):
+    """Compact the structure histories of split modulestore courses"""
+    help = '''
+    Rewrite the versions of split modulestore course structures that are stored in full
+    as deltas against earlier snapshots of the structure. Takes the arguments:
+    <course_id>: the course ids of the courses to compact
+    --all: compact all courses and libraries instead
+    --snapshot_interval: the number of versions stored as deltas between snapshots
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', help='IDs of the courses to compact')
+        parser.add_argument('--all', action='store_true', help='Compact all courses and libraries')
+        parser.add_argument(
+            '--snapshot_interval',
+            type=int,
+            help='Number of versions stored as deltas between snapshots (defaults to the '
+                 'COURSE_STRUCTURE_DELTA_SNAPSHOT_INTERVAL setting, or {})'.format(DEFAULT_SNAPSHOT_INTERVAL),
+        )
+
+    def handle(self, *args, **options):
+        if bool(options['course_ids']) == options['all']:
+            raise CommandError("Specify either course ids or --all.")
+
+        # pylint: disable=protected-access
+        split_store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)
+        db_connection = split_store.db_connection
+        snapshot_interval = (
+            options['snapshot_interval'] or db_connection.delta_snapshot_interval or DEFAULT_SNAPSHOT_INTERVAL
+        )
+
+        if options['all']:
+            course_indexes = list(db_connection.find_matching_course_indexes())
+        else:
+            course_indexes = []
+            for course_id in options['course_ids']:
+                try:
+                    course_key = CourseKey.from_string(course_id)
+                except InvalidKeyError:
+                    raise CommandError("Invalid course key: {}".format(course_id))
+                course_index = db_connection.get_course_index(course_key)
+                if course_index is None:
+                    raise CommandError("Course not found: {}".format(course_id))
+                course_indexes.append(course_index)
+
+        for course_index in course_indexes:
+            course_key = split_store.make_course_key(course_index['org'], course_index['course'], course_index['run'])
+            original_versions = set()
+            for version_guid in course_index['versions'].itervalues():
+                structure = db_connection.get_structure(version_guid, course_key)
+                if structure is not None:
+                    original_versions.add(structure['original_version'])
+
+            compacted = sum(
+                db_connection.compact_structures(original_version, snapshot_interval, course_key)
+                for original_version in original_versions
+            )
+            self.stdout.write(u"Compacted {} structures of {}".format(compacted, course_key))
@@ -0,0 +1,54 @@
+"""
+Tests for the compact_course_structures management command
+"""
+from StringIO import StringIO
+
+from django.core.management import call_command, CommandError
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestCompactCourseStructures(ModuleStoreTestCase):
+    """
+    Tests for the compact_course_structures management command
+    """
+    def setUp(self):
+        super(TestCompactCourseStructures, self).setUp()
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.chapters = [
+            ItemFactory.create(parent_location=self.course.location, category='chapter', display_name='Chapter')
+            for _ in range(5)
+        ]
+        for chapter in self.chapters:
+            chapter.display_name = 'Edited'
+            self.store.update_item(chapter, self.user.id)
+
+        # pylint: disable=protected-access
+        split_store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)
+        self.structures = split_store.db_connection.structures
+
+    def test_no_args(self):
+        with self.assertRaisesRegexp(CommandError, 'Specify either course ids or --all.'):
+            call_command('compact_course_structures')
+
+    def test_invalid_course_key(self):
+        with self.assertRaisesRegexp(CommandError, 'Invalid course key'):
+            call_command('compact_course_structures', 'TestX/TS01')
+
+    def test_course_not_found(self):
+        with self.assertRaisesRegexp(CommandError, 'Course not found'):
+            call_command('compact_course_structures', 'course-v1:org+course+run')
+
+    def test_compact(self):
+        self.assertEqual(self.structures.find({'delta_base': {'$exists': True}}).count(), 0)
+
+        out = StringIO()
+        call_command('compact_course_structures', unicode(self.course.id), '--snapshot_interval', '3', stdout=out)
+
+        self.assertIn(u'structures of {}'.format(self.course.id), out.getvalue())
+        self.assertGreater(self.structures.find({'delta_base': {'$exists': True}}).count(), 0)
+        for chapter in self.chapters:
+            self.assertEqual(self.store.get_item(chapter.location).display_name, 'Edited')
@@ -434,13 +434,56 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         # index based on time, will include an index of the origin sequential
         # because it is in a common subtree but not of the original vertical
         # because the original sequential's subtree is too old
+        # split courses only index the items added since the full index
         new_indexed_count = self.index_recent_changes(store, before_time)
-        self.assertEqual(new_indexed_count, 5)
+        if store.get_modulestore_type(self.course.id) == ModuleStoreEnum.Type.split:
+            self.assertEqual(new_indexed_count, 3)
+        else:
+            self.assertEqual(new_indexed_count, 5)
 
         # full index again
         indexed_count = self.reindex_course(store)
         self.assertEqual(indexed_count, 7)
 
+    def _test_incremental_index(self, store):
+        """ Make sure that only the items changed since the last index of a split course are indexed """
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+
+        # nothing changed since the full index
+        indexed_count = self.index_recent_changes(store, datetime.now(UTC))
+        self.assertEqual(indexed_count, 0)
+
+        # only the changed unit is indexed again, with its ancestors
+        self.html_unit.data = "<p>Some new content</p>"
+        self.update_item(store, self.html_unit)
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.index_recent_changes(store, datetime.now(UTC))
+        self.assertEqual(indexed_count, 4)
+        response = self.search(query_string="new content")
+        self.assertEqual(response["total"], 1)
+
+        # the items within a renamed one are indexed again, with their new location
+        self.sequential.display_name = "Lesson 2"
+        self.update_item(store, self.sequential)
+        self.publish_item(store, self.sequential.location)
+        indexed_count = self.index_recent_changes(store, datetime.now(UTC))
+        self.assertEqual(indexed_count, 4)
+        response = self.search(query_string="new content")
+        self.assertEqual(response["results"][0]["data"]["location"], ["Week 1", "Lesson 2", "Subsection 1"])
+
+        # deleted items are removed without searching for the items to keep, and their
+        # ancestors are indexed again
+        self.delete_item(store, self.html_unit.location)
+        self.publish_item(store, self.vertical.location)
+        with patch.object(CoursewareSearchIndexer, 'remove_deleted_items') as mock_remove_deleted_items:
+            indexed_count = self.index_recent_changes(store, datetime.now(UTC))
+        self.assertEqual(indexed_count, 3)
+        self.assertFalse(mock_remove_deleted_items.called)
+        response = self.search()
+        self.assertEqual(response["total"], 3)
+
     def _test_course_about_property_index(self, store):
         """ Test that informational properties in the course object end up in the course_info index """
         display_name = "Help, I need somebody!"
@@ -572,6 +615,9 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_time_based_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_time_based_index)
 
+    def test_incremental_index(self):
+        self._perform_test_using_store(ModuleStoreEnum.Type.split, self._test_incremental_index)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
@@ -1333,6 +1379,27 @@ class GroupConfigurationSearchMongo(CourseTestCase, MixedWithOptionsTestCase):
             )
             mock_index.reset_mock()
 
+    def test_content_group_of_unit_updated_by_recent_changes(self):
+        """ indexing recent changes to the content groups of the only html unit of a vertical """
+        self.reindex_course(self.store)
+        search_fields = {"course": unicode(self.course.id), "content_groups": 1}
+        self.assertEqual(self.search(field_dictionary=search_fields)["total"], 0)
+
+        group_access_content = {'group_access': {666: [1]}}
+        self.client.ajax_post(
+            reverse_usage_url("xblock_handler", self.html_unit1.location),
+            data={'metadata': group_access_content}
+        )
+        self.publish_item(self.store, self.html_unit1.location)
+
+        # the vertical is indexed again with the content group of its html unit
+        CoursewareSearchIndexer.index(self.store, self.course.id, triggered_at=datetime.now(UTC))
+        response = self.search(field_dictionary=search_fields)
+        self.assertEqual(
+            set(result["data"]["id"] for result in response["results"]),
+            {unicode(self.vertical.location), unicode(self.html_unit1.location)}
+        )
+
     def test_content_group_not_assigned(self):
         """ indexing course without content groups added test """
 
@@ -108,6 +108,7 @@ from lms.envs.common import (
     # django-debug-toolbar
     DEBUG_TOOLBAR_PATCH_SETTINGS,
     BLOCK_STRUCTURES_SETTINGS,
+    COURSE_OVERVIEWS_SETTINGS,
 
     # File upload defaults
     FILE_UPLOAD_STORAGE_BUCKET_NAME,
@@ -512,6 +513,7 @@ MIDDLEWARE_CLASSES = [
     'django.middleware.locale.LocaleMiddleware',
 
     'codejail.django_integration.ConfigureCodeJailMiddleware',
+    'capa.safe_exec.django_integration.ConfigureSandboxWorkerPoolMiddleware',
 
     # catches any uncaught RateLimitExceptions and returns a 403 instead of a 500
     'ratelimitbackend.middleware.RateLimitMiddleware',
@@ -618,6 +620,15 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Warm sandbox processes to run jailed code in, instead of starting a new
+    # one for every execution.
+    'worker_pool': {
+        # How many workers does each server process have?  0 means don't use them.
+        'size': 0,
+        # After how many executions is a worker replaced?
+        'max_executions': 100,
+    },
 }
 
 ############################ DJANGO_BUILTINS ################################
@@ -688,6 +699,16 @@ COURSE_IMPORT_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 ##### EMBARGO #####
 EMBARGO_SITE_REDIRECT_URL = None
 
+############################ COURSE ASSETS #####################################
+
+# A local disk cache of the contents of course assets, served by the contentserver
+# middleware. Contents are only copied to disk when DIRECTORY is set, and the least
+# recently used ones are pruned beyond MAX_SIZE bytes.
+CONTENTSERVER_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+}
+
 ############################### PIPELINE #######################################
 
 PIPELINE_ENABLED = True
@@ -33,6 +33,7 @@ from lms.envs.test import (
     JWT_AUTH,
     REGISTRATION_EXTRA_FIELDS,
     ECOMMERCE_API_URL,
+    COURSE_OVERVIEWS_SETTINGS,
 )
 
 # Allow all hosts during tests, we use a lot of different ones all over the codebase.
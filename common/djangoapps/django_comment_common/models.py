@@ -5,7 +5,7 @@ from config_models.models import ConfigurationModel
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils.translation import ugettext_noop
 from jsonfield.fields import JSONField
@@ -13,6 +13,7 @@ from opaque_keys.edx.django.models import CourseKeyField
 from six import text_type
 
 from openedx.core.djangoapps.xmodule_django.models import NoneToEmptyManager
+from openedx.core.lib.cache_utils import CacheVersion
 from student.models import CourseEnrollment
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -229,3 +230,43 @@ class DiscussionsIdMapping(models.Model):
         if not created:
             mapping_entry.mapping = discussions_id_map
             mapping_entry.save()
+
+    # The mappings loaded by this process, by course id, with their versions.
+    _process_cache = {}
+    PROCESS_CACHE_SIZE = 1000
+    # Versions of the mappings kept by processes, by course id.
+    cache_versions = CacheVersion(u'discussions_id_mapping.version')
+
+    @classmethod
+    def get_mapping(cls, course_key):
+        """
+        Returns the mapping of discussion IDs to XBlock usage key strings of the
+        course, or None if it hasn't been stored.
+
+        Mappings are kept by the process until they are updated, which changes
+        their version, shared through the cache.
+        """
+        version = cls.cache_versions.get(course_key)
+        cached = cls._process_cache.get(course_key)
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            mapping = cls.objects.get(course_id=course_key).mapping
+        except cls.DoesNotExist:
+            mapping = None
+        # Without a shared version, e.g. with a dummy cache, mappings can't be kept.
+        if version is not None:
+            if len(cls._process_cache) >= cls.PROCESS_CACHE_SIZE:
+                cls._process_cache.clear()
+            cls._process_cache[course_key] = (version, mapping)
+        return mapping
+
+
+@receiver(post_save, sender=DiscussionsIdMapping)
+@receiver(post_delete, sender=DiscussionsIdMapping)
+def change_discussions_id_mapping_version(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Changes the version of a mapping when it is saved or deleted.
+    """
+    DiscussionsIdMapping.cache_versions.change(instance.course_id)
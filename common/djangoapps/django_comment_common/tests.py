@@ -1,10 +1,12 @@
 from django.test import TestCase
+from edx_django_utils.cache import RequestCache
 from opaque_keys.edx.locator import CourseLocator
 from six import text_type
 
-from django_comment_common.models import Role
+from django_comment_common.models import DiscussionsIdMapping, Role
 from models import CourseDiscussionSettings
 from openedx.core.djangoapps.course_groups.cohorts import CourseCohortsSettings
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from openedx.core.lib.tests import attr
 from student.models import CourseEnrollment, User
 from utils import get_course_discussion_settings, set_course_discussion_settings
@@ -135,3 +137,37 @@ class CourseDiscussionSettingsTest(ModuleStoreTestCase):
                 text_type(value_error.exception),
                 exception_msg_template.format(field['name'], field['type'].__name__)
             )
+
+
+class DiscussionsIdMappingTest(CacheIsolationTestCase):
+    """
+    Tests for keeping the mappings of discussion ids in the process.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(DiscussionsIdMappingTest, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        RequestCache.clear_all_namespaces()
+
+    def test_get_missing_mapping(self):
+        self.assertIsNone(DiscussionsIdMapping.get_mapping(self.course_key))
+
+    def test_get_mapping_once(self):
+        DiscussionsIdMapping.update_mapping(self.course_key, {'discussion': 'usage_key'})
+        self.assertEqual(DiscussionsIdMapping.get_mapping(self.course_key), {'discussion': 'usage_key'})
+
+        # in a later request, the mapping is still loaded
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(0):
+            self.assertEqual(DiscussionsIdMapping.get_mapping(self.course_key), {'discussion': 'usage_key'})
+
+    def test_get_updated_mapping(self):
+        DiscussionsIdMapping.update_mapping(self.course_key, {'discussion': 'usage_key'})
+        DiscussionsIdMapping.get_mapping(self.course_key)
+
+        DiscussionsIdMapping.update_mapping(self.course_key, {'discussion': 'other_usage_key'})
+        self.assertEqual(DiscussionsIdMapping.get_mapping(self.course_key), {'discussion': 'other_usage_key'})
+
+        DiscussionsIdMapping.objects.all().delete()
+        self.assertIsNone(DiscussionsIdMapping.get_mapping(self.course_key))
@@ -1,5 +1,6 @@
 import logging
 import re
+from weakref import WeakKeyDictionary
 
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
@@ -8,11 +9,19 @@ from django.conf import settings
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
+from openedx.core.lib.cache_utils import process_cached
 from six import text_type
 
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# The number of paths whose existence in staticfiles_storage is remembered.
+STATICFILES_EXISTS_CACHE_SIZE = 10000
+
+# Whether paths exist in each staticfiles storage, which only changes on deploys.
+# Keyed by the storage, so that results are never reused with another one.
+_staticfiles_exists_cache = WeakKeyDictionary()
+
 
 def _url_replace_regex(prefix):
     """
@@ -30,6 +39,42 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+@process_cached
+def _compiled_url_replace_regex(prefix):
+    """
+    Return the compiled `_url_replace_regex` for `prefix`, compiling it only
+    once per process.
+    """
+    return re.compile(_url_replace_regex(prefix))
+
+
+def _static_url_prefix(data_dir):
+    """
+    Return the regex matching the prefixes of static urls that aren't already
+    in the data directory `data_dir`.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
+def staticfiles_storage_exists(path):
+    """
+    Return whether `path` exists in staticfiles_storage, remembering the
+    answer unless in debug mode, where static files may change.
+    """
+    if settings.DEBUG:
+        return staticfiles_storage.exists(path)
+
+    exists_cache = _staticfiles_exists_cache.setdefault(staticfiles_storage, {})
+    if path not in exists_cache:
+        if len(exists_cache) >= STATICFILES_EXISTS_CACHE_SIZE:
+            exists_cache.clear()
+        exists_cache[path] = staticfiles_storage.exists(path)
+    return exists_cache[path]
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -71,7 +116,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -91,7 +136,19 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex('/course/').sub(replace_course_url, text)
+
+
+def _is_xblock_resource_url(full_url):
+    """
+    Is `full_url` a link to an XBlock resource, rather than to a static asset?
+    """
+    # Probably wasn't a good idea that /static works for actual static assets and
+    # for magical course asset URLs....
+    starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -109,26 +166,13 @@ def process_static_urls(text, replacement_function, data_dir=None):
         quote = match.group('quote')
         rest = match.group('rest')
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -167,6 +211,14 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     if static_paths_out is None:
         static_paths_out = []
 
+    replace_static_url = _static_url_replacer(data_directory, course_id, static_asset_path, static_paths_out)
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+
+def _static_url_replacer(data_directory, course_id, static_asset_path, static_paths_out):
+    """
+    Return the function replacing a single static url for `replace_static_urls`.
+    """
     def replace_static_url(original, prefix, quote, rest):
         """
         Replace a single matched url.
@@ -189,7 +241,7 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
 
             exists_in_staticfiles_storage = False
             try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+                exists_in_staticfiles_storage = staticfiles_storage_exists(rest)
             except Exception as err:
                 log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
                     rest, str(err)))
@@ -213,7 +265,7 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
             course_path = "/".join((static_asset_path or data_directory, rest))
 
             try:
-                if staticfiles_storage.exists(rest):
+                if staticfiles_storage_exists(rest):
                     url = staticfiles_storage.url(rest)
                 else:
                     url = staticfiles_storage.url(course_path)
@@ -226,4 +278,47 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         static_paths_out.append((original_uri, url))
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
+
+
+def replace_urls(text, course_id, data_directory=None, static_asset_path='', jump_to_id_base_url=None,
+                 static_paths_out=None):
+    """
+    Replace the urls of `replace_static_urls`, `replace_course_urls` and, if
+    `jump_to_id_base_url` is given, `replace_jump_to_id_urls`, scanning `text`
+    only once.
+
+    Takes the arguments of these functions.
+    """
+    if static_paths_out is None:
+        static_paths_out = []
+
+    replace_static_url = _static_url_replacer(data_directory, course_id, static_asset_path, static_paths_out)
+    course_url = '/courses/' + text_type(course_id) + '/'
+
+    def replace_url(match):
+        """
+        Replace a single matched url, according to the kind of url it is.
+        """
+        original = match.group(0)
+        prefix = match.group('prefix')
+        quote = match.group('quote')
+        rest = match.group('rest')
+
+        if match.group('static_prefix') is not None:
+            # Don't rewrite XBlock resource links.
+            if _is_xblock_resource_url(prefix + rest):
+                return original
+            return replace_static_url(original, prefix, quote, rest)
+        elif match.group('course_prefix') is not None:
+            return "".join([quote, course_url, rest, quote])
+        else:
+            return "".join([quote, jump_to_id_base_url + rest, quote])
+
+    prefixes = [
+        u'(?P<static_prefix>{})'.format(_static_url_prefix(static_asset_path or data_directory)),
+        u'(?P<course_prefix>/course/)',
+    ]
+    if jump_to_id_base_url is not None:
+        prefixes.append(u'/jump_to_id/')
+    return _compiled_url_replace_regex(u'|'.join(prefixes)).sub(replace_url, text)
@@ -19,7 +19,10 @@ from static_replace import (
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls,
+    staticfiles_storage_exists
 )
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
@@ -146,6 +149,52 @@ def test_data_dir_fallback(mock_storage, mock_modulestore, mock_settings):
     assert replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY) == '"/static/data_dir/file.png"'
 
 
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_storage_exists_memoized(mock_storage):
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.png'
+
+    assert staticfiles_storage_exists('file.png')
+    assert replace_static_urls(STATIC_SOURCE + STATIC_SOURCE, DATA_DIRECTORY) == '"/static/file.png"' * 2
+    mock_storage.exists.assert_called_once_with('file.png')
+
+
+@override_settings(DEBUG=True)
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_storage_exists_not_memoized_in_debug(mock_storage):
+    mock_storage.exists.return_value = True
+    assert staticfiles_storage_exists('file.png')
+    assert staticfiles_storage_exists('file.png')
+    assert mock_storage.exists.call_count == 2
+
+
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls(mock_storage):
+    mock_storage.exists.return_value = False
+    mock_storage.url.return_value = '/static/data_dir/file.png'
+    text = '<img src="/static/file.png"/><a href=\'/course/info\'></a><a href="/jump_to_id/id"></a>'
+
+    sequential = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY), COURSE_KEY),
+        COURSE_KEY,
+        '/jump_base/',
+    )
+    assert sequential == (
+        '<img src="/static/data_dir/file.png"/><a href=\'/courses/org/course/run/info\'></a>'
+        '<a href="/jump_base/id"></a>'
+    )
+
+    static_paths = []
+    assert replace_urls(
+        text, COURSE_KEY, DATA_DIRECTORY, static_asset_path=DATA_DIRECTORY, jump_to_id_base_url='/jump_base/',
+        static_paths_out=static_paths,
+    ) == sequential
+    assert static_paths == [('/static/file.png', '/static/data_dir/file.png')]
+
+    # Without a base url, jump_to_id urls are left alone.
+    assert '"/jump_to_id/id"' in replace_urls(text, COURSE_KEY, DATA_DIRECTORY, static_asset_path=DATA_DIRECTORY)
+
+
 def test_raw_static_check():
     """
     Make sure replace_static_urls leaves alone things that end in '.raw'
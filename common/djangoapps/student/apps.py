@@ -5,7 +5,7 @@ from __future__ import absolute_import
 
 from django.apps import AppConfig
 from django.contrib.auth.signals import user_logged_in
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_save, pre_save
 
 
 class StudentConfig(AppConfig):
@@ -23,3 +23,9 @@ class StudentConfig(AppConfig):
         from django.contrib.auth.models import User
         from .signals.receivers import on_user_updated
         pre_save.connect(on_user_updated, sender=User)
+
+        from openedx.core.djangoapps.signals.signals import COURSE_CERT_CHANGED
+        from .models import CourseEnrollment
+        from .signals.receivers import on_certificate_changed, on_enrollment_updated
+        post_save.connect(on_enrollment_updated, sender=CourseEnrollment)
+        COURSE_CERT_CHANGED.connect(on_certificate_changed)
@@ -0,0 +1,184 @@
+"""
+Independent sections of the student dashboard, computed concurrently.
+
+Each section is the value of a function, computed while rendering the
+dashboard. Since sections don't depend on each other, they are computed in a
+bounded pool of threads, each with its own request cache and database
+connection, closed once all the sections are computed. The values of cached
+sections are kept in the cache per user, until the enrollments, certificates
+or verifications of the user change.
+
+Configured by the STUDENT_DASHBOARD_SECTIONS setting:
+
+  - MAX_WORKERS: number of sections computed at once; 1 computes them in the
+    thread of the request
+  - CACHE_TIMEOUT: seconds for which the values of cached sections are kept;
+    0 disables caching
+
+The time spent computing each section is reported as a custom metric.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+
+import crum
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import translation
+from edx_django_utils import monitoring as monitoring_utils
+from edx_django_utils.cache import RequestCache
+
+from openedx.core.lib.cache_utils import CacheVersion
+
+log = logging.getLogger(__name__)
+
+# Versions of the cached sections, by user id.
+_cache_version = CacheVersion(u'student.dashboard_sections.cache_version')
+
+
+def _get_setting(name, default=None):
+    """
+    Returns the value of the STUDENT_DASHBOARD_SECTIONS setting `name`.
+    """
+    return getattr(settings, 'STUDENT_DASHBOARD_SECTIONS', {}).get(name, default)
+
+
+class DashboardSection(object):
+    """
+    A section of the dashboard, whose value is `function(*args, **kwargs)`.
+
+    The values of `cached` sections must be picklable, and may only change
+    along with the enrollments, certificates or verifications of the user,
+    or with time.
+    """
+    def __init__(self, name, function, args=(), kwargs=None, cached=False):
+        self.name = name
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.cached = cached
+
+    def compute(self):
+        """
+        Returns the value of the section.
+        """
+        return self.function(*self.args, **self.kwargs)
+
+
+def get_section_values(request, sections):
+    """
+    Returns a dict of the values of the given sections of the dashboard of
+    the user of the request, by name.
+    """
+    values = {}
+    cache_keys = _get_cache_keys(request, [section for section in sections if section.cached])
+    if cache_keys:
+        cached_values = cache.get_many(cache_keys.values())
+        for name, cache_key in cache_keys.items():
+            if cache_key in cached_values:
+                values[name] = cached_values[cache_key]
+
+    timings = {}
+    missing_sections = [section for section in sections if section.name not in values]
+    max_workers = min(_get_setting('MAX_WORKERS', 1), len(missing_sections))
+    if max_workers <= 1:
+        for section in missing_sections:
+            values[section.name], timings[section.name] = _compute_section(section)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        # The database connections of the threads of the pool, by thread.
+        thread_connections = {}
+        try:
+            futures = [
+                (section, executor.submit(
+                    _compute_section_in_thread, section, request, translation.get_language(), thread_connections,
+                ))
+                for section in missing_sections
+            ]
+            for section, future in futures:
+                values[section.name], timings[section.name] = future.result()
+        finally:
+            executor.shutdown(wait=True)
+            _close_connections(thread_connections.values())
+
+    computed_values = {
+        cache_keys[name]: values[name] for name in timings if name in cache_keys
+    }
+    if computed_values:
+        cache.set_many(computed_values, _get_setting('CACHE_TIMEOUT'))
+
+    for name, duration in timings.items():
+        monitoring_utils.set_custom_metric(u'dashboard_section_{}_ms'.format(name), int(duration * 1000))
+    monitoring_utils.set_custom_metric('dashboard_sections_cached', len(values) - len(timings))
+    log.debug(
+        u'Computed dashboard sections for user %s in %s',
+        request.user.id,
+        u', '.join(u'{}: {:.3f}s'.format(name, duration) for name, duration in sorted(timings.items())),
+    )
+    return values
+
+
+def invalidate_sections(user_id):
+    """
+    Discards the cached sections of the dashboard of the given user, now and
+    once the current transaction is committed.
+    """
+    _cache_version.change(user_id)
+
+
+def _compute_section(section):
+    """
+    Returns the value of the section, and the number of seconds spent
+    computing it.
+    """
+    start = time()
+    value = section.compute()
+    return value, time() - start
+
+
+def _compute_section_in_thread(section, request, language, thread_connections):
+    """
+    Computes the section in a thread of the pool, in the context of the
+    request, clearing the request cache of the thread afterwards. The
+    database connection of the thread is kept for its next sections, and
+    recorded in `thread_connections` to be closed with the pool.
+    """
+    thread_connections[threading.current_thread().ident] = connections[DEFAULT_DB_ALIAS]
+    crum.set_current_request(request)
+    try:
+        with translation.override(language):
+            return _compute_section(section)
+    finally:
+        crum.set_current_request(None)
+        RequestCache.clear_all_namespaces()
+
+
+def _close_connections(thread_connections):
+    """
+    Closes the database connections of the threads of a pool, once they have exited.
+    """
+    for thread_connection in thread_connections:
+        # Django only lets the thread opening a connection close it, unless it is shared.
+        thread_connection.allow_thread_sharing = True
+        thread_connection.close()
+
+
+def _get_cache_keys(request, sections):
+    """
+    Returns a dict of the cache keys of the values of the given sections, by
+    name, or an empty dict if they are not cached.
+    """
+    if not sections or not _get_setting('CACHE_TIMEOUT'):
+        return {}
+    cache_version = _cache_version.get(request.user.id)
+    if cache_version is None:
+        return {}
+    site_id = request.site.id if getattr(request, 'site', None) else None
+    return {
+        section.name: u'student.dashboard_sections.{}.{}.{}.{}.{}'.format(
+            request.user.id, cache_version, site_id, translation.get_language(), section.name,
+        )
+        for section in sections
+    }
@@ -13,7 +13,7 @@ import csv
 from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand, CommandError
 
-from student.models import anonymous_id_for_user
+from student.models import anonymous_ids_for_users
 from opaque_keys.edx.keys import CourseKey
 from six import text_type
 
@@ -39,7 +39,7 @@ class Command(BaseCommand):
 
         # Figure out which students are enrolled in the course
         students = User.objects.filter(courseenrollment__course_id=course_key)
-        if len(students) == 0:
+        if not students.exists():
             self.stdout.write("No students enrolled in %s" % text_type(course_key))
             return
 
@@ -52,11 +52,13 @@ class Command(BaseCommand):
                     "Per-Student anonymized user ID",
                     "Per-course anonymized user id"
                 ))
-                for student in students:
+                unique_ids = anonymous_ids_for_users(students, None)
+                course_specific_ids = anonymous_ids_for_users(students, course_key)
+                for user_id in sorted(course_specific_ids):
                     csv_writer.writerow((
-                        student.id,
-                        anonymous_id_for_user(student, None),
-                        anonymous_id_for_user(student, course_key)
+                        user_id,
+                        unique_ids[user_id],
+                        course_specific_ids[user_id]
                     ))
         except IOError:
             raise CommandError("Error writing to file: %s" % output_filename)
@@ -118,6 +118,10 @@ TRANSITION_STATES = (
 )
 
 
+# Number of anonymous ids looked up per query by the bulk functions below.
+ANONYMOUS_ID_BATCH_SIZE = 1000
+
+
 class AnonymousUserId(models.Model):
     """
     This table contains user, course_Id and anonymous_user_id
@@ -155,13 +159,7 @@ def anonymous_id_for_user(user, course_id, save=True):
     if cached_id is not None:
         return cached_id
 
-    # include the secret key as a salt, and to make the ids unique across different LMS installs.
-    hasher = hashlib.md5()
-    hasher.update(settings.SECRET_KEY)
-    hasher.update(text_type(user.id))
-    if course_id:
-        hasher.update(text_type(course_id).encode('utf-8'))
-    digest = hasher.hexdigest()
+    digest = _anonymous_id_digest(_salted_anonymous_id_hasher(), user.id, course_id)
 
     if not hasattr(user, '_anonymous_id'):
         user._anonymous_id = {}  # pylint: disable=protected-access
@@ -203,6 +201,114 @@ def user_by_anonymous_id(uid):
         return None
 
 
+def anonymous_ids_for_users(users, course_id, save=True):
+    """
+    Return a dict mapping the ids of the given users to their anonymous ids
+    for a course, as `anonymous_id_for_user` returns them one at a time.
+
+    `users` is a queryset, of which only the ids are fetched, or an iterable
+    of users, whose cached anonymous ids are updated.
+
+    Keyword arguments:
+    save -- Whether the missing AnonymousUserId objects should be created,
+    with one query per batch of users rather than one per user.
+    """
+    salted_hasher = _salted_anonymous_id_hasher()
+    anonymous_ids = {}
+    if isinstance(users, models.QuerySet):
+        for user_id in users.values_list('id', flat=True).iterator():
+            anonymous_ids[user_id] = _anonymous_id_digest(salted_hasher, user_id, course_id)
+    else:
+        for user in users:
+            if user.is_anonymous:
+                continue
+            digest = _anonymous_id_digest(salted_hasher, user.id, course_id)
+            if not hasattr(user, '_anonymous_id'):
+                user._anonymous_id = {}  # pylint: disable=protected-access
+            user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+            anonymous_ids[user.id] = digest
+
+    if save:
+        _create_missing_anonymous_ids(anonymous_ids, course_id)
+    return anonymous_ids
+
+
+def users_by_anonymous_ids(uids):
+    """
+    Return a dict mapping the given anonymous ids to their users, as
+    `user_by_anonymous_id` returns them one at a time.
+
+    Ids without a user are left out.
+    """
+    uids = list(set(uid for uid in uids if uid is not None))
+    users = {}
+    for start in range(0, len(uids), ANONYMOUS_ID_BATCH_SIZE):
+        anonymous_user_ids = AnonymousUserId.objects.filter(
+            anonymous_user_id__in=uids[start:start + ANONYMOUS_ID_BATCH_SIZE],
+        ).select_related('user')
+        users.update(
+            (anonymous_user_id.anonymous_user_id, anonymous_user_id.user) for anonymous_user_id in anonymous_user_ids
+        )
+    return users
+
+
+def _salted_anonymous_id_hasher():
+    """
+    Return the hasher from which anonymous ids are computed.
+    """
+    # include the secret key as a salt, and to make the ids unique across different LMS installs.
+    hasher = hashlib.md5()
+    hasher.update(settings.SECRET_KEY)
+    return hasher
+
+
+def _anonymous_id_digest(salted_hasher, user_id, course_id):
+    """
+    Return the anonymous id of a user for a course.
+    """
+    hasher = salted_hasher.copy()
+    hasher.update(text_type(user_id))
+    if course_id:
+        hasher.update(text_type(course_id).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _create_missing_anonymous_ids(anonymous_ids, course_id):
+    """
+    Create the AnonymousUserId objects of the given dict of anonymous ids by
+    user id that don't exist yet, in batches.
+    """
+    user_ids_by_anonymous_id = {digest: user_id for user_id, digest in anonymous_ids.iteritems()}
+    digests = list(user_ids_by_anonymous_id)
+    for start in range(0, len(digests), ANONYMOUS_ID_BATCH_SIZE):
+        batch = digests[start:start + ANONYMOUS_ID_BATCH_SIZE]
+        existing = set(
+            AnonymousUserId.objects.filter(anonymous_user_id__in=batch).values_list('anonymous_user_id', flat=True)
+        )
+        missing = [
+            AnonymousUserId(user_id=user_ids_by_anonymous_id[digest], course_id=course_id, anonymous_user_id=digest)
+            for digest in batch if digest not in existing
+        ]
+        if not missing:
+            continue
+        try:
+            with transaction.atomic():
+                AnonymousUserId.objects.bulk_create(missing)
+        except IntegrityError:
+            # Another thread has created some of these entries in the
+            # meantime, so create the others one at a time.
+            for anonymous_user_id in missing:
+                try:
+                    with transaction.atomic():
+                        AnonymousUserId.objects.get_or_create(
+                            user_id=anonymous_user_id.user_id,
+                            course_id=course_id,
+                            anonymous_user_id=anonymous_user_id.anonymous_user_id,
+                        )
+                except IntegrityError:
+                    pass
+
+
 def is_username_retired(username):
     """
     Checks to see if the given username has been previously retired
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 
 from openedx.core.djangoapps.user_api.config.waffle import PREVENT_AUTH_USER_WRITES, waffle
+from student.dashboard_sections import invalidate_sections
 from student.helpers import (
     AccountValidationError,
     USERNAME_EXISTS_MSG_FMT
@@ -56,3 +57,17 @@ def on_user_updated(sender, instance, **kwargs):  # pylint: disable=unused-argum
                 EMAIL_EXISTS_MSG_FMT.format(username=instance.email),
                 field="email"
             )
+
+
+def on_enrollment_updated(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discard the cached dashboard sections of the user of a changed enrollment.
+    """
+    invalidate_sections(instance.user_id)
+
+
+def on_certificate_changed(sender, user, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discard the cached dashboard sections of the user of a changed certificate.
+    """
+    invalidate_sections(user.id)
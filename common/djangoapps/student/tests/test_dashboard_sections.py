@@ -0,0 +1,135 @@
+"""
+Tests of the concurrent computation and caching of dashboard sections.
+"""
+import threading
+
+import crum
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.utils import translation
+from edx_django_utils.cache import RequestCache
+from mock import Mock, patch
+
+from openedx.core.djangoapps.signals.signals import COURSE_CERT_CHANGED
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from student.dashboard_sections import DashboardSection, get_section_values
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+
+
+@override_settings(STUDENT_DASHBOARD_SECTIONS={'MAX_WORKERS': 1, 'CACHE_TIMEOUT': 60})
+class DashboardSectionsTestCase(CacheIsolationTestCase):
+    """
+    Tests of get_section_values.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(DashboardSectionsTestCase, self).setUp()
+        RequestCache.clear_all_namespaces()
+        self.user = UserFactory()
+        self.request = RequestFactory().get('/dashboard')
+        self.request.user = self.user
+        self.cached_function = Mock(return_value={'cached': True})
+        self.function = Mock(return_value='value')
+
+    def get_section_values(self, request=None):
+        return get_section_values(request or self.request, [
+            DashboardSection('cached', self.cached_function, (self.user,), {'option': 1}, cached=True),
+            DashboardSection('computed', self.function),
+        ])
+
+    def test_values(self):
+        self.assertEqual(self.get_section_values(), {'cached': {'cached': True}, 'computed': 'value'})
+        self.cached_function.assert_called_once_with(self.user, option=1)
+        self.function.assert_called_once_with()
+
+    def test_cached(self):
+        self.get_section_values()
+        self.assertEqual(self.get_section_values(), {'cached': {'cached': True}, 'computed': 'value'})
+        self.assertEqual(self.cached_function.call_count, 1)
+        self.assertEqual(self.function.call_count, 2)
+
+    def test_cached_per_user(self):
+        self.get_section_values()
+        other_request = RequestFactory().get('/dashboard')
+        other_request.user = UserFactory()
+        self.get_section_values(other_request)
+        self.assertEqual(self.cached_function.call_count, 2)
+
+    @override_settings(STUDENT_DASHBOARD_SECTIONS={'MAX_WORKERS': 1, 'CACHE_TIMEOUT': 0})
+    def test_cache_disabled(self):
+        self.get_section_values()
+        self.get_section_values()
+        self.assertEqual(self.cached_function.call_count, 2)
+
+    def test_invalidated_by_enrollment(self):
+        self.get_section_values()
+        CourseEnrollmentFactory(user=self.user)
+        self.get_section_values()
+        self.assertEqual(self.cached_function.call_count, 2)
+
+    def test_invalidated_by_certificate(self):
+        self.get_section_values()
+        COURSE_CERT_CHANGED.send(sender=None, user=self.user, course_key=None, mode='verified', status='downloadable')
+        self.get_section_values()
+        self.assertEqual(self.cached_function.call_count, 2)
+
+    @override_settings(STUDENT_DASHBOARD_SECTIONS={'MAX_WORKERS': 2, 'CACHE_TIMEOUT': 0})
+    def test_threads(self):
+        def get_context():
+            return crum.get_current_request(), translation.get_language()
+
+        with translation.override('eo'):
+            values = get_section_values(self.request, [
+                DashboardSection(name, get_context) for name in ('first', 'second', 'third')
+            ])
+        self.assertEqual(values, {name: (self.request, 'eo') for name in ('first', 'second', 'third')})
+
+    @override_settings(STUDENT_DASHBOARD_SECTIONS={'MAX_WORKERS': 2, 'CACHE_TIMEOUT': 0})
+    def test_threads_connections(self):
+        started_threads = set()
+        started_threads_lock = threading.Lock()
+        all_threads_started = threading.Event()
+
+        def get_connection():
+            # Wait for both threads of the pool to compute sections.
+            with started_threads_lock:
+                started_threads.add(threading.current_thread().ident)
+                if len(started_threads) == 2:
+                    all_threads_started.set()
+            all_threads_started.wait(10)
+            return threading.current_thread().ident, connections[DEFAULT_DB_ALIAS]
+
+        connection_class = type(connections[DEFAULT_DB_ALIAS])
+        with patch.object(connection_class, 'close', autospec=True) as mock_close:
+            values = get_section_values(self.request, [
+                DashboardSection(name, get_connection) for name in ('first', 'second', 'third', 'fourth')
+            ])
+            thread_connections = dict(values.values())
+            self.assertEqual(len(thread_connections), 2)
+            self.assertNotIn(threading.current_thread().ident, thread_connections)
+            self.assertNotIn(connections[DEFAULT_DB_ALIAS], thread_connections.values())
+
+            # Each thread kept its connection for all its sections, closed along with the pool.
+            self.assertEqual(
+                sorted(id(call[0][0]) for call in mock_close.call_args_list),
+                sorted(id(thread_connection) for thread_connection in thread_connections.values()),
+            )
+
+    @override_settings(STUDENT_DASHBOARD_SECTIONS={'MAX_WORKERS': 2, 'CACHE_TIMEOUT': 0})
+    def test_threads_error(self):
+        with self.assertRaises(ValueError):
+            get_section_values(self.request, [
+                DashboardSection('computed', self.function),
+                DashboardSection('failing', Mock(side_effect=ValueError)),
+            ])
+
+    @patch('student.dashboard_sections.monitoring_utils.set_custom_metric')
+    def test_metrics(self, mock_set_custom_metric):
+        self.get_section_values()
+        self.get_section_values()
+        metric_names = [call[0][0] for call in mock_set_custom_metric.call_args_list]
+        self.assertEqual(metric_names.count('dashboard_section_cached_ms'), 1)
+        self.assertEqual(metric_names.count('dashboard_section_computed_ms'), 2)
+        mock_set_custom_metric.assert_called_with('dashboard_sections_cached', 1)
@@ -40,8 +40,10 @@ from student.models import (
     LinkedInAddToProfileConfiguration,
     UserAttribute,
     anonymous_id_for_user,
+    anonymous_ids_for_users,
     unique_id_for_user,
-    user_by_anonymous_id
+    user_by_anonymous_id,
+    users_by_anonymous_ids
 )
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
 from student.views import complete_course_mode_info
@@ -1061,6 +1063,40 @@ class AnonymousLookupTable(ModuleStoreTestCase):
             self.assertEqual(self.user, user_by_anonymous_id(anonymous_id))
             self.assertEqual(self.user, user_by_anonymous_id(new_anonymous_id))
 
+    def test_bulk_roundtrip(self):
+        users = [self.user, UserFactory.create(), AnonymousUser()]
+        existing_id = anonymous_id_for_user(users[0], self.course.id)
+        anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+
+        self.assertEqual(anonymous_ids, {
+            users[0].id: existing_id,
+            users[1].id: anonymous_id_for_user(users[1], self.course.id, save=False),
+        })
+        with self.assertNumQueries(1):
+            real_users = users_by_anonymous_ids(anonymous_ids.values() + [None, 'unknown'])
+        self.assertEqual(real_users, {anonymous_ids[user.id]: user for user in users[:2]})
+
+    def test_bulk_from_queryset(self):
+        user2 = UserFactory.create()
+        users = User.objects.filter(id__in=[self.user.id, user2.id])
+        with self.assertNumQueries(1):
+            anonymous_ids = anonymous_ids_for_users(users, None, save=False)
+
+        self.assertEqual(anonymous_ids, {
+            self.user.id: anonymous_id_for_user(self.user, None, save=False),
+            user2.id: anonymous_id_for_user(user2, None, save=False),
+        })
+        self.assertEqual(users_by_anonymous_ids(anonymous_ids.values()), {})
+
+    @patch('student.models.ANONYMOUS_ID_BATCH_SIZE', 2)
+    def test_bulk_batches(self):
+        users = [self.user] + UserFactory.create_batch(4)
+        anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+        with self.assertNumQueries(3):
+            real_users = users_by_anonymous_ids(anonymous_ids.values())
+        self.assertEqual(len(real_users), 5)
+        self.assertEqual(anonymous_ids, anonymous_ids_for_users(users, self.course.id))
+
 
 @skip_unless_lms
 @patch('openedx.core.djangoapps.programs.utils.get_programs')
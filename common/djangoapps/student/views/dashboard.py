@@ -45,6 +45,7 @@ from openedx.features.journals.api import journals_enabled
 from shoppingcart.api import order_history
 from shoppingcart.models import CourseRegistrationCode, DonationConfiguration
 from openedx.core.djangoapps.user_authn.cookies import _set_deprecated_user_info_cookie
+from student.dashboard_sections import DashboardSection, get_section_values
 from student.helpers import cert_info, check_verify_status_by_course
 from student.models import (
     CourseEnrollment,
@@ -512,6 +513,81 @@ def _credit_statuses(user, course_enrollments):
     return statuses
 
 
+def _get_course_modes_by_course(course_enrollments):
+    """
+    Returns a dict of the unexpired course modes of the courses of the given
+    enrollments, by course id and mode slug.
+    """
+    enrolled_course_ids = [enrollment.course_id for enrollment in course_enrollments]
+    __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
+    return {
+        course_id: {
+            mode.slug: mode
+            for mode in modes
+        }
+        for course_id, modes in iteritems(unexpired_course_modes)
+    }
+
+
+def _get_courses_with_courseware_links(user, course_enrollments):
+    """
+    Returns the ids of the courses of the given enrollments whose courseware
+    the user can load.
+    """
+    return frozenset(
+        enrollment.course_id for enrollment in course_enrollments
+        if has_access(user, 'load', enrollment.course_overview)
+    )
+
+
+def _get_inverted_programs(site, user, course_enrollments):
+    """
+    Returns the programs of the given enrollments, keyed by course run id.
+    """
+    return ProgramProgressMeter(site, user, enrollments=course_enrollments).invert_programs()
+
+
+def _get_cert_statuses(user, course_enrollments):
+    """
+    Returns the certificate statuses of the user in the courses of the given
+    enrollments, by course id.
+    """
+    return {
+        enrollment.course_id: cert_info(user, enrollment.course_overview)
+        for enrollment in course_enrollments
+    }
+
+
+def _get_blocked_courses(request, course_enrollments):
+    """
+    Returns the ids of the courses of the given enrollments that are blocked
+    for the user of the request.
+    """
+    return frozenset(
+        enrollment.course_id for enrollment in course_enrollments
+        if is_course_blocked(
+            request,
+            CourseRegistrationCode.objects.filter(
+                course_id=enrollment.course_id,
+                registrationcoderedemption__redeemed_by=request.user
+            ),
+            enrollment.course_id
+        )
+    )
+
+
+def _get_courses_requirements_not_met(user, course_enrollments):
+    """
+    Returns the pre-requisite courses the user has yet to complete, by id
+    of the courses of the given enrollments having them.
+    """
+    courses_having_prerequisites = frozenset(
+        enrollment.course_id for enrollment in course_enrollments
+        if enrollment.course_overview.pre_requisite_courses
+    )
+    return get_pre_requisite_courses_not_completed(user, courses_having_prerequisites)
+
+
 def _get_urls_for_resume_buttons(user, enrollments):
     '''
     Checks whether a user has made progress in any of a list of enrollments.
@@ -575,16 +651,6 @@ def student_dashboard(request):
     site_org_whitelist, site_org_blacklist = get_org_black_and_whitelist_for_site()
     course_enrollments = list(get_course_enrollments(user, site_org_whitelist, site_org_blacklist))
 
-    # Get the entitlements for the user and a mapping to all available sessions for that entitlement
-    # If an entitlement has no available sessions, pass through a mock course overview object
-    (course_entitlements,
-     course_entitlement_available_sessions,
-     unfulfilled_entitlement_pseudo_sessions) = get_filtered_course_entitlements(
-        user,
-        site_org_whitelist,
-        site_org_blacklist
-    )
-
     # Record how many courses there are so that we can get a better
     # understanding of usage patterns on prod.
     monitoring_utils.accumulate('num_courses', len(course_enrollments))
@@ -592,16 +658,68 @@ def student_dashboard(request):
     # Sort the enrollment pairs by the enrollment date
     course_enrollments.sort(key=lambda x: x.created, reverse=True)
 
-    # Retrieve the course modes for each course
-    enrolled_course_ids = [enrollment.course_id for enrollment in course_enrollments]
-    __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(enrolled_course_ids)
-    course_modes_by_course = {
-        course_id: {
-            mode.slug: mode
-            for mode in modes
-        }
-        for course_id, modes in iteritems(unexpired_course_modes)
-    }
+    # Compute the independent sections of the dashboard concurrently. Those
+    # only depending on the enrollments, certificates and verifications of
+    # the user are cached until these change.
+    sections = get_section_values(request, [
+        # Get the entitlements for the user and a mapping to all available sessions for that entitlement
+        # If an entitlement has no available sessions, pass through a mock course overview object
+        DashboardSection(
+            'course_entitlements', get_filtered_course_entitlements, (user, site_org_whitelist, site_org_blacklist),
+        ),
+        # Retrieve the course modes for each course
+        DashboardSection('course_modes_by_course', _get_course_modes_by_course, (course_enrollments,)),
+        DashboardSection(
+            'show_courseware_links_for', _get_courses_with_courseware_links, (user, course_enrollments),
+        ),
+        # Find programs associated with course runs being displayed. This information
+        # is passed in the template context to allow rendering of program-related
+        # information on the dashboard.
+        DashboardSection(
+            'inverted_programs', _get_inverted_programs, (request.site, user, course_enrollments), cached=True,
+        ),
+        # Determine the per-course verification status
+        # This is a dictionary in which the keys are course locators
+        # and the values are one of:
+        #
+        # VERIFY_STATUS_NEED_TO_VERIFY
+        # VERIFY_STATUS_SUBMITTED
+        # VERIFY_STATUS_APPROVED
+        # VERIFY_STATUS_MISSED_DEADLINE
+        #
+        # Each of which correspond to a particular message to display
+        # next to the course on the dashboard.
+        #
+        # If a course is not included in this dictionary,
+        # there is no verification messaging to display.
+        DashboardSection(
+            'verify_status_by_course', check_verify_status_by_course, (user, course_enrollments), cached=True,
+        ),
+        DashboardSection('cert_statuses', _get_cert_statuses, (user, course_enrollments), cached=True),
+        # Verification Attempts
+        # Used to generate the "you must reverify for course x" banner
+        DashboardSection('verification_status', IDVerificationService.user_status, (user,), cached=True),
+        DashboardSection('block_courses', _get_blocked_courses, (request, course_enrollments)),
+        # Populate the Order History for the side-bar.
+        DashboardSection(
+            'order_history_list',
+            order_history,
+            (user,),
+            {'course_org_filter': site_org_whitelist, 'org_filter_out_set': site_org_blacklist},
+            cached=True,
+        ),
+        # get list of courses having pre-requisites yet to be completed
+        DashboardSection(
+            'courses_requirements_not_met', _get_courses_requirements_not_met, (user, course_enrollments),
+        ),
+    ])
+    (course_entitlements,
+     course_entitlement_available_sessions,
+     unfulfilled_entitlement_pseudo_sessions) = sections['course_entitlements']
+    course_modes_by_course = sections['course_modes_by_course']
+    inverted_programs = sections['inverted_programs']
+    verification_status = sections['verification_status']
+    order_history_list = sections['order_history_list']
 
     # Check to see if the student has recently enrolled in a course.
     # If so, display a notification message confirming the enrollment.
@@ -647,17 +765,7 @@ def student_dashboard(request):
         staff_access = True
         errored_courses = modulestore().get_errored_courses()
 
-    show_courseware_links_for = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if has_access(request.user, 'load', enrollment.course_overview)
-    )
-
-    # Find programs associated with course runs being displayed. This information
-    # is passed in the template context to allow rendering of program-related
-    # information on the dashboard.
-    meter = ProgramProgressMeter(request.site, user, enrollments=course_enrollments)
     ecommerce_service = EcommerceService()
-    inverted_programs = meter.invert_programs()
 
     urls, programs_data = {}, {}
     bundles_on_dashboard_flag = WaffleFlag(WaffleFlagNamespace(name=u'student.experiments'), u'bundles_on_dashboard')
@@ -688,26 +796,6 @@ def student_dashboard(request):
         for enrollment in course_enrollments
     }
 
-    # Determine the per-course verification status
-    # This is a dictionary in which the keys are course locators
-    # and the values are one of:
-    #
-    # VERIFY_STATUS_NEED_TO_VERIFY
-    # VERIFY_STATUS_SUBMITTED
-    # VERIFY_STATUS_APPROVED
-    # VERIFY_STATUS_MISSED_DEADLINE
-    #
-    # Each of which correspond to a particular message to display
-    # next to the course on the dashboard.
-    #
-    # If a course is not included in this dictionary,
-    # there is no verification messaging to display.
-    verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
-    cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview)
-        for enrollment in course_enrollments
-    }
-
     # only show email settings for Mongo course and when bulk email is turned on
     show_email_settings_for = frozenset(
         enrollment.course_id for enrollment in course_enrollments if (
@@ -715,27 +803,12 @@ def student_dashboard(request):
         )
     )
 
-    # Verification Attempts
-    # Used to generate the "you must reverify for course x" banner
-    verification_status = IDVerificationService.user_status(user)
     verification_errors = get_verification_error_reasons_for_display(verification_status['error'])
 
     # Gets data for midcourse reverifications, if any are necessary or have failed
     statuses = ["approved", "denied", "pending", "must_reverify"]
     reverifications = reverification_info(statuses)
 
-    block_courses = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if is_course_blocked(
-            request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
-            enrollment.course_id
-        )
-    )
-
     enrolled_courses_either_paid = frozenset(
         enrollment.course_id for enrollment in course_enrollments
         if enrollment.is_paid_course()
@@ -745,20 +818,6 @@ def student_dashboard(request):
     # we'll display the banner
     denied_banner = any(item.display for item in reverifications["denied"])
 
-    # Populate the Order History for the side-bar.
-    order_history_list = order_history(
-        user,
-        course_org_filter=site_org_whitelist,
-        org_filter_out_set=site_org_blacklist
-    )
-
-    # get list of courses having pre-requisites yet to be completed
-    courses_having_prerequisites = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if enrollment.course_overview.pre_requisite_courses
-    )
-    courses_requirements_not_met = get_pre_requisite_courses_not_completed(user, courses_having_prerequisites)
-
     if 'notlive' in request.GET:
         redirect_message = _("The course you are looking for does not start until {date}.").format(
             date=request.GET['notlive']
@@ -798,17 +857,17 @@ def student_dashboard(request):
         'course_optouts': course_optouts,
         'staff_access': staff_access,
         'errored_courses': errored_courses,
-        'show_courseware_links_for': show_courseware_links_for,
+        'show_courseware_links_for': sections['show_courseware_links_for'],
         'all_course_modes': course_mode_info,
-        'cert_statuses': cert_statuses,
+        'cert_statuses': sections['cert_statuses'],
         'credit_statuses': _credit_statuses(user, course_enrollments),
         'show_email_settings_for': show_email_settings_for,
         'reverifications': reverifications,
         'verification_display': verification_status['should_display'],
         'verification_status': verification_status['status'],
-        'verification_status_by_course': verify_status_by_course,
+        'verification_status_by_course': sections['verify_status_by_course'],
         'verification_errors': verification_errors,
-        'block_courses': block_courses,
+        'block_courses': sections['block_courses'],
         'denied_banner': denied_banner,
         'billing_email': settings.PAYMENT_SUPPORT_EMAIL,
         'user': user,
@@ -817,7 +876,7 @@ def student_dashboard(request):
         'enrolled_courses_either_paid': enrolled_courses_either_paid,
         'provider_states': [],
         'order_history_list': order_history_list,
-        'courses_requirements_not_met': courses_requirements_not_met,
+        'courses_requirements_not_met': sections['courses_requirements_not_met'],
         'nav_hidden': True,
         'inverted_programs': inverted_programs,
         'show_program_listing': ProgramsApiConfig.is_enabled(),
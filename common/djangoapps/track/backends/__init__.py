@@ -25,3 +25,14 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_batch(self, events):
+        """
+        Send a list of events to tracker.
+
+        Backends that can write several events at once override this. It
+        raises an exception if the events could not be written, so that
+        the caller can keep them for later.
+        """
+        for event in events:
+            self.send(event)
@@ -0,0 +1,303 @@
+"""
+Event tracker backend that sends events to another backend in batches,
+from a background thread.
+
+Events are put in a bounded queue, so that sending them doesn't block the
+request that emitted them. When the queue is full, events are dropped after
+waiting at most `max_wait` seconds for room. When the wrapped backend fails
+to write a batch because it is unavailable, the batch is appended to
+`spill_file`, up to `max_spill_size` bytes, and sent again once the backend
+is back. When it fails because of the events themselves, they are sent one
+at a time, dropping only those that can't be written. The queue is flushed
+when the process exits.
+
+Example configuration::
+
+  TRACKING_BACKENDS = {
+      'logger': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.logger.LoggerBackend',
+                  'OPTIONS': {
+                      'name': 'tracking'
+                  }
+              },
+              'spill_file': '/edx/var/log/tracking/spill'
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import cPickle as pickle
+import logging
+import os
+import struct
+import threading
+from Queue import Empty, Full, Queue
+
+from django.utils.module_loading import import_string
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+# Batches in the spill file are preceded by their length.
+HEADER = struct.Struct('!I')
+
+# Errors raised by the wrapped backend because of the events it is sent, like
+# those that can't be serialized, rather than because it is unavailable: these
+# events would fail again, so they aren't spilled.
+EVENT_ERRORS = (TypeError, ValueError)
+
+
+class BufferedBackend(BaseBackend):
+    """Event tracker backend that buffers events for another backend"""
+
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, flush_interval=1,
+                 max_wait=0, spill_file=None, max_spill_size=100 * 1024 * 1024, **kwargs):
+        """
+        Create the wrapped backend.
+
+        :Parameters:
+
+          - `backend`: dict with the 'ENGINE' and 'OPTIONS' of the wrapped
+            backend, like an entry of TRACKING_BACKENDS
+          - `max_queue_size`: number of events kept in memory
+          - `batch_size`: maximum number of events sent at once
+          - `flush_interval`: seconds between two checks for events to send
+            again from the spill file, when no event is emitted
+          - `max_wait`: seconds to wait for room in a full queue before
+            dropping an event
+          - `spill_file`: path of the file keeping the events that could not
+            be sent, or None to drop them
+          - `max_spill_size`: size in bytes past which events are dropped
+            instead of being added to the spill file, or None for no limit
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        self.backend = import_string(backend['ENGINE'])(**backend.get('OPTIONS', {}))
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_wait = max_wait
+        self.spill_file = spill_file
+        self.max_spill_size = max_spill_size
+
+        self.dropped = 0
+        self.spilled = 0
+
+        self.queue = Queue(max_queue_size)
+        self._pid = None
+        self._closed = False
+        # Held while starting the flush thread, and while writing a batch.
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Enqueue the event, dropping it if the queue stays full"""
+        self._ensure_flush_thread()
+        try:
+            if self.max_wait:
+                self.queue.put(event, timeout=self.max_wait)
+            else:
+                self.queue.put_nowait(event)
+        except Full:
+            self._drop(1)
+
+    def flush(self):
+        """Send all the queued events"""
+        while True:
+            batch = self._get_batch(block=False)
+            self._send_batch(batch)
+            if len(batch) < self.batch_size:
+                break
+
+    def close(self):
+        """Stop the flush thread, and send the remaining events"""
+        self._closed = True
+        if self._pid == os.getpid():
+            self.flush()
+
+    def _ensure_flush_thread(self):
+        """
+        Start the thread sending the events of this process, if needed.
+
+        Threads don't survive a fork: a process forked after events were
+        emitted starts its own, with an empty queue.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self.queue = Queue(self.max_queue_size)
+                self._start_flush_thread()
+                self._pid = os.getpid()
+
+    def _start_flush_thread(self):
+        """Start the thread sending the queued events"""
+        thread = threading.Thread(target=self._run, name='track-buffered-backend')
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        """Send the queued events in batches, until the backend is closed"""
+        while not self._closed:
+            try:
+                self._send_batch(self._get_batch(block=True))
+            except Exception:  # pylint: disable=broad-except
+                log.exception('Error sending events from the buffered tracker backend')
+
+    def _get_batch(self, block):
+        """
+        Take up to `batch_size` events from the queue, waiting for the first
+        one at most `flush_interval` seconds if `block` is True.
+        """
+        batch = []
+        try:
+            if block:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except Empty:
+            pass
+        return batch
+
+    def _send_batch(self, batch):
+        """
+        Send the spilled events, then `batch`, to the wrapped backend,
+        spilling `batch` if the backend fails.
+        """
+        with self._flush_lock:
+            dog_stats_api.gauge('track.buffered.queue_size', self.queue.qsize())
+            if self.spill_file and os.path.exists(self.spill_file):
+                if not self._send_spilled():
+                    self._spill(batch)
+                    return
+
+            if batch:
+                self._spill(self._deliver(batch))
+
+    def _deliver(self, batch):
+        """
+        Send `batch` to the wrapped backend, and return the events that
+        weren't sent because it is unavailable.
+
+        When the events of the batch cause the error, they are sent one at a
+        time, dropping those that can't be written. Events of the batch that
+        were already written may then be written twice.
+        """
+        try:
+            with dog_stats_api.timer('track.buffered.send_batch'):
+                self.backend.send_batch(batch)
+            return []
+        except EVENT_ERRORS:
+            log.exception('Error sending %d events to the tracker backend, sending them one at a time', len(batch))
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error sending %d events to the tracker backend', len(batch))
+            return batch
+
+        for index, event in enumerate(batch):
+            try:
+                self.backend.send(event)
+            except EVENT_ERRORS:
+                log.exception('Dropping an event the tracker backend can not write')
+                self._drop(1)
+            except Exception:  # pylint: disable=broad-except
+                log.exception('Error sending %d events to the tracker backend', len(batch) - index)
+                return batch[index:]
+        return []
+
+    def _drop(self, count):
+        """Count `count` dropped events"""
+        self.dropped += count
+        dog_stats_api.increment('track.buffered.dropped', count)
+
+    def _spill(self, batch):
+        """Append `batch` to the spill file, or drop it if it can't be"""
+        if not batch:
+            return
+        if self._write_spill_file(batch):
+            self.spilled += len(batch)
+            dog_stats_api.increment('track.buffered.spilled', len(batch))
+        else:
+            self._drop(len(batch))
+
+    def _write_spill_file(self, batch):
+        """Append `batch` to the spill file, and return whether it was"""
+        if not self.spill_file:
+            return False
+        try:
+            data = pickle.dumps(batch, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError):
+            log.exception('Error pickling %d events for the tracker spill file', len(batch))
+            return False
+        try:
+            # Other processes may append to the same file: each batch is
+            # written at once.
+            fd = os.open(self.spill_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0600)
+            try:
+                spill_size = os.fstat(fd).st_size + HEADER.size + len(data)
+                if self.max_spill_size is not None and spill_size > self.max_spill_size:
+                    log.warning('The tracker spill file %s is full', self.spill_file)
+                    return False
+                os.write(fd, HEADER.pack(len(data)) + data)
+            finally:
+                os.close(fd)
+        except (IOError, OSError):
+            log.exception('Error writing to the tracker spill file %s', self.spill_file)
+            return False
+        return True
+
+    def _send_spilled(self):
+        """
+        Send the events of the spill file, and return whether all of them
+        were sent; those that weren't are spilled again.
+        """
+        # Take the file, so that no other process sends the same events.
+        replay_file = '{}.{}'.format(self.spill_file, os.getpid())
+        try:
+            os.rename(self.spill_file, replay_file)
+        except OSError:
+            # Another process took it.
+            return True
+
+        try:
+            with open(replay_file, 'rb') as spilled:
+                batches = list(_read_batches(spilled))
+        except (IOError, OSError):
+            log.exception('Error reading the tracker spill file %s', replay_file)
+            return True
+        os.remove(replay_file)
+
+        for index, batch in enumerate(batches):
+            unsent = self._deliver(batch)
+            if unsent:
+                for unsent_batch in [unsent] + batches[index + 1:]:
+                    if not self._write_spill_file(unsent_batch):
+                        self._drop(len(unsent_batch))
+                return False
+        return True
+
+
+def _read_batches(spilled):
+    """Yield the batches written to a spill file"""
+    while True:
+        header = spilled.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        data = spilled.read(HEADER.unpack(header)[0])
+        try:
+            yield pickle.loads(data)
+        except Exception:  # pylint: disable=broad-except
+            # A batch cut short when the process writing it died.
+            log.warning('Skipping a truncated batch of the tracker spill file')
+            return
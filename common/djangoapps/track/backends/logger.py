@@ -48,3 +48,14 @@ class LoggerBackend(BaseBackend):
         event_str = event_str[:settings.TRACK_MAX_EVENT]
 
         self.event_logger.info(event_str)
+
+    def send_batch(self, events):
+        for event in events:
+            try:
+                self.send(event)
+            except UnicodeDecodeError:
+                # Already logged: write the other events.
+                pass
+            except (TypeError, ValueError):
+                # The event can't be serialized: write the other events.
+                application_log.exception("Error serializing event: %r", event)
@@ -96,3 +96,19 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_batch(self, events):
+        """
+        Insert the events in to the Mongo collection at once.
+
+        Connection errors are raised, so that the events can be kept until
+        the database is back.
+        """
+        try:
+            self.collection.insert(events, manipulate=False)
+        except BSONError:
+            # One of the events can't be encoded: insert them one at a
+            # time, losing only the invalid ones. Events of a large batch
+            # that were already sent may be inserted twice.
+            for event in events:
+                self.send(event)
@@ -0,0 +1,162 @@
+"""Tests for the buffered event tracker backend."""
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from django.test import TestCase
+from mock import patch
+from pytz import UTC
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class InMemoryBackend(BaseBackend):
+    """
+    Backend keeping the batches of events it is sent, unless it is down or
+    one of them is invalid
+    """
+
+    def __init__(self, **kwargs):
+        super(InMemoryBackend, self).__init__(**kwargs)
+        self.batches = []
+        self.down = False
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        if self.down:
+            raise IOError('down')
+        if any(event.get('invalid') for event in events):
+            raise TypeError('invalid')
+        self.batches.append(events)
+
+
+@patch.object(BufferedBackend, '_start_flush_thread')
+class TestBufferedBackend(TestCase):
+    """Tests of BufferedBackend, flushed by the tests instead of a thread"""
+
+    def setUp(self):
+        super(TestBufferedBackend, self).setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.spill_file = os.path.join(self.temp_dir, 'spill')
+
+    def _create_backend(self, **options):
+        """Returns a BufferedBackend wrapping an InMemoryBackend"""
+        options.setdefault('spill_file', self.spill_file)
+        return BufferedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_buffered.InMemoryBackend'},
+            **options
+        )
+
+    def test_batches(self, mock_start_flush_thread):
+        backend = self._create_backend(batch_size=2)
+        events = [{'test': index} for index in range(5)]
+        for event in events:
+            backend.send(event)
+        self.assertEqual(backend.backend.batches, [])
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [events[0:2], events[2:4], events[4:]])
+        self.assertEqual(mock_start_flush_thread.call_count, 1)
+
+    def test_queue_full(self, _mock_start_flush_thread):
+        backend = self._create_backend(max_queue_size=2)
+        for index in range(3):
+            backend.send({'test': index})
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 0}, {'test': 1}]])
+        self.assertEqual(backend.dropped, 1)
+
+    def test_spill(self, _mock_start_flush_thread):
+        backend = self._create_backend()
+        event = {'test': 1, 'time': datetime(2012, 5, 1, 7, 27, 1, tzinfo=UTC)}
+
+        backend.backend.down = True
+        backend.send(event)
+        backend.flush()
+        backend.send({'test': 2})
+        backend.flush()
+        self.assertEqual(backend.spilled, 2)
+        self.assertTrue(os.path.exists(self.spill_file))
+
+        # The spilled events are sent before the new ones, unchanged.
+        backend.backend.down = False
+        backend.send({'test': 3})
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[event], [{'test': 2}], [{'test': 3}]])
+        self.assertFalse(os.path.exists(self.spill_file))
+        self.assertEqual(backend.dropped, 0)
+
+    def test_invalid_event(self, _mock_start_flush_thread):
+        backend = self._create_backend()
+        backend.send({'test': 1})
+        backend.send({'invalid': True})
+        backend.send({'test': 2})
+        backend.flush()
+
+        # Only the invalid event is dropped, instead of spilling the batch.
+        self.assertEqual(backend.backend.batches, [[{'test': 1}], [{'test': 2}]])
+        self.assertEqual(backend.dropped, 1)
+        self.assertEqual(backend.spilled, 0)
+        self.assertFalse(os.path.exists(self.spill_file))
+
+    def test_invalid_spilled_event(self, _mock_start_flush_thread):
+        backend = self._create_backend()
+        backend.backend.down = True
+        backend.send({'invalid': True})
+        backend.send({'test': 1})
+        backend.flush()
+        self.assertEqual(backend.spilled, 2)
+
+        backend.backend.down = False
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+        self.assertEqual(backend.dropped, 1)
+        self.assertFalse(os.path.exists(self.spill_file))
+
+    def test_spill_file_full(self, _mock_start_flush_thread):
+        backend = self._create_backend(max_spill_size=200)
+        backend.backend.down = True
+        for index in range(10):
+            backend.send({'test': index})
+            backend.flush()
+        self.assertGreater(backend.spilled, 0)
+        self.assertEqual(backend.spilled + backend.dropped, 10)
+        self.assertLessEqual(os.path.getsize(self.spill_file), 200)
+
+    def test_no_spill_file(self, _mock_start_flush_thread):
+        backend = self._create_backend(spill_file=None)
+        backend.backend.down = True
+        backend.send({'test': 1})
+        backend.flush()
+        self.assertEqual(backend.dropped, 1)
+
+    def test_close(self, _mock_start_flush_thread):
+        backend = self._create_backend()
+        backend.send({'test': 1})
+        backend.close()
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+
+
+class TestBufferedBackendThread(TestCase):
+    """Tests of the thread flushing BufferedBackend"""
+
+    def test_flush_thread(self):
+        backend = BufferedBackend(
+            backend={'ENGINE': 'track.backends.tests.test_buffered.InMemoryBackend'},
+            flush_interval=0.01,
+        )
+        self.addCleanup(backend.close)
+        backend.send({'test': 1})
+        for _ in range(200):
+            if backend.backend.batches:
+                break
+            time.sleep(0.01)
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
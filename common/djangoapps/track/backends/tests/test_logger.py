@@ -36,3 +36,18 @@ def test_logger_backend(caplog):
 
     assert saved_events[0] == unpacked_event
     assert saved_events[1] == unpacked_event
+
+
+def test_logger_backend_batch(caplog):
+    """
+    Send a batch containing an event that can't be serialized, and check
+    that the other events are recorded.
+    """
+    caplog.set_level(logging.INFO)
+    logger_name = 'track.backends.logger.test'
+    backend = LoggerBackend(name=logger_name)
+
+    backend.send_batch([{'test': 1}, {'test': object()}, {'test': 2}])
+
+    saved_events = [json.loads(e[2]) for e in caplog.record_tuples if e[0] == logger_name]
+    assert saved_events == [{'test': 1}, {'test': 2}]
@@ -7,6 +7,8 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import numbers
 import operator
+import threading
+from collections import OrderedDict
 
 import numpy
 import scipy.constants
@@ -81,6 +83,9 @@ SUFFIXES = {
     '%': 0.01,
 }
 
+# Number of parsed expressions kept by `compile_expression`.
+PARSE_CACHE_SIZE = 1000
+
 
 class UndefinedVariable(Exception):
     """
@@ -244,35 +249,175 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    check_parens(math_expr)
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+class CompiledExpression(object):
+    """
+    A math expression parsed once, to be evaluated with many sets of variables.
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+    Use `compile_expression` to get one, so that the parse is shared through
+    the parse cache. Instances are never modified after creation.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        """
+        Parse `math_expr` and turn its tree into nested evaluation functions.
+
+        Raise a `pyparsing.ParseException` if it can't be parsed.
+        """
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self.parsed = None
+        self._evaluate_tree = lambda all_variables, all_functions: float('nan')
+
+        # Blank expressions evaluate to NaN, as with `evaluator`.
+        if math_expr.strip() != "":
+            self.parsed = ParseAugmenter(math_expr, case_sensitive)
+            self.parsed.parse_algebra()
+            self._evaluate_tree = self._compile_node(self.parsed.tree)
+
+    def _compile_node(self, node):
+        """
+        Return a function of `(all_variables, all_functions)` evaluating `node`.
+
+        Numbers, variable names and function names are resolved here, once,
+        rather than each time the expression is evaluated.
+        """
+        if not isinstance(node, ParseResults):
+            # Terminal nodes (operators, parentheses) are passed on as is.
+            return lambda all_variables, all_functions: node
+
+        if self.case_sensitive:
+            casify = lambda x: x
+        else:
+            casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        node_name = node.getName()
+        if node_name == 'number':
+            value = eval_number(node)
+            return lambda all_variables, all_functions: value
+        elif node_name == 'variable':
+            varname = casify(node[0])
+            return lambda all_variables, all_functions: all_variables[varname]
+        elif node_name == 'function':
+            funcname = casify(node[0])
+            evaluate_arg = self._compile_node(node[1])
+            return lambda all_variables, all_functions: all_functions[funcname](
+                evaluate_arg(all_variables, all_functions)
+            )
+
+        evaluate_actions = {
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+        if node_name not in evaluate_actions:  # pragma: no cover
+            raise Exception(u"Unknown branch name '{}'".format(node_name))
+
+        action = evaluate_actions[node_name]
+        evaluate_kids = [self._compile_node(k) for k in node]
+        return lambda all_variables, all_functions: action(
+            [evaluate_kid(all_variables, all_functions) for evaluate_kid in evaluate_kids]
+        )
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression with the given variables and functions.
+
+        Takes the same `variables` and `functions` as `evaluator`.
+        """
+        return self.evaluate_many([variables], functions)[0]
+
+    def evaluate_many(self, variables_list, functions):
+        """
+        Evaluate the expression once for each dictionary of variables in
+        `variables_list`, and return the list of results.
+
+        The defaults are merged into `functions` only once for all of them.
+        """
+        all_functions = add_defaults({}, functions, self.case_sensitive)[1]
+        results = []
+        for variables in variables_list:
+            all_variables = add_defaults(variables, {}, self.case_sensitive)[0]
+            if self.parsed is not None:
+                self.parsed.check_variables(all_variables, all_functions)
+            results.append(self._evaluate_tree(all_variables, all_functions))
+        return results
+
+
+class _ParseCache(object):
+    """
+    Thread-safe, bounded cache of `CompiledExpression`s, evicting the least
+    recently used ones first.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._expressions = OrderedDict()
+
+    def get(self, key):
+        """
+        Return the expression cached for `key`, or None.
+        """
+        with self._lock:
+            expression = self._expressions.pop(key, None)
+            if expression is not None:
+                self._expressions[key] = expression
+            return expression
+
+    def set(self, key, expression):
+        """
+        Cache `expression` for `key`, evicting the oldest one if full.
+        """
+        with self._lock:
+            self._expressions.pop(key, None)
+            self._expressions[key] = expression
+            while len(self._expressions) > self.size:
+                self._expressions.popitem(last=False)
+
+    def clear(self):
+        """
+        Empty the cache.
+        """
+        with self._lock:
+            self._expressions.clear()
+
+
+PARSE_CACHE = _ParseCache(PARSE_CACHE_SIZE)
+
+
+def parse_expression(math_expr, case_sensitive=False):
+    """
+    Return the `CompiledExpression` for `math_expr`, from the parse cache if
+    it was parsed before.
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+    Unlike `compile_expression`, do not check the parentheses first, so that
+    unmatched ones raise a `pyparsing.ParseException`.
+    """
+    key = (math_expr, case_sensitive)
+    expression = PARSE_CACHE.get(key)
+    if expression is None:
+        expression = CompiledExpression(math_expr, case_sensitive)
+        PARSE_CACHE.set(key, expression)
+    return expression
+
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Parse and check an expression once, to evaluate it as many times as needed:
+
+      expression = compile_expression('x^2 + y')
+      results = expression.evaluate_many([{'x': 1, 'y': 2}, {'x': 3, 'y': 4}], {})
+
+    Raise an `UnmatchedParenthesis` or a `pyparsing.ParseException` if the
+    expression is invalid; undefined variables and functions are only
+    detected when evaluating it.
+    """
+    if math_expr.strip() != "":
+        check_parens(math_expr)
+    return parse_expression(math_expr, case_sensitive)
 
 
 def check_parens(formula):
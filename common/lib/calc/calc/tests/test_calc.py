@@ -4,6 +4,7 @@ Unit tests for calc.py
 
 import unittest
 import numpy
+from mock import patch
 import calc
 from pyparsing import ParseException
 
@@ -554,3 +555,71 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({}, {}, "(1+2")
         with self.assertRaisesRegexp(calc.UnmatchedParenthesis, 'no matching opening parenthesis'):
             calc.evaluator({}, {}, "(1+2))")
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and its parse cache
+    """
+
+    def setUp(self):
+        super(CompiledExpressionTest, self).setUp()
+        calc.PARSE_CACHE.clear()
+        self.addCleanup(calc.PARSE_CACHE.clear)
+
+    def test_evaluate_many(self):
+        """
+        Evaluating a compiled expression with several sets of variables should
+        match `evaluator` for each of them
+        """
+        math_expr = "sqrt(x^2 + y) || 2 - sin(x) / -y + 3%"
+        variables_list = [{'x': 1.0, 'y': 2.0}, {'x': -3.5, 'y': 0.25}, {'X': 2, 'Y': 7}]
+        results = calc.compile_expression(math_expr).evaluate_many(variables_list, {})
+        self.assertEqual(
+            results,
+            [calc.evaluator(variables, {}, math_expr) for variables in variables_list]
+        )
+
+    def test_parse_cache(self):
+        """
+        Expressions should only be parsed once per case sensitivity
+        """
+        expression = calc.compile_expression("x+1")
+        self.assertIs(calc.compile_expression("x+1"), expression)
+        self.assertIsNot(calc.compile_expression("x+1", case_sensitive=True), expression)
+
+        with patch.object(calc.CompiledExpression, '__init__') as mock_init:
+            self.assertEqual(calc.evaluator({'x': 2}, {}, "x+1"), 3)
+        self.assertFalse(mock_init.called)
+
+    def test_parse_cache_size(self):
+        """
+        The least recently used expressions should be evicted first
+        """
+        with patch.object(calc.PARSE_CACHE, 'size', 2):
+            first = calc.compile_expression("1")
+            calc.compile_expression("2")
+            calc.compile_expression("1")
+            calc.compile_expression("3")
+            self.assertIs(calc.compile_expression("1"), first)
+            self.assertIsNone(calc.PARSE_CACHE.get(("2", False)))
+
+    def test_errors(self):
+        """
+        Invalid expressions should fail when compiled, and undefined variables
+        when evaluated
+        """
+        with self.assertRaises(calc.UnmatchedParenthesis):
+            calc.compile_expression("(1+2")
+        with self.assertRaises(ParseException):
+            calc.compile_expression("1 + + 2")
+
+        expression = calc.compile_expression("x+y")
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            expression.evaluate_many([{'x': 1, 'y': 2}, {'x': 1}], {})
+
+    def test_blank(self):
+        """
+        Blank expressions should evaluate to NaN, like with `evaluator`
+        """
+        self.assertTrue(numpy.isnan(calc.compile_expression("  ").evaluate({}, {})))
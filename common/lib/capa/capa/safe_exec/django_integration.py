@@ -0,0 +1,24 @@
+"""
+Django integration for the pool of sandbox workers of capa's safe_exec.
+"""
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import worker_pool
+
+
+class ConfigureSandboxWorkerPoolMiddleware(object):
+    """
+    Configure the pool of sandbox workers from the CODE_JAIL['worker_pool']
+    setting, once, when Django starts serving requests.
+
+    Like codejail's ConfigureCodeJailMiddleware, it is never used to process
+    requests.
+    """
+    def __init__(self):
+        pool_settings = settings.CODE_JAIL.get('worker_pool', {})
+        worker_pool.configure(
+            pool_settings.get('size', 0),
+            max_executions=pool_settings.get('max_executions', worker_pool.DEFAULT_MAX_EXECUTIONS),
+        )
+        raise MiddlewareNotUsed
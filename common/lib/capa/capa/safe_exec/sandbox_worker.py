@@ -0,0 +1,179 @@
+"""
+The long-lived process run in the sandbox by `worker_pool`.
+
+This file isn't imported by edx-platform: its source is passed to the sandboxed
+Python executable with `-c`, so it must only use the standard library.
+
+The worker imports the modules capa problems assume once, then reads jobs from
+stdin. It runs each job in a child forked for it, so that no job can change
+the state seen by another, and writes the results to stdout. The child still
+inherits the memory the worker used for previous jobs, until the worker is
+recycled. The worker kills the child if it doesn't answer within the REALTIME
+limit of the job, even if the jailed code ignores the alarm set for it.
+Messages are JSON documents, each preceded by its length as a 4-byte unsigned
+integer.
+"""
+import os
+os.environ["OPENBLAS_NUM_THREADS"] = "1"    # See TNL-6456
+
+import json
+import resource
+import select
+import signal
+import struct
+import sys
+import time
+import traceback
+from StringIO import StringIO
+
+HEADER = struct.Struct('!I')
+
+# How long the worker waits for a child after the REALTIME limit of its job has
+# passed, before killing it, in seconds.
+KILL_GRACE_TIME = 1
+
+# The types of the globals that are passed back from the jailed code.
+OK_TYPES = (type(None), int, long, float, str, unicode, list, tuple, dict)
+BAD_KEYS = ("__builtins__",)
+
+
+def read_message(stream):
+    """
+    Read a message from `stream`, returning None at the end of it.
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    return json.loads(stream.read(HEADER.unpack(header)[0]))
+
+
+def write_message(stream, message):
+    """
+    Write `message` to `stream`.
+    """
+    data = json.dumps(message)
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def jsonable(value):
+    """
+    Can `value` be passed back from the jailed code?
+    """
+    if not isinstance(value, OK_TYPES):
+        return False
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def run_job(job, result_fd):
+    """
+    Run `job` in the forked child and write its result to `result_fd`.
+
+    Never returns.
+    """
+    # The jailed code mustn't be able to write to the pool.
+    os.close(0)
+    os.close(1)
+    pid = os.getpid()
+
+    limits = job['limits']
+    try:
+        # No subprocesses.
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+        # CPU seconds, counted from the fork.
+        if limits.get('CPU'):
+            resource.setrlimit(resource.RLIMIT_CPU, (limits['CPU'], limits['CPU'] + 1))
+        # Wall clock seconds.
+        if limits.get('REALTIME'):
+            signal.alarm(limits['REALTIME'])
+
+        if job['tmp_dir']:
+            os.chdir(job['tmp_dir'])
+        for pydir in job['python_path']:
+            sys.path.append(pydir)
+
+        sys.stdout = sys.stderr = StringIO()
+        g_dict = job['globals']
+        exec job['code'] in g_dict  # pylint: disable=exec-used
+        result = {
+            'globals': {
+                key: value for key, value in g_dict.iteritems() if key not in BAD_KEYS and jsonable(value)
+            },
+        }
+        status = 0
+    except BaseException:  # pylint: disable=broad-except
+        result = {'error': traceback.format_exc()}
+        status = 1
+
+    # Processes forked by the jailed code, if it could, don't get to answer.
+    if os.getpid() == pid:
+        with os.fdopen(result_fd, 'w') as result_file:
+            result_file.write(json.dumps(result))
+    os._exit(status)  # pylint: disable=protected-access
+
+
+def read_result(result_fd, pid, realtime):
+    """
+    Read the result of the job run by the child `pid` from `result_fd`.
+
+    Kill the child and return None if it hasn't answered within `realtime`
+    seconds.
+    """
+    deadline = time.time() + realtime + KILL_GRACE_TIME if realtime else None
+    chunks = []
+    while True:
+        timeout = max(deadline - time.time(), 0) if deadline is not None else None
+        ready, _, _ = select.select([result_fd], [], [], timeout)
+        if not ready:
+            os.kill(pid, signal.SIGKILL)
+            return None
+        chunk = os.read(result_fd, 65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def run_worker(stdin, stdout):
+    """
+    Warm up, then run jobs until stdin is closed.
+    """
+    for modname in read_message(stdin)['warm_imports']:
+        try:
+            __import__(modname)
+        except Exception:  # pylint: disable=broad-except
+            pass
+    write_message(stdout, {'ready': True})
+
+    while True:
+        job = read_message(stdin)
+        if job is None:
+            break
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            run_job(job, write_fd)
+        os.close(write_fd)
+        try:
+            output = read_result(read_fd, pid, job['limits'].get('REALTIME'))
+        finally:
+            os.close(read_fd)
+        _, status = os.waitpid(pid, 0)
+
+        if output:
+            reply = json.loads(output)
+        elif os.WIFSIGNALED(status):
+            reply = {'error': 'The jailed code was killed by signal {}'.format(os.WTERMSIG(status))}
+        else:
+            reply = {'error': 'The jailed code exited with status {}'.format(os.WEXITSTATUS(status))}
+        reply['status'] = status
+        write_message(stdout, reply)
+
+
+if __name__ == '__main__':
+    run_worker(sys.stdin, sys.stdout)
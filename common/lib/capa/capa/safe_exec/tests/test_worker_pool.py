@@ -0,0 +1,142 @@
+"""Test worker_pool.py"""
+
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import zipfile
+from StringIO import StringIO
+
+from mock import call, patch
+from six import text_type
+
+from capa.safe_exec import safe_exec, worker_pool
+from codejail.safe_exec import SafeExecException
+
+
+class TestSandboxWorkerPool(unittest.TestCase):
+    """Test running code in a pool of unsandboxed workers."""
+
+    def setUp(self):
+        super(TestSandboxWorkerPool, self).setUp()
+        self.pool = worker_pool.SandboxWorkerPool(
+            [sys.executable, '-E', '-B'], size=1, max_executions=2, warm_imports=['math'],
+        )
+        self.addCleanup(self.pool.close)
+
+    def test_set_values(self):
+        g = {'b': 2}
+        self.pool.safe_exec("a = 17 + b", g)
+        self.assertEqual(g, {'a': 19, 'b': 2})
+
+    def test_raising_exceptions(self):
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", {})
+        self.assertIn("ZeroDivisionError", text_type(cm.exception))
+
+        # The worker is still usable.
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    def test_isolation(self):
+        self.pool.safe_exec("import math; math.pi = 3; x = 1", {})
+        g = {}
+        self.pool.safe_exec("import math; a = math.pi > 3 and 'x' not in globals()", g)
+        self.assertTrue(g['a'])
+
+    def test_python_lib(self):
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        g = {}
+        self.pool.safe_exec("import constant; a = constant.THE_CONST", g, python_path=[pylib])
+        self.assertEqual(g['a'], 23)
+
+    def test_extra_files(self):
+        zip_lib = StringIO()
+        with zipfile.ZipFile(zip_lib, 'w') as zip_file:
+            zip_file.writestr('extra.py', 'VALUE = 42\n')
+        g = {}
+        self.pool.safe_exec(
+            "import extra; a = extra.VALUE",
+            g,
+            python_path=['python_lib.zip'],
+            extra_files=[('python_lib.zip', zip_lib.getvalue())],
+        )
+        self.assertEqual(g['a'], 42)
+
+    def test_recycling(self):
+        with patch.object(self.pool, '_start_worker', wraps=self.pool._start_worker) as mock_start_worker:
+            for _ in range(5):
+                self.pool.safe_exec("a = 1", {})
+        self.assertEqual(mock_start_worker.call_count, 3)
+
+    def test_queue_depth(self):
+        with patch.object(worker_pool, 'dog_stats_api') as mock_dog_stats_api:
+            self.pool.safe_exec("a = 1", {})
+        self.assertEqual(
+            mock_dog_stats_api.gauge.call_args_list,
+            [call('capa.safe_exec.pool.queue_depth', 1), call('capa.safe_exec.pool.queue_depth', 0)]
+        )
+
+    @patch.dict(worker_pool.jail_code.LIMITS, {'CPU': 1, 'REALTIME': 1})
+    def test_killed_execution(self):
+        with self.assertRaisesRegexp(SafeExecException, 'killed by signal'):
+            self.pool.safe_exec("while True: pass", {})
+
+        # The next execution is unaffected.
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    @patch.dict(worker_pool.jail_code.LIMITS, {'CPU': 1, 'REALTIME': 1})
+    def test_ignored_alarm(self):
+        with self.assertRaisesRegexp(SafeExecException, 'killed by signal 9'):
+            self.pool.safe_exec(
+                "import signal, time; signal.signal(signal.SIGALRM, signal.SIG_IGN); time.sleep(60)", {}
+            )
+
+        # The worker is still usable.
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+    @patch.dict(worker_pool.jail_code.LIMITS, {'FSIZE': None})
+    def test_close_kills_children(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        pid_file = os.path.join(tmp_dir, 'pid')
+        worker = worker_pool.SandboxWorker([sys.executable, '-E', '-B'], None, [])
+        worker._send({  # pylint: disable=protected-access
+            'code': "import os, time; open({!r}, 'w').write(str(os.getpid())); time.sleep(60)".format(pid_file),
+            'globals': {},
+            'python_path': [],
+            'tmp_dir': None,
+            'limits': {},
+        })
+        for _ in range(100):
+            if os.path.exists(pid_file) and os.path.getsize(pid_file):
+                break
+            time.sleep(0.1)
+        with open(pid_file) as pid_file_contents:
+            child_pid = int(pid_file_contents.read())
+
+        worker.close()
+        for _ in range(100):
+            try:
+                os.kill(child_pid, 0)
+            except OSError:
+                break
+            time.sleep(0.1)
+        else:
+            self.fail("The child of the worker is still running")
+
+    def test_safe_exec(self):
+        g = {}
+        with patch.object(worker_pool, 'get_pool', return_value=self.pool):
+            with patch.object(self.pool, '_execute', wraps=self.pool._execute) as mock_execute:
+                safe_exec("a = 1/2", g, random_seed=17)
+        self.assertEqual(g['a'], 0.5)
+        self.assertTrue(mock_execute.called)
@@ -0,0 +1,375 @@
+"""
+A pool of warm sandbox workers for capa's safe_exec.
+
+Starting a codejail subprocess and importing numpy in it for every execution
+is slow. When configured, safe_exec instead hands its code to one of a pool of
+long-lived worker processes, started in the sandbox the same way codejail starts
+its subprocesses, which have already imported the modules capa problems assume.
+
+Every execution runs in a child forked from a worker for it, with the codejail
+limits applied to the child: whatever the jailed code changes is thrown away
+when the child exits. The isolation is per fork, not per fresh process, though:
+the child inherits the heap of its worker, which still holds what the worker
+allocated and freed while handling previous jobs, such as their code, globals
+and results. Workers are recycled after `max_executions` executions, which
+bounds how many previous jobs that can be; setting it to 1 re-execs a worker
+after each job, trading the warm start for a fresh process. Workers are also
+killed along with their children when they don't answer in time.
+"""
+import atexit
+import errno
+import json
+import logging
+import os
+import select
+import shutil
+import signal
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from Queue import Empty, Queue
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+# The number of executions after which a worker is replaced by a new one.
+DEFAULT_MAX_EXECUTIONS = 100
+
+# How long to wait for a worker to start, in seconds.
+STARTUP_TIMEOUT = 30
+
+# How long to wait for a worker after the REALTIME limit of an execution has
+# passed, in seconds.
+EXECUTION_GRACE_TIME = 5
+
+# Messages to and from workers are preceded by their length.
+HEADER = struct.Struct('!I')
+
+# We'll need the code from sandbox_worker.py to start workers, so read it now.
+# It isn't imported: it changes the environment of the process running it.
+SANDBOX_WORKER_PY = open(os.path.join(os.path.dirname(__file__), "sandbox_worker.py")).read()
+
+POOL_CONFIG = {
+    'size': 0,
+    'max_executions': DEFAULT_MAX_EXECUTIONS,
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure(size, max_executions=DEFAULT_MAX_EXECUTIONS):
+    """
+    Configure the pool of sandbox workers.
+
+    `size` is the number of workers of each process; 0 disables the pool.
+    `max_executions` is the number of executions after which a worker is
+    recycled.
+    """
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        POOL_CONFIG['size'] = size
+        POOL_CONFIG['max_executions'] = max_executions
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_pool():
+    """
+    Return the pool of sandbox workers of this process, or None if the pool
+    is disabled or codejail isn't configured to run python in a sandbox.
+    """
+    global _pool  # pylint: disable=global-statement
+    if not POOL_CONFIG['size'] or not jail_code.is_configured("python"):
+        return None
+
+    with _pool_lock:
+        # Pipes to the workers can't be shared with forked processes.
+        if _pool is None or _pool.pid != os.getpid():
+            command = jail_code.COMMANDS["python"]
+            _pool = SandboxWorkerPool(
+                command['cmdline_start'],
+                user=command['user'],
+                size=POOL_CONFIG['size'],
+                max_executions=POOL_CONFIG['max_executions'],
+            )
+        return _pool
+
+
+@atexit.register
+def _close_pool():
+    """
+    Stop the workers of this process when it exits.
+    """
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close()
+
+
+class SandboxWorker(object):
+    """
+    A long-lived process running sandbox_worker.py in the sandbox.
+    """
+    def __init__(self, cmdline_start, user, warm_imports):
+        self.user = user
+        cmd = []
+        if user:
+            cmd.extend(['sudo', '-u', user])
+        cmd.extend(cmdline_start)
+        cmd.extend(['-c', SANDBOX_WORKER_PY])
+
+        with open(os.devnull, 'w') as devnull:
+            self.process = subprocess.Popen(
+                cmd, preexec_fn=set_worker_limits, env={},
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=devnull,
+            )
+        self.executions = 0
+        try:
+            self._send({'warm_imports': warm_imports})
+            self._receive(time.time() + STARTUP_TIMEOUT)
+        except Exception:
+            self.close()
+            raise
+
+    def execute(self, job):
+        """
+        Run `job` in a child of the worker and return its result.
+        """
+        self.executions += 1
+        self._send(job)
+        realtime = job['limits'].get('REALTIME') or 0
+        return self._receive(time.time() + realtime + EXECUTION_GRACE_TIME)
+
+    def is_alive(self):
+        """
+        Is the worker still running?
+        """
+        return self.process.poll() is None
+
+    def close(self):
+        """
+        Stop the worker.
+        """
+        # The worker exits when its stdin is closed, once its current job is done.
+        self.process.stdin.close()
+        self.process.stdout.close()
+        if self.is_alive():
+            self._kill()
+
+    def _kill(self):
+        """
+        Kill the worker and the child running its current job.
+
+        The worker leads its own process group, which the children it forks
+        belong to. sudo doesn't let us signal them, so, like codejail, we ask
+        pkill to kill the whole group as root.
+        """
+        pgid = self.process.pid
+        try:
+            if self.user:
+                subprocess.call(["sudo", "pkill", "-9", "-g", str(pgid)])
+            else:
+                os.killpg(pgid, signal.SIGKILL)
+        except OSError as err:
+            if err.errno != errno.ESRCH:
+                log.exception("Couldn't kill the sandbox worker process group %r", pgid)
+
+    def _send(self, message):
+        """
+        Send `message` to the worker.
+        """
+        data = json.dumps(message)
+        try:
+            self.process.stdin.write(HEADER.pack(len(data)) + data)
+            self.process.stdin.flush()
+        except IOError:
+            raise SafeExecException("Sandbox worker exited unexpectedly")
+
+    def _receive(self, deadline):
+        """
+        Receive a message from the worker, failing after `deadline`.
+        """
+        header = self._read(HEADER.size, deadline)
+        return json.loads(self._read(HEADER.unpack(header)[0], deadline))
+
+    def _read(self, size, deadline):
+        """
+        Read `size` bytes from the worker, failing after `deadline`.
+        """
+        chunks = []
+        while size:
+            ready, _, _ = select.select([self.process.stdout], [], [], max(deadline - time.time(), 0))
+            if not ready:
+                raise SafeExecException("Sandbox worker timed out")
+            chunk = os.read(self.process.stdout.fileno(), size)
+            if not chunk:
+                raise SafeExecException("Sandbox worker exited unexpectedly")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+
+def set_worker_limits():
+    """
+    Set the limits of a worker; the limits of each execution are set in the
+    child running it.
+    """
+    import resource
+
+    # Start a new session, so that the worker and the children it forks are in
+    # a new process group, which can be killed at once.
+    os.setsid()
+
+    # Total process virtual memory.
+    vmem = jail_code.LIMITS.get("VMEM")
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+
+    # Size of written files.  Can be zero (nothing can be written).
+    fsize = jail_code.LIMITS.get("FSIZE")
+    if fsize is not None:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+
+
+class SandboxWorkerPool(object):
+    """
+    A fixed number of sandbox workers, shared by the threads of a process.
+    """
+    def __init__(self, cmdline_start, user=None, size=1, max_executions=DEFAULT_MAX_EXECUTIONS, warm_imports=None):
+        if warm_imports is None:
+            from .safe_exec import ASSUMED_IMPORTS
+            warm_imports = [modname for _, modname in ASSUMED_IMPORTS]
+
+        self.pid = os.getpid()
+        self.cmdline_start = cmdline_start
+        self.user = user
+        self.max_executions = max_executions
+        self.warm_imports = warm_imports
+
+        # Workers are started when first needed: None stands for one not started yet.
+        self._idle_workers = Queue()
+        for _ in range(size):
+            self._idle_workers.put(None)
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Execute code like codejail.safe_exec.safe_exec does, in a worker.
+        """
+        tmp_dir = None
+        job = {
+            'code': code,
+            'globals': json_safe(globals_dict),
+            'python_path': [],
+            'tmp_dir': None,
+            'limits': {name: jail_code.LIMITS.get(name) for name in ("CPU", "REALTIME")},
+        }
+        try:
+            if python_path or extra_files:
+                tmp_dir = job['tmp_dir'] = self._make_tmp_dir(python_path or [], extra_files or [])
+                job['python_path'] = [
+                    os.path.join(tmp_dir, os.path.basename(pydir)) for pydir in python_path or []
+                ]
+
+            if slug:
+                log.debug("Executing jailed code %s in a sandbox worker", slug)
+            result = self._execute(job)
+        finally:
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if result['status'] != 0 or 'error' in result:
+            raise SafeExecException(
+                "Couldn't execute jailed code: {!r} with status code: {}".format(result['error'], result['status'])
+            )
+        globals_dict.update(result['globals'])
+
+    def close(self):
+        """
+        Stop the workers of the pool.
+        """
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle_workers.get_nowait()
+            except Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+    def _execute(self, job):
+        """
+        Run `job` in an idle worker, waiting for one if necessary.
+        """
+        with self._lock:
+            self._waiting += 1
+            dog_stats_api.gauge('capa.safe_exec.pool.queue_depth', self._waiting)
+
+        started = time.time()
+        worker = self._idle_workers.get()
+        with self._lock:
+            self._waiting -= 1
+            dog_stats_api.gauge('capa.safe_exec.pool.queue_depth', self._waiting)
+        dog_stats_api.histogram('capa.safe_exec.pool.wait_time', time.time() - started)
+
+        try:
+            if worker is None or not worker.is_alive():
+                worker = self._start_worker()
+            started = time.time()
+            try:
+                return worker.execute(job)
+            finally:
+                dog_stats_api.histogram('capa.safe_exec.pool.execution_time', time.time() - started)
+                if worker.is_alive() and worker.executions >= self.max_executions:
+                    dog_stats_api.increment('capa.safe_exec.pool.worker_recycled')
+                    worker.close()
+                    worker = None
+        except Exception:
+            # The worker is in an unknown state; its replacement is started when next needed.
+            if worker is not None:
+                worker.close()
+                worker = None
+            raise
+        finally:
+            if self._closed and worker is not None:
+                worker.close()
+            else:
+                self._idle_workers.put(worker)
+
+    def _start_worker(self):
+        """
+        Start a new worker.
+        """
+        dog_stats_api.increment('capa.safe_exec.pool.worker_started')
+        return SandboxWorker(self.cmdline_start, self.user, self.warm_imports)
+
+    def _make_tmp_dir(self, python_path, extra_files):
+        """
+        Create a directory the sandbox can read, containing the `extra_files`
+        and the files of `python_path` not among them, like codejail does.
+        """
+        tmp_dir = tempfile.mkdtemp(prefix="codejail-")
+        # Make directory readable by other users ('sandbox' user needs to be able to read it).
+        os.chmod(tmp_dir, 0775)
+
+        extra_names = set(name for name, _ in extra_files)
+        for name, contents in extra_files:
+            with open(os.path.join(tmp_dir, name), "wb") as extra_file:
+                extra_file.write(contents)
+
+        for pydir in python_path:
+            if pydir in extra_names:
+                continue
+            dest = os.path.join(tmp_dir, os.path.basename(pydir))
+            if os.path.isdir(pydir):
+                shutil.copytree(pydir, dest)
+            else:
+                shutil.copy(pydir, dest)
+        return tmp_dir
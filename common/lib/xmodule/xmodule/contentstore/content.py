@@ -10,6 +10,8 @@ XASSET_THUMBNAIL_TAIL_NAME = '.jpg'
 STREAM_DATA_CHUNK_SIZE = 1024
 VERSIONED_ASSETS_PREFIX = '/assets/courseware'
 VERSIONED_ASSETS_PATTERN = r'/assets/courseware/(v[\d]/)?([a-f0-9]{32})'
+# The number of asset keys parsed from paths that are kept for the life of the process.
+ASSET_KEY_CACHE_SIZE = 10000
 
 import os
 import logging
@@ -25,6 +27,9 @@ from xmodule.exceptions import NotFoundError
 from PIL import Image
 
 
+_asset_key_cache = {}
+
+
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
                  length=None, locked=False, content_digest=None):
@@ -205,12 +210,21 @@ class StaticContent(object):
         if not path.startswith('/c4x'):
             path = path.lstrip('/')
 
-        try:
-            return AssetKey.from_string(path)
-        except InvalidKeyError:
-            # If we couldn't parse the path, just let compute_location figure it out.
-            # It's most likely a path like /image.png or something.
-            return StaticContent.compute_location(course_key, path)
+        # Asset keys are immutable, and parsing the paths that aren't keys is
+        # slow, so remember them.
+        cache_key = (course_key, path)
+        asset_key = _asset_key_cache.get(cache_key)
+        if asset_key is None:
+            try:
+                asset_key = AssetKey.from_string(path)
+            except InvalidKeyError:
+                # If we couldn't parse the path, just let compute_location figure it out.
+                # It's most likely a path like /image.png or something.
+                asset_key = StaticContent.compute_location(course_key, path)
+            if len(_asset_key_cache) >= ASSET_KEY_CACHE_SIZE:
+                _asset_key_cache.clear()
+            _asset_key_cache[cache_key] = asset_key
+        return asset_key
 
     @staticmethod
     def is_excluded_asset_type(path, excluded_exts):
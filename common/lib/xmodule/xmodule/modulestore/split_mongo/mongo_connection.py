@@ -1,13 +1,16 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import copy
 import datetime
 import cPickle as pickle
 import math
+import threading
 import zlib
 import pymongo
 import pytz
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +18,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -26,7 +30,7 @@ import logging
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
 from xmodule.exceptions import HeartbeatFailure
-from xmodule.modulestore import BlockData
+from xmodule.modulestore import BlockData, EditInfo
 from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
@@ -34,6 +38,21 @@ from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 new_contract('BlockData', BlockData)
 log = logging.getLogger(__name__)
 
+# Default budget (in bytes of uncompressed pickled data) of the in-process
+# structure LRU. Override with the COURSE_STRUCTURE_LRU_MAX_SIZE setting;
+# a value of 0 disables the in-process tier.
+DEFAULT_STRUCTURE_LRU_MAX_SIZE = 64 * 1024 * 1024
+
+# Maximum number of consecutive versions of a structure that are stored as
+# deltas against the same snapshot before a full snapshot is stored again.
+# Override with the COURSE_STRUCTURE_DELTA_SNAPSHOT_INTERVAL setting; the
+# default of 0 stores every structure in full.
+DEFAULT_STRUCTURE_DELTA_SNAPSHOT_INTERVAL = 0
+
+# A structure is stored in full, rather than as a delta, once more than this
+# fraction of its blocks differ from its snapshot.
+STRUCTURE_DELTA_MAX_CHANGED_RATIO = 0.5
+
 
 def get_cache(alias):
     """
@@ -225,21 +244,180 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def _same_storable_value(value, other):
+    """
+    Return whether ``value`` and ``other`` are stored as the same value by mongo.
+
+    Unlike ``==``, this tells apart numbers that mongo stores with different
+    types, such as ``1``, ``1.0`` and ``True``.
+    """
+    if isinstance(value, dict):
+        return (
+            isinstance(other, dict) and
+            value.viewkeys() == other.viewkeys() and
+            all(_same_storable_value(item, other[key]) for key, item in value.iteritems())
+        )
+    if isinstance(value, (list, tuple)):
+        return (
+            isinstance(other, (list, tuple)) and
+            len(value) == len(other) and
+            all(_same_storable_value(item, other_item) for item, other_item in zip(value, other))
+        )
+    if isinstance(value, (bool, int, long, float)) or isinstance(other, (bool, int, long, float)):
+        return _storable_number_type(value) == _storable_number_type(other) and value == other
+    return value == other
+
+
+def _storable_number_type(value):
+    """
+    Return the type mongo stores the number ``value`` as.
+    """
+    if isinstance(value, bool):
+        return bool
+    if isinstance(value, (int, long)):
+        return int
+    return type(value)
+
+
+def copy_structure(structure):
+    """
+    Return a copy of ``structure`` that can be safely handed out from a shared,
+    in-process cache.
+
+    Structures are immutable once persisted, but callers do update the
+    BlockData objects in place (e.g. merging in definition fields when loading
+    items), so the top-level document, the blocks map, each BlockData and its
+    ``fields`` map are copied. Everything below that is shared.
+
+    The ``edit_info`` of each block is copied without the subtree edit info
+    memoized on it, which depends on the version of the structure the block
+    ends up in.
+    """
+    new_structure = dict(structure)
+    new_blocks = {}
+    for block_key, block in structure['blocks'].iteritems():
+        new_block = copy.copy(block)
+        new_block.fields = dict(block.fields)
+        new_block.edit_info = EditInfo(**block.edit_info.to_storable())
+        new_blocks[block_key] = new_block
+    new_structure['blocks'] = new_blocks
+    return new_structure
+
+
+class StructureLRUCache(object):
+    """
+    A bounded, size-aware, thread-safe LRU of deserialized course structures,
+    keyed by structure ``_id``.
+
+    Every entry is weighed by the size of its uncompressed pickle, and the
+    least recently used entries are evicted once the sum of those weights
+    exceeds ``max_size``. Hit, miss and eviction counts are kept for the
+    lifetime of the process.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return a copy of the structure cached under ``key``, or None.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            # Re-insert to mark this entry as the most recently used one.
+            self._entries[key] = entry
+            self.hits += 1
+        return copy_structure(entry[0])
+
+    def set(self, key, structure, size):
+        """
+        Cache a private copy of ``structure`` under ``key``, weighted by ``size``.
+
+        Returns the number of entries evicted to make room for it.
+        """
+        if size > self.max_size:
+            return 0
+
+        entry = (copy_structure(structure), size)
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_size:
+                __, (__, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def clear(self):
+        """
+        Drop every cached structure (the counters are left untouched).
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_STRUCTURE_LRU_CACHE = None
+_STRUCTURE_LRU_CACHE_LOCK = threading.Lock()
+
+
+def get_structure_lru_cache():
+    """
+    Return the process-wide :class:`StructureLRUCache`, or None if it is disabled.
+    """
+    global _STRUCTURE_LRU_CACHE  # pylint: disable=global-statement
+    if _STRUCTURE_LRU_CACHE is None:
+        max_size = DEFAULT_STRUCTURE_LRU_MAX_SIZE
+        if DJANGO_AVAILABLE:
+            max_size = getattr(settings, 'COURSE_STRUCTURE_LRU_MAX_SIZE', max_size)
+        if not max_size:
+            return None
+        with _STRUCTURE_LRU_CACHE_LOCK:
+            if _STRUCTURE_LRU_CACHE is None:
+                _STRUCTURE_LRU_CACHE = StructureLRUCache(max_size)
+    return _STRUCTURE_LRU_CACHE
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    Structures read from the django cache are also kept, deserialized, in an
+    in-process LRU (see :class:`StructureLRUCache`), so that repeated reads of
+    the same structure by a worker don't pay for decompressing and unpickling
+    it again. Structures are immutable and keyed by their version guid, so
+    entries never need to be invalidated.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.lru_cache = None
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+            else:
+                self.lru_cache = get_structure_lru_cache()
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
@@ -247,6 +425,13 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            if self.lru_cache is not None:
+                structure = self.lru_cache.get(key)
+                self._measure_lru(tagger)
+                tagger.tag(from_lru=str(structure is not None).lower())
+                if structure is not None:
+                    return structure
+
             compressed_pickled_data = self.cache.get(key)
             tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
@@ -260,7 +445,18 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            return pickle.loads(pickled_data)
+            structure = pickle.loads(pickled_data)
+            if self.lru_cache is not None:
+                tagger.measure('lru_evictions', self.lru_cache.set(key, structure, len(pickled_data)))
+            return structure
+
+    def _measure_lru(self, tagger):
+        """Record the lifetime counters and current fill of the in-process LRU."""
+        tagger.measure('lru_hits', self.lru_cache.hits)
+        tagger.measure('lru_misses', self.lru_cache.misses)
+        tagger.measure('lru_total_evictions', self.lru_cache.evictions)
+        tagger.measure('lru_entries', len(self.lru_cache))
+        tagger.measure('lru_size', self.lru_cache.size)
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
@@ -304,6 +500,12 @@ class MongoConnection(object):
         self.structures = self.database[collection + '.structures']
         self.definitions = self.database[collection + '.definitions']
 
+        self.delta_snapshot_interval = DEFAULT_STRUCTURE_DELTA_SNAPSHOT_INTERVAL
+        if DJANGO_AVAILABLE:
+            self.delta_snapshot_interval = getattr(
+                settings, 'COURSE_STRUCTURE_DELTA_SNAPSHOT_INTERVAL', self.delta_snapshot_interval
+            )
+
     def heartbeat(self):
         """
         Check that the db is reachable.
@@ -337,7 +539,8 @@ class MongoConnection(object):
                         )
                         return None
                     tagger_find_one.measure("blocks", len(doc['blocks']))
-                    structure = structure_from_mongo(doc, course_context)
+                    tagger_find_one.tag(delta=str('delta_base' in doc).lower())
+                    structure = self._structure_from_mongo(doc, course_context)
                     tagger_find_one.sample_rate = 1
 
                 cache.set(key, structure, course_context)
@@ -354,10 +557,7 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_structures_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({'_id': {'$in': ids}})
-            ]
+            docs = self._structures_from_mongo(self.structures.find({'_id': {'$in': ids}}), course_context)
             tagger.measure("structures", len(docs))
             return docs
 
@@ -372,13 +572,29 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_courselike_blocks_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find(
-                    {'_id': {'$in': ids}},
-                    {'blocks': {'$elemMatch': {'block_type': block_type}}, 'root': 1}
-                )
+            projection = {'blocks': {'$elemMatch': {'block_type': block_type}}, 'root': 1}
+            structures = list(self.structures.find({'_id': {'$in': ids}}, dict(projection, delta_base=1)))
+
+            # Deltas only hold the courselike block if it changed since their
+            # snapshot, so the others take it from their snapshot.
+            base_ids = [
+                structure['delta_base'] for structure in structures
+                if 'delta_base' in structure and not structure.get('blocks')
             ]
+            if base_ids:
+                bases = {
+                    base['_id']: base
+                    for base in self.structures.find({'_id': {'$in': base_ids}}, projection)
+                }
+                for structure in structures:
+                    if 'delta_base' in structure and not structure.get('blocks'):
+                        structure['blocks'] = bases[structure['delta_base']].get('blocks', [])
+
+            docs = []
+            for structure in structures:
+                structure.pop('delta_base', None)
+                structure.setdefault('blocks', [])
+                docs.append(structure_from_mongo(structure, course_context))
             tagger.measure("structures", len(docs))
             return docs
 
@@ -392,10 +608,9 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_structures_derived_from", course_context) as tagger:
             tagger.measure("base_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({'previous_version': {'$in': ids}})
-            ]
+            docs = self._structures_from_mongo(
+                self.structures.find({'previous_version': {'$in': ids}}), course_context
+            )
             tagger.measure("structures", len(docs))
             return docs
 
@@ -409,31 +624,191 @@ class MongoConnection(object):
             block_key (BlockKey): The id of the block in question
         """
         with TIMER.timer("find_ancestor_structures", course_context) as tagger:
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({
-                    'original_version': original_version,
-                    'blocks': {
-                        '$elemMatch': {
-                            'block_id': block_key.id,
-                            'block_type': block_key.type,
-                            'edit_info.update_version': {
-                                '$exists': True,
-                            },
+            structures = list(self.structures.find({
+                'original_version': original_version,
+                'blocks': {
+                    '$elemMatch': {
+                        'block_id': block_key.id,
+                        'block_type': block_key.type,
+                        'edit_info.update_version': {
+                            '$exists': True,
                         },
                     },
-                })
-            ]
+                },
+            }))
+
+            # Deltas also contain the block if it is in their snapshot, and
+            # they didn't remove it.
+            snapshot_ids = [structure['_id'] for structure in structures if 'delta_base' not in structure]
+            if snapshot_ids:
+                found_ids = set(structure['_id'] for structure in structures)
+                structures.extend(
+                    structure
+                    for structure in self.structures.find({
+                        'delta_base': {'$in': snapshot_ids},
+                        'removed_blocks': {'$ne': [block_key.type, block_key.id]},
+                    })
+                    if structure['_id'] not in found_ids
+                )
+
+            docs = self._structures_from_mongo(structures, course_context)
             tagger.measure("structures", len(docs))
             return docs
 
     def insert_structure(self, structure, course_context=None):
         """
         Insert a new structure into the database.
+
+        If delta storage is enabled, the structure is stored as a delta
+        against the snapshot of its previous version when possible.
         """
         with TIMER.timer("insert_structure", course_context) as tagger:
             tagger.measure("blocks", len(structure["blocks"]))
-            self.structures.insert(structure_to_mongo(structure, course_context))
+            doc = structure_to_mongo(structure, course_context)
+            delta = self._delta_from_snapshot(doc, self.delta_snapshot_interval, course_context)
+            if delta is not None:
+                tagger.measure("delta_blocks", len(delta['blocks']))
+                doc = delta
+            tagger.tag(delta=str(delta is not None).lower())
+            self.structures.insert(doc)
+
+    def compact_structures(self, original_version, snapshot_interval, course_context=None):
+        """
+        Rewrite the structures originated from ``original_version`` that are
+        stored in full as deltas against the snapshots of their previous
+        versions, where possible.
+
+        The structures read back are unchanged, so cached structures stay
+        valid. Structures that other structures are stored as deltas against
+        are kept in full.
+
+        Returns the number of structures that were rewritten.
+        """
+        with TIMER.timer("compact_structures", course_context) as tagger:
+            snapshot_ids = set(
+                self.structures.find(
+                    {'original_version': original_version, 'delta_base': {'$exists': True}},
+                    {'delta_base': 1},
+                ).distinct('delta_base')
+            )
+            candidates = self.structures.find(
+                {
+                    'original_version': original_version,
+                    'delta_base': {'$exists': False},
+                    'previous_version': {'$ne': None},
+                },
+                {'_id': 1},
+            ).sort('_id', pymongo.ASCENDING)
+
+            compacted = 0
+            # Structures are visited oldest first, so that previous versions
+            # are already compacted by the time their successors are.
+            for candidate in candidates:
+                if candidate['_id'] in snapshot_ids:
+                    continue
+                doc = self.structures.find_one({'_id': candidate['_id']})
+                delta = self._delta_from_snapshot(doc, snapshot_interval, course_context)
+                if delta is None:
+                    continue
+                self.structures.update({'_id': doc['_id']}, delta)
+                snapshot_ids.add(delta['delta_base'])
+                compacted += 1
+
+            tagger.measure("compacted", compacted)
+            return compacted
+
+    def _delta_from_snapshot(self, doc, snapshot_interval, course_context=None):
+        """
+        Return ``doc``, the mongo document of a structure, as a delta against
+        the snapshot of its previous version, or None if it should be stored
+        in full.
+
+        A delta document holds only the blocks that differ from the snapshot,
+        and lists the keys of the snapshot's blocks it removed.
+        """
+        if not snapshot_interval or doc.get('previous_version') is None:
+            return None
+
+        previous = self.structures.find_one(
+            {'_id': doc['previous_version']},
+            {'delta_base': 1, 'delta_depth': 1},
+        )
+        if previous is None:
+            return None
+
+        delta_depth = previous.get('delta_depth', 0) + 1
+        if delta_depth > snapshot_interval:
+            return None
+
+        base_id = previous.get('delta_base', previous['_id'])
+        base = self.get_structure(base_id, course_context)
+        if base is None:
+            return None
+
+        base_blocks = {
+            (block['block_type'], block['block_id']): block
+            for block in structure_to_mongo(base, course_context)['blocks']
+        }
+        block_keys = set()
+        changed_blocks = []
+        for block in doc['blocks']:
+            block_key = (block['block_type'], block['block_id'])
+            block_keys.add(block_key)
+            if block_key not in base_blocks or not _same_storable_value(block, base_blocks[block_key]):
+                changed_blocks.append(block)
+        removed_blocks = [list(block_key) for block_key in base_blocks if block_key not in block_keys]
+
+        if len(changed_blocks) + len(removed_blocks) > len(doc['blocks']) * STRUCTURE_DELTA_MAX_CHANGED_RATIO:
+            return None
+
+        delta = dict(doc)
+        delta['blocks'] = changed_blocks
+        delta['removed_blocks'] = removed_blocks
+        delta['delta_base'] = base_id
+        delta['delta_depth'] = delta_depth
+        return delta
+
+    def _structure_from_mongo(self, doc, course_context=None, snapshots=None):
+        """
+        Convert the mongo document of a structure, stored either in full or
+        as a delta against a snapshot, into a full structure.
+
+        Arguments:
+            doc: The mongo document of the structure
+            course_context (CourseKey): For metrics gathering, the CourseKey
+                for the course that this data is being processed for.
+            snapshots (dict): Snapshots already loaded, by id, which is
+                updated with any snapshot this loads.
+        """
+        if 'delta_base' not in doc:
+            return structure_from_mongo(doc, course_context)
+
+        base_id = doc.pop('delta_base')
+        removed_blocks = doc.pop('removed_blocks')
+        doc.pop('delta_depth', None)
+
+        if snapshots is None:
+            snapshots = {}
+        if base_id not in snapshots:
+            snapshots[base_id] = self.get_structure(base_id, course_context)
+        if snapshots[base_id] is None:
+            raise ValueError(u"Snapshot {} of structure {} is missing".format(base_id, doc['_id']))
+
+        structure = structure_from_mongo(doc, course_context)
+        blocks = copy_structure(snapshots[base_id])['blocks']
+        for block_key in removed_blocks:
+            blocks.pop(BlockKey(*block_key), None)
+        blocks.update(structure['blocks'])
+        structure['blocks'] = blocks
+        return structure
+
+    def _structures_from_mongo(self, docs, course_context=None):
+        """
+        Convert the mongo documents of structures into full structures,
+        loading each of the snapshots they need once.
+        """
+        snapshots = {}
+        return [self._structure_from_mongo(doc, course_context, snapshots) for doc in docs]
 
     def get_course_index(self, key, ignore_case=False):
         """
@@ -596,6 +971,14 @@ class MongoConnection(object):
             unique=True,
             background=True
         )
+        # Only the structures stored as deltas have a delta_base, looked up to
+        # find the deltas based on a snapshot.
+        create_collection_index(
+            self.structures,
+            [('delta_base', pymongo.ASCENDING)],
+            sparse=True,
+            background=True
+        )
 
     def close_connections(self):
         """
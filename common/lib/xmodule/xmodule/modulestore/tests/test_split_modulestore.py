@@ -19,7 +19,7 @@ from openedx.core.lib import tempdir
 from openedx.core.lib.tests import attr
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
 from xmodule.course_module import CourseDescriptor
-from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore import BlockData, ModuleStoreEnum
 from xmodule.modulestore.exceptions import (
     ItemNotFoundError, VersionConflictError,
     DuplicateItemError, DuplicateCourseError,
@@ -30,6 +30,7 @@ from ccx_keys.locator import CCXBlockUsageLocator
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.x_module import XModuleMixin
 from xmodule.fields import Date, Timedelta
+from xmodule.modulestore.split_mongo.mongo_connection import StructureLRUCache
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
@@ -1004,6 +1005,34 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_structure_lru_cache')
+    def test_course_structure_lru_cache(self, mock_get_lru_cache, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        mock_get_lru_cache.return_value = StructureLRUCache(max_size=1024 * 1024 * 1024)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the first read from the django cache populates the in-process LRU...
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        # ... so later reads don't touch the django cache at all
+        with patch.object(self.cache, 'get') as mock_cache_get:
+            with check_mongo_calls(0):
+                lru_structure = self._get_structure(self.new_course)
+            self.assertFalse(mock_cache_get.called)
+
+        self.assertEqual(lru_structure, not_cached_structure)
+        self.assertEqual(lru_structure, cached_structure)
+        self.assertEqual(mock_get_lru_cache.return_value.hits, 1)
+
+        # structures handed out by the LRU can be modified without corrupting it
+        root = lru_structure['root']
+        lru_structure['blocks'][root].fields['display_name'] = 'Changed'
+        self.assertEqual(self._get_structure(self.new_course), not_cached_structure)
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1013,6 +1042,157 @@ class TestCourseStructureCache(SplitModuleTest):
         )
 
 
+class TestStructureLRUCache(unittest.TestCase):
+    """Tests for the in-process StructureLRUCache"""
+
+    def _structure(self, name):
+        """
+        Return a minimal structure with a single block.
+        """
+        return {'root': BlockKey('course', name), 'blocks': {BlockKey('course', name): BlockData()}}
+
+    def test_miss(self):
+        cache = StructureLRUCache(max_size=10)
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = StructureLRUCache(max_size=10)
+        self.assertEqual(cache.set('a', self._structure('a'), 4), 0)
+        self.assertEqual(cache.set('b', self._structure('b'), 4), 0)
+        # reading 'a' makes 'b' the least recently used entry
+        self.assertIsNotNone(cache.get('a'))
+        self.assertEqual(cache.set('c', self._structure('c'), 4), 1)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_oversized_structure_not_cached(self):
+        cache = StructureLRUCache(max_size=10)
+        self.assertEqual(cache.set('a', self._structure('a'), 11), 0)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_subtree_edit_info_not_shared(self):
+        cache = StructureLRUCache(max_size=10)
+        cache.set('a', self._structure('a'), 4)
+        block = cache.get('a')['blocks'][BlockKey('course', 'a')]
+        block.edit_info._subtree_edited_on = datetime.datetime.now()  # pylint: disable=protected-access
+
+        cached_block = cache.get('a')['blocks'][BlockKey('course', 'a')]
+        self.assertIsNot(cached_block.edit_info, block.edit_info)
+        self.assertIsNone(cached_block.edit_info._subtree_edited_on)  # pylint: disable=protected-access
+
+
+@attr(shard=2)
+class TestStructureDeltaStorage(SplitModuleTest):
+    """Tests for storing structures as deltas against snapshots"""
+
+    def setUp(self):
+        super(TestStructureDeltaStorage, self).setUp()
+        self.db_connection = modulestore().db_connection
+        self.user = random.getrandbits(32)
+        course = modulestore().create_course(
+            'org', 'delta_course', uuid.uuid4().hex, self.user, BRANCH_NAME_DRAFT,
+        )
+        self.course_key = course.id
+        self.chapters = [
+            modulestore().create_item(
+                self.user, self.course_key, 'chapter', fields={'display_name': 'Chapter {}'.format(index)}
+            ).location.version_agnostic()
+            for index in range(5)
+        ]
+        self.original_version = modulestore().get_course_history_info(self.course_key)['original_version']
+
+    def _edit_chapters(self):
+        """
+        Rename each of the chapters, creating a new version of the structure for each.
+        """
+        for index, location in enumerate(self.chapters):
+            chapter = modulestore().get_item(location)
+            chapter.display_name = 'Edited {}'.format(index)
+            modulestore().update_item(chapter, self.user)
+
+    def _versions(self):
+        """
+        Return the ids of all the versions of the structure, oldest first.
+        """
+        return [
+            structure['_id']
+            for structure in self.db_connection.structures.find(
+                {'original_version': self.original_version}, {'_id': 1}
+            ).sort('_id', 1)
+        ]
+
+    def _is_delta(self, version):
+        """
+        Return whether the structure with id version is stored as a delta.
+        """
+        return 'delta_base' in self.db_connection.structures.find_one({'_id': version})
+
+    def _structures(self, versions):
+        """
+        Return the structures with ids versions, oldest first.
+        """
+        return sorted(self.db_connection.find_structures_by_id(versions), key=lambda structure: structure['_id'])
+
+    def test_insert_delta(self):
+        with patch.object(self.db_connection, 'delta_snapshot_interval', 2):
+            self._edit_chapters()
+
+        # a snapshot is stored once 2 versions are stored as deltas against the previous one
+        self.assertEqual(
+            [self._is_delta(version) for version in self._versions()[-5:]],
+            [True, True, False, True, True],
+        )
+        for index, location in enumerate(self.chapters):
+            self.assertEqual(modulestore().get_item(location).display_name, 'Edited {}'.format(index))
+
+        block_key = BlockKey.from_usage_key(self.chapters[0])
+        ancestors = self.db_connection.find_ancestor_structures(self.original_version, block_key)
+        # the versions that created the other chapters, and the edits
+        self.assertEqual(len(ancestors), 10)
+        for structure in ancestors:
+            self.assertIn(block_key, structure['blocks'])
+
+    def test_insert_snapshot_when_mostly_changed(self):
+        with patch.object(self.db_connection, 'delta_snapshot_interval', 10):
+            with patch('xmodule.modulestore.split_mongo.mongo_connection.STRUCTURE_DELTA_MAX_CHANGED_RATIO', 0):
+                self._edit_chapters()
+
+        self.assertFalse(any(self._is_delta(version) for version in self._versions()))
+
+    def test_compact_structures(self):
+        self._edit_chapters()
+        versions = self._versions()
+        block_key = BlockKey.from_usage_key(self.chapters[0])
+        expected_structures = self._structures(versions)
+        expected_ancestors = set(
+            structure['_id']
+            for structure in self.db_connection.find_ancestor_structures(self.original_version, block_key)
+        )
+
+        compacted = self.db_connection.compact_structures(self.original_version, 2)
+        self.assertGreater(compacted, 0)
+        self.assertEqual(len([version for version in versions if self._is_delta(version)]), compacted)
+
+        self.assertEqual(self._structures(versions), expected_structures)
+        self.assertEqual(
+            set(
+                structure['_id']
+                for structure in self.db_connection.find_ancestor_structures(self.original_version, block_key)
+            ),
+            expected_ancestors,
+        )
+
+        # compacting again doesn't change anything
+        self.assertEqual(self.db_connection.compact_structures(self.original_version, 2), 0)
+
+
 @attr(shard=2)
 class SplitModuleItemTests(SplitModuleTest):
     '''
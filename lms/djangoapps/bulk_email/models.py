@@ -2,6 +2,8 @@
 Models for bulk email
 """
 import logging
+import re
+from string import Formatter
 
 import markupsafe
 from config_models.models import ConfigurationModel
@@ -403,6 +405,97 @@ class CourseEmailTemplate(models.Model):
                 context[key] = markupsafe.escape(value)
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Compile the plain text message for rendering it to many recipients.
+
+        Returns a CompiledCourseEmailTemplate rendering what render_plaintext() would,
+        for the provided `context` dict updated with the values of each recipient.
+        """
+        return CompiledCourseEmailTemplate(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Compile the HTML text message for rendering it to many recipients.
+
+        Returns a CompiledCourseEmailTemplate rendering what render_htmltext() would,
+        for the provided `context` dict updated with the values of each recipient.
+        """
+        return CompiledCourseEmailTemplate(self.html_template, htmltext, context, escape_values=True)
+
+
+class CompiledCourseEmailTemplate(object):
+    """
+    A template and message body, compiled for rendering them to each recipient of an email.
+
+    The template is parsed once, and its fields are formatted with the values of the
+    context that all recipients share.  Only fields using the values of a recipient,
+    named in RECIPIENT_KEYS, are formatted for each recipient.
+    """
+    RECIPIENT_KEYS = ('name', 'email', 'user_id')
+
+    # Matches the name of the context value that a template field uses.
+    FIELD_KEY_RE = re.compile(r'[^.\[]*')
+
+    def __init__(self, format_string, message_body, context, escape_values=False):
+        self.message_body = message_body
+        self.escape_values = escape_values
+        self.context = self._escape(context)
+        self.formatter = Formatter()
+
+        # A list of strings, with the fields to format for each recipient as 1-tuples.
+        self.parts = []
+        literal_parts = []
+        for literal_text, field_name, format_spec, conversion in self.formatter.parse(format_string):
+            literal_parts.append(literal_text)
+            if field_name is None:
+                continue
+
+            field = u'{{{name}{conversion}{format_spec}}}'.format(
+                name=field_name,
+                conversion=u'!' + conversion if conversion else u'',
+                format_spec=u':' + format_spec if format_spec else u'',
+            )
+            if self.FIELD_KEY_RE.match(field_name).group() in self.RECIPIENT_KEYS or '{' in format_spec:
+                self.parts.append(u''.join(literal_parts))
+                self.parts.append((field,))
+                literal_parts = []
+            else:
+                literal_parts.append(self.formatter.format(field, **self.context))
+        self.parts.append(u''.join(literal_parts))
+
+    def _escape(self, context):
+        """
+        Returns a copy of `context`, with its string values HTML-escaped if needed.
+        """
+        if not self.escape_values:
+            return dict(context)
+        return {
+            key: markupsafe.escape(value) if isinstance(value, basestring) else value
+            for key, value in context.iteritems()
+        }
+
+    def render(self, recipient_context):
+        """
+        Render the message using the values of a recipient in `recipient_context`.
+        """
+        context = dict(self.context)
+        context.update(self._escape(recipient_context))
+
+        result = u''.join(
+            self.formatter.format(part[0], **context) if isinstance(part, tuple) else part
+            for part in self.parts
+        )
+
+        # Substitute all %%-encoded keywords in the message body
+        message_body = self.message_body
+        if 'user_id' in context and 'course_id' in context and '%%' in message_body:
+            message_body = substitute_keywords_with_data(message_body, context)
+
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+        return wrap_message(result)
+
 
 class CourseAuthorization(models.Model):
     """
@@ -0,0 +1,61 @@
+"""
+A limit on the rate at which all bulk email workers send messages.
+
+The workers share the limit through the cache: each second, the first
+`max_rate` messages are let through, and the workers sending the next ones
+wait for the following second.
+"""
+import time
+
+from django.core.cache import cache
+
+import dogstats_wrapper as dog_stats_api
+
+CACHE_KEY_PREFIX = 'bulk_email.send_rate'
+
+
+class SendRateLimiter(object):
+    """
+    Limits the number of messages sent each second by all workers to `max_rate`.
+
+    A falsy `max_rate` disables the limit.
+    """
+    def __init__(self, max_rate):
+        self.max_rate = max_rate
+
+    def wait(self):
+        """
+        Waits until a message can be sent.
+
+        Returns the number of seconds waited.
+        """
+        if not self.max_rate:
+            return 0
+
+        waited = 0
+        while True:
+            now = time.time()
+            window = int(now)
+            if self._acquire(window):
+                break
+            delay = window + 1 - now
+            time.sleep(delay)
+            waited += delay
+
+        if waited:
+            dog_stats_api.histogram('course_email.rate_limiter.wait_time', waited)
+        return waited
+
+    def _acquire(self, window):
+        """
+        Takes one of the messages allowed in the given second, if any is left.
+        """
+        key = u'{}.{}'.format(CACHE_KEY_PREFIX, window)
+        # The count of a second only needs to outlive it.
+        if cache.add(key, 1, timeout=10):
+            return True
+        try:
+            return cache.incr(key) <= self.max_rate
+        except ValueError:
+            # The count expired in the meantime.
+            return cache.add(key, 1, timeout=10)
@@ -7,6 +7,9 @@ import json
 import logging
 import random
 import re
+import socket
+import threading
+import time
 from collections import Counter
 from smtplib import SMTPConnectError, SMTPDataError, SMTPException, SMTPServerDisconnected
 from time import sleep
@@ -40,6 +43,7 @@ from six import text_type
 
 import dogstats_wrapper as dog_stats_api
 from bulk_email.models import CourseEmail, Optout
+from bulk_email.rate_limiter import SendRateLimiter
 from courseware.courses import get_course
 from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.subtasks import (
@@ -96,6 +100,73 @@ BULK_EMAIL_FAILURE_ERRORS = (
 )
 
 
+# The connection to the email backend kept open by each worker thread between
+# subtasks, with the time it was last used.
+_connections = threading.local()
+
+
+def _get_connection():
+    """
+    Returns an open connection to the email backend.
+
+    The connection left open by the previous subtask of this thread is reused,
+    unless it has been idle for more than settings.BULK_EMAIL_CONNECTION_MAX_IDLE seconds
+    or the email server has closed it meanwhile.
+    """
+    connection = getattr(_connections, 'connection', None)
+    _connections.connection = None
+    if connection is not None:
+        idle_time = time.time() - _connections.last_used
+        if idle_time < settings.BULK_EMAIL_CONNECTION_MAX_IDLE and _is_connection_usable(connection):
+            dog_stats_api.increment('course_email.connection.reused')
+            return connection
+        _discard_connection(connection)
+
+    connection = get_connection()
+    connection.open()
+    return connection
+
+
+def _is_connection_usable(connection):
+    """
+    Returns whether a kept connection to the email server still works.
+
+    Only connections of the SMTP backend are checked, with a NOOP command.
+    """
+    smtp_connection = getattr(connection, 'connection', False)
+    if smtp_connection is False:
+        return True
+    if smtp_connection is None:
+        return False
+    try:
+        status = smtp_connection.noop()[0]
+    except (SMTPException, socket.error):
+        return False
+    return status == 250
+
+
+def _release_connection(connection):
+    """
+    Keeps the connection open for the next subtask of this thread, if
+    connections are reused, or closes it.
+    """
+    if settings.BULK_EMAIL_CONNECTION_MAX_IDLE:
+        _connections.connection = connection
+        _connections.last_used = time.time()
+    else:
+        connection.close()
+
+
+def _discard_connection(connection):
+    """
+    Closes a connection that may be in an unknown state after an error.
+    """
+    try:
+        connection.close()
+    except Exception:  # pylint: disable=broad-except
+        log.exception('BulkEmail ==> Error closing a connection to the email backend.')
+
+
 def _get_course_email_context(course):
     """
     Returns context arguments to apply to all emails, independent of recipient.
@@ -497,151 +568,177 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
-    try:
-        connection = get_connection()
-        connection.open()
 
-        # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
-        email_context.update(global_email_context)
+    # Define context values to use in all course emails, and compile the templates
+    # with them once, leaving only the user-specific values to render for each recipient.
+    email_context = {'name': '', 'email': ''}
+    email_context.update(global_email_context)
+    email_context['course_id'] = course_email.course_id
+
+    # Throttle if we have gotten the rate limiter.  If a send rate is configured, it
+    # is shared by all the workers sending email.  Otherwise, if a task has been
+    # retried for rate-limiting reasons, then we sleep for a period of time between
+    # all emails within this task.  Choice of the value depends on the number of
+    # workers that might be sending email in parallel, and what the SES throttle rate is.
+    rate_limiter = SendRateLimiter(settings.BULK_EMAIL_MAX_SEND_RATE)
+    batch_size = max(settings.BULK_EMAIL_SEND_BATCH_SIZE, 1)
+    connection = None
+    try:
+        plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+        html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
+        connection = _get_connection()
 
         while to_list:
-            # Update context with user-specific values from the user at the end of the list.
-            # At the end of processing this user, they will be popped off of the to_list.
+            # Render the messages to the users at the end of the list, starting with the last one.
+            # At the end of processing each user, they will be popped off of the to_list.
             # That way, the to_list will always contain the recipients remaining to be emailed.
             # This is convenient for retries, which will need to send to those who haven't
             # yet been emailed, but not send to those who have already been sent to.
-            recipient_num += 1
-            current_recipient = to_list[-1]
-            email = current_recipient['email']
-            if _has_non_ascii_characters(email):
-                to_list.pop()
-                total_recipients_failed += 1
-                log.info(
-                    "BulkEmail ==> Email address %s contains non-ascii characters. Skipping sending "
-                    "email to %s, EmailId: %s ",
-                    email,
-                    current_recipient['profile__name'],
-                    email_id
+            batch = []
+            render_start = time.time()
+            for current_recipient in reversed(to_list[-batch_size:]):
+                email = current_recipient['email']
+                if _has_non_ascii_characters(email):
+                    batch.append((current_recipient, None))
+                    continue
+
+                recipient_context = {
+                    'email': email,
+                    'name': current_recipient['profile__name'],
+                    'user_id': current_recipient['pk'],
+                }
+
+                # Create email:
+                email_msg = EmailMultiAlternatives(
+                    course_email.subject,
+                    plaintext_template.render(recipient_context),
+                    from_addr,
+                    [email],
+                    connection=connection
                 )
-                subtask_status.increment(failed=1)
-                continue
-
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
+                email_msg.attach_alternative(html_template.render(recipient_context), 'text/html')
+                batch.append((current_recipient, email_msg))
+            dog_stats_api.histogram(
+                'course_email.batch.render_time', time.time() - render_start, tags=[_statsd_tag(course_title)]
             )
-            email_msg.attach_alternative(html_msg, 'text/html')
-
-            # Throttle if we have gotten the rate limiter.  This is not very high-tech,
-            # but if a task has been retried for rate-limiting reasons, then we sleep
-            # for a period of time between all emails within this task.  Choice of
-            # the value depends on the number of workers that might be sending email in
-            # parallel, and what the SES throttle rate is.
-            if subtask_status.retried_nomax > 0:
-                sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
-
-            try:
-                log.info(
-                    "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                    Recipient name: %s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    current_recipient['profile__name'],
-                    email
-                )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
-
-            except SMTPDataError as exc:
-                # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                if exc.smtp_code >= 400 and exc.smtp_code < 500:
-                    # This will cause the outer handler to catch the exception and retry the entire task.
-                    raise exc
-                else:
+
+            send_start = time.time()
+            for current_recipient, email_msg in batch:
+                recipient_num += 1
+                email = current_recipient['email']
+                if email_msg is None:
+                    to_list.pop()
+                    total_recipients_failed += 1
+                    log.info(
+                        "BulkEmail ==> Email address %s contains non-ascii characters. Skipping sending "
+                        "email to %s, EmailId: %s ",
+                        email,
+                        current_recipient['profile__name'],
+                        email_id
+                    )
+                    subtask_status.increment(failed=1)
+                    continue
+
+                if settings.BULK_EMAIL_MAX_SEND_RATE:
+                    rate_limiter.wait()
+                elif subtask_status.retried_nomax > 0:
+                    sleep(settings.BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+
+                try:
+                    log.info(
+                        "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
+                        Recipient name: %s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        current_recipient['profile__name'],
+                        email
+                    )
+                    with dog_stats_api.timer(
+                        'course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]
+                    ):
+                        connection.send_messages([email_msg])
+
+                except SMTPDataError as exc:
+                    # According to SMTP spec, we'll retry error codes in the 4xx range.
+                    # 5xx range indicates hard failure.
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SMTPDataError), Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    if exc.smtp_code >= 400 and exc.smtp_code < 500:
+                        # This will cause the outer handler to catch the exception and retry the entire task.
+                        raise exc
+                    else:
+                        # This will fall through and not retry the message.
+                        log.warning(
+                            'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
+                            Email not delivered to %s due to error %s',
+                            parent_task_id,
+                            task_id,
+                            email_id,
+                            recipient_num,
+                            total_recipients,
+                            email,
+                            exc.smtp_error
+                        )
+                        dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
+                        subtask_status.increment(failed=1)
+
+                except SINGLE_EMAIL_FAILURE_ERRORS as exc:
                     # This will fall through and not retry the message.
-                    log.warning(
-                        'BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Recipient num: %s/%s, \
-                        Email not delivered to %s due to error %s',
+                    total_recipients_failed += 1
+                    log.error(
+                        "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
+                        EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
                         parent_task_id,
                         task_id,
                         email_id,
                         recipient_num,
                         total_recipients,
                         email,
-                        exc.smtp_error
+                        exc
                     )
                     dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
                     subtask_status.increment(failed=1)
 
-            except SINGLE_EMAIL_FAILURE_ERRORS as exc:
-                # This will fall through and not retry the message.
-                total_recipients_failed += 1
-                log.error(
-                    "BulkEmail ==> Status: Failed(SINGLE_EMAIL_FAILURE_ERRORS), Task: %s, SubTask: %s, \
-                    EmailId: %s, Recipient num: %s/%s, Email address: %s, Exception: %s",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email,
-                    exc
-                )
-                dog_stats_api.increment('course_email.error', tags=[_statsd_tag(course_title)])
-                subtask_status.increment(failed=1)
-
-            else:
-                total_recipients_successful += 1
-                log.info(
-                    "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
-                    Recipient num: %s/%s, Email address: %s,",
-                    parent_task_id,
-                    task_id,
-                    email_id,
-                    recipient_num,
-                    total_recipients,
-                    email
-                )
-                dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
-                if settings.BULK_EMAIL_LOG_SENT_EMAILS:
-                    log.info('Email with id %s sent to %s', email_id, email)
                 else:
-                    log.debug('Email with id %s sent to %s', email_id, email)
-                subtask_status.increment(succeeded=1)
+                    total_recipients_successful += 1
+                    log.info(
+                        "BulkEmail ==> Status: Success, Task: %s, SubTask: %s, EmailId: %s, \
+                        Recipient num: %s/%s, Email address: %s,",
+                        parent_task_id,
+                        task_id,
+                        email_id,
+                        recipient_num,
+                        total_recipients,
+                        email
+                    )
+                    dog_stats_api.increment('course_email.sent', tags=[_statsd_tag(course_title)])
+                    if settings.BULK_EMAIL_LOG_SENT_EMAILS:
+                        log.info('Email with id %s sent to %s', email_id, email)
+                    else:
+                        log.debug('Email with id %s sent to %s', email_id, email)
+                    subtask_status.increment(succeeded=1)
+
+                # Pop the user that was emailed off the end of the list only once they have
+                # successfully been processed.  (That way, if there were a failure that
+                # needed to be retried, the user is still on the list.)
+                recipients_info[email] += 1
+                to_list.pop()
 
-            # Pop the user that was emailed off the end of the list only once they have
-            # successfully been processed.  (That way, if there were a failure that
-            # needed to be retried, the user is still on the list.)
-            recipients_info[email] += 1
-            to_list.pop()
+            dog_stats_api.histogram(
+                'course_email.batch.send_time', time.time() - send_start, tags=[_statsd_tag(course_title)]
+            )
 
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
@@ -721,8 +818,12 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         # Successful completion is marked by an exception value of None.
         return subtask_status, None
     finally:
-        # Clean up at the end.
-        connection.close()
+        # Clean up at the end, keeping the connection open for the next subtask if it is known to be usable.
+        if connection is not None:
+            if subtask_status.state == SUCCESS:
+                _release_connection(connection)
+            else:
+                _discard_connection(connection)
 
 
 def _get_current_task():
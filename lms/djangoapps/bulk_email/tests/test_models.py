@@ -253,6 +253,33 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    def test_compiled_templates(self):
+        template = CourseEmailTemplate.get_template()
+        global_context = self._add_xss_fields(self._get_sample_html_context())
+        del global_context['user_id']
+        message_body = "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%."
+        compiled_plaintext = template.compile_plaintext(message_body, global_context)
+        compiled_htmltext = template.compile_htmltext(message_body, global_context)
+
+        for user_id, name, email in [(1, u'Robot', u'robot@example.com'), (2, u'<b>Ro\xfcbot</b>', u'r@example.com')]:
+            recipient_context = {'user_id': user_id, 'name': name, 'email': email}
+            context = dict(global_context, **recipient_context)
+            self.assertEqual(
+                compiled_plaintext.render(recipient_context),
+                template.render_plaintext(message_body, dict(context)),
+            )
+            self.assertEqual(
+                compiled_htmltext.render(recipient_context),
+                template.render_htmltext(message_body, dict(context)),
+            )
+
+    def test_compile_without_context(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._get_sample_html_context()
+        del context['course_title']
+        with self.assertRaises(KeyError):
+            template.compile_htmltext("My new html text.", context)
+
 
 @attr(shard=1)
 class CourseAuthorizationTest(TestCase):
@@ -7,8 +7,9 @@ paths actually work.
 
 """
 import json
+import socket
 from itertools import chain, cycle, repeat
-from smtplib import SMTPAuthenticationError, SMTPConnectError, SMTPDataError, SMTPServerDisconnected
+from smtplib import SMTP, SMTPAuthenticationError, SMTPConnectError, SMTPDataError, SMTPServerDisconnected
 from uuid import uuid4
 
 from boto.exception import AWSConnectionError
@@ -25,17 +26,23 @@ from boto.ses.exceptions import (
 )
 from celery.states import FAILURE, SUCCESS
 from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
 from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
 from mock import Mock, patch
 from opaque_keys.edx.locator import CourseLocator
 
-from bulk_email.models import SEND_TO_LEARNERS, SEND_TO_MYSELF, SEND_TO_STAFF, CourseEmail, Optout
+from bulk_email.models import SEND_TO_LEARNERS, SEND_TO_MYSELF, SEND_TO_STAFF, CourseEmail, CourseEmailTemplate, Optout
+from bulk_email import tasks
+from bulk_email.rate_limiter import SendRateLimiter
 from bulk_email.tasks import _get_course_email_context
-from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.models import InstructorSubtaskProgress, InstructorSubtaskStatus, InstructorTask
 from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, update_subtask_status
 from lms.djangoapps.instructor_task.tasks import send_bulk_course_email
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 
@@ -62,10 +69,8 @@ def my_update_subtask_status(entry_id, current_task_id, new_subtask_status):
     This should not be an issue in production, where status is updated before
     a task is retried, and is then updated afterwards if the retry fails.
     """
-    entry = InstructorTask.objects.get(pk=entry_id)
-    subtask_dict = json.loads(entry.subtasks)
-    subtask_status_info = subtask_dict['status']
-    current_subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
+    subtask_status_info = InstructorSubtaskStatus.get_latest(entry_id, current_task_id).to_dict()
+    current_subtask_status = SubtaskStatus.from_dict(subtask_status_info)
     current_retry_count = current_subtask_status.get_retry_count()
     new_retry_count = new_subtask_status.get_retry_count()
     if current_retry_count <= new_retry_count:
@@ -140,18 +145,20 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         return [self.create_student('robot%d' % i) for i in xrange(num_students)]
 
     def _assert_single_subtask_status(self, entry, succeeded, failed=0, skipped=0, retried_nomax=0, retried_withmax=0):
-        """Compare counts with 'subtasks' entry in InstructorTask table."""
+        """Compare counts with the subtask progress and status of the InstructorTask."""
         subtask_info = json.loads(entry.subtasks)
         # verify subtask-level counts:
         self.assertEquals(subtask_info.get('total'), 1)
-        self.assertEquals(subtask_info.get('succeeded'), 1 if succeeded > 0 else 0)
-        self.assertEquals(subtask_info.get('failed'), 0 if succeeded > 0 else 1)
+        subtask_progress = InstructorSubtaskProgress.objects.get(instructor_task=entry)
+        self.assertEquals(subtask_progress.total_subtasks, 1)
+        self.assertEquals(subtask_progress.succeeded_subtasks, 1 if succeeded > 0 else 0)
+        self.assertEquals(subtask_progress.failed_subtasks, 0 if succeeded > 0 else 1)
         # verify individual subtask status:
-        subtask_status_info = subtask_info.get('status')
-        task_id_list = subtask_status_info.keys()
+        subtask_statuses = InstructorSubtaskStatus.objects.filter(instructor_task=entry)
+        task_id_list = list(subtask_statuses.values_list('subtask_id', flat=True).distinct())
         self.assertEquals(len(task_id_list), 1)
         task_id = task_id_list[0]
-        subtask_status = subtask_status_info.get(task_id)
+        subtask_status = InstructorSubtaskStatus.get_latest(entry.id, task_id).to_dict()
         print "Testing subtask status: {}".format(subtask_status)
         self.assertEquals(subtask_status.get('task_id'), task_id)
         self.assertEquals(subtask_status.get('attempted'), succeeded + failed)
@@ -374,6 +381,24 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
     def test_retry_after_general_error(self):
         self._test_retry_after_limited_retry_error(Exception("This is some random exception."))
 
+    def test_retry_after_template_error(self):
+        num_emails = 5
+        self._create_students(num_emails - 1)
+        compile_plaintext = CourseEmailTemplate.compile_plaintext
+        errors = [Exception("This is some template error.")]
+
+        def fail_once(template, *args):
+            """Fails to compile the first template, and compiles the following ones."""
+            if errors:
+                raise errors.pop()
+            return compile_plaintext(template, *args)
+
+        with patch('bulk_email.tasks.get_connection', autospec=True):
+            with patch.object(CourseEmailTemplate, 'compile_plaintext', autospec=True, side_effect=fail_once):
+                self._test_run_with_task(
+                    send_bulk_course_email, 'emailed', num_emails, num_emails, retried_withmax=1
+                )
+
     def test_max_retry_after_general_error(self):
         self._test_max_retry_limit_causes_failure(Exception("This is some random exception."))
 
@@ -471,3 +496,96 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertIn('account_settings_url', result)
         self.assertIn('email_settings_url', result)
         self.assertIn('platform_name', result)
+
+    @override_settings(BULK_EMAIL_SEND_BATCH_SIZE=7)
+    def test_successful_in_batches(self):
+        num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None, None, SESIllegalAddressError(400, '')])
+            self._test_run_with_task(
+                send_bulk_course_email, 'emailed', num_emails, num_emails - num_emails // 3, failed=num_emails // 3
+            )
+        self.assertEqual(get_conn.return_value.send_messages.call_count, num_emails)
+
+    @override_settings(BULK_EMAIL_MAX_SEND_RATE=1000)
+    def test_successful_with_send_rate(self):
+        num_emails = 5
+        self._create_students(num_emails - 1)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.return_value.send_messages.side_effect = cycle([None])
+            with patch.object(SendRateLimiter, 'wait', return_value=0) as mock_wait:
+                self._test_run_with_task(send_bulk_course_email, 'emailed', num_emails, num_emails)
+        self.assertEqual(mock_wait.call_count, num_emails)
+
+
+class TestBulkEmailConnections(TestCase):
+    """Tests reusing connections to the email backend between subtasks."""
+
+    def setUp(self):
+        super(TestBulkEmailConnections, self).setUp()
+        self.addCleanup(setattr, tasks._connections, 'connection', None)
+
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=30)
+    def test_reuse(self):
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            connection = tasks._get_connection()
+            connection.connection.noop.return_value = (250, 'OK')
+            tasks._release_connection(connection)
+            self.assertIs(tasks._get_connection(), connection)
+        self.assertEqual(get_conn.call_count, 1)
+        self.assertFalse(connection.close.called)
+
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=30)
+    def test_idle_timeout(self):
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.side_effect = [Mock(), Mock()]
+            connection = tasks._get_connection()
+            tasks._release_connection(connection)
+            tasks._connections.last_used -= 31
+            self.assertIsNot(tasks._get_connection(), connection)
+        self.assertTrue(connection.close.called)
+
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=30)
+    def test_closed_by_server(self):
+        # The server closed the socket of the kept connection while it was idle.
+        smtp_connection = SMTP()
+        smtp_connection.sock = socket.socket()
+        smtp_connection.sock.close()
+        connection = EmailBackend()
+        connection.connection = smtp_connection
+        tasks._release_connection(connection)
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            self.assertIs(tasks._get_connection(), get_conn.return_value)
+        self.assertIsNone(connection.connection)
+
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=0)
+    def test_no_reuse(self):
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            get_conn.side_effect = [Mock(), Mock()]
+            connection = tasks._get_connection()
+            tasks._release_connection(connection)
+            self.assertTrue(connection.close.called)
+            self.assertIsNot(tasks._get_connection(), connection)
+
+
+class TestSendRateLimiter(CacheIsolationTestCase):
+    """Tests the rate limit shared by workers sending email."""
+    ENABLED_CACHES = ['default']
+
+    @patch('bulk_email.rate_limiter.time')
+    def test_wait(self, mock_time):
+        mock_time.time.return_value = 1000.25
+        limiter = SendRateLimiter(2)
+        self.assertEqual(limiter.wait(), 0)
+        self.assertEqual(limiter.wait(), 0)
+
+        # The third message of the second has to wait for the next one.
+        mock_time.sleep.side_effect = lambda delay: setattr(mock_time.time, 'return_value', 1001.0)
+        self.assertEqual(limiter.wait(), 0.75)
+        mock_time.sleep.assert_called_once_with(0.75)
+
+    def test_disabled(self):
+        limiter = SendRateLimiter(None)
+        for _ in range(5):
+            self.assertEqual(limiter.wait(), 0)
@@ -5,3 +5,8 @@ WAFFLE_SWITCH_NAMESPACE = WaffleSwitchNamespace(name='course_list_api_rate_limit
 
 USE_RATE_LIMIT_2_FOR_COURSE_LIST_API = WaffleSwitch(WAFFLE_SWITCH_NAMESPACE, 'rate_limit_2')
 USE_RATE_LIMIT_10_FOR_COURSE_LIST_API = WaffleSwitch(WAFFLE_SWITCH_NAMESPACE, 'rate_limit_10')
+
+BLOCKS_API_WAFFLE_SWITCH_NAMESPACE = WaffleSwitchNamespace(name='course_blocks_api')
+
+# Stream the JSON responses of the Course Blocks API one block at a time.
+STREAM_BLOCKS_API_RESPONSES = WaffleSwitch(BLOCKS_API_WAFFLE_SWITCH_NAMESPACE, 'stream_responses')
@@ -6,7 +6,7 @@ import lms.djangoapps.course_blocks.api as course_blocks_api
 from lms.djangoapps.course_blocks.transformers.hidden_content import HiddenContentTransformer
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 
-from .serializers import BlockDictSerializer, BlockSerializer
+from .serializers import FastBlockSerializer
 from .transformers.blocks_api import BlocksAPITransformer
 from .transformers.block_completion import BlockCompletionTransformer
 from .transformers.milestones import MilestonesAndSpecialExamsTransformer
@@ -50,6 +50,36 @@ def get_blocks(
         block_types_filter (list): Optional list of block type names used to filter
             the final result of returned blocks.
     """
+    return get_blocks_serializer(
+        request,
+        usage_key,
+        user,
+        depth,
+        nav_depth,
+        requested_fields,
+        block_counts,
+        student_view_data,
+        return_type,
+        block_types_filter,
+    ).data
+
+
+def get_blocks_serializer(
+        request,
+        usage_key,
+        user=None,
+        depth=None,
+        nav_depth=None,
+        requested_fields=None,
+        block_counts=None,
+        student_view_data=None,
+        return_type='dict',
+        block_types_filter=None,
+):
+    """
+    Return a FastBlockSerializer of the course blocks, whose data is returned
+    by get_blocks, called with the same arguments.
+    """
     # create ordered list of transformers, adding BlocksAPITransformer at end.
     transformers = BlockStructureTransformers()
     if requested_fields is None:
@@ -96,10 +126,4 @@ def get_blocks(
         'requested_fields': requested_fields or [],
     }
 
-    if return_type == 'dict':
-        serializer = BlockDictSerializer(blocks, context=serializer_context, many=False)
-    else:
-        serializer = BlockSerializer(blocks, context=serializer_context, many=True)
-
-    # return serialized data
-    return serializer.data
+    return FastBlockSerializer(blocks, serializer_context, return_type)
@@ -1,12 +1,181 @@
 """
 Serializers for Course Blocks related return objects.
 """
+from collections import OrderedDict
+
 from django.conf import settings
+from django.urls import NoReverseMatch
+from django.utils.http import RFC3986_SUBDELIMS, urlquote
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
 from .transformers import SUPPORTED_FIELDS
 
+# Stands for the usage key of a block in the URL templates of FastBlockSerializer.
+BLOCK_KEY_PLACEHOLDER = 'BLOCK_KEY_PLACEHOLDER'
+
+# The characters left unquoted by django's reverse, as in the `pchar`
+# definition of RFC 3986.
+URL_SAFE_CHARACTERS = RFC3986_SUBDELIMS + str('/~:@')
+
+
+class FastBlockSerializer(object):
+    """
+    Serializer for the blocks of a block structure, to the same representation
+    as BlockSerializer and BlockDictSerializer, without instantiating a
+    serializer per block.
+
+    The fields to serialize are planned once from the requested fields, and
+    the URLs of the blocks are formatted from templates reversed once per
+    course.
+    """
+    def __init__(self, block_structure, context, return_type='dict'):
+        self.block_structure = block_structure
+        self.request = context['request']
+        self.return_type = return_type
+
+        requested_fields = set(context['requested_fields'])
+        self.include_lti_url = bool(settings.FEATURES.get("ENABLE_LTI_PROVIDER") and 'lti_url' in requested_fields)
+        self.include_children = 'children' in requested_fields
+        self.field_plan = [
+            supported_field for supported_field in SUPPORTED_FIELDS
+            if supported_field.requested_field_name in requested_fields
+        ]
+        self._url_templates = {}
+
+    @property
+    def data(self):
+        """
+        Return the serialized blocks, as a dict keyed by usage key if
+        return_type is 'dict', or as a list.
+        """
+        if self.return_type == 'dict':
+            return OrderedDict([
+                ('root', unicode(self.block_structure.root_block_usage_key)),
+                ('blocks', {
+                    unicode(block_key): self.to_representation(block_key) for block_key in self.block_structure
+                }),
+            ])
+        return [self.to_representation(block_key) for block_key in self.block_structure]
+
+    def iter_json(self, renderer, accepted_media_type=None, renderer_context=None):
+        """
+        Yield the JSON of the serialized blocks, as rendered by the given
+        compact JSONRenderer without indentation, one block at a time.
+        """
+        def render(value):
+            return renderer.render(value, accepted_media_type, renderer_context)
+
+        if self.return_type == 'dict':
+            yield b'{%s:%s,%s:{' % (
+                render('root'), render(unicode(self.block_structure.root_block_usage_key)), render('blocks'),
+            )
+            separator = b''
+            for block_key in self.block_structure:
+                yield b'%s%s:%s' % (separator, render(unicode(block_key)), render(self.to_representation(block_key)))
+                separator = b','
+            yield b'}}'
+        else:
+            yield b'['
+            separator = b''
+            for block_key in self.block_structure:
+                yield separator + render(self.to_representation(block_key))
+                separator = b','
+            yield b']'
+
+    def to_representation(self, block_key):
+        """
+        Return a serializable representation of the requested block
+        """
+        block_key_string = unicode(block_key)
+        url_templates = self._get_url_templates(block_key.course_key)
+        quoted_block_key = urlquote(block_key_string, safe=URL_SAFE_CHARACTERS)
+        data = {
+            'id': block_key_string,
+            'block_id': unicode(block_key.block_id),
+        }
+        for field_name, view_name, kwargs, template in url_templates:
+            if template is None:
+                data[field_name] = reverse(
+                    view_name,
+                    kwargs={
+                        name: block_key_string if value == BLOCK_KEY_PLACEHOLDER else value
+                        for name, value in kwargs.iteritems()
+                    },
+                    request=self.request,
+                )
+            else:
+                data[field_name] = template[0] + quoted_block_key + template[1]
+
+        for supported_field in self.field_plan:
+            field_value = _get_block_field(
+                self.block_structure,
+                block_key,
+                supported_field.transformer,
+                supported_field.block_field_name,
+                supported_field.default_value,
+            )
+            if field_value is not None:
+                # only return fields that have data
+                data[supported_field.serializer_field_name] = field_value
+
+        if self.include_children:
+            children = self.block_structure.get_children(block_key)
+            if children:
+                data['children'] = [unicode(child) for child in children]
+
+        return data
+
+    def _get_url_templates(self, course_key):
+        """
+        Return a list of the (field_name, view_name, kwargs, template) of the
+        URLs of the blocks of the given course, where the template is the
+        (prefix, suffix) around the quoted usage key of a block in its URL.
+
+        The URLs whose template is None are reversed for each block.
+        """
+        url_templates = self._url_templates.get(course_key)
+        if url_templates is None:
+            course_id = unicode(course_key)
+            urls = [
+                ('lms_web_url', 'jump_to', {'course_id': course_id, 'location': BLOCK_KEY_PLACEHOLDER}),
+                ('student_view_url', 'render_xblock', {'usage_key_string': BLOCK_KEY_PLACEHOLDER}),
+            ]
+            if self.include_lti_url:
+                urls.append(
+                    ('lti_url', 'lti_provider_launch', {'course_id': course_id, 'usage_id': BLOCK_KEY_PLACEHOLDER}),
+                )
+            url_templates = self._url_templates[course_key] = []
+            for field_name, view_name, kwargs in urls:
+                template = None
+                try:
+                    url = reverse(view_name, kwargs=kwargs, request=self.request)
+                except NoReverseMatch:
+                    url = None
+                if isinstance(url, basestring) and url.count(BLOCK_KEY_PLACEHOLDER) == 1:
+                    template = tuple(url.split(BLOCK_KEY_PLACEHOLDER))
+                url_templates.append((field_name, view_name, kwargs, template))
+        return url_templates
+
+
+def _get_block_field(block_structure, block_key, transformer, field_name, default):
+    """
+    Get the field value requested.  The field may be an XBlock field, a
+    transformer block field, or an entire tranformer block data dict.
+    """
+    value = None
+    if transformer is None:
+        value = block_structure.get_xblock_field(block_key, field_name)
+    elif field_name is None:
+        try:
+            value = block_structure.get_transformer_block_data(block_key, transformer).fields
+        except KeyError:
+            pass
+    else:
+        value = block_structure.get_transformer_block_field(block_key, transformer, field_name)
+
+    return value if (value is not None) else default
+
 
 class BlockSerializer(serializers.Serializer):  # pylint: disable=abstract-method
     """
@@ -17,18 +186,7 @@ class BlockSerializer(serializers.Serializer):  # pylint: disable=abstract-metho
         Get the field value requested.  The field may be an XBlock field, a
         transformer block field, or an entire tranformer block data dict.
         """
-        value = None
-        if transformer is None:
-            value = self.context['block_structure'].get_xblock_field(block_key, field_name)
-        elif field_name is None:
-            try:
-                value = self.context['block_structure'].get_transformer_block_data(block_key, transformer).fields
-            except KeyError:
-                pass
-        else:
-            value = self.context['block_structure'].get_transformer_block_field(block_key, transformer, field_name)
-
-        return value if (value is not None) else default
+        return _get_block_field(self.context['block_structure'], block_key, transformer, field_name, default)
 
     def to_representation(self, block_key):
         """
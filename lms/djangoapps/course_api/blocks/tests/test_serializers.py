@@ -1,7 +1,11 @@
 """
 Tests for Course Blocks serializers
 """
-from mock import MagicMock
+import json
+
+from django.test.client import RequestFactory
+from mock import MagicMock, patch
+from rest_framework.renderers import JSONRenderer
 
 from lms.djangoapps.course_blocks.api import get_course_block_access_transformers, get_course_blocks
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
@@ -11,7 +15,8 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import ToyCourseFactory
 
-from ..serializers import BlockDictSerializer, BlockSerializer
+from .. import serializers
+from ..serializers import BlockDictSerializer, BlockSerializer, FastBlockSerializer
 from ..transformers.blocks_api import BlocksAPITransformer
 from .helpers import deserialize_usage_key
 
@@ -237,3 +242,65 @@ class TestBlockDictSerializer(TestBlockSerializerBase):
             self.assert_extended_block(serialized_block)
             self.assert_staff_fields(serialized_block)
         self.assertEquals(len(serializer.data['blocks']), 29)
+
+
+class TestFastBlockSerializer(TestBlockSerializerBase):
+    """
+    Tests the FastBlockSerializer class, which serializes blocks like BlockSerializer and BlockDictSerializer.
+    """
+    shard = 4
+
+    def setUp(self):
+        super(TestFastBlockSerializer, self).setUp()
+        self.serializer_context['request'] = RequestFactory().get('/api/courses/v1/blocks/')
+        self.add_additional_requested_fields()
+
+    def test_dict(self):
+        serializer = FastBlockSerializer(self.block_structure, self.serializer_context)
+        self.assertEquals(
+            serializer.data,
+            BlockDictSerializer(self.block_structure, many=False, context=self.serializer_context).data,
+        )
+        self.assertEquals(len(serializer.data['blocks']), 28)
+
+    def test_list(self):
+        serializer = FastBlockSerializer(self.block_structure, self.serializer_context, return_type='list')
+        self.assertEquals(
+            serializer.data,
+            BlockSerializer(self.block_structure, many=True, context=self.serializer_context).data,
+        )
+
+    def test_staff_fields(self):
+        context = self.create_staff_context()
+        context['request'] = self.serializer_context['request']
+        self.add_additional_requested_fields(context)
+        serializer = FastBlockSerializer(context['block_structure'], context)
+        self.assertEquals(
+            serializer.data,
+            BlockDictSerializer(context['block_structure'], many=False, context=context).data,
+        )
+
+    def test_urls_reversed_once(self):
+        serializer = FastBlockSerializer(self.block_structure, self.serializer_context)
+        with patch.object(serializers, 'reverse', wraps=serializers.reverse) as mock_reverse:
+            blocks = serializer.data['blocks']
+        # jump_to, render_xblock and lti_provider_launch
+        self.assertEquals(mock_reverse.call_count, 3)
+        for block_key in self.block_structure:
+            self.assertEquals(
+                blocks[unicode(block_key)]['lms_web_url'],
+                serializers.reverse(
+                    'jump_to',
+                    kwargs={'course_id': unicode(block_key.course_key), 'location': unicode(block_key)},
+                    request=self.serializer_context['request'],
+                ),
+            )
+
+    def test_iter_json(self):
+        renderer = JSONRenderer()
+        for return_type in ('dict', 'list'):
+            serializer = FastBlockSerializer(self.block_structure, self.serializer_context, return_type)
+            self.assertEquals(
+                json.loads(b''.join(serializer.iter_json(renderer))),
+                json.loads(renderer.render(serializer.data)),
+            )
@@ -1,6 +1,7 @@
 """
 Tests for Blocks Views
 """
+import json
 from datetime import datetime
 from string import join
 from urllib import urlencode
@@ -8,6 +9,7 @@ from urlparse import urlunparse
 
 from django.urls import reverse
 from opaque_keys.edx.locator import CourseLocator
+from waffle.testutils import override_switch
 
 from student.models import CourseEnrollment
 from student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserFactory
@@ -193,6 +195,20 @@ class TestBlocksView(SharedModuleStoreTestCase):
         response = self.verify_response(params={'return_type': 'list'})
         self.verify_response_block_list(response)
 
+    def test_streamed(self):
+        for return_type in ('dict', 'list'):
+            params = {'return_type': return_type, 'requested_fields': self.requested_fields}
+            response = self.verify_response(params=params)
+            self.assertFalse(response.streaming)
+            with override_switch('course_blocks_api.stream_responses', active=True):
+                streamed_response = self.verify_response(params=params)
+            self.assertTrue(streamed_response.streaming)
+            self.assertEquals(streamed_response['Content-Type'], 'application/json')
+            self.assertEquals(
+                json.loads(b''.join(streamed_response.streaming_content)),
+                json.loads(response.content),
+            )
+
     def test_block_counts_param(self):
         response = self.verify_response(params={'block_counts': ['course', 'chapter']})
         self.verify_response_block_dict(response)
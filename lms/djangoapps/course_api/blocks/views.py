@@ -2,10 +2,11 @@
 CourseBlocks API views
 """
 from django.core.exceptions import ValidationError
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 from rest_framework.generics import ListAPIView
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from six import text_type
 
@@ -13,7 +14,8 @@ from openedx.core.lib.api.view_utils import DeveloperErrorViewMixin, view_auth_c
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
-from .api import get_blocks
+from .. import STREAM_BLOCKS_API_RESPONSES
+from .api import get_blocks_serializer
 from .forms import BlockListGetForm
 
 
@@ -201,23 +203,37 @@ class BlocksView(DeveloperErrorViewMixin, ListAPIView):
             raise ValidationError(params.errors)
 
         try:
-            return Response(
-                get_blocks(
-                    request,
-                    params.cleaned_data['usage_key'],
-                    params.cleaned_data['user'],
-                    params.cleaned_data['depth'],
-                    params.cleaned_data.get('nav_depth'),
-                    params.cleaned_data['requested_fields'],
-                    params.cleaned_data.get('block_counts', []),
-                    params.cleaned_data.get('student_view_data', []),
-                    params.cleaned_data['return_type'],
-                    params.cleaned_data.get('block_types_filter', None),
-                )
+            serializer = get_blocks_serializer(
+                request,
+                params.cleaned_data['usage_key'],
+                params.cleaned_data['user'],
+                params.cleaned_data['depth'],
+                params.cleaned_data.get('nav_depth'),
+                params.cleaned_data['requested_fields'],
+                params.cleaned_data.get('block_counts', []),
+                params.cleaned_data.get('student_view_data', []),
+                params.cleaned_data['return_type'],
+                params.cleaned_data.get('block_types_filter', None),
             )
         except ItemNotFoundError as exception:
             raise Http404("Block not found: {}".format(text_type(exception)))
 
+        renderer = request.accepted_renderer
+        renderer_context = self.get_renderer_context()
+        if (
+                STREAM_BLOCKS_API_RESPONSES.is_enabled() and
+                isinstance(renderer, JSONRenderer) and
+                renderer.compact and
+                renderer.get_indent(request.accepted_media_type, renderer_context) is None
+        ):
+            # Write the blocks as they are serialized, rather than rendering
+            # all of them at once.
+            return StreamingHttpResponse(
+                serializer.iter_json(renderer, request.accepted_media_type, renderer_context),
+                content_type=renderer.media_type,
+            )
+        return Response(serializer.data)
+
 
 @view_auth_classes()
 class BlocksInCourseView(BlocksView):
@@ -9,6 +9,9 @@ Classes to provide the LMS runtime data storage to XBlocks.
 :class:`FieldDataCache`: A object which provides a read-through prefetch cache
     of data to support XBlock fields within a limited set of scopes.
 
+:class:`MultiUserFieldDataCache`: A object which prefetches the data of many users
+    at once, and hands out a :class:`FieldDataCache` for each of them.
+
 The remaining classes in this module provide read-through prefetch cache implementations
 for specific scopes. The individual classes provide the knowledge of what are the essential
 pieces of information for each scope, and thus how to cache, prefetch, and create new field data
@@ -21,10 +24,12 @@ UserInfoCache: A cache for Scope.user_info
 DjangoOrmFieldCache: A base-class for single-row-per-field caches.
 """
 
+import itertools
 import json
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from operator import attrgetter
 
 from contracts import contract, new_contract
 from django.db import DatabaseError, IntegrityError, transaction
@@ -82,6 +87,38 @@ def _all_block_types(descriptors, aside_types):
     return block_types
 
 
+def _descendant_descriptors(descriptor, depth, descriptor_filter):
+    """
+    Return a list of `descriptor` and all of its descendants down to the
+    specified depth that match the descriptor filter.
+
+    descriptor: The parent to search inside
+    depth: The number of levels to descend, or None for infinite depth
+    descriptor_filter(descriptor): A function that returns True
+        if descriptor should be included in the results
+    """
+    def get_child_descriptors(descriptor, depth):
+        """
+        Return a list of all child descriptors down to the specified depth
+        that match the descriptor filter. Includes `descriptor`
+        """
+        if descriptor_filter(descriptor):
+            descriptors = [descriptor]
+        else:
+            descriptors = []
+
+        if depth is None or depth > 0:
+            new_depth = depth - 1 if depth is not None else depth
+
+            for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
+                descriptors.extend(get_child_descriptors(child, new_depth))
+
+        return descriptors
+
+    with modulestore().bulk_operations(descriptor.location.course_key):
+        return get_child_descriptors(descriptor, depth)
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -172,7 +209,17 @@ class DjangoOrmFieldCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        for field_object in self._read_objects(fields, xblocks, aside_types):
+        self.cache_field_objects(self._read_objects(fields, xblocks, aside_types))
+
+    def cache_field_objects(self, field_objects):
+        """
+        Add ``field_objects``, already read from the underlying datastore,
+        into this cache.
+
+        Arguments:
+            field_objects (list of Django model instances): Objects storing the data for fields in this cache.
+        """
+        for field_object in field_objects:
             self._cache[self._cache_key_for_field_object(field_object)] = field_object
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
@@ -366,7 +413,18 @@ class UserStateCache(object):
             _all_usage_keys(xblocks, aside_types),
         )
         for user_state in block_field_state:
-            self._cache[user_state.block_key] = user_state.state
+            self.cache_block_state(user_state.block_key, user_state.state)
+
+    def cache_block_state(self, block_key, state):
+        """
+        Add the ``state`` of the block identified by ``block_key``, already
+        read from the underlying datastore, into this cache.
+
+        Arguments:
+            block_key (:class:`UsageKey`): The block the state belongs to.
+            state (dict): The user_state field values of the block.
+        """
+        self._cache[block_key] = state
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
@@ -748,33 +806,7 @@ class FieldDataCache(object):
                 should be cached
         """
 
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
-
-            return descriptors
-
-        with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
-
-        self.add_descriptors_to_cache(descriptors)
+        self.add_descriptors_to_cache(_descendant_descriptors(descriptor, depth, descriptor_filter))
 
     @classmethod
     def cache_for_descriptor_descendents(cls, course_id, user, descriptor, depth=None,
@@ -930,6 +962,150 @@ class FieldDataCache(object):
         return sum(len(cache) for cache in self.cache.values())
 
 
+class MultiUserFieldDataCache(object):
+    """
+    A cache of django model objects needed to supply the data for a set of
+    modules to many users at once.
+
+    The data of all of the users is loaded with a few bulk queries, and
+    each user is then handed out a :class:`FieldDataCache` of their own,
+    which can be wrapped in a :class:`DjangoKeyValueStore` as usual.
+    """
+    def __init__(self, descriptors, course_id, users, asides=None, read_only=False):
+        """
+        Arguments
+        descriptors: A list of XModuleDescriptors.
+        course_id: The id of the current course
+        users: The users for which to cache data
+        asides: The list of aside types to load, or None to prefetch no asides.
+        read_only: We should not perform writes (they become a no-op).
+        """
+        if asides is None:
+            self.asides = []
+        else:
+            self.asides = asides
+
+        assert isinstance(course_id, CourseKey)
+        self.course_id = course_id
+        self.read_only = read_only
+
+        # Scope.user_state_summary is not specific to any user, so its
+        # data is loaded once and shared by all of the users.
+        self._user_state_summary_cache = UserStateSummaryCache(self.course_id)
+        self._field_data_caches = {}
+        for user in users:
+            field_data_cache = FieldDataCache([], course_id, user, asides=self.asides, read_only=read_only)
+            field_data_cache.cache[Scope.user_state_summary] = self._user_state_summary_cache
+            self._field_data_caches[user.id] = field_data_cache
+
+        self.add_descriptors_to_cache(descriptors)
+
+    def for_user(self, user):
+        """
+        Return the :class:`FieldDataCache` of `user`, who must be one of the
+        users this cache was created for.
+        """
+        return self._field_data_caches[user.id]
+
+    def add_descriptors_to_cache(self, descriptors):
+        """
+        Add all `descriptors` to the FieldDataCaches of all of the users.
+        """
+        field_data_caches = [
+            field_data_cache for field_data_cache in self._field_data_caches.itervalues()
+            if field_data_cache.user.is_authenticated
+        ]
+        if not field_data_caches:
+            return
+
+        scorable_locations = set(desc.location for desc in descriptors if desc.has_score)
+        for field_data_cache in field_data_caches:
+            field_data_cache.scorable_locations.update(scorable_locations)
+
+        user_ids = [field_data_cache.user.id for field_data_cache in field_data_caches]
+        for scope, fields in field_data_caches[0]._fields_to_cache(descriptors).items():  # pylint: disable=protected-access
+            field_names = set(field.name for field in fields)
+            if scope == Scope.user_state:
+                self._cache_user_state(field_data_caches, descriptors)
+            elif scope == Scope.user_info:
+                self._cache_field_objects(
+                    field_data_caches,
+                    scope,
+                    XModuleStudentInfoField.objects.filter(student_id__in=user_ids, field_name__in=field_names),
+                )
+            elif scope == Scope.preferences:
+                self._cache_field_objects(
+                    field_data_caches,
+                    scope,
+                    XModuleStudentPrefsField.objects.chunked_filter(
+                        'module_type__in',
+                        _all_block_types(descriptors, self.asides),
+                        student_id__in=user_ids,
+                        field_name__in=field_names,
+                    ),
+                )
+            elif scope == Scope.user_state_summary:
+                self._user_state_summary_cache.cache_fields(fields, descriptors, self.asides)
+
+    def add_descriptor_descendents(self, descriptor, depth=None, descriptor_filter=lambda descriptor: True):
+        """
+        Add all descendants of `descriptor` to the FieldDataCaches of all of the users.
+
+        Arguments:
+            descriptor: An XModuleDescriptor
+            depth is the number of levels of descendant modules to load StudentModules for, in addition to
+                the supplied descriptor. If depth is None, load all descendant StudentModules
+            descriptor_filter is a function that accepts a descriptor and return whether the field data
+                should be cached
+        """
+        self.add_descriptors_to_cache(_descendant_descriptors(descriptor, depth, descriptor_filter))
+
+    def _cache_user_state(self, field_data_caches, descriptors):
+        """
+        Load the StudentModules of all of the users for the `descriptors`
+        into their UserStateCaches.
+        """
+        user_state_caches = {
+            field_data_cache.user.id: field_data_cache.cache[Scope.user_state]
+            for field_data_cache in field_data_caches
+        }
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(
+            sorted(_all_usage_keys(descriptors, self.asides), key=course_key_func),
+            course_key_func,
+        )
+        for course_key, usage_keys in by_course:
+            student_modules = StudentModule.objects.chunked_filter(
+                'module_state_key__in',
+                list(usage_keys),
+                student_id__in=list(user_state_caches),
+                course_id=course_key,
+            )
+            for student_module in student_modules:
+                if student_module.state is None:
+                    continue
+
+                state = json.loads(student_module.state)
+                # An empty state has been deleted, and so is not cached.
+                if state == {}:
+                    continue
+
+                usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
+                user_state_caches[student_module.student_id].cache_block_state(usage_key, state)
+
+    def _cache_field_objects(self, field_data_caches, scope, field_objects):
+        """
+        Add the `field_objects` of all of the users into the caches for
+        `scope` of the users they belong to.
+        """
+        field_objects_by_user_id = defaultdict(list)
+        for field_object in field_objects:
+            field_objects_by_user_id[field_object.student_id].append(field_object)
+
+        for field_data_cache in field_data_caches:
+            field_data_cache.cache[scope].cache_field_objects(field_objects_by_user_id[field_data_cache.user.id])
+
+
 class ScoresClient(object):
     """
     Basic client interface for retrieving Score information.
@@ -988,6 +1164,28 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create a ScoresClient for each of the given users, with pre-fetched
+        data for the given locations, using a single query for all of them.
+        Returns a dict mapping user ids to their ScoresClient.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            scores = clients[user_id]._locations_to_scores  # pylint: disable=protected-access
+            scores[location.map_into_course(course_id)] = cls.Score(correct, total, created)
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -11,7 +11,7 @@ from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError, MultiUserFieldDataCache
 from courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -434,3 +434,73 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr(shard=1)
+class TestMultiUserFieldDataCache(TestCase):
+    """Tests for loading the field data of many users with MultiUserFieldDataCache"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestMultiUserFieldDataCache, self).setUp()
+        self.users = [UserFactory.create() for _ in range(3)]
+        for index, user in enumerate(self.users[:2]):
+            StudentModuleFactory(student=user, state=json.dumps({'a_field': 'a_value_{}'.format(index)}))
+            StudentPrefsFactory(student=user, field_name='pref_field', value=json.dumps(index))
+            StudentInfoFactory(student=user, field_name='info_field', value=json.dumps(index))
+        UserStateSummaryFactory(field_name='summary_field', value=json.dumps('summary'))
+        self.descriptor = mock_descriptor([
+            mock_field(Scope.user_state, 'a_field'),
+            mock_field(Scope.preferences, 'pref_field'),
+            mock_field(Scope.user_info, 'info_field'),
+            mock_field(Scope.user_state_summary, 'summary_field'),
+        ])
+
+    def kvs_key(self, scope, user, field_name):
+        """
+        Returns the key of the field_name of the descriptor in scope for user.
+        """
+        block_scope_id = {
+            Scope.user_state: location('usage_id'),
+            Scope.preferences: 'mock_problem',
+            Scope.user_info: None,
+            Scope.user_state_summary: location('usage_id'),
+        }[scope]
+        user_id = None if scope == Scope.user_state_summary else user.id
+        return DjangoKeyValueStore.Key(scope, user_id, block_scope_id, field_name)
+
+    def test_bulk_queries(self):
+        # One query per scope, regardless of the number of users.
+        with self.assertNumQueries(4):
+            field_data_caches = MultiUserFieldDataCache([self.descriptor], course_id, self.users)
+
+        with self.assertNumQueries(0):
+            for user in self.users:
+                field_data_cache = field_data_caches.for_user(user)
+                self.assertEquals(field_data_cache.user, user)
+
+    def test_parity(self):
+        field_data_caches = MultiUserFieldDataCache([self.descriptor], course_id, self.users)
+        for user in self.users:
+            expected_kvs = DjangoKeyValueStore(FieldDataCache([self.descriptor], course_id, user))
+            kvs = DjangoKeyValueStore(field_data_caches.for_user(user))
+            for scope, field_name in (
+                (Scope.user_state, 'a_field'),
+                (Scope.preferences, 'pref_field'),
+                (Scope.user_info, 'info_field'),
+                (Scope.user_state_summary, 'summary_field'),
+            ):
+                key = self.kvs_key(scope, user, field_name)
+                self.assertEquals(kvs.has(key), expected_kvs.has(key))
+                if expected_kvs.has(key):
+                    self.assertEquals(kvs.get(key), expected_kvs.get(key))
+
+    def test_set(self):
+        field_data_caches = MultiUserFieldDataCache([self.descriptor], course_id, self.users)
+        user = self.users[2]
+        DjangoKeyValueStore(field_data_caches.for_user(user)).set(
+            self.kvs_key(Scope.user_state, user, 'a_field'), 'new_value'
+        )
+        student_module = StudentModule.objects.get(student=user)
+        self.assertEquals({'a_field': 'new_value'}, json.loads(student_module.state))
@@ -7,6 +7,7 @@ import mock
 
 from django.urls import reverse
 from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
 from mock import Mock, patch
 from pytz import UTC
@@ -38,6 +39,7 @@ from openedx.core.djangoapps.course_groups import cohorts
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohorted
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from openedx.core.lib.tests import attr
 from student.roles import CourseStaffRole
 from student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserFactory
@@ -1840,6 +1842,62 @@ class ClientConfigurationTestCase(TestCase):
         self.assertEqual(result, {})
 
 
+@override_settings(COMMENTS_SERVICE_CLIENT={
+    'MAX_CONNECTIONS': 2,
+    'COALESCE_REQUESTS': True,
+    'CACHE_TIMEOUTS': {'User.model.retrieve': 10},
+})
+@patch('lms.lib.comment_client.utils.requests.Session.request', autospec=True)
+class CommentClientSessionTestCase(CacheIsolationTestCase):
+    """Tests sending requests to the comments service over pooled connections."""
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(CommentClientSessionTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+        RequestCache.clear_all_namespaces()
+        self.addCleanup(RequestCache.clear_all_namespaces)
+
+    def _set_response(self, mock_request, data):
+        """Makes the comments service answer `data` to all requests."""
+        mock_request.return_value = Mock(status_code=200, text=json.dumps(data), json=lambda: data)
+
+    def test_coalesce_requests(self, mock_request):
+        self._set_response(mock_request, {'id': 'thread'})
+        for _ in range(2):
+            self.assertEqual(perform_request('get', 'http://cs/threads/1', {'a': 1}), {'id': 'thread'})
+        self.assertEqual(mock_request.call_count, 1)
+
+        perform_request('get', 'http://cs/threads/1', {'a': 2})
+        self.assertEqual(mock_request.call_count, 2)
+
+        # A change empties the responses of the request.
+        perform_request('post', 'http://cs/threads/1/comments', {'body': 'b'})
+        perform_request('get', 'http://cs/threads/1', {'a': 1})
+        self.assertEqual(mock_request.call_count, 4)
+
+    def test_cache_timeouts(self, mock_request):
+        self._set_response(mock_request, {'id': 'user'})
+        user_tags = ['model_class:User']
+        perform_request('get', 'http://cs/users/1', metric_action='model.retrieve', metric_tags=list(user_tags))
+        perform_request('get', 'http://cs/threads/1', metric_action='model.retrieve')
+        RequestCache.clear_all_namespaces()
+
+        result = perform_request('get', 'http://cs/users/1', metric_action='model.retrieve', metric_tags=user_tags)
+        perform_request('get', 'http://cs/threads/1', metric_action='model.retrieve')
+        self.assertEqual(result, {'id': 'user'})
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_session_reused(self, mock_request):
+        self._set_response(mock_request, {})
+        perform_request('post', 'http://cs/threads', {})
+        perform_request('post', 'http://cs/threads', {})
+        sessions = set(call[0][0] for call in mock_request.call_args_list)
+        self.assertEqual(len(sessions), 1)
+
+
 def set_discussion_division_settings(
         course_key, enable_cohorts=False, always_divide_inline_discussions=False,
         divided_discussions=[], division_scheme=CourseDiscussionSettings.COHORT
@@ -0,0 +1,63 @@
+"""
+Discussions Transformer
+"""
+from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+
+
+class DiscussionsTransformer(BlockStructureTransformer):
+    """
+    Collects the fields of discussion blocks used to map discussion ids to
+    them, so that the discussions visible to a user can be found in the
+    block structure transformed for them, without loading their xblocks.
+    """
+    WRITE_VERSION = 1
+    READ_VERSION = 1
+    REQUIRED_FIELDS = ('discussion_id', 'discussion_category', 'discussion_target')
+
+    @classmethod
+    def name(cls):
+        return "discussions"
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects the fields of the discussion blocks.
+        """
+        block_structure.request_xblock_fields(*cls.REQUIRED_FIELDS)
+
+    def transform(self, usage_info, block_structure):
+        """
+        No transformation is needed: the discussions are filtered by the
+        access transformers.
+        """
+        pass
+
+    @classmethod
+    def get_discussion_id_map(cls, block_structure):
+        """
+        Returns a dict of the metadata of the discussion blocks in
+        block_structure, keyed by discussion id, as get_discussion_id_map_entry
+        returns it.  Blocks without the required fields are left out.
+        """
+        id_map = {}
+        for block_key in block_structure:
+            if block_key.block_type != 'discussion':
+                continue
+            fields = {
+                field_name: block_structure.get_xblock_field(block_key, field_name)
+                for field_name in cls.REQUIRED_FIELDS
+            }
+            if any(value is None for value in fields.itervalues()):
+                continue
+            id_map[fields['discussion_id']] = {
+                'location': block_key,
+                'title': get_discussion_title(fields['discussion_category'], fields['discussion_target']),
+            }
+        return id_map
+
+
+def get_discussion_title(discussion_category, discussion_target):
+    """
+    Returns the title of a discussion in the discussion id map.
+    """
+    return discussion_category.split("/")[-1].strip() + (" / " + discussion_target if discussion_target else "")
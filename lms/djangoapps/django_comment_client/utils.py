@@ -15,9 +15,11 @@ from six import text_type
 
 from courseware import courses
 from courseware.access import has_access
+from lms.djangoapps.course_blocks.api import get_course_block_access_transformers, get_course_blocks
 from django_comment_client.constants import TYPE_ENTRY, TYPE_SUBCATEGORY
 from django_comment_client.permissions import check_permissions_by_view, get_team, has_permission
 from django_comment_client.settings import MAX_COMMENT_DEPTH
+from django_comment_client.transformers import DiscussionsTransformer, get_discussion_title
 from django_comment_common.models import (
     FORUM_ROLE_STUDENT,
     FORUM_ROLE_COMMUNITY_TA,
@@ -26,6 +28,8 @@ from django_comment_common.models import (
     Role
 )
 from django_comment_common.utils import get_course_discussion_settings
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_id, get_cohort_names, is_course_cohorted
 from openedx.core.lib.cache_utils import request_cached
 from student.models import get_user_by_username_or_email
@@ -159,7 +163,7 @@ def get_discussion_id_map_entry(xblock):
         xblock.discussion_id,
         {
             "location": xblock.location,
-            "title": xblock.discussion_category.split("/")[-1].strip() + (" / " + xblock.discussion_target if xblock.discussion_target else "")
+            "title": get_discussion_title(xblock.discussion_category, xblock.discussion_target)
         }
     )
 
@@ -176,19 +180,16 @@ def get_cached_discussion_key(course_id, discussion_id):
     map is cached but does not contain discussion_id, returns None. If the discussion id map is not cached for course,
     raises a DiscussionIdMapIsNotCached exception.
     """
-    try:
-        mapping = DiscussionsIdMapping.objects.get(course_id=course_id).mapping
-        if not mapping:
-            raise DiscussionIdMapIsNotCached()
-
-        usage_key_string = mapping.get(discussion_id)
-        if usage_key_string:
-            return UsageKey.from_string(usage_key_string).map_into_course(course_id)
-        else:
-            return None
-    except DiscussionsIdMapping.DoesNotExist:
+    mapping = DiscussionsIdMapping.get_mapping(course_id)
+    if not mapping:
         raise DiscussionIdMapIsNotCached()
 
+    usage_key_string = mapping.get(discussion_id)
+    if usage_key_string:
+        return UsageKey.from_string(usage_key_string).map_into_course(course_id)
+    else:
+        return None
+
 
 def get_cached_discussion_id_map(course, discussion_ids, user):
     """
@@ -203,21 +204,37 @@ def get_cached_discussion_id_map_by_course_id(course_id, discussion_ids, user):
     Returns a dict mapping discussion_ids to respective discussion xblock metadata if it is cached and visible to the
     user. If not, returns the result of get_discussion_id_map
     """
-    include_all = getattr(user, 'is_community_ta', False)
-    try:
-        entries = []
-        for discussion_id in discussion_ids:
-            key = get_cached_discussion_key(course_id, discussion_id)
-            if not key:
-                continue
-            xblock = _get_item_from_modulestore(key)
-            if not (has_required_keys(xblock) and (include_all or has_access(user, 'load', xblock, course_id))):
-                continue
-            entries.append(get_discussion_id_map_entry(xblock))
-        return dict(entries)
-    except DiscussionIdMapIsNotCached:
+    mapping = DiscussionsIdMapping.get_mapping(course_id)
+    if not mapping:
         return get_discussion_id_map_by_course_id(course_id, user)
 
+    discussion_ids = [discussion_id for discussion_id in discussion_ids if discussion_id in mapping]
+    if not discussion_ids:
+        return {}
+    include_all = getattr(user, 'is_community_ta', False)
+    visible_id_map = _get_visible_discussion_id_map(course_id, user, include_all)
+    return {
+        discussion_id: visible_id_map[discussion_id]
+        for discussion_id in discussion_ids if discussion_id in visible_id_map
+    }
+
+
+@request_cached()
+def _get_visible_discussion_id_map(course_id, user, include_all):
+    """
+    Returns the metadata of the discussion xblocks of the course visible to the user, keyed by discussion_id,
+    from the course block structure, without loading the xblocks.
+    """
+    if include_all:
+        block_structure = get_block_structure_manager(course_id).get_collected()
+    else:
+        block_structure = get_course_blocks(
+            user,
+            modulestore().make_course_usage_key(course_id),
+            BlockStructureTransformers(get_course_block_access_transformers() + [DiscussionsTransformer()]),
+        )
+    return DiscussionsTransformer.get_discussion_id_map(block_structure)
+
 
 def get_discussion_id_map(course, user):
     """
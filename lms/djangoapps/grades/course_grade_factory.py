@@ -2,6 +2,7 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
@@ -13,6 +14,7 @@ from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade, prefetch
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -23,6 +25,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of students whose scores are retrieved together by iter.
+    USER_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -92,6 +97,9 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        Students are graded in batches of USER_BATCH_SIZE, for which scores
+        and saved subsection grades are retrieved with bulk queries.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -102,9 +110,17 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                yield self._iter_grade_result(user, course_data, force_update)
+        users = iter(users)
+        user_batch = list(islice(users, self.USER_BATCH_SIZE))
+        while user_batch:
+            SubsectionGradeFactory.prefetch_for_users(user_batch, course_data)
+            try:
+                for user in user_batch:
+                    with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                        yield self._iter_grade_result(user, course_data, force_update)
+            finally:
+                SubsectionGradeFactory.clear_prefetched(user_batch, course_data.course_key)
+            user_batch = list(islice(users, self.USER_BATCH_SIZE))
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
@@ -15,7 +15,7 @@ from courseware.models import StudentModule
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
 from lms.djangoapps.grades.events import PROBLEM_SUBMITTED_EVENT_TYPE
 from lms.djangoapps.grades.tasks import recalculate_subsection_grade_v3
-from student.models import user_by_anonymous_id
+from student.models import users_by_anonymous_ids
 from submissions.models import Submission
 from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from util.date_utils import to_timestamp
@@ -76,9 +76,11 @@ class Command(BaseCommand):
             recalculate_subsection_grade_v3.apply_async(kwargs=task_args)
 
         kwargs = {'created_at__range': (modified_start, modified_end)}
-        for record in Submission.objects.filter(**kwargs):
+        submissions = Submission.objects.filter(**kwargs).select_related('student_item')
+        users = users_by_anonymous_ids(record.student_item.student_id for record in submissions)
+        for record in submissions:
             task_args = {
-                "user_id": user_by_anonymous_id(record.student_item.student_id).id,
+                "user_id": users[record.student_item.student_id].id,
                 "anonymous_user_id": record.student_item.student_id,
                 "course_id": unicode(record.student_item.course_id),
                 "usage_id": unicode(record.student_item.item_id),
@@ -32,7 +32,7 @@ class TestRecalculateSubsectionGrades(HasCourseWithProblemsMixin, ModuleStoreTes
         self.command = recalculate_subsection_grades.Command()
 
     @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.Submission')
-    @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.user_by_anonymous_id')
+    @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.users_by_anonymous_ids')
     @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.recalculate_subsection_grade_v3')
     def test_submissions(self, task_mock, id_mock, subs_mock):
         submission = MagicMock()
@@ -42,13 +42,12 @@ class TestRecalculateSubsectionGrades(HasCourseWithProblemsMixin, ModuleStoreTes
             item_id='abc',
         )
         submission.created_at = utc.localize(datetime.strptime('2016-08-23 16:43', DATE_FORMAT))
-        subs_mock.objects.filter.return_value = [submission]
-        id_mock.return_value = MagicMock()
-        id_mock.return_value.id = "ID"
+        subs_mock.objects.filter.return_value.select_related.return_value = [submission]
+        id_mock.return_value = {"anonymousID": MagicMock(id="ID")}
         self._run_command_and_check_output(task_mock, ScoreDatabaseTableEnum.submissions, include_anonymous_id=True)
 
     @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.StudentModule')
-    @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.user_by_anonymous_id')
+    @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.users_by_anonymous_ids')
     @patch('lms.djangoapps.grades.management.commands.recalculate_subsection_grades.recalculate_subsection_grade_v3')
     def test_csm(self, task_mock, id_mock, csm_mock):
         csm_record = MagicMock()
@@ -57,8 +56,7 @@ class TestRecalculateSubsectionGrades(HasCourseWithProblemsMixin, ModuleStoreTes
         csm_record.module_state_key = "abc"
         csm_record.modified = utc.localize(datetime.strptime('2016-08-23 16:43', DATE_FORMAT))
         csm_mock.objects.filter.return_value = [csm_record]
-        id_mock.return_value = MagicMock()
-        id_mock.return_value.id = "ID"
+        id_mock.return_value = {}
         self._run_command_and_check_output(task_mock, ScoreDatabaseTableEnum.courseware_student_module)
 
     def _run_command_and_check_output(self, task_mock, score_db_table, include_anonymous_id=False):
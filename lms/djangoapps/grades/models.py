@@ -32,6 +32,14 @@ log = logging.getLogger(__name__)
 
 BLOCK_RECORD_LIST_VERSION = 1
 
+# Maximum number of BlockRecordList hash values interned by the process.
+# Learners in a course mostly share identical lists of visible blocks,
+# so their hash values are computed once and then looked up by content.
+BLOCK_RECORD_LIST_HASH_CACHE_SIZE = 10000
+_block_record_list_hashes = {}
+
+_DEDUP_STATS_NAMESPACE = u"grades.models.VisibleBlocks.dedup"
+
 # Used to serialize information about a block at the time it was used in
 # grade calculation.
 BlockRecord = namedtuple('BlockRecord', ['locator', 'weight', 'raw_possible', 'graded'])
@@ -70,8 +78,21 @@ class BlockRecordList(tuple):
         of the binary digest.  In the future, different algorithms could be
         supported by adding a label indicated which algorithm was used, e.g.,
         "sha256$j0NDRmSPa5bfid2pAcUXaxCm2Dlh3TwayItZstwyeqQ=".
-        """
-        return b64encode(sha1(self.json_value).digest())
+
+        Hash values are interned by the content of the list, so identical
+        lists of block records are serialized and hashed only once.
+        """
+        content_key = (self.course_key, self.version, tuple(self))
+        hash_value = _block_record_list_hashes.get(content_key)
+        if hash_value is None:
+            _increment_dedup_stat('hash_misses')
+            hash_value = b64encode(sha1(self.json_value).digest())
+            if len(_block_record_list_hashes) >= BLOCK_RECORD_LIST_HASH_CACHE_SIZE:
+                _block_record_list_hashes.clear()
+            _block_record_list_hashes[content_key] = hash_value
+        else:
+            _increment_dedup_stat('hash_hits')
+        return hash_value
 
     @lazy
     def json_value(self):
@@ -218,24 +239,38 @@ class VisibleBlocks(models.Model):
         Bulk creates VisibleBlocks for the given iterator of
         BlockRecordList objects for the given user and course_key, but
         only for those that aren't already created.
+
+        VisibleBlocks already read or created for any user in the course
+        during this request are not created again.
         """
         cached_records = cls.bulk_read(user_id, course_key)
-        non_existent_brls = {brl.hash_value for brl in block_record_lists if brl.hash_value not in cached_records}
-        cls.bulk_create(user_id, course_key, non_existent_brls)
+        course_hashes = cls._course_hashes(course_key)
+        non_existent_brls = {}
+        for brl in block_record_lists:
+            if brl.hash_value not in cached_records and brl.hash_value not in course_hashes:
+                non_existent_brls[brl.hash_value] = brl
+        _increment_dedup_stat('created', len(non_existent_brls))
+        _increment_dedup_stat('deduplicated', len(block_record_lists) - len(non_existent_brls))
+        cls.bulk_create(user_id, course_key, non_existent_brls.values())
 
     @classmethod
-    def _initialize_cache(cls, user_id, course_key):
+    def _initialize_cache(cls, user_id, course_key, grades_with_blocks=None):
         """
         Prefetches visible blocks for the given user and course and stores in the cache.
         Returns a dictionary mapping hashes of these block records to the
         block record objects.
+
+        If grades_with_blocks is given, the visible blocks of those already
+        fetched grades are cached instead of querying for them.
         """
-        grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks').filter(
-            user_id=user_id,
-            course_id=course_key,
-        )
+        if grades_with_blocks is None:
+            grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks').filter(
+                user_id=user_id,
+                course_id=course_key,
+            )
         prefetched = {grade.visible_blocks.hashed: grade.visible_blocks for grade in grades_with_blocks}
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = prefetched
+        cls._course_hashes(course_key).update(prefetched)
         return prefetched
 
     @classmethod
@@ -247,6 +282,15 @@ class VisibleBlocks(models.Model):
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)].update(
             {visible_block.hashed: visible_block for visible_block in visible_blocks}
         )
+        cls._course_hashes(course_key).update(visible_block.hashed for visible_block in visible_blocks)
+
+    @classmethod
+    def _course_hashes(cls, course_key):
+        """
+        Returns the set of hashes of the VisibleBlocks known to exist
+        for the given course, for any user, during this request.
+        """
+        return get_cache(cls._CACHE_NAMESPACE).setdefault(u"visible_blocks_hashes.{}".format(course_key), set())
 
     @classmethod
     def _cache_key(cls, user_id, course_key):
@@ -369,6 +413,32 @@ class PersistentSubsectionGrade(TimeStampedModel):
             course_id=course_key,
         )
 
+    @classmethod
+    def bulk_read_grades_for_users(cls, user_ids, course_key):
+        """
+        Reads all grades for the given users and course with a single query.
+        Returns a dict mapping each user id to the list of its grades.
+
+        The VisibleBlocks cache of each user is initialized with the
+        visible blocks of the fetched grades, if not already initialized.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_key: The course identifier for the desired grades
+        """
+        grades_by_user = {user_id: [] for user_id in user_ids}
+        for grade in cls.objects.select_related('visible_blocks', 'override').filter(
+                user_id__in=list(grades_by_user),
+                course_id=course_key,
+        ):
+            grades_by_user[grade.user_id].append(grade)
+
+        visible_blocks_cache = get_cache(VisibleBlocks._CACHE_NAMESPACE)  # pylint: disable=protected-access
+        for user_id, grades in grades_by_user.iteritems():
+            if VisibleBlocks._cache_key(user_id, course_key) not in visible_blocks_cache:  # pylint: disable=protected-access
+                VisibleBlocks._initialize_cache(user_id, course_key, grades)  # pylint: disable=protected-access
+        return grades_by_user
+
     @classmethod
     def update_or_create_grade(cls, **params):
         """
@@ -636,3 +706,23 @@ class PersistentSubsectionGradeOverride(models.Model):
 def prefetch(user, course_key):
     PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
     VisibleBlocks.bulk_read(user.id, course_key)
+
+
+def visible_blocks_dedup_stats():
+    """
+    Returns a dict of the counts, during this request, of BlockRecordList
+    hash values computed ('hash_misses') or interned ('hash_hits'), and of
+    VisibleBlocks created ('created') or found to already exist
+    ('deduplicated').
+    """
+    stats = dict.fromkeys(('hash_hits', 'hash_misses', 'created', 'deduplicated'), 0)
+    stats.update(get_cache(_DEDUP_STATS_NAMESPACE))
+    return stats
+
+
+def _increment_dedup_stat(name, count=1):
+    """
+    Increments the named VisibleBlocks deduplication count for this request.
+    """
+    stats = get_cache(_DEDUP_STATS_NAMESPACE)
+    stats[name] = stats.get(name, 0) + count
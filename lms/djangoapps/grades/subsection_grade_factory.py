@@ -7,8 +7,9 @@ from courseware.model_data import ScoresClient
 from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_grades
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
+from openedx.core.lib.cache_utils import get_cache
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
-from student.models import anonymous_id_for_user
+from student.models import anonymous_id_for_user, anonymous_ids_for_users
 from submissions import api as submissions_api
 
 from .course_data import CourseData
@@ -21,6 +22,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    _CACHE_NAMESPACE = u"grades.subsection_grade_factory.SubsectionGradeFactory"
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -28,6 +31,27 @@ class SubsectionGradeFactory(object):
         self._cached_subsection_grades = None
         self._unsaved_subsection_grades = OrderedDict()
 
+    @classmethod
+    def prefetch_for_users(cls, users, course_data):
+        """
+        Registers the given users as a batch, so that the first of their
+        factories to need its student's scores or saved subsection grades
+        retrieves them for all of the users at once.
+        """
+        user_batch = _UserBatch(users, course_data)
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user in users:
+            cache[cls._cache_key(user.id, course_data.course_key)] = user_batch
+
+    @classmethod
+    def clear_prefetched(cls, users, course_key):
+        """
+        Unregisters the given users from their batch, if any.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user in users:
+            cache.pop(cls._cache_key(user.id, course_key), None)
+
     def create(self, subsection, read_only=False):
         """
         Returns the SubsectionGrade object for the student and subsection.
@@ -104,6 +128,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._user_batch is not None:
+            return self._user_batch.csm_scores[self.student.id]
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -113,9 +139,18 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._user_batch is not None:
+            return self._user_batch.submissions_scores[self.student.id]
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
+    @lazy
+    def _user_batch(self):
+        """
+        Returns the batch of users the student was prefetched with, if any.
+        """
+        return get_cache(self._CACHE_NAMESPACE).get(self._cache_key(self.student.id, self.course_data.course_key))
+
     def _get_bulk_cached_grade(self, subsection):
         """
         Returns the student's SubsectionGrade for the subsection,
@@ -135,10 +170,11 @@ class SubsectionGradeFactory(object):
         a bulk retrieval of all subsection grades in the course.
         """
         if self._cached_subsection_grades is None:
-            self._cached_subsection_grades = {
-                record.full_usage_key: record
-                for record in PersistentSubsectionGrade.bulk_read_grades(self.student.id, self.course_data.course_key)
-            }
+            if self._user_batch is not None:
+                records = self._user_batch.subsection_grades[self.student.id]
+            else:
+                records = PersistentSubsectionGrade.bulk_read_grades(self.student.id, self.course_data.course_key)
+            self._cached_subsection_grades = {record.full_usage_key: record for record in records}
         return self._cached_subsection_grades
 
     def _update_saved_subsection_grade(self, subsection_usage_key, subsection_model):
@@ -150,6 +186,10 @@ class SubsectionGradeFactory(object):
         if self._cached_subsection_grades is not None:
             self._cached_subsection_grades[subsection_usage_key] = subsection_model
 
+    @staticmethod
+    def _cache_key(user_id, course_key):
+        return u"{}.{}".format(course_key, user_id)
+
     def _log_event(self, log_func, log_statement, subsection):
         """
         Logs the given statement, for this instance.
@@ -161,3 +201,58 @@ class SubsectionGradeFactory(object):
             getattr(subsection, 'subtree_edited_on', None),
             self.student.id,
         ))
+
+
+class _UserBatch(object):
+    """
+    Scores and saved subsection grades of a batch of users in a course,
+    each retrieved for all of the users on first access, with bulk queries
+    where the underlying APIs allow.
+
+    Results are identical to those retrieved for each user separately by
+    SubsectionGradeFactory.
+    """
+    def __init__(self, users, course_data):
+        self.users = users
+        self.course_data = course_data
+
+    @lazy
+    def csm_scores(self):
+        """
+        Returns a dict mapping user ids to ScoresClients with the scores
+        stored in the user state (in CSM) for the course.
+
+        Scores are fetched for all scorable blocks in the collected course
+        structure, a superset of the blocks in each user's structure.
+        """
+        scorable_locations = [
+            block_key for block_key in self.course_data.collected_structure if possibly_scored(block_key)
+        ]
+        return ScoresClient.create_for_users(
+            self.course_data.course_key, [user.id for user in self.users], scorable_locations,
+        )
+
+    @lazy
+    def submissions_scores(self):
+        """
+        Returns a dict mapping user ids to the scores stored by the
+        Submissions API for the course.
+
+        The Submissions API only returns the scores of one student at a
+        time, so only the anonymous ids of the users are fetched in bulk.
+        """
+        course_id = str(self.course_data.course_key)
+        return {
+            user_id: submissions_api.get_scores(course_id, anonymous_id)
+            for user_id, anonymous_id in anonymous_ids_for_users(self.users, self.course_data.course_key).iteritems()
+        }
+
+    @lazy
+    def subsection_grades(self):
+        """
+        Returns a dict mapping user ids to the lists of their saved
+        subsection grades in the course.
+        """
+        return PersistentSubsectionGrade.bulk_read_grades_for_users(
+            [user.id for user in self.users], self.course_data.course_key,
+        )
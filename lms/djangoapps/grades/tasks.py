@@ -28,6 +28,7 @@ from .config.waffle import DISABLE_REGRADE_ON_POLICY_CHANGE, waffle
 from .constants import ScoreDatabaseTableEnum
 from .course_grade_factory import CourseGradeFactory
 from .exceptions import DatabaseNotReadyError
+from .models import visible_blocks_dedup_stats
 from .services import GradesService
 from .signals.signals import SUBSECTION_SCORE_CHANGED
 from .subsection_grade_factory import SubsectionGradeFactory
@@ -114,6 +115,20 @@ def compute_grades_for_course(course_key, offset, batch_size, **kwargs):  # pyli
     for result in CourseGradeFactory().iter(users=student_iter, course_key=course_key, force_update=True):
         if result.error is not None:
             raise result.error
+    _set_visible_blocks_dedup_metrics()
+
+
+def _set_visible_blocks_dedup_metrics():
+    """
+    Sets custom metrics for the deduplication of VisibleBlocks while
+    computing grades during this request.
+    """
+    stats = visible_blocks_dedup_stats()
+    for name, count in stats.iteritems():
+        set_custom_metric(u'visible_blocks_{}'.format(name), count)
+    total = stats['created'] + stats['deduplicated']
+    if total:
+        set_custom_metric(u'visible_blocks_dedup_ratio', float(stats['deduplicated']) / total)
 
 
 @task(
@@ -2,19 +2,23 @@ import itertools
 
 import ddt
 from courseware.access import has_access
+from courseware.model_data import ScoresClient, set_score
 from django.conf import settings
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from mock import patch
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
 from six import text_type
 
+from student.models import CourseEnrollment, anonymous_id_for_user
 from student.tests.factories import UserFactory
+from submissions import api as submissions_api
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentSubsectionGrade
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
 from .base import GradeTestBase
 from .utils import mock_get_score
@@ -349,3 +353,52 @@ class TestGradeIteration(SharedModuleStoreTestCase):
                 students_to_errors[student] = error
 
         return students_to_course_grades, students_to_errors
+
+
+@ddt.ddt
+class TestGradeIterationBatches(GradeTestBase):
+    """
+    Test that grades of students iterated in batches are identical to
+    those computed for each student separately.
+    """
+    def setUp(self):
+        super(TestGradeIterationBatches, self).setUp()
+        self.students = [UserFactory.create() for _ in range(5)]
+        for index, student in enumerate(self.students):
+            CourseEnrollment.enroll(student, self.course.id)
+            if index % 2 == 0:
+                set_score(student.id, self.problem.location, index % 3, 2)
+            if index > 1:
+                self._set_submissions_score(student, self.problem2.location, index % 2, 1)
+
+    def _set_submissions_score(self, student, usage_key, earned, possible):
+        """
+        Sets the student's score for the given block with the Submissions API.
+        """
+        student_item = {
+            'student_id': anonymous_id_for_user(student, self.course.id),
+            'course_id': unicode(self.course.id),
+            'item_id': unicode(usage_key),
+            'item_type': 'problem',
+        }
+        submission = submissions_api.create_submission(student_item, 'any answer')
+        submissions_api.set_score(submission['uuid'], earned, possible)
+
+    @ddt.data(True, False)
+    def test_parity(self, force_update):
+        expected_summaries = {
+            student.id: CourseGradeFactory().update(student, self.course).summary
+            for student in self.students
+        }
+
+        with patch.object(CourseGradeFactory, 'USER_BATCH_SIZE', 2):
+            with patch.object(ScoresClient, 'create_for_locations') as mock_create_for_locations:
+                with patch.object(PersistentSubsectionGrade, 'bulk_read_grades') as mock_bulk_read_grades:
+                    results = list(CourseGradeFactory().iter(self.students, self.course, force_update=force_update))
+                    summaries = {student.id: course_grade.summary for student, course_grade, _ in results}
+
+        self.assertFalse(mock_create_for_locations.called)
+        self.assertFalse(mock_bulk_read_grades.called)
+        self.assertEqual([error for _, _, error in results], [None] * len(self.students))
+        self.assertEqual(summaries, expected_summaries)
+        self.assertNotEqual(len(set(summary['percent'] for summary in summaries.values())), 1)
@@ -12,6 +12,7 @@ import pytz
 from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
+from edx_django_utils.cache import RequestCache
 from freezegun import freeze_time
 from mock import patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
@@ -23,7 +24,8 @@ from lms.djangoapps.grades.models import (
     PersistentCourseGrade,
     PersistentSubsectionGrade,
     PersistentSubsectionGradeOverride,
-    VisibleBlocks
+    VisibleBlocks,
+    visible_blocks_dedup_stats
 )
 from track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
 
@@ -59,6 +61,20 @@ class BlockRecordListTestCase(TestCase):
             brs
         )
 
+    def test_hash_value_interned(self):
+        block_record = BlockRecord(
+            locator=self.course_key.make_usage_key('problem', 'problem_id'), weight=1, raw_possible=2, graded=True,
+        )
+        expected_hash = BlockRecordList.from_list([block_record], self.course_key).hash_value
+        with patch('lms.djangoapps.grades.models.sha1') as mock_sha1:
+            mock_sha1.return_value.digest.return_value = 'digest'
+            self.assertEqual(BlockRecordList.from_list([block_record], self.course_key).hash_value, expected_hash)
+            self.assertNotEqual(
+                BlockRecordList.from_list([block_record._replace(weight=2)], self.course_key).hash_value,
+                expected_hash,
+            )
+        self.assertEqual(mock_sha1.call_count, 1)
+
 
 class GradesModelTestCase(TestCase):
     """
@@ -198,6 +214,29 @@ class VisibleBlocksTest(GradesModelTestCase):
         with self.assertRaises(AttributeError):
             visible_blocks.blocks = expected_blocks
 
+    def test_bulk_get_or_create_dedup(self):
+        """
+        Ensures that VisibleBlocks already created for a user in the
+        course are not created again for other users.
+        """
+        RequestCache.clear_all_namespaces()
+
+        def _block_record_lists():
+            return [
+                BlockRecordList.from_list([self.record_a], self.course_key),
+                BlockRecordList.from_list([self.record_a, self.record_b], self.course_key),
+            ]
+
+        with self.assertNumQueries(2):
+            VisibleBlocks.bulk_get_or_create(self.user_id, self.course_key, _block_record_lists())
+        with self.assertNumQueries(1):
+            VisibleBlocks.bulk_get_or_create(self.user_id + 1, self.course_key, _block_record_lists())
+
+        self.assertEqual(VisibleBlocks.objects.filter(course_id=self.course_key).count(), 2)
+        stats = visible_blocks_dedup_stats()
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['deduplicated'], 2)
+
 
 @ddt.ddt
 class PersistentSubsectionGradeTest(GradesModelTestCase):
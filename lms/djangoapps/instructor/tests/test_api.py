@@ -87,8 +87,10 @@ from student.models import (
     CourseEnrollmentAllowed,
     ManualEnrollmentAudit,
     NonExistentCourseError,
+    anonymous_id_for_user,
     get_retired_email_by_email,
-    get_retired_username_by_username
+    get_retired_username_by_username,
+    unique_id_for_user
 )
 from student.roles import CourseBetaTesterRole, CourseFinanceAdminRole, CourseInstructorRole, CourseSalesAdminRole
 from student.tests.factories import AdminFactory, UserFactory
@@ -3202,8 +3204,6 @@ class TestInstructorAPILevelsDataDump(SharedModuleStoreTestCase, LoginEnrollment
         response = self.client.post(url, {})
         self.assertIn('The detailed enrollment report is being created.', response.content)
 
-    @patch.object(lms.djangoapps.instructor.views.api, 'anonymous_id_for_user', Mock(return_value='42'))
-    @patch.object(lms.djangoapps.instructor.views.api, 'unique_id_for_user', Mock(return_value='41'))
     def test_get_anon_ids(self):
         """
         Test the CSV output for the anonymized user ids.
@@ -3212,12 +3212,16 @@ class TestInstructorAPILevelsDataDump(SharedModuleStoreTestCase, LoginEnrollment
         response = self.client.post(url, {})
         self.assertEqual(response['Content-Type'], 'text/csv')
         body = response.content.replace('\r', '')
-        self.assertTrue(body.startswith(
-            '"User ID","Anonymized User ID","Course Specific Anonymized User ID"'
-            '\n"{user_id}","41","42"\n'.format(user_id=self.students[0].id)
-        ))
-        self.assertTrue(
-            body.endswith('"{user_id}","41","42"\n'.format(user_id=self.students[-1].id))
+        header = '"User ID","Anonymized User ID","Course Specific Anonymized User ID"\n'
+        self.assertTrue(body.startswith(header + self._anon_ids_row(self.students[0])))
+        self.assertTrue(body.endswith(self._anon_ids_row(self.students[-1])))
+
+    def _anon_ids_row(self, user):
+        """
+        Returns the expected CSV row of the anonymized ids of the given user.
+        """
+        return '"{}","{}","{}"\n'.format(
+            user.id, unique_id_for_user(user, save=False), anonymous_id_for_user(user, self.course.id, save=False),
         )
 
     @patch('lms.djangoapps.instructor_task.models.logger.error')
@@ -108,9 +108,8 @@ from student.models import (
     ManualEnrollmentAudit,
     Registration,
     UserProfile,
-    anonymous_id_for_user,
+    anonymous_ids_for_users,
     get_user_by_username_or_email,
-    unique_id_for_user,
     is_email_retired
 )
 from student.roles import CourseFinanceAdminRole, CourseSalesAdminRole
@@ -1862,7 +1861,9 @@ def get_anon_ids(request, course_id):  # pylint: disable=unused-argument
         courseenrollment__course_id=course_id,
     ).order_by('id')
     header = ['User ID', 'Anonymized User ID', 'Course Specific Anonymized User ID']
-    rows = [[s.id, unique_id_for_user(s, save=False), anonymous_id_for_user(s, course_id, save=False)] for s in students]
+    unique_ids = anonymous_ids_for_users(students, None, save=False)
+    course_specific_ids = anonymous_ids_for_users(students, course_id, save=False)
+    rows = [[user_id, unique_ids[user_id], course_specific_ids[user_id]] for user_id in sorted(course_specific_ids)]
     return csv_response(text_type(course_id).replace('/', '-') + '-anon-ids.csv', header, rows)
 
 
@@ -17,6 +17,7 @@ from six import text_type
 from courseware.courses import get_problems_in_section
 from courseware.module_render import get_xqueue_callback_url_prefix
 from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import get_subtask_progress
 from util.db import outer_atomic
 from xmodule.modulestore.django import modulestore
 
@@ -175,10 +176,10 @@ def _update_instructor_task(instructor_task, task_result):
     opportunity to update the InstructorTask entry.
 
     Tasks that are in progress and have subtasks doing the processing do not look
-    to the task's AsyncResult object.  When subtasks are running, the
-    InstructorTask object itself is updated with the subtasks' progress,
-    not any AsyncResult object.  In this case, the InstructorTask is
-    not updated at all.
+    to the task's AsyncResult object.  When subtasks are running, their
+    progress is aggregated in the database, not in any AsyncResult object.
+    In this case, only the task_output of the InstructorTask is updated,
+    with the progress aggregated so far.
 
     Calculates json to store in "task_output" field of the `instructor_task`,
     as well as updating the task_state.
@@ -208,8 +209,11 @@ def _update_instructor_task(instructor_task, task_result):
         # meaning that the subtasks have successfully been defined.  However, the InstructorTask
         # will be marked as in PROGRESS, until the last subtask completes and marks it as SUCCESS.
         # We want to ignore the parent SUCCESS if subtasks are still running, and just trust the
-        # contents of the InstructorTask.
+        # contents of the InstructorTask, and the progress its subtasks have recorded.
         entry_needs_updating = False
+        task_progress = get_subtask_progress(instructor_task)
+        if task_progress is not None:
+            instructor_task.task_output = InstructorTask.create_output_for_success(task_progress)
     elif result_state in [PROGRESS, SUCCESS]:
         # construct a status message directly from the task result's result:
         # it needs to go back with the entry passed in.
@@ -10,5 +10,11 @@ class GradeReportSetting(ConfigurationModel):
     """
     Sets the batch size used when running grade reports
     with multiple celery workers.
+
+    When the instructor_task.stream_grade_reports waffle flag is enabled for
+    a course, its grade reports are streamed to the report store in parts of
+    batch_size students, graded by up to max_workers threads, and resumed from
+    the last uploaded part if the task is interrupted.
     """
     batch_size = IntegerField(default=100)
+    max_workers = IntegerField(default=1)
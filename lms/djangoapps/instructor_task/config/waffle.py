@@ -0,0 +1,24 @@
+"""
+This module contains various configuration settings via
+waffle switches for the instructor_task app.
+"""
+from openedx.core.djangoapps.waffle_utils import CourseWaffleFlag, WaffleFlagNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'instructor_task'
+
+# Course Flags
+STREAM_GRADE_REPORTS = u'stream_grade_reports'
+
+
+def waffle_flags():
+    """
+    Returns the namespaced, cached, audited Waffle flags dictionary for instructor_task.
+    """
+    namespace = WaffleFlagNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'InstructorTask: ')
+    return {
+        # By default, course grade reports are compiled in memory and uploaded at once.
+        # When enabled, they are streamed to the report store in parts, as configured
+        # by GradeReportSetting.
+        STREAM_GRADE_REPORTS: CourseWaffleFlag(namespace, STREAM_GRADE_REPORTS),
+    }
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor_task', '0003_gradereportsetting_max_workers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstructorSubtaskProgress',
+            fields=[
+                ('instructor_task', models.OneToOneField(primary_key=True, serialize=False, to='instructor_task.InstructorTask', on_delete=django.db.models.deletion.CASCADE)),
+                ('total_subtasks', models.PositiveIntegerField(default=0)),
+                ('succeeded_subtasks', models.PositiveIntegerField(default=0)),
+                ('failed_subtasks', models.PositiveIntegerField(default=0)),
+                ('attempted', models.PositiveIntegerField(default=0)),
+                ('succeeded', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InstructorSubtaskStatus',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('subtask_id', models.CharField(max_length=255)),
+                ('state', models.CharField(max_length=50)),
+                ('attempted', models.PositiveIntegerField(default=0)),
+                ('succeeded', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('retried_nomax', models.PositiveIntegerField(default=0)),
+                ('retried_withmax', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('instructor_task', models.ForeignKey(db_index=False, to='instructor_task.InstructorTask', on_delete=django.db.models.deletion.CASCADE)),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='instructorsubtaskstatus',
+            index_together=set([('instructor_task', 'subtask_id')]),
+        ),
+    ]
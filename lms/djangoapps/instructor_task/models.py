@@ -18,12 +18,14 @@ import hashlib
 import json
 import logging
 import os.path
+import shutil
+from tempfile import TemporaryFile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 from opaque_keys.edx.django.models import CourseKeyField
 from six import text_type
@@ -180,6 +182,98 @@ class InstructorTask(models.Model):
         return json.dumps({'message': 'Task revoked before running'})
 
 
+class InstructorSubtaskStatus(models.Model):
+    """
+    Records the status of a subtask of an InstructorTask, as reported by the
+    subtask itself.
+
+    Rows are only ever added: each status update of a subtask is a new row, and
+    the current status of a subtask is its most recent row.  Subtasks therefore
+    don't contend with each other to record their status.
+
+    `subtask_id` stores the id used by celery for the subtask, and the other
+    fields store the values of its SubtaskStatus.
+    """
+    class Meta(object):
+        app_label = "instructor_task"
+        index_together = [('instructor_task', 'subtask_id')]
+
+    instructor_task = models.ForeignKey(InstructorTask, db_index=False, on_delete=models.CASCADE)
+    subtask_id = models.CharField(max_length=255)
+    state = models.CharField(max_length=50)
+    attempted = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    retried_nomax = models.PositiveIntegerField(default=0)
+    retried_withmax = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+
+    STATUS_FIELDS = ('attempted', 'succeeded', 'failed', 'skipped', 'retried_nomax', 'retried_withmax', 'state')
+
+    @classmethod
+    def from_subtask_status(cls, instructor_task_id, subtask_status):
+        """
+        Returns an unsaved row recording the given SubtaskStatus.
+        """
+        return cls(
+            instructor_task_id=instructor_task_id,
+            subtask_id=subtask_status.task_id,
+            **{field: getattr(subtask_status, field) for field in cls.STATUS_FIELDS}
+        )
+
+    @classmethod
+    def get_latest(cls, instructor_task_id, subtask_id):
+        """
+        Returns the most recent row recording the status of the given subtask,
+        or None if none was recorded.
+        """
+        return cls.objects.filter(
+            instructor_task_id=instructor_task_id, subtask_id=subtask_id,
+        ).order_by('-id').first()
+
+    def to_dict(self):
+        """
+        Returns the recorded status as a dict, as defined by SubtaskStatus.to_dict().
+        """
+        subtask_status = {field: getattr(self, field) for field in self.STATUS_FIELDS}
+        subtask_status['task_id'] = self.subtask_id
+        return subtask_status
+
+
+class InstructorSubtaskProgress(models.Model):
+    """
+    Aggregates the progress made by the subtasks of an InstructorTask.
+
+    Counters are incremented atomically in the database as subtasks complete,
+    so that the progress of the InstructorTask can be read from a single row.
+
+    `total_subtasks`, `succeeded_subtasks` and `failed_subtasks` count subtasks.
+    `attempted`, `succeeded`, `failed` and `skipped` count items, summed over the
+        subtasks that completed.
+    """
+    class Meta(object):
+        app_label = "instructor_task"
+
+    instructor_task = models.OneToOneField(InstructorTask, primary_key=True, on_delete=models.CASCADE)
+    total_subtasks = models.PositiveIntegerField(default=0)
+    succeeded_subtasks = models.PositiveIntegerField(default=0)
+    failed_subtasks = models.PositiveIntegerField(default=0)
+    attempted = models.PositiveIntegerField(default=0)
+    succeeded = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+
+    ITEM_COUNTERS = ('attempted', 'succeeded', 'failed', 'skipped')
+
+    @property
+    def num_remaining(self):
+        """
+        The number of subtasks that haven't completed.
+        """
+        return self.total_subtasks - self.succeeded_subtasks - self.failed_subtasks
+
+
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
@@ -278,6 +372,55 @@ class DjangoStorageReportStore(ReportStore):
         output_buffer.seek(0)
         self.store(course_id, filename, output_buffer)
 
+    def store_rows_part(self, course_id, filename, part_index, rows):
+        """
+        Given a course_id, filename, part_index, and rows, write the rows to
+        the storage backend in csv format as the numbered part of the file,
+        replacing any previously written part with the same number. Parts are
+        combined into the file by `store_parts`.
+        """
+        path = self.path_to(course_id, self._part_filename(filename, part_index))
+        if self.storage.exists(path):
+            self.storage.delete(path)
+        output_buffer = ContentFile('')
+        csvwriter = csv.writer(output_buffer)
+        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        output_buffer.seek(0)
+        self.storage.save(path, output_buffer)
+
+    def store_parts(self, course_id, filename, header_rows, num_parts):
+        """
+        Given a course_id, filename, header_rows, and the number of parts
+        previously written with `store_rows_part`, write the header rows
+        followed by the contents of the parts, in order, to the file. The
+        parts are copied through a temporary file, so that they are never
+        held in memory together, and deleted once the file is stored.
+        """
+        part_paths = [
+            self.path_to(course_id, self._part_filename(filename, part_index))
+            for part_index in range(num_parts)
+        ]
+        with TemporaryFile() as output_file:
+            # Adding unicode signature (BOM) for MS Excel 2013 compatibility
+            output_file.write(codecs.BOM_UTF8)
+            csvwriter = csv.writer(output_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(header_rows))
+            for part_path in part_paths:
+                with self.storage.open(part_path) as part_file:
+                    shutil.copyfileobj(part_file, output_file)
+            output_file.seek(0)
+            self.store(course_id, filename, File(output_file))
+
+        for part_path in part_paths:
+            self.storage.delete(part_path)
+
+    def _part_filename(self, filename, part_index):
+        """
+        Return the name of the numbered part of the given file, in a
+        directory of its own so parts aren't listed by `links_for`.
+        """
+        return os.path.join(u'parts', filename, u'{:05d}.csv'.format(part_index))
+
     def links_for(self, course_id):
         """
         For a given `course_id`, return a list of `(filename, url)` tuples.
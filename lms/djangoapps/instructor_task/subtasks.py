@@ -11,12 +11,13 @@ import psutil
 from celery.states import READY_STATES, RETRY, SUCCESS
 from django.core.cache import cache
 from django.db import DatabaseError, transaction
+from django.db.models import F
 
 import dogstats_wrapper as dog_stats_api
 from util.db import outer_atomic
 
 from .exceptions import DuplicateTaskException
-from .models import PROGRESS, QUEUING, InstructorTask
+from .models import PROGRESS, QUEUING, InstructorSubtaskProgress, InstructorSubtaskStatus, InstructorTask
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -25,6 +26,8 @@ SUBTASK_LOCK_EXPIRE = 60 * 10  # Lock expires in 10 minutes
 # Number of times to retry if a subtask update encounters a lock on the InstructorTask.
 # (These are recursive retries, so don't make this number too large.)
 MAX_DATABASE_LOCK_RETRIES = 5
+# Number of initial subtask statuses to insert per query.
+SUBTASK_STATUS_BATCH_SIZE = 1000
 
 
 def _get_number_of_subtasks(total_num_items, items_per_task):
@@ -222,15 +225,16 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
     done overall.  The `action_name` is also stored, to help with constructing more readable
     task_progress messages.
 
-    The InstructorTask's "subtasks" field is also initialized.  This is also a JSON-serialized dict.
-    Keys include 'total', 'succeeded', 'retried', 'failed', which are counters for the number of
-    subtasks.  'Total' is set here to the total number, while the other three are initialized to zero.
-    Once the counters for 'succeeded' and 'failed' match the 'total', the subtasks are done and
-    the InstructorTask's "status" will be changed to SUCCESS.
+    The InstructorTask's "subtasks" field is also initialized.  This is also a JSON-serialized dict,
+    whose 'total' key is set to the total number of subtasks.
 
-    The "subtasks" field also contains a 'status' key, that contains a dict that stores status
-    information for each subtask.  The value for each subtask (keyed by its task_id)
-    is its subtask status, as defined by SubtaskStatus.to_dict().
+    The InstructorTask's InstructorSubtaskProgress is (re)initialized, with counters for the number
+    of subtasks that 'succeeded' and 'failed' set to zero.  Once they add up to the total, the
+    subtasks are done and the InstructorTask's "status" will be changed to SUCCESS.
+
+    An InstructorSubtaskStatus is recorded for each subtask, with its initial status as defined
+    by SubtaskStatus.  Statuses recorded for subtasks defined previously are deleted, so that
+    those subtasks are no longer known to the InstructorTask.
 
     This information needs to be set up in the InstructorTask before any of the subtasks start
     running.  If not, there is a chance that the subtasks could complete before the parent task
@@ -256,16 +260,24 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
 
     # Write out the subtasks information.
     num_subtasks = len(subtask_id_list)
-    # Note that may not be necessary to store initial value with all those zeroes!
-    # Write out as a dict, so it will go more smoothly into json.
-    subtask_status = {subtask_id: (SubtaskStatus.create(subtask_id)).to_dict() for subtask_id in subtask_id_list}
-    subtask_dict = {
-        'total': num_subtasks,
-        'succeeded': 0,
-        'failed': 0,
-        'status': subtask_status
-    }
-    entry.subtasks = json.dumps(subtask_dict)
+    InstructorSubtaskStatus.objects.filter(instructor_task_id=entry.id).delete()
+    InstructorSubtaskStatus.objects.bulk_create(
+        [
+            InstructorSubtaskStatus.from_subtask_status(entry.id, SubtaskStatus.create(subtask_id))
+            for subtask_id in subtask_id_list
+        ],
+        batch_size=SUBTASK_STATUS_BATCH_SIZE,
+    )
+    InstructorSubtaskProgress.objects.update_or_create(
+        instructor_task_id=entry.id,
+        defaults=dict(
+            {statname: 0 for statname in InstructorSubtaskProgress.ITEM_COUNTERS},
+            total_subtasks=num_subtasks,
+            succeeded_subtasks=0,
+            failed_subtasks=0,
+        ),
+    )
+    entry.subtasks = json.dumps({'total': num_subtasks})
 
     # and save the entry immediately, before any subtasks actually start work:
     entry.save_now()
@@ -414,9 +426,8 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
     # Confirm that the InstructorTask knows about this particular subtask.
-    subtask_dict = json.loads(entry.subtasks)
-    subtask_status_info = subtask_dict['status']
-    if current_task_id not in subtask_status_info:
+    subtask_status_info = _get_subtask_status_info(entry, current_task_id)
+    if subtask_status_info is None:
         format_str = "Unexpected task_id '{}': unable to find status for subtask of instructor task '{}': rejecting task {}"
         msg = format_str.format(current_task_id, entry, new_subtask_status)
         TASK_LOG.warning(msg)
@@ -425,7 +436,7 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
 
     # Confirm that the InstructorTask doesn't think that this subtask has already been
     # performed successfully.
-    subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
+    subtask_status = SubtaskStatus.from_dict(subtask_status_info)
     subtask_state = subtask_status.state
     if subtask_state in READY_STATES:
         format_str = "Unexpected task_id '{}': already completed - status {} for subtask of instructor task '{}': rejecting task {}"
@@ -459,12 +470,60 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
 
+def _get_subtask_status_info(entry, subtask_id):
+    """
+    Returns the current status of the given subtask of the InstructorTask `entry`,
+    as a dict defined by SubtaskStatus.to_dict(), or None if the subtask is unknown.
+    """
+    subtask_dict = json.loads(entry.subtasks)
+    if 'status' in subtask_dict:
+        # The statuses of subtasks defined before InstructorSubtaskStatus existed are
+        # stored in the "subtasks" field itself.
+        return subtask_dict['status'].get(subtask_id)
+
+    subtask_status = InstructorSubtaskStatus.get_latest(entry.id, subtask_id)
+    return subtask_status.to_dict() if subtask_status is not None else None
+
+
+def get_subtask_progress(entry):
+    """
+    Returns the current progress of the subtasks of the InstructorTask `entry`, in the format
+    of its "task_output" field, or None if its subtasks don't record progress in an
+    InstructorSubtaskProgress.
+
+    Used to report the progress of InstructorTasks whose subtasks are running: the progress
+    is only written to the "task_output" field by the last subtask to complete.
+    """
+    try:
+        subtask_progress = InstructorSubtaskProgress.objects.get(instructor_task_id=entry.id)
+    except InstructorSubtaskProgress.DoesNotExist:
+        return None
+    return _get_task_progress(entry, subtask_progress)
+
+
+def _get_task_progress(entry, subtask_progress):
+    """
+    Returns the "task_output" of the InstructorTask `entry`, updated with the counts
+    aggregated in `subtask_progress`.
+
+    Also updates the 'duration_ms' value with the current interval since the original
+    InstructorTask started, but only if it increases.  Clock skew between time() returned
+    by different machines may result in non-monotonic values for duration.
+    """
+    task_progress = json.loads(entry.task_output)
+    for statname in InstructorSubtaskProgress.ITEM_COUNTERS:
+        task_progress[statname] = getattr(subtask_progress, statname)
+    new_duration = int((time() - task_progress['start_time']) * 1000)
+    task_progress['duration_ms'] = max(task_progress['duration_ms'], new_duration)
+    return task_progress
+
+
 def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
     """
-    Update the status of the subtask in the parent InstructorTask object tracking its progress.
+    Update the status of the subtask, and the progress of the parent InstructorTask object.
 
-    Because select_for_update is used to lock the InstructorTask object while it is being updated,
-    multiple subtasks updating at the same time may time out while waiting for the lock.
+    Subtasks updating at the same time may still conflict in the database, for instance
+    when incrementing the counters of the parent's progress.
     The actual update operation is surrounded by a try/except/else that permits the update to be
     retried if the transaction times out.
 
@@ -496,7 +555,75 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 @transaction.atomic
 def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     """
-    Update the status of the subtask in the parent InstructorTask object tracking its progress.
+    Update the status of the subtask, and the progress of the parent InstructorTask object.
+
+    The status is recorded by adding an InstructorSubtaskStatus; the InstructorTask itself
+    is neither locked nor written until its last subtask completes.
+
+    When the subtask is done, its counts for 'attempted', 'succeeded', 'failed', 'skipped',
+    and whether it succeeded or failed, are added to the counters of the parent's
+    InstructorSubtaskProgress in a single UPDATE.  Once the counters of subtasks that
+    succeeded and failed add up to the total, the subtasks are done: the InstructorTask's
+    "task_output" is updated with the aggregated counts and its "status" is changed to SUCCESS.
+    Until then, get_subtask_progress() reports the progress made so far.
+
+    InstructorTasks whose subtasks were defined before InstructorSubtaskStatus existed are
+    updated by _update_legacy_subtask_status().
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    if 'status' in json.loads(entry.subtasks):
+        _update_legacy_subtask_status(entry_id, current_task_id, new_subtask_status)
+        return
+
+    TASK_LOG.info("Preparing to update status for subtask %s for instructor task %d with status %s",
+                  current_task_id, entry_id, new_subtask_status)
+
+    try:
+        if not InstructorSubtaskStatus.objects.filter(instructor_task_id=entry_id, subtask_id=current_task_id).exists():
+            # unexpected error -- raise an exception
+            format_str = "Unexpected task_id '{}': unable to update status for subtask of instructor task '{}'"
+            msg = format_str.format(current_task_id, entry_id)
+            TASK_LOG.warning(msg)
+            raise ValueError(msg)
+
+        # Update status:
+        InstructorSubtaskStatus.from_subtask_status(entry_id, new_subtask_status).save()
+
+        # Update counts only when subtask is done.
+        new_state = new_subtask_status.state
+        if new_state not in READY_STATES:
+            return
+
+        counters = {
+            statname: F(statname) + getattr(new_subtask_status, statname)
+            for statname in InstructorSubtaskProgress.ITEM_COUNTERS
+        }
+        if new_state == SUCCESS:
+            counters['succeeded_subtasks'] = F('succeeded_subtasks') + 1
+        else:
+            counters['failed_subtasks'] = F('failed_subtasks') + 1
+        InstructorSubtaskProgress.objects.filter(instructor_task_id=entry_id).update(**counters)
+
+        # If we're done with the last task, update the parent status to indicate that.
+        # At present, we mark the task as having succeeded.
+        subtask_progress = InstructorSubtaskProgress.objects.get(instructor_task_id=entry_id)
+        if subtask_progress.num_remaining <= 0:
+            entry.task_state = SUCCESS
+            entry.task_output = InstructorTask.create_output_for_success(_get_task_progress(entry, subtask_progress))
+            entry.save()
+            TASK_LOG.info("Task output updated to %s for subtask %s of instructor task %d",
+                          entry.task_output, current_task_id, entry_id)
+    except Exception:
+        TASK_LOG.exception("Unexpected error while updating InstructorTask.")
+        dog_stats_api.increment('instructor_task.subtask.update_exception')
+        raise
+
+
+@transaction.atomic
+def _update_legacy_subtask_status(entry_id, current_task_id, new_subtask_status):
+    """
+    Update the status of the subtask in the parent InstructorTask object tracking its progress,
+    for InstructorTasks that store the status of their subtasks in their "subtasks" field.
 
     Uses select_for_update to lock the InstructorTask object while it is being updated.
     The operation is surrounded by a try/except/else that permit the manual transaction to be
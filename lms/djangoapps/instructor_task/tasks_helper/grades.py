@@ -1,15 +1,21 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
 import re
-from collections import OrderedDict
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from datetime import datetime
 from itertools import chain, izip, izip_longest
 from time import time
 
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db import connection
+from edx_django_utils.cache import RequestCache
 from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
@@ -35,8 +41,11 @@ from xmodule.modulestore.django import modulestore
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
+from ..config.models import GradeReportSetting
+from ..config.waffle import STREAM_GRADE_REPORTS, waffle_flags
+from ..models import InstructorTask
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import upload_csv_part_to_report_store, upload_csv_parts_to_report_store, upload_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -44,6 +53,12 @@ ENROLLED_IN_COURSE = 'enrolled'
 
 NOT_ENROLLED_IN_COURSE = 'unenrolled'
 
+# Key of the checkpoint of a streamed grade report in its task's progress.
+GRADE_REPORT_CHECKPOINT = 'grade_report_checkpoint'
+
+# Format of the report timestamp stored in the checkpoint.
+CHECKPOINT_TIMESTAMP_FORMAT = '%Y-%m-%d-%H%M'
+
 
 def _user_enrollment_status(user, course_id):
     """
@@ -81,7 +96,9 @@ class _CourseGradeReportContext(object):
         )
         self.action_name = action_name
         self.course_id = course_id
+        self.entry_id = _entry_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
+        self.checkpoint = None
 
     @lazy
     def course(self):
@@ -144,7 +161,38 @@ class _CourseGradeReportContext(object):
         Also logs the update.
         """
         TASK_LOG.info(u'%s, Task type: %s, %s', self.task_info_string, self.action_name, message)
-        return self.task_progress.update_task_state(extra_meta={'step': message})
+        extra_meta = {'step': message}
+        if self.checkpoint is not None:
+            extra_meta[GRADE_REPORT_CHECKPOINT] = self.checkpoint
+        return self.task_progress.update_task_state(extra_meta=extra_meta)
+
+    def load_checkpoint(self):
+        """
+        Returns the checkpoint saved in the task's output by an interrupted
+        run of this report, if any.
+        """
+        if self.entry_id is None:
+            return None
+        task_output = InstructorTask.objects.get(pk=self.entry_id).task_output
+        try:
+            task_progress = json.loads(task_output)
+        except (TypeError, ValueError):
+            return None
+        if isinstance(task_progress, dict):
+            return task_progress.get(GRADE_REPORT_CHECKPOINT)
+
+    def save_checkpoint(self, checkpoint, message):
+        """
+        Updates the status on the celery task to the given message, and
+        saves the given checkpoint with the progress in the task's output,
+        so an interrupted run of this report can be resumed from it.
+        """
+        self.checkpoint = checkpoint
+        task_progress = self.update_status(message)
+        if self.entry_id is not None:
+            InstructorTask.objects.filter(pk=self.entry_id).update(
+                task_output=InstructorTask.create_output_for_success(task_progress),
+            )
 
 
 class _CertificateBulkContext(object):
@@ -202,6 +250,9 @@ class CourseGradeReport(object):
         """
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
+            if waffle_flags()[STREAM_GRADE_REPORTS].is_enabled(course_id):
+                setting = GradeReportSetting.current()
+                return CourseGradeReport()._generate_streamed(context, setting.batch_size, setting.max_workers)
             return CourseGradeReport()._generate(context)
 
     def _generate(self, context):
@@ -221,6 +272,124 @@ class CourseGradeReport(object):
 
         return context.update_status(u'Completed grades')
 
+    def _generate_streamed(self, context, batch_size, max_workers):
+        """
+        Internal method for generating a grade report for the given context,
+        uploading the rows of each batch of users as a part of the report
+        once graded and checkpointing the progress in the task's output.
+        A run of the task interrupted by a crash resumes from the last
+        uploaded part.
+        """
+        context.update_status(u'Starting grades')
+        success_headers = self._success_headers(context)
+        checkpoint = context.load_checkpoint()
+        if checkpoint is None:
+            checkpoint = {
+                'timestamp': datetime.now(UTC).strftime(CHECKPOINT_TIMESTAMP_FORMAT),
+                'last_user_id': None,
+                'parts': 0,
+                'error_parts': 0,
+                'succeeded': 0,
+                'failed': 0,
+            }
+        else:
+            context.update_status(u'Resuming grades after user {}'.format(checkpoint['last_user_id']))
+        date = UTC.localize(datetime.strptime(checkpoint['timestamp'], CHECKPOINT_TIMESTAMP_FORMAT))
+
+        # Grade the users in order of id, so the checkpoint identifies
+        # the users graded before an interruption.
+        users = self._enrolled_users(context).order_by('id')
+        if checkpoint['last_user_id'] is not None:
+            users = users.filter(id__gt=checkpoint['last_user_id'])
+
+        for users_batch, (success_rows, error_rows) in self._graded_batches(context, users, batch_size, max_workers):
+            upload_csv_part_to_report_store(
+                success_rows, 'grade_report', context.course_id, date, checkpoint['parts'],
+            )
+            checkpoint['parts'] += 1
+            if error_rows:
+                upload_csv_part_to_report_store(
+                    error_rows, 'grade_report_err', context.course_id, date, checkpoint['error_parts'],
+                )
+                checkpoint['error_parts'] += 1
+            checkpoint['last_user_id'] = users_batch[-1].id
+            checkpoint['succeeded'] += len(success_rows)
+            checkpoint['failed'] += len(error_rows)
+
+            context.task_progress.succeeded = checkpoint['succeeded']
+            context.task_progress.failed = checkpoint['failed']
+            context.task_progress.attempted = checkpoint['succeeded'] + checkpoint['failed']
+            context.save_checkpoint(checkpoint, u'Graded {} users'.format(context.task_progress.attempted))
+
+        context.task_progress.total = context.task_progress.attempted = checkpoint['succeeded'] + checkpoint['failed']
+        context.task_progress.succeeded = checkpoint['succeeded']
+        context.task_progress.failed = checkpoint['failed']
+
+        context.update_status(u'Uploading grades')
+        upload_csv_parts_to_report_store(
+            [success_headers], 'grade_report', context.course_id, date, checkpoint['parts'],
+        )
+        if checkpoint['error_parts']:
+            upload_csv_parts_to_report_store(
+                [self._error_headers()], 'grade_report_err', context.course_id, date, checkpoint['error_parts'],
+            )
+
+        context.checkpoint = None
+        return context.update_status(u'Completed grades')
+
+    def _graded_batches(self, context, users, batch_size, max_workers):
+        """
+        A generator of (users, (success_rows, error_rows)) for the batches of
+        batch_size of the given users, in order. With more than one worker,
+        up to max_workers batches are graded concurrently in threads, each
+        with its own database connection, request cache and copy of the
+        course structure.
+        """
+        batches = ([user for user in batch if user is not None] for batch in self._grouper(users, batch_size))
+        if max_workers <= 1:
+            for users_batch in batches:
+                yield users_batch, self._rows_for_users(context, users_batch)
+            return
+
+        # Load the course structure copied by the threads before starting them.
+        _ = context.course_structure
+        thread_contexts = threading.local()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = deque()
+        try:
+            for users_batch in batches:
+                pending.append((
+                    users_batch,
+                    executor.submit(self._rows_for_users_in_thread, context, thread_contexts, users_batch),
+                ))
+                if len(pending) >= max_workers:
+                    users_batch, future = pending.popleft()
+                    yield users_batch, future.result()
+            while pending:
+                users_batch, future = pending.popleft()
+                yield users_batch, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _rows_for_users_in_thread(self, context, thread_contexts, users):
+        """
+        Returns a list of rows for the given users for this report, releasing
+        the thread's database connection and request cache afterwards.
+
+        Grading may change the course structure of the context, so each thread
+        grades with its own copy, kept in thread_contexts.
+        """
+        if not hasattr(thread_contexts, 'context'):
+            thread_contexts.context = copy(context)
+            thread_contexts.context.course_structure = context.course_structure.copy()
+        try:
+            return self._rows_for_users(thread_contexts.context, users)
+        finally:
+            RequestCache.clear_all_namespaces()
+            connection.close()
+
     def _success_headers(self, context):
         """
         Returns a list of all applicable column headers for this grade report.
@@ -293,13 +462,22 @@ class CourseGradeReport(object):
         """
         Returns a generator of batches of users.
         """
-        def grouper(iterable, chunk_size=self.USER_BATCH_SIZE, fillvalue=None):
-            args = [iter(iterable)] * chunk_size
-            return izip_longest(*args, fillvalue=fillvalue)
+        return self._grouper(self._enrolled_users(context), self.USER_BATCH_SIZE)
+
+    def _grouper(self, iterable, chunk_size, fillvalue=None):
+        """
+        Returns a generator of tuples of chunk_size items of the given
+        iterable, the last of which is padded with fillvalue.
+        """
+        args = [iter(iterable)] * chunk_size
+        return izip_longest(*args, fillvalue=fillvalue)
 
+    def _enrolled_users(self, context):
+        """
+        Returns a queryset of the users enrolled in the course.
+        """
         users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
-        users = users.select_related('profile')
-        return grouper(users)
+        return users.select_related('profile')
 
     def _user_grades(self, course_grade, context):
         """
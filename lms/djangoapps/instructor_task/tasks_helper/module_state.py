@@ -7,15 +7,17 @@ from time import time
 
 from django.contrib.auth.models import User
 from django.utils.translation import ugettext_noop
+from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 
 import dogstats_wrapper as dog_stats_api
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from courseware.courses import get_course_by_id, get_problems_in_section
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache
-from courseware.models import StudentModule
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, MultiUserFieldDataCache
+from courseware.models import StudentModule, chunks
 from courseware.module_render import get_module_for_descriptor_internal
 from lms.djangoapps.grades.events import GRADES_OVERRIDE_EVENT_TYPE, GRADES_RESCORE_EVENT_TYPE
+from openedx.core.lib.cache_utils import get_cache
 from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from track.views import task_track
 from util.db import outer_atomic
@@ -29,6 +31,12 @@ from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED,
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Number of student modules whose students are loaded together, and whose
+# field data is loaded together when their modules are instantiated.
+STUDENT_MODULE_BATCH_SIZE = 100
+
+_FIELD_DATA_CACHE_NAMESPACE = u'instructor_task.module_state.field_data_caches'
+
 
 def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
     """
@@ -87,23 +95,33 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update, task_input)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    for modules_batch in chunks(modules_to_update, STUDENT_MODULE_BATCH_SIZE):
+        students = _load_students(modules_batch)
+        _StudentsFieldData.register(course_id, problems.values(), students)
+        try:
+            for module_to_update in modules_batch:
+                task_progress.attempted += 1
+                module_descriptor = problems[unicode(module_to_update.module_state_key)]
+                # There is no try here:  if there's an error, we let it throw, and the task will
+                # be marked as FAILED, with a stack trace.
+                with dog_stats_api.timer(
+                    'instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]
+                ):
+                    update_status = update_fcn(module_descriptor, module_to_update, task_input)
+                    if update_status == UPDATE_STATUS_SUCCEEDED:
+                        # If the update_fcn returns true, then it performed some kind of work.
+                        # Logging of failures is left to the update_fcn itself.
+                        task_progress.succeeded += 1
+                    elif update_status == UPDATE_STATUS_FAILED:
+                        task_progress.failed += 1
+                    elif update_status == UPDATE_STATUS_SKIPPED:
+                        task_progress.skipped += 1
+                    else:
+                        raise UpdateProblemModuleStateError(
+                            "Unexpected update_status returned: {}".format(update_status)
+                        )
+        finally:
+            _StudentsFieldData.clear(course_id, students)
 
     return task_progress.update_task_state()
 
@@ -327,7 +345,9 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
     the need for a Request object when instantiating an xmodule instance.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    field_data_cache = _StudentsFieldData.field_data_cache_for(course_id, student)
+    if field_data_cache is None:
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
     student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
@@ -363,6 +383,84 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
     )
 
 
+def _load_students(student_modules):
+    """
+    Loads the students of all of the `student_modules` with a single query,
+    and sets them on the student modules.
+
+    Returns the list of the students.
+    """
+    students = User.objects.in_bulk(set(student_module.student_id for student_module in student_modules))
+    for student_module in student_modules:
+        student_module.student = students[student_module.student_id]
+    return students.values()
+
+
+class _StudentsFieldData(object):
+    """
+    Field data of the problems of a task for a batch of students, loaded
+    for all of the students with a MultiUserFieldDataCache the first time
+    a module is instantiated for one of them.
+
+    Each batch is registered in the request cache for its students, so
+    that _get_module_instance_for_task can find it.  Should the request
+    cache be cleared, modules are instantiated with a FieldDataCache of
+    their own student as before.
+    """
+    def __init__(self, course_id, problem_descriptors, students):
+        self.course_id = course_id
+        self.problem_descriptors = problem_descriptors
+        self.students = students
+
+    @classmethod
+    def register(cls, course_id, problem_descriptors, students):
+        """
+        Registers a batch for the given students.
+        """
+        students_field_data = cls(course_id, problem_descriptors, students)
+        cache = get_cache(_FIELD_DATA_CACHE_NAMESPACE)
+        for student in students:
+            cache[cls._cache_key(course_id, student.id)] = students_field_data
+
+    @classmethod
+    def clear(cls, course_id, students):
+        """
+        Unregisters the given students from their batch, if any.
+        """
+        cache = get_cache(_FIELD_DATA_CACHE_NAMESPACE)
+        for student in students:
+            cache.pop(cls._cache_key(course_id, student.id), None)
+
+    @classmethod
+    def field_data_cache_for(cls, course_id, student):
+        """
+        Returns the FieldDataCache of the student from their batch, or
+        None if the student is not registered in a batch.
+        """
+        students_field_data = get_cache(_FIELD_DATA_CACHE_NAMESPACE).get(cls._cache_key(course_id, student.id))
+        if students_field_data is None:
+            return None
+        return students_field_data.field_data_caches.for_user(student)
+
+    @lazy
+    def field_data_caches(self):
+        """
+        The MultiUserFieldDataCache of the descendants of all of the
+        problems for all of the students.
+        """
+        field_data_caches = MultiUserFieldDataCache([], self.course_id, self.students)
+        for problem_descriptor in self.problem_descriptors:
+            field_data_caches.add_descriptor_descendents(problem_descriptor)
+        return field_data_caches
+
+    @staticmethod
+    def _cache_key(course_id, student_id):
+        """
+        Returns the request cache key of the batch of the student.
+        """
+        return u'{}:{}'.format(course_id, student_id)
+
+
 def _get_track_function_for_task(student, xmodule_instance_args=None, source_page='x_module_task'):
     """
     Make a tracking function that logs what happened.
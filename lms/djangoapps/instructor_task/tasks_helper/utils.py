@@ -31,17 +31,57 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         report_name: string - Name of the generated report
     """
     report_store = ReportStore.from_config(config_name)
-    report_name = u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-        course_prefix=course_filename_prefix_generator(course_id),
-        csv_name=csv_name,
-        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-    )
+    report_name = _report_name(csv_name, course_id, timestamp)
 
     report_store.store_rows(course_id, report_name, rows)
     tracker_emit(csv_name)
     return report_name
 
 
+def upload_csv_part_to_report_store(rows, csv_name, course_id, timestamp, part_index, config_name='GRADES_DOWNLOAD'):
+    """
+    Upload data as the numbered part of a CSV using ReportStore.  The parts
+    of the CSV are combined by `upload_csv_parts_to_report_store`.
+
+    Arguments:
+        rows: CSV data, without a header row
+        csv_name: Name of the resulting CSV
+        course_id: ID of the course
+        timestamp: Timestamp of the resulting CSV
+        part_index: Number of this part, starting at 0
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_store.store_rows_part(course_id, _report_name(csv_name, course_id, timestamp), part_index, rows)
+
+
+def upload_csv_parts_to_report_store(header_rows, csv_name, course_id, timestamp, num_parts, config_name='GRADES_DOWNLOAD'):
+    """
+    Upload the CSV made of the given header rows, followed by the rows of
+    its num_parts parts previously uploaded with
+    `upload_csv_part_to_report_store`, using ReportStore.
+
+    Returns:
+        report_name: string - Name of the generated report
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_name = _report_name(csv_name, course_id, timestamp)
+
+    report_store.store_parts(course_id, report_name, header_rows, num_parts)
+    tracker_emit(csv_name)
+    return report_name
+
+
+def _report_name(csv_name, course_id, timestamp):
+    """
+    Returns the name of the report CSV for the given name, course, and timestamp.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -1,11 +1,26 @@
 """
 Unit tests for instructor_task subtasks.
 """
+import json
 from uuid import uuid4
 
+from celery.states import FAILURE, SUCCESS
 from mock import Mock, patch
 
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from lms.djangoapps.instructor_task.models import (
+    PROGRESS,
+    QUEUING,
+    InstructorSubtaskProgress,
+    InstructorSubtaskStatus,
+    InstructorTask
+)
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    get_subtask_progress,
+    initialize_subtask_info,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from student.models import CourseEnrollment
@@ -80,3 +95,84 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+
+class TestSubtaskStatusUpdates(InstructorTaskCourseTestCase):
+    """Tests for recording the status and progress of subtasks."""
+    shard = 4
+
+    def setUp(self):
+        super(TestSubtaskStatusUpdates, self).setUp()
+        self.entry = InstructorTaskFactory.create(task_id=str(uuid4()), task_type='bulk_course_email')
+        self.subtask_ids = ['subtask-1', 'subtask-2']
+        initialize_subtask_info(self.entry, 'emailed', 10, self.subtask_ids)
+
+    def _reload_entry(self):
+        """Return the InstructorTask as currently stored."""
+        return InstructorTask.objects.get(pk=self.entry.id)
+
+    def test_initialize_subtask_info(self):
+        self.assertEqual(json.loads(self.entry.subtasks), {'total': 2})
+        subtask_progress = InstructorSubtaskProgress.objects.get(instructor_task=self.entry)
+        self.assertEqual(subtask_progress.num_remaining, 2)
+        for subtask_id in self.subtask_ids:
+            self.assertEqual(InstructorSubtaskStatus.get_latest(self.entry.id, subtask_id).state, QUEUING)
+
+        # defining new subtasks forgets the previous ones
+        initialize_subtask_info(self.entry, 'emailed', 10, ['subtask-3'])
+        self.assertIsNone(InstructorSubtaskStatus.get_latest(self.entry.id, 'subtask-1'))
+        self.assertEqual(InstructorSubtaskProgress.objects.get(instructor_task=self.entry).total_subtasks, 1)
+
+    def test_update_subtask_status(self):
+        update_subtask_status(self.entry.id, 'subtask-1', SubtaskStatus.create('subtask-1', state=PROGRESS))
+        update_subtask_status(
+            self.entry.id, 'subtask-1', SubtaskStatus.create('subtask-1', succeeded=4, failed=1, state=SUCCESS)
+        )
+
+        # statuses are appended
+        self.assertEqual(InstructorSubtaskStatus.objects.filter(subtask_id='subtask-1').count(), 3)
+        self.assertEqual(
+            InstructorSubtaskStatus.get_latest(self.entry.id, 'subtask-1').to_dict(),
+            SubtaskStatus.create('subtask-1', succeeded=4, failed=1, state=SUCCESS).to_dict(),
+        )
+
+        # the parent is still in progress, and reports the progress made so far
+        entry = self._reload_entry()
+        self.assertEqual(entry.task_state, PROGRESS)
+        task_progress = get_subtask_progress(entry)
+        self.assertEqual(
+            {key: task_progress[key] for key in ('attempted', 'succeeded', 'failed', 'skipped', 'total')},
+            {'attempted': 5, 'succeeded': 4, 'failed': 1, 'skipped': 0, 'total': 10},
+        )
+
+        # the last subtask to complete updates the parent
+        update_subtask_status(
+            self.entry.id, 'subtask-2', SubtaskStatus.create('subtask-2', succeeded=3, skipped=2, state=FAILURE)
+        )
+        entry = self._reload_entry()
+        self.assertEqual(entry.task_state, SUCCESS)
+        task_output = json.loads(entry.task_output)
+        self.assertEqual(
+            {key: task_output[key] for key in ('attempted', 'succeeded', 'failed', 'skipped', 'total')},
+            {'attempted': 8, 'succeeded': 7, 'failed': 1, 'skipped': 2, 'total': 10},
+        )
+        subtask_progress = InstructorSubtaskProgress.objects.get(instructor_task=self.entry)
+        self.assertEqual((subtask_progress.succeeded_subtasks, subtask_progress.failed_subtasks), (1, 1))
+
+    def test_update_unknown_subtask(self):
+        with self.assertRaisesRegexp(ValueError, 'unable to update status for subtask'):
+            update_subtask_status(self.entry.id, 'subtask-3', SubtaskStatus.create('subtask-3', state=SUCCESS))
+
+    def test_update_legacy_subtask_status(self):
+        self.entry.subtasks = json.dumps({
+            'total': 1,
+            'succeeded': 0,
+            'failed': 0,
+            'status': {'subtask-1': SubtaskStatus.create('subtask-1').to_dict()},
+        })
+        self.entry.save()
+        update_subtask_status(self.entry.id, 'subtask-1', SubtaskStatus.create('subtask-1', succeeded=1, state=SUCCESS))
+
+        entry = self._reload_entry()
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['status']['subtask-1']['state'], SUCCESS)
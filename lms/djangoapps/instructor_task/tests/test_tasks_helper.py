@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -64,18 +65,25 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_may_enroll_csv,
     upload_students_csv,
 )
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.config.waffle import STREAM_GRADE_REPORTS, waffle_flags
+from lms.djangoapps.instructor_task.tasks import calculate_grades_csv
 from lms.djangoapps.instructor_task.tasks_helper.grades import (
     ENROLLED_IN_COURSE,
+    GRADE_REPORT_CHECKPOINT,
     NOT_ENROLLED_IN_COURSE,
     CourseGradeReport,
     ProblemGradeReport,
     ProblemResponses,
+    _CourseGradeReportContext,
 )
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
     upload_ora2_data,
 )
+from lms.djangoapps.instructor_task.tasks_helper.utils import upload_csv_part_to_report_store
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -88,7 +96,8 @@ from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
 from openedx.core.djangoapps.credit.tests.factories import CreditCourseFactory
 from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
-from ..models import ReportStore
+from openedx.core.djangoapps.waffle_utils.testutils import override_waffle_flag
+from ..models import InstructorTask, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 
@@ -479,6 +488,142 @@ class TestTeamGradeReport(InstructorGradeReportTestCase):
         self._verify_cell_data_for_user(self.student2.username, self.course.id, 'Team Name', team2.name)
 
 
+@override_waffle_flag(waffle_flags()[STREAM_GRADE_REPORTS], active=True)
+@patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+class TestStreamedGradeReport(InstructorGradeReportTestCase):
+    """
+    Tests that grade reports streamed in parts to the report store work.
+    """
+    def setUp(self):
+        super(TestStreamedGradeReport, self).setUp()
+        self.course = CourseFactory.create()
+        GradeReportSetting.objects.create(batch_size=2)
+        self.students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+
+    def _report_rows(self, csv_name='grade_report'):
+        """
+        Returns the rows of the named report for the course.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_csv_filename = [
+            filename for filename, _ in report_store.links_for(self.course.id) if csv_name + '_' in filename
+        ][0]
+        with report_store.storage.open(report_store.path_to(self.course.id, report_csv_filename)) as csv_file:
+            return list(unicodecsv.reader(csv_file, encoding='utf-8-sig'))
+
+    def test_streamed_report(self, _mock_current_task):
+        result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, result)
+        self.assertNotIn(GRADE_REPORT_CHECKPOINT, result)
+
+        rows = self._report_rows()
+        self.assertEqual(rows[0][:3], ['Student ID', 'Email', 'Username'])
+        self.assertEqual([row[2] for row in rows[1:]], [student.username for student in self.students])
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.assertEqual(report_store.storage.listdir(report_store.path_to(self.course.id, 'parts'))[1], [])
+
+    def test_not_streamed_without_flag(self, _mock_current_task):
+        with override_waffle_flag(waffle_flags()[STREAM_GRADE_REPORTS], active=False):
+            with patch.object(CourseGradeReport, '_generate_streamed') as mock_generate_streamed:
+                result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+        self.assertFalse(mock_generate_streamed.called)
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, result)
+
+    def test_resume_from_checkpoint(self, _mock_current_task):
+        timestamp = '2018-01-01-0000'
+        upload_csv_part_to_report_store(
+            [[u'graded', u'before', u'interruption']], 'grade_report', self.course.id,
+            UTC.localize(datetime(2018, 1, 1)), 0,
+        )
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_output=json.dumps({GRADE_REPORT_CHECKPOINT: {
+                'timestamp': timestamp,
+                'last_user_id': self.students[0].id,
+                'parts': 1,
+                'error_parts': 0,
+                'succeeded': 1,
+                'failed': 0,
+            }}),
+        )
+
+        result = CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, result)
+
+        rows = self._report_rows()
+        self.assertEqual(rows[1], [u'graded', u'before', u'interruption'])
+        self.assertEqual([row[2] for row in rows[2:]], [student.username for student in self.students[1:]])
+
+    def test_checkpoint_saved(self, _mock_current_task):
+        entry = InstructorTaskFactory.create(course_id=self.course.id)
+        checkpoints = []
+        with patch.object(InstructorTask, 'create_output_for_success', side_effect=lambda output: (
+            checkpoints.append(dict(output[GRADE_REPORT_CHECKPOINT])) or json.dumps(output)
+        )):
+            CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+
+        self.assertEqual([checkpoint['parts'] for checkpoint in checkpoints], [1, 2, 3])
+        self.assertEqual(checkpoints[-1]['last_user_id'], self.students[-1].id)
+        self.assertEqual(
+            json.loads(InstructorTask.objects.get(pk=entry.id).task_output)[GRADE_REPORT_CHECKPOINT],
+            checkpoints[-1],
+        )
+
+    def test_resume_after_interruption(self, _mock_current_task):
+        entry = InstructorTaskFactory.create(course_id=self.course.id)
+        rows_for_users = CourseGradeReport._rows_for_users
+        graded_users = []
+
+        def grade_until_interrupted(report, context, users):
+            """ Grades the first two batches of users, then stops like a lost worker """
+            if len(graded_users) == 4:
+                raise SystemExit()
+            graded_users.extend(users)
+            return rows_for_users(report, context, users)
+
+        with patch.object(CourseGradeReport, '_rows_for_users', autospec=True, side_effect=grade_until_interrupted):
+            with self.assertRaises(SystemExit):
+                CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+        self.assertEqual(graded_users, self.students[:4])
+
+        # The task is delivered again, and only grades the remaining users.
+        with patch.object(CourseGradeReport, '_rows_for_users', autospec=True, side_effect=rows_for_users) as mock_rows:
+            result = CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+        self.assertEqual([call[0][2] for call in mock_rows.call_args_list], [self.students[4:]])
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, result)
+
+        rows = self._report_rows()
+        self.assertEqual([row[2] for row in rows[1:]], [student.username for student in self.students])
+
+    def test_task_redelivered_when_worker_lost(self, _mock_current_task):
+        self.assertTrue(calculate_grades_csv.acks_late)
+
+    def test_graded_batches_in_threads(self, _mock_current_task):
+        context = _CourseGradeReportContext.__new__(_CourseGradeReportContext)
+        context.course_structure = Mock()
+        context.course_structure.copy.side_effect = Mock
+        structures = []
+
+        def rows_for_users(context, users):
+            """ Returns the users as rows, keeping the course structure they were graded with """
+            structures.append(context.course_structure)
+            return users, []
+
+        with patch.object(CourseGradeReport, '_rows_for_users', side_effect=rows_for_users):
+            batches = list(CourseGradeReport()._graded_batches(context, range(7), 2, max_workers=3))
+        self.assertEqual(
+            batches,
+            [([0, 1], ([0, 1], [])), ([2, 3], ([2, 3], [])), ([4, 5], ([4, 5], [])), ([6], ([6], []))],
+        )
+
+        # Each thread grades with its own copy of the course structure.
+        self.assertNotIn(context.course_structure, structures)
+        self.assertEqual(len(set(structures)), context.course_structure.copy.call_count)
+        self.assertLessEqual(context.course_structure.copy.call_count, 3)
+
+
 # pylint: disable=protected-access
 class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
     """
@@ -1,13 +1,16 @@
 """
-Signal handler for setting default course verification dates
+Signal handlers for setting default course verification dates, and for
+discarding the cached dashboard sections of users whose verifications change
 """
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_save
 from django.dispatch.dispatcher import receiver
 
 from openedx.core.djangoapps.user_api.accounts.signals import USER_RETIRE_LMS_CRITICAL
+from student.dashboard_sections import invalidate_sections
 from xmodule.modulestore.django import SignalHandler, modulestore
 
-from .models import SoftwareSecurePhotoVerification, VerificationDeadline
+from .models import ManualVerification, SoftwareSecurePhotoVerification, SSOVerification, VerificationDeadline
 
 
 @receiver(SignalHandler.course_published)
@@ -30,3 +33,13 @@ def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable
 def _listen_for_lms_retire(sender, **kwargs):  # pylint: disable=unused-argument
     user = kwargs.get('user')
     SoftwareSecurePhotoVerification.retire_user(user.id)
+
+
+@receiver(post_save, sender=SoftwareSecurePhotoVerification)
+@receiver(post_save, sender=SSOVerification)
+@receiver(post_save, sender=ManualVerification)
+def _listen_for_verification_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discards the cached dashboard sections of the user of a changed verification.
+    """
+    invalidate_sections(instance.user_id)
@@ -892,6 +892,15 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Warm sandbox processes to run jailed code in, instead of starting a new
+    # one for every execution.
+    'worker_pool': {
+        # How many workers does each server process have?  0 means don't use them.
+        'size': 0,
+        # After how many executions is a worker replaced?
+        'max_executions': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1264,6 +1273,7 @@ MIDDLEWARE_CLASSES = [
 
     'django_comment_client.utils.ViewNameMiddleware',
     'codejail.django_integration.ConfigureCodeJailMiddleware',
+    'capa.safe_exec.django_integration.ConfigureSandboxWorkerPoolMiddleware',
 
     # catches any uncaught RateLimitExceptions and returns a 403 instead of a 500
     'ratelimitbackend.middleware.RateLimitMiddleware',
@@ -1305,6 +1315,16 @@ X_FRAME_OPTIONS = 'DENY'
 # Platform for Privacy Preferences header
 P3P_HEADER = 'CP="Open EdX does not have a P3P policy."'
 
+############################ COURSE ASSETS #####################################
+
+# A local disk cache of the contents of course assets, served by the contentserver
+# middleware. Contents are only copied to disk when DIRECTORY is set, and the least
+# recently used ones are pruned beyond MAX_SIZE bytes.
+CONTENTSERVER_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 * 1024 * 1024,
+}
+
 ############################### PIPELINE #######################################
 
 PIPELINE_ENABLED = True
@@ -1923,8 +1943,60 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum number of stale block structures that the warmer has being
+    # recollected at once.
+    WARMER_CONCURRENCY=10,
+
+    # The warmer recollects the stale block structures of the courses with
+    # the most enrollments in this many recent days first.
+    WARMER_ENROLLMENT_WINDOW_DAYS=7,
 )
 
+############################## Course Overviews ###############################
+
+COURSE_OVERVIEWS_SETTINGS = dict(
+    # Number of course overviews kept in memory by each process until their
+    # course is published again; 0 reads them from the database every time.
+    PROCESS_CACHE_SIZE=1000,
+
+    # Seconds for which a process generating a course overview keeps the
+    # others from generating it too.
+    REGENERATION_LOCK_TIMEOUT=60,
+
+    # Seconds for which a missing course overview is waited for while another
+    # process generates it, before generating it anyway.
+    REGENERATION_WAIT=10,
+)
+
+############################# Student Dashboard ###############################
+
+STUDENT_DASHBOARD_SECTIONS = {
+    # Number of sections of the dashboard computed at once, in threads with
+    # their own database connections; 1 computes them in the request thread.
+    'MAX_WORKERS': 4,
+
+    # Seconds for which the sections only depending on the enrollments,
+    # certificates and verifications of a user are cached; 0 disables caching.
+    'CACHE_TIMEOUT': 5 * 60,
+}
+
+############################## Comments Service ###############################
+
+COMMENTS_SERVICE_CLIENT = {
+    # Connections to the comments service kept alive by each process; 0 opens
+    # a new connection for each request.
+    'MAX_CONNECTIONS': 10,
+    # Answer identical GET requests made while handling a request with the
+    # response to the first one.
+    'COALESCE_REQUESTS': True,
+    # Seconds for which the responses to GET requests are also shared between
+    # requests, by metric action, optionally prefixed with the model class:
+    # e.g. {'User.model.retrieve': 5, 'thread.search': 5}.  Changes made by
+    # other requests may not be seen for that long.
+    'CACHE_TIMEOUTS': {},
+}
+
 ################################ Bulk Email ###################################
 
 # Suffix used to construct 'from' email address for bulk emails.
@@ -1969,6 +2041,17 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Maximum number of bulk email messages sent per second by all workers together,
+# shared through the cache.  When None, the above delay is used instead.
+BULK_EMAIL_MAX_SEND_RATE = None
+
+# Number of messages rendered together by a bulk email task before sending them.
+BULK_EMAIL_SEND_BATCH_SIZE = 50
+
+# Number of seconds a connection to the email backend is kept open between two
+# bulk email tasks of a worker.  0 closes the connection at the end of each task.
+BULK_EMAIL_CONNECTION_MAX_IDLE = 30
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -305,6 +305,16 @@ CELERY_RESULT_BACKEND = 'djcelery.backends.cache:CacheBackend'
 
 CLEAR_REQUEST_CACHE_ON_TASK_COMPLETION = False
 
+# Don't keep connections to the email backend open between bulk email tests.
+BULK_EMAIL_CONNECTION_MAX_IDLE = 0
+
+# Send each request to the comments service, which tests mock with requests.request.
+COMMENTS_SERVICE_CLIENT = {
+    'MAX_CONNECTIONS': 0,
+    'COALESCE_REQUESTS': False,
+    'CACHE_TIMEOUTS': {},
+}
+
 ######################### MARKETING SITE ###############################
 
 MKTG_URL_LINK_MAP = {
@@ -359,6 +369,16 @@ FILE_UPLOAD_HANDLERS = [
 
 BLOCK_STRUCTURES_SETTINGS['PRUNING_ACTIVE'] = True
 
+# Read course overviews from the database every time, as tests change them
+# without publishing their courses.
+COURSE_OVERVIEWS_SETTINGS['PROCESS_CACHE_SIZE'] = 0
+
+# Compute the dashboard sections in the test's transaction, every time.
+STUDENT_DASHBOARD_SECTIONS = {
+    'MAX_WORKERS': 1,
+    'CACHE_TIMEOUT': 0,
+}
+
 ########################### Server Ports ###################################
 
 # These ports are carefully chosen so that if the browser needs to
@@ -1,17 +1,31 @@
 """" Common utilities for comment client wrapper """
+import hashlib
+import json
 import logging
+import os
+import threading
 from contextlib import contextmanager
 from time import time
 from uuid import uuid4
 
 import requests
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import get_language
 
 import dogstats_wrapper as dog_stats_api
+from openedx.core.lib.cache_utils import get_cache
 from .settings import SERVICE_HOST as COMMENTS_SERVICE
 
 log = logging.getLogger(__name__)
 
+# Name of the request cache holding the responses to the GET requests of the current request.
+REQUEST_CACHE_NAME = 'comment_client.responses'
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -31,7 +45,12 @@ def extract(dic, keys):
 
 
 @contextmanager
-def request_timer(request_id, method, url, tags=None):
+def request_timer(request_id, method, url, tags=None, source='service'):
+    """
+    Time a request to the comments service, answered from `source`: 'service',
+    or the 'request' or 'cache' holding a previous response.
+    """
+    tags = (tags or []) + [u'source:{}'.format(source)]
     start = time()
     with dog_stats_api.timer('comment_client.request.time', tags=tags):
         yield
@@ -40,15 +59,97 @@ def request_timer(request_id, method, url, tags=None):
 
     log.info(
         u"comment_client_request_log: request_id={request_id}, method={method}, "
-        u"url={url}, duration={duration}".format(
+        u"url={url}, duration={duration}, source={source}".format(
             request_id=request_id,
             method=method,
             url=url,
-            duration=duration
+            duration=duration,
+            source=source,
         )
     )
 
 
+def _get_client_setting(name, default=None):
+    """
+    Returns the value of the COMMENTS_SERVICE_CLIENT setting `name`.
+    """
+    return getattr(settings, 'COMMENTS_SERVICE_CLIENT', {}).get(name, default)
+
+
+def get_session():
+    """
+    Returns the requests session of this process, keeping connections to the
+    comments service alive, or None if connections aren't pooled.
+    """
+    global _session, _session_pid  # pylint: disable=global-statement
+    max_connections = _get_client_setting('MAX_CONNECTIONS')
+    if not max_connections:
+        return None
+
+    with _session_lock:
+        # Pooled connections can't be shared with forked processes.
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_connections)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+class _CachedResponse(object):
+    """
+    The parts of a response to a GET request used by perform_request, kept
+    for identical requests.
+    """
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.text = response.text
+
+    def json(self):
+        """
+        Parse the response, anew for each request, since callers may change the result.
+        """
+        return json.loads(self.text)
+
+
+def _get_response_cache_key(url, params, headers):
+    """
+    Returns the key of the response to a GET request with the given
+    parameters, leaving out its request_id.
+    """
+    params = {key: value for key, value in params.iteritems() if key != 'request_id'}
+    key = json.dumps([url, sorted(params.items()), headers['Accept-Language']], default=unicode)
+    return u'comment_client.response.{}'.format(hashlib.md5(key).hexdigest())
+
+
+def _get_cache_timeout(metric_action, metric_tags):
+    """
+    Returns the number of seconds for which the responses to an action are
+    shared between requests, set in the CACHE_TIMEOUTS client setting for the
+    action, or the action of a model class, like 'User.model.retrieve'.
+    """
+    cache_timeouts = _get_client_setting('CACHE_TIMEOUTS', {})
+    for tag in metric_tags:
+        if tag.startswith(u'model_class:'):
+            model_action = u'{}.{}'.format(tag[len(u'model_class:'):], metric_action)
+            if model_action in cache_timeouts:
+                return cache_timeouts[model_action]
+    return cache_timeouts.get(metric_action)
+
+
+def _send_request(method, url, **kwargs):
+    """
+    Send a request to the comments service, through the pooled connections
+    if there are.
+    """
+    session = get_session()
+    if session is None:
+        return requests.request(method, url, **kwargs)
+    return session.request(method, url, **kwargs)
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
     # To avoid dependency conflict
@@ -81,15 +182,45 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = data_or_params.copy()
         params.update(request_id_dict)
-    with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
-            method,
-            url,
-            data=data,
-            params=params,
-            headers=headers,
-            timeout=config.connection_timeout
-        )
+
+    # Identical GET requests made while handling a request are answered with
+    # the response to the first one.  The responses to the actions listed in
+    # CACHE_TIMEOUTS are also shared between requests for a few seconds.
+    response_cache = get_cache(REQUEST_CACHE_NAME)
+    cache_key = cache_timeout = None
+    if method.lower() == 'get' and _get_client_setting('COALESCE_REQUESTS'):
+        cache_key = _get_response_cache_key(url, params, headers)
+        cache_timeout = _get_cache_timeout(metric_action, metric_tags)
+    elif method.lower() != 'get':
+        # This request may change what the previous ones returned.
+        response_cache.clear()
+
+    response = None
+    source = 'service'
+    if cache_key is not None:
+        if cache_key in response_cache:
+            response = response_cache[cache_key]
+            source = 'request'
+        elif cache_timeout:
+            response = cache.get(cache_key)
+            if response is not None:
+                response_cache[cache_key] = response
+                source = 'cache'
+
+    with request_timer(request_id, method, url, metric_tags, source=source):
+        if response is None:
+            response = _send_request(
+                method,
+                url,
+                data=data,
+                params=params,
+                headers=headers,
+                timeout=config.connection_timeout
+            )
+            if cache_key is not None and response.status_code == 200:
+                response = response_cache[cache_key] = _CachedResponse(response)
+                if cache_timeout:
+                    cache.set(cache_key, response, cache_timeout)
 
     metric_tags.append(u'status_code:{}'.format(response.status_code))
     if response.status_code > 200:
@@ -9,3 +9,12 @@ PATHWAY_CACHE_KEY_TPL = 'pathway-{id}'
 
 # Cache key used to locate an item containing a list of all credit pathway ids for a site.
 SITE_PATHWAY_IDS_CACHE_KEY_TPL = 'pathway-ids-{domain}'
+
+# Template used to create cache keys for the lists of UUIDs of the programs of a site containing a course run.
+SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL = 'course-run-program-uuids-{domain}-{course_run_key}'
+
+# Template used to create cache keys for the lists of UUIDs of the programs of a site containing a course.
+SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL = 'course-program-uuids-{domain}-{course_uuid}'
+
+# Cache key used to locate an item listing the cache keys of the course indexes above built for a site.
+SITE_PROGRAM_INDEXES_CACHE_KEY_TPL = 'program-indexes-{domain}'
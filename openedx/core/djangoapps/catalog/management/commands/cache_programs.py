@@ -1,5 +1,6 @@
 import logging
 import sys
+from collections import defaultdict
 
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
@@ -9,7 +10,10 @@ from django.core.management import BaseCommand
 from openedx.core.djangoapps.catalog.cache import (
     PATHWAY_CACHE_KEY_TPL,
     PROGRAM_CACHE_KEY_TPL,
+    SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL,
+    SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL,
     SITE_PATHWAY_IDS_CACHE_KEY_TPL,
+    SITE_PROGRAM_INDEXES_CACHE_KEY_TPL,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
@@ -24,8 +28,12 @@ class Command(BaseCommand):
 
     This command requests every available program from the discovery
     service, writing each to its own cache entry with an indefinite expiration.
-    It is meant to be run on a scheduled basis and should be the only code
-    updating these cache entries.
+    It also writes, for each site, the UUIDs of the programs containing each
+    course run and each course, so that the programs of a learner can be read
+    without reading all of them. It is meant to be run on a scheduled basis and
+    should be the only code updating these cache entries: the details of
+    programs no longer offered by any site, and the indexes of course runs and
+    courses no longer in any program of a site, are deleted.
     """
     help = "Rebuild the LMS' cache of program data."
 
@@ -46,12 +54,24 @@ class Command(BaseCommand):
 
         programs = {}
         pathways = {}
+        indexes = {}
+        current_program_uuids = set()
+        previous_program_uuids = set()
+        stale_index_keys = set()
         for site in Site.objects.all():
+            previous_program_uuids.update(cache.get(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain)) or [])
+            indexes_cache_key = SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=site.domain)
+            previous_index_keys = cache.get(indexes_cache_key)
+            if not isinstance(previous_index_keys, list):
+                previous_index_keys = []
+
             site_config = getattr(site, 'configuration', None)
             if site_config is None or not site_config.get_value('COURSE_CATALOG_API_URL'):
                 logger.info('Skipping site {domain}. No configuration.'.format(domain=site.domain))
                 cache.set(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain), [], None)
                 cache.set(SITE_PATHWAY_IDS_CACHE_KEY_TPL.format(domain=site.domain), [], None)
+                stale_index_keys.update(previous_index_keys)
+                stale_index_keys.add(indexes_cache_key)
                 continue
 
             client = create_catalog_api_client(user, site=site)
@@ -66,6 +86,10 @@ class Command(BaseCommand):
 
             programs.update(new_programs)
             pathways.update(new_pathways)
+            current_program_uuids.update(uuids)
+            site_indexes = self.get_course_indexes(site, new_programs)
+            indexes.update(site_indexes)
+            stale_index_keys.update(set(previous_index_keys) - set(site_indexes))
 
             logger.info('Caching UUIDs for {total} programs for site {site_name}.'.format(
                 total=len(uuids),
@@ -90,6 +114,19 @@ class Command(BaseCommand):
             successful_pathways=successful_pathways))
         cache.set_many(pathways, None)
 
+        # The indexes refer to the programs cached above.
+        logger.info('Caching program UUIDs for {total} course runs and courses.'.format(total=len(indexes)))
+        cache.set_many(indexes, None)
+
+        stale_program_keys = [
+            PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in previous_program_uuids - current_program_uuids
+        ]
+        logger.info('Deleting details for {total} programs and {total_indexes} stale indexes.'.format(
+            total=len(stale_program_keys),
+            total_indexes=len(stale_index_keys),
+        ))
+        cache.delete_many(stale_program_keys + list(stale_index_keys))
+
         if failure:
             # This will fail a Jenkins job running this command, letting site
             # operators know that there was a problem.
@@ -134,6 +171,34 @@ class Command(BaseCommand):
                 continue
         return programs, failure
 
+    def get_course_indexes(self, site, programs):
+        """
+        Map the cache keys of the course runs and courses of the given programs
+        of a site to the UUIDs of the programs containing them, including the
+        cache key listing these cache keys, telling that the indexes of the site
+        are built.
+        """
+        indexes = defaultdict(list)
+        for program in programs.values():
+            program_uuid = program['uuid']
+            for course in program['courses']:
+                cache_keys = [SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                    domain=site.domain, course_uuid=course['uuid'],
+                )]
+                cache_keys.extend(
+                    SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                        domain=site.domain, course_run_key=course_run['key'],
+                    )
+                    for course_run in course['course_runs']
+                )
+                for cache_key in cache_keys:
+                    if program_uuid not in indexes[cache_key]:
+                        indexes[cache_key].append(program_uuid)
+
+        indexes = dict(indexes)
+        indexes[SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=site.domain)] = sorted(indexes)
+        return indexes
+
     def get_pathways(self, client, site):
         """
         Get all pathways for the current client
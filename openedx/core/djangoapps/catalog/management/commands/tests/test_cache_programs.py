@@ -7,7 +7,10 @@ from django.core.management import call_command
 from openedx.core.djangoapps.catalog.cache import (
     PATHWAY_CACHE_KEY_TPL,
     PROGRAM_CACHE_KEY_TPL,
+    SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL,
+    SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL,
     SITE_PATHWAY_IDS_CACHE_KEY_TPL,
+    SITE_PROGRAM_INDEXES_CACHE_KEY_TPL,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.tests.factories import PathwayFactory, ProgramFactory
@@ -167,6 +170,92 @@ class TestCachePrograms(CatalogIntegrationMixin, CacheIsolationTestCase, SiteMix
             del program['pathway_ids']
             self.assertEqual(program, programs[key])
 
+    def test_handle_course_indexes(self):
+        """
+        Verify that the command caches the UUIDs of the programs containing each course run and course.
+        """
+        UserFactory(username=self.catalog_integration.service_username)
+
+        # Share a course between two programs.
+        self.programs[1]['courses'].append(self.programs[0]['courses'][0])
+
+        self.mock_list()
+        self.mock_pathways(self.pathways)
+        for program in self.programs:
+            self.mock_detail(program['uuid'], program)
+
+        call_command('cache_programs')
+
+        self.assertTrue(cache.get(SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=self.site_domain)))
+        self.assertIn(
+            SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                domain=self.site_domain, course_uuid=self.programs[0]['courses'][0]['uuid'],
+            ),
+            cache.get(SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=self.site_domain))
+        )
+        for program in self.programs:
+            for course in program['courses']:
+                expected_uuids = [
+                    other_program['uuid'] for other_program in self.programs if course in other_program['courses']
+                ]
+                self.assertEqual(
+                    cache.get(SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                        domain=self.site_domain, course_uuid=course['uuid'],
+                    )),
+                    expected_uuids,
+                )
+                for course_run in course['course_runs']:
+                    self.assertEqual(
+                        cache.get(SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                            domain=self.site_domain, course_run_key=course_run['key'],
+                        )),
+                        expected_uuids,
+                    )
+
+    def test_handle_stale_entries(self):
+        """
+        Verify that the command deletes the details of programs no longer offered
+        and the indexes of sites or courses no longer in programs.
+        """
+        UserFactory(username=self.catalog_integration.service_username)
+
+        self.mock_list()
+        self.mock_pathways(self.pathways)
+        for program in self.programs:
+            self.mock_detail(program['uuid'], program)
+
+        # Indexes of a site which is skipped since it isn't configured.
+        skipped_course_key = SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+            domain=self.site.domain, course_uuid='skipped',
+        )
+        cache.set_many({
+            skipped_course_key: [self.uuids[0]],
+            SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=self.site.domain): [skipped_course_key],
+        }, None)
+
+        call_command('cache_programs')
+
+        self.assertIsNone(cache.get(skipped_course_key))
+        self.assertIsNone(cache.get(SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=self.site.domain)))
+
+        # Stop offering a program which isn't part of a pathway.
+        removed_program = self.programs.pop(2)
+        self.uuids.remove(removed_program['uuid'])
+        self.mock_list()
+        self.mock_pathways(self.pathways)
+
+        call_command('cache_programs')
+
+        self.assertIsNone(cache.get(PROGRAM_CACHE_KEY_TPL.format(uuid=removed_program['uuid'])))
+        self.assertEqual(
+            set(cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in self.uuids])),
+            set(PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in self.uuids)
+        )
+        for course in removed_program['courses']:
+            self.assertIsNone(cache.get(SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                domain=self.site_domain, course_uuid=course['uuid'],
+            )))
+
     def test_handle_pathways(self):
         """
         Verify that the command requests and caches credit pathways
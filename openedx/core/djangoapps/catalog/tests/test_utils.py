@@ -19,7 +19,10 @@ from openedx.core.constants import COURSE_UNPUBLISHED
 from openedx.core.djangoapps.catalog.cache import (
     PATHWAY_CACHE_KEY_TPL,
     PROGRAM_CACHE_KEY_TPL,
+    SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL,
+    SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL,
     SITE_PATHWAY_IDS_CACHE_KEY_TPL,
+    SITE_PROGRAM_INDEXES_CACHE_KEY_TPL,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
@@ -32,6 +35,7 @@ from openedx.core.djangoapps.catalog.tests.factories import (
 )
 from openedx.core.djangoapps.catalog.tests.mixins import CatalogIntegrationMixin
 from openedx.core.djangoapps.catalog.utils import (
+    _get_programs_by_uuids,
     get_course_runs,
     get_course_runs_for_course,
     get_course_run_details,
@@ -183,6 +187,67 @@ class TestGetPrograms(CacheIsolationTestCase):
         self.assertEqual(actual_program, expected_program)
         self.assertFalse(mock_warning.called)
 
+    def test_get_for_courses(self, _mock_warning, mock_info):
+        programs = ProgramFactory.create_batch(3)
+        cache.set_many(
+            {PROGRAM_CACHE_KEY_TPL.format(uuid=program['uuid']): program for program in programs},
+            None
+        )
+        cache.set(
+            SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=self.site.domain),
+            [program['uuid'] for program in programs],
+            None
+        )
+        course_run_key = programs[0]['courses'][0]['course_runs'][0]['key']
+        course_uuid = programs[1]['courses'][0]['uuid']
+
+        # Until the indexes are cached, all programs are read and filtered.
+        actual_programs = get_programs(self.site, course_run_keys=[course_run_key], course_uuids=[course_uuid])
+        self.assertEqual(
+            set(program['uuid'] for program in actual_programs),
+            {programs[0]['uuid'], programs[1]['uuid']}
+        )
+        mock_info.assert_called_with(
+            'Program indexes are not cached for site {}, reading all programs.'.format(self.site.domain)
+        )
+        mock_info.reset_mock()
+
+        # Once they are, only the indexed programs are read.
+        cache.set_many({
+            SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=self.site.domain): True,
+            SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                domain=self.site.domain, course_run_key=course_run_key
+            ): [programs[0]['uuid']],
+            SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(
+                domain=self.site.domain, course_uuid=course_uuid
+            ): [programs[1]['uuid']],
+        }, None)
+        with mock.patch(UTILS_MODULE + '._get_programs_by_uuids', wraps=_get_programs_by_uuids) as mock_get:
+            actual_programs = get_programs(
+                self.site, course_run_keys=[course_run_key], course_uuids=[course_uuid]
+            )
+        self.assertEqual(
+            set(mock_get.call_args[0][0]),
+            {programs[0]['uuid'], programs[1]['uuid']}
+        )
+        self.assertEqual(
+            set(program['uuid'] for program in actual_programs),
+            {programs[0]['uuid'], programs[1]['uuid']}
+        )
+        self.assertFalse(mock_info.called)
+
+        # Course runs outside of programs have no index entry.
+        self.assertEqual(get_programs(self.site, course_run_keys=['course-v1:Other+Run+1']), [])
+
+        # Programs the site no longer offers are ignored, even if still indexed.
+        cache.set(
+            SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=self.site.domain),
+            [programs[1]['uuid'], programs[2]['uuid']],
+            None
+        )
+        actual_programs = get_programs(self.site, course_run_keys=[course_run_key], course_uuids=[course_uuid])
+        self.assertEqual([program['uuid'] for program in actual_programs], [programs[1]['uuid']])
+
 
 @skip_unless_lms
 @mock.patch(UTILS_MODULE + '.logger.info')
@@ -15,7 +15,10 @@ from pytz import UTC
 from entitlements.utils import is_course_run_entitlement_fulfillable
 from openedx.core.constants import COURSE_PUBLISHED
 from openedx.core.djangoapps.catalog.cache import (PATHWAY_CACHE_KEY_TPL, PROGRAM_CACHE_KEY_TPL,
+                                                   SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL,
+                                                   SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL,
                                                    SITE_PATHWAY_IDS_CACHE_KEY_TPL,
+                                                   SITE_PROGRAM_INDEXES_CACHE_KEY_TPL,
                                                    SITE_PROGRAM_UUIDS_CACHE_KEY_TPL)
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
 from openedx.core.lib.edx_api_utils import get_edx_api_data
@@ -39,7 +42,7 @@ def create_catalog_api_client(user, site=None):
     return EdxRestApiClient(url, jwt=jwt)
 
 
-def get_programs(site, uuid=None):
+def get_programs(site, uuid=None, course_run_keys=None, course_uuids=None):
     """Read programs from the cache.
 
     The cache is populated by a management command, cache_programs.
@@ -49,6 +52,10 @@ def get_programs(site, uuid=None):
 
     Keyword Arguments:
         uuid (string): UUID identifying a specific program to read from the cache.
+        course_run_keys (list of string): If provided, only the programs containing
+            one of these course runs, or one of the courses in course_uuids, are read.
+        course_uuids (list of string): If provided, only the programs containing
+            one of these courses, or one of the course runs in course_run_keys, are read.
 
     Returns:
         list of dict, representing programs.
@@ -62,10 +69,72 @@ def get_programs(site, uuid=None):
             logger.warning(missing_details_msg_tpl.format(uuid=uuid))
 
         return program
+
+    if course_run_keys is not None or course_uuids is not None:
+        course_run_keys = set(course_run_keys or [])
+        course_uuids = set(course_uuids or [])
+        programs = _get_programs_by_uuids(_get_program_uuids_for_courses(site, course_run_keys, course_uuids))
+        return [
+            program for program in programs
+            if any(
+                course['uuid'] in course_uuids or
+                any(course_run['key'] in course_run_keys for course_run in course['course_runs'])
+                for course in program['courses']
+            )
+        ]
+
     uuids = cache.get(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain), [])
     if not uuids:
         logger.warning('Failed to get program UUIDs from the cache for site {}.'.format(site.domain))
 
+    return _get_programs_by_uuids(uuids)
+
+
+def _get_program_uuids_for_courses(site, course_run_keys, course_uuids):
+    """
+    Read the UUIDs of the programs of a site containing the given course runs
+    or courses from the indexes built by cache_programs.
+
+    Until the indexes are built, the UUIDs of all the programs of the site are returned.
+    Otherwise, only the UUIDs of the programs the site currently offers are returned.
+    """
+    indexes_cache_key = SITE_PROGRAM_INDEXES_CACHE_KEY_TPL.format(domain=site.domain)
+    site_uuids_cache_key = SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain)
+    cache_keys = [indexes_cache_key, site_uuids_cache_key]
+    cache_keys.extend(
+        SITE_COURSE_RUN_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain, course_run_key=course_run_key)
+        for course_run_key in course_run_keys
+    )
+    cache_keys.extend(
+        SITE_COURSE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=site.domain, course_uuid=course_uuid)
+        for course_uuid in course_uuids
+    )
+    cached = cache.get_many(cache_keys)
+    # Entries of course runs and courses outside of programs are missing too,
+    # but some may be missing as explained in _get_programs_by_uuids: try again.
+    missing_cache_keys = [cache_key for cache_key in cache_keys if cache_key not in cached]
+    if missing_cache_keys:
+        cached.update(cache.get_many(missing_cache_keys))
+    site_uuids = cached.pop(site_uuids_cache_key, [])
+    if cached.pop(indexes_cache_key, None) is None:
+        logger.info('Program indexes are not cached for site {}, reading all programs.'.format(site.domain))
+        return site_uuids
+
+    site_uuids = set(site_uuids)
+    uuids = []
+    for program_uuids in cached.values():
+        for program_uuid in program_uuids:
+            if program_uuid in site_uuids and program_uuid not in uuids:
+                uuids.append(program_uuid)
+    return uuids
+
+
+def _get_programs_by_uuids(uuids):
+    """
+    Read the programs with the given UUIDs from the cache.
+    """
+    missing_details_msg_tpl = 'Failed to get details for program {uuid} from the cache.'
+
     programs = cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in uuids])
     programs = list(programs.values())
 
@@ -3,11 +3,14 @@ Module with family of classes for block structures.
     BlockStructure - responsible for block existence and relations.
     BlockStructureBlockData - responsible for block & transformer data.
     BlockStructureModulestoreData - responsible for xBlock data.
+    BlockStructureOverlay - copy-on-write view of a BlockStructureBlockData.
 
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
     _BlockData - Data structure for a single block's data.
+    _CopyOnWriteMap - Map overlaying changes over a shared, read-only map.
 """
+from collections import MutableMapping
 from copy import deepcopy
 from functools import partial
 from logging import getLogger
@@ -120,7 +123,7 @@ class BlockStructure(object):
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        self._get_relations_to_update(usage_key).parents = []
 
     def __contains__(self, usage_key):
         """
@@ -229,6 +232,13 @@ class BlockStructure(object):
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
 
+    def _get_relations_to_update(self, usage_key):
+        """
+        Returns the _BlockRelations of the given block, for updating.
+        Overridden by copy-on-write structures.
+        """
+        return self._block_relations[usage_key]
+
     def _add_relation(self, parent_key, child_key):
         """
         Adds a parent to child relationship in this block structure.
@@ -237,7 +247,11 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
-        self._add_to_relations(self._block_relations, parent_key, child_key)
+        self._add_block(self._block_relations, parent_key)
+        self._add_block(self._block_relations, child_key)
+
+        self._get_relations_to_update(child_key).parents.append(parent_key)
+        self._get_relations_to_update(parent_key).children.append(child_key)
 
     @staticmethod
     def _add_to_relations(block_relations, parent_key, child_key):
@@ -418,6 +432,9 @@ class BlockStructureBlockData(BlockStructure):
         """
         Returns a new instance of BlockStructureBlockData with a
         deep-copy of this instance's contents.
+
+        See create_overlay for a cheaper alternative when this instance
+        is no longer modified.
         """
         from .factory import BlockStructureFactory
         return BlockStructureFactory.create_new(
@@ -427,6 +444,16 @@ class BlockStructureBlockData(BlockStructure):
             deepcopy(self._block_data_map),
         )
 
+    def create_overlay(self):
+        """
+        Returns a new BlockStructureOverlay that shares this instance's
+        contents, copying only what it modifies.
+
+        This instance must not be modified for as long as the overlay is
+        in use.
+        """
+        return BlockStructureOverlay(self)
+
     def iteritems(self):
         """
         Returns iterator of (UsageKey, BlockData) pairs for all
@@ -479,7 +506,7 @@ class BlockStructureBlockData(BlockStructure):
 
             override_data (object) - The data you want to set
         """
-        block_data = self._block_data_map.get(usage_key)
+        block_data = self._get_block_data_to_update(usage_key)
         setattr(block_data, field_name, override_data)
 
     def get_transformer_data(self, transformer, key, default=None):
@@ -575,7 +602,7 @@ class BlockStructureBlockData(BlockStructure):
                 requested block.
         """
         setattr(
-            self._get_or_create_block(usage_key).transformer_data.get_or_create(transformer),
+            self._get_transformer_block_data_to_update(usage_key, transformer),
             key,
             value,
         )
@@ -593,7 +620,8 @@ class BlockStructureBlockData(BlockStructure):
                 whose data entry is to be deleted.
         """
         try:
-            transformer_block_data = self.get_transformer_block_data(usage_key, transformer)
+            self.get_transformer_block_data(usage_key, transformer)
+            transformer_block_data = self._get_transformer_block_data_to_update(usage_key, transformer)
             delattr(transformer_block_data, key)
         except (AttributeError, KeyError):
             pass
@@ -623,11 +651,11 @@ class BlockStructureBlockData(BlockStructure):
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            self._get_relations_to_update(child).parents.remove(usage_key)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            self._get_relations_to_update(parent).children.remove(usage_key)
 
         # Remove block.
         self._block_relations.pop(usage_key, None)
@@ -750,18 +778,218 @@ class BlockStructureBlockData(BlockStructure):
             raise TransformerException('Version attributes are not set on transformer {0}.', transformer.name())
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.WRITE_VERSION)
 
+    def _get_block_data_to_update(self, usage_key):
+        """
+        Returns the BlockData associated with the given usage_key, for
+        updating, or None if not found. Overridden by copy-on-write
+        structures.
+        """
+        return self._block_data_map.get(usage_key)
+
+    def _get_transformer_block_data_to_update(self, usage_key, transformer):
+        """
+        Returns the TransformerData of the given transformer for the
+        block with the given usage_key, for updating, creating the block
+        and the TransformerData if not found. Overridden by copy-on-write
+        structures.
+        """
+        return self._get_or_create_block(usage_key).transformer_data.get_or_create(transformer)
+
     def _get_or_create_block(self, usage_key):
         """
         Returns the BlockData associated with the given usage_key.
         If not found, creates and returns a new BlockData and
         maps it to the given key.
         """
-        try:
-            return self._block_data_map[usage_key]
-        except KeyError:
+        block_data = self._get_block_data_to_update(usage_key)
+        if block_data is None:
             block_data = BlockData(usage_key)
             self._block_data_map[usage_key] = block_data
-            return block_data
+        return block_data
+
+
+class _CopyOnWriteMap(MutableMapping):
+    """
+    A map that reads through to a shared base map, which it never
+    modifies. Instead, it records the keys removed from the base map and
+    keeps its own copies of the values that are updated, as returned by
+    get_to_update.
+    """
+    def __init__(self, base_map, copy_value):
+        """
+        Arguments:
+            base_map (Mapping) - The shared map to read through to.
+
+            copy_value ((value)->value) - Function returning a copy of a
+                value of the base map that can be updated independently.
+        """
+        self._base_map = base_map
+        self._copy_value = copy_value
+
+        # Map of keys to values that are either added or copied from
+        # the base map.
+        self._own_map = {}
+
+        # Set of keys of the base map that are removed.
+        self._removed = set()
+
+    def get_to_update(self, key):
+        """
+        Returns the value for the given key, copying it from the base map
+        the first time it is requested, so that it can be safely updated.
+
+        Raises KeyError if not found.
+        """
+        try:
+            return self._own_map[key]
+        except KeyError:
+            value = self[key]
+            value = self._own_map[key] = self._copy_value(value)
+            return value
+
+    def __getitem__(self, key):
+        try:
+            return self._own_map[key]
+        except KeyError:
+            if key in self._removed:
+                raise
+            return self._base_map[key]
+
+    def get(self, key, default=None):
+        # Overridden since this is the hot path of block structures.
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self._own_map[key] = value
+        if key in self._base_map:
+            self._removed.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._own_map.pop(key, None)
+        if key in self._base_map:
+            self._removed.add(key)
+
+    def __contains__(self, key):
+        return key in self._own_map or (key not in self._removed and key in self._base_map)
+
+    def __iter__(self):
+        for key in self._base_map:
+            if key not in self._removed and key not in self._own_map:
+                yield key
+        for key in self._own_map.keys():
+            yield key
+
+    def __len__(self):
+        return len(self._base_map) - len(self._removed) + sum(
+            1 for key in self._own_map if key not in self._base_map
+        )
+
+    def __deepcopy__(self, memo):
+        return {key: deepcopy(value, memo) for key, value in self.iteritems()}
+
+
+def _copy_block_relations(block_relations):
+    """
+    Returns a copy of the given _BlockRelations that can be updated
+    independently.
+    """
+    new_block_relations = _BlockRelations()
+    new_block_relations.parents = list(block_relations.parents)
+    new_block_relations.children = list(block_relations.children)
+    return new_block_relations
+
+
+def _copy_block_data(block_data):
+    """
+    Returns a shallow copy of the given BlockData, sharing its xBlock
+    fields and the data of its transformers until they are updated.
+    """
+    new_block_data = BlockData(block_data.location)
+    new_block_data.fields = block_data.fields
+    new_block_data.transformer_data = TransformerDataMap(block_data.transformer_data)
+    return new_block_data
+
+
+class BlockStructureOverlay(BlockStructureBlockData):
+    """
+    Subclass of BlockStructureBlockData that shares the block relations
+    and block data of another (collected) BlockStructureBlockData,
+    recording the blocks it removes and copying the blocks it updates:
+    only the xBlock fields, or the data of the transformer, being updated
+    are copied.
+
+    This makes it cheap to create an overlay per user in order to
+    transform it, compared to deep-copying the whole block structure.
+    Note that the values of the shared blocks' fields must therefore not
+    be mutated in place; they can only be updated through the block
+    structure's methods.
+    """
+    def __init__(self, block_structure):
+        super(BlockStructureOverlay, self).__init__(block_structure.root_block_usage_key)
+        self._block_relations = _CopyOnWriteMap(block_structure._block_relations, _copy_block_relations)
+        self._base_block_data_map = block_structure._block_data_map
+        self._block_data_map = _CopyOnWriteMap(self._base_block_data_map, _copy_block_data)
+
+        # Non-block-specific transformer data is small; copy it outright.
+        self.transformer_data = deepcopy(block_structure.transformer_data)
+
+    def _get_relations_to_update(self, usage_key):
+        return self._block_relations.get_to_update(usage_key)
+
+    def _get_block_data_to_update(self, usage_key):
+        try:
+            block_data = self._block_data_map.get_to_update(usage_key)
+        except KeyError:
+            return None
+        base_block_data = self._base_block_data_map.get(usage_key)
+        if base_block_data is not None and block_data.fields is base_block_data.fields:
+            block_data.fields = dict(block_data.fields)
+        return block_data
+
+    def _get_transformer_block_data_to_update(self, usage_key, transformer):
+        try:
+            block_data = self._block_data_map.get_to_update(usage_key)
+        except KeyError:
+            block_data = self._block_data_map[usage_key] = BlockData(usage_key)
+        transformer_block_data = block_data.transformer_data.get_or_create(transformer)
+
+        base_block_data = self._base_block_data_map.get(usage_key)
+        if base_block_data is not None:
+            try:
+                base_transformer_block_data = base_block_data.transformer_data[transformer]
+            except KeyError:
+                base_transformer_block_data = None
+            if transformer_block_data is base_transformer_block_data:
+                transformer_block_data = TransformerData()
+                transformer_block_data.fields = dict(base_transformer_block_data.fields)
+                block_data.transformer_data[transformer] = transformer_block_data
+        return transformer_block_data
+
+    def _prune_unreachable(self):
+        """
+        Mutates this block structure by removing any unreachable blocks,
+        without copying the relations of the reachable blocks that are
+        not affected.
+        """
+        reachable = set(self.post_order_traversal())
+        unreachable = [block_key for block_key in self._block_relations if block_key not in reachable]
+        if not unreachable:
+            return
+
+        unreachable = set(unreachable)
+        for block_key in unreachable:
+            for child in self._block_relations[block_key].children:
+                if child in reachable:
+                    relations = self._get_relations_to_update(child)
+                    relations.parents = [parent for parent in relations.parents if parent not in unreachable]
+
+        for block_key in unreachable:
+            del self._block_relations[block_key]
 
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
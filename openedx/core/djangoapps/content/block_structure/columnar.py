@@ -0,0 +1,401 @@
+"""
+Module for the columnar serialization format of collected BlockStructures.
+
+Pickling a collected block structure as-is produces a graph of Python
+objects (UsageKeys, _BlockRelations, BlockData and TransformerData
+instances) that is slow to load for large courses.  This format instead
+stores:
+
+    * an interned table of the structure's usage keys, so that every
+      block is referred to by its integer index,
+    * the parent/child relations as integer adjacency arrays,
+    * the collected xBlock fields and block-specific transformer fields
+      as one column per field, holding the indices of the blocks that
+      have a value for the field along with those values.
+
+On load, the block relations are rebuilt eagerly (transformers traverse
+them right away) while the block data is only materialized into BlockData
+objects as blocks are accessed, via ColumnarBlockDataMap.
+
+The serialized data starts with a short header holding a magic string and
+the format version, followed by the zlib compressed pickle of the columns.
+"""
+# pylint: disable=protected-access
+import cPickle as pickle
+import threading
+import zlib
+from array import array
+from collections import MutableMapping
+from copy import deepcopy
+from itertools import izip
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+from .exceptions import BlockStructureSerializationError
+
+
+# Magic string at the start of all columnar serializations. It cannot be
+# mistaken for the start of zlib compressed data (as stored by zpickle).
+MAGIC = 'BSC'
+
+# The latest version of the columnar format. Incrementally update this value
+# whenever the format changes; data serialized with another version is
+# treated as not found so that it is recollected.
+VERSION = 1
+
+# Type code of the integer arrays used for indices and adjacency lists.
+_INDEX_TYPECODE = 'i'
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data uses the columnar format.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Serializes the given collected block structure to the columnar format.
+
+    Raises:
+        BlockStructureSerializationError if the structure contains block
+        keys that are not usage keys.
+    """
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    usage_keys = list(block_relations)
+    usage_keys.extend(key for key in block_data_map if key not in block_relations)
+    index_of = {usage_key: index for index, usage_key in enumerate(usage_keys)}
+
+    payload = {
+        'keys': _encode_usage_keys(usage_keys),
+        'num_related': len(block_relations),
+        'children': _encode_adjacency(
+            [block_relations[usage_key].children for usage_key in usage_keys[:len(block_relations)]], index_of,
+        ),
+        'parents': _encode_adjacency(
+            [block_relations[usage_key].parents for usage_key in usage_keys[:len(block_relations)]], index_of,
+        ),
+        'data_blocks': _encode_indices(index_of[usage_key] for usage_key in block_data_map),
+        'transformer_data': block_structure.transformer_data,
+    }
+    payload.update(_encode_block_data(block_data_map, index_of))
+
+    header = '{}{}'.format(MAGIC, chr(VERSION))
+    return header + zlib.compress(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL))
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Deserializes the given columnar data and returns the parsed block_structure.
+
+    Raises:
+        BlockStructureSerializationError if the data is not in a
+        supported version of the columnar format.
+    """
+    from .factory import BlockStructureFactory
+
+    if not is_columnar(serialized_data):
+        raise BlockStructureSerializationError('Data is not in the columnar format.')
+    version = ord(serialized_data[len(MAGIC)])
+    if version != VERSION:
+        raise BlockStructureSerializationError(
+            'Unsupported columnar format version {}; expected {}.'.format(version, VERSION)
+        )
+
+    payload = pickle.loads(zlib.decompress(serialized_data[len(MAGIC) + 1:]))
+    usage_keys = _decode_usage_keys(payload['keys'])
+
+    block_relations = {}
+    num_related = payload['num_related']
+    children = _decode_adjacency(payload['children'], usage_keys)
+    parents = _decode_adjacency(payload['parents'], usage_keys)
+    for index in xrange(num_related):
+        relations = _BlockRelations()
+        relations.children = children[index]
+        relations.parents = parents[index]
+        block_relations[usage_keys[index]] = relations
+
+    block_data_map = ColumnarBlockDataMap(
+        {usage_keys[index]: index for index in _decode_indices(payload['data_blocks'])},
+        payload['fields'],
+        payload['transformer_blocks'],
+        payload['transformer_fields'],
+    )
+
+    return BlockStructureFactory.create_new(
+        root_block_usage_key,
+        block_relations,
+        payload['transformer_data'],
+        block_data_map,
+    )
+
+
+class ColumnarBlockDataMap(MutableMapping):
+    """
+    A map of a block's usage key to its BlockData that lazily builds the
+    BlockData objects from the columns of a columnar serialization, the
+    first time each block is accessed.
+
+    It can be used wherever BlockStructureBlockData expects its
+    _block_data_map dict. Reading it from several threads is safe: the
+    columns are decoded and each BlockData is built only once.
+    """
+    def __init__(self, block_indices, field_columns, transformer_blocks, transformer_columns):
+        """
+        Arguments:
+            block_indices (dict {UsageKey: int}) - Map of usage keys of
+                the blocks that have data to their index in the columns.
+
+            field_columns (dict {string: (bytes, list)}) - Map of an
+                xBlock field name to its encoded column.
+
+            transformer_blocks (dict {string: bytes}) - Map of a
+                transformer name to the encoded indices of the blocks
+                that have data for that transformer.
+
+            transformer_columns (dict {string: dict {string: (bytes, list)}}) -
+                Map of a transformer name to the encoded columns of its
+                block-specific fields.
+        """
+        # Map of a block's usage key to its index in the columns, and
+        # list of the BlockData materialized so far, by index.
+        self._block_indices = block_indices
+        self._block_data = [None] * (max(block_indices.itervalues()) + 1 if block_indices else 0)
+        self._encoded_columns = (field_columns, transformer_blocks, transformer_columns)
+        self._columns = None
+        # Held while decoding the columns and materializing a BlockData.
+        self._lock = threading.Lock()
+
+    def __getitem__(self, usage_key):
+        index = self._block_indices[usage_key]
+        block_data = self._block_data[index]
+        if block_data is None:
+            with self._lock:
+                block_data = self._block_data[index]
+                if block_data is None:
+                    block_data = self._block_data[index] = self._materialize(usage_key, index)
+        return block_data
+
+    def get(self, usage_key, default=None):
+        # Overridden since this is the hot path of BlockStructureBlockData.
+        try:
+            return self[usage_key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, usage_key, block_data):
+        index = self._block_indices.get(usage_key)
+        if index is None:
+            index = self._block_indices[usage_key] = len(self._block_data)
+            self._block_data.append(block_data)
+        else:
+            self._block_data[index] = block_data
+
+    def __delitem__(self, usage_key):
+        index = self._block_indices.pop(usage_key)
+        self._block_data[index] = None
+
+    def __contains__(self, usage_key):
+        return usage_key in self._block_indices
+
+    def __iter__(self):
+        return iter(self._block_indices)
+
+    def __len__(self):
+        return len(self._block_indices)
+
+    def __deepcopy__(self, memo):
+        return {usage_key: deepcopy(block_data, memo) for usage_key, block_data in self.iteritems()}
+
+    def _materialize(self, usage_key, index):
+        """
+        Returns a new BlockData for the block at the given index of the columns.
+        """
+        field_columns, transformer_blocks, transformer_columns = self._get_columns()
+
+        transformer_data_map = TransformerDataMap()
+        for transformer_name, indices in transformer_blocks.iteritems():
+            if index in indices:
+                transformer_data_map[transformer_name] = _new_field_data(TransformerData, {
+                    field_name: column[index]
+                    for field_name, column in transformer_columns.get(transformer_name, {}).iteritems()
+                    if index in column
+                })
+
+        block_data = _new_field_data(BlockData, {
+            field_name: column[index]
+            for field_name, column in field_columns.iteritems()
+            if index in column
+        })
+        block_data.__dict__.update(location=usage_key, transformer_data=transformer_data_map)
+        return block_data
+
+    def _get_columns(self):
+        """
+        Decodes the columns into maps of block index to value, on first use.
+
+        Called with the lock held.
+        """
+        if self._columns is None:
+            field_columns, transformer_blocks, transformer_columns = self._encoded_columns
+            self._columns = (
+                {name: _decode_column(column) for name, column in field_columns.iteritems()},
+                {name: set(_decode_indices(indices)) for name, indices in transformer_blocks.iteritems()},
+                {
+                    transformer_name: {name: _decode_column(column) for name, column in columns.iteritems()}
+                    for transformer_name, columns in transformer_columns.iteritems()
+                },
+            )
+            self._encoded_columns = None
+        return self._columns
+
+
+def _new_field_data(field_data_class, fields):
+    """
+    Returns a new instance of the given FieldData class holding the given
+    fields, bypassing the (comparatively slow) attribute handling of
+    FieldData.__setattr__.
+    """
+    field_data = field_data_class.__new__(field_data_class)
+    field_data.__dict__['fields'] = fields
+    return field_data
+
+
+def _encode_usage_keys(usage_keys):
+    """
+    Encodes the given usage keys as interned tables of their course keys and
+    block types, along with the block ids.
+    """
+    course_keys, course_key_indices = [], {}
+    block_types, block_type_indices = [], {}
+    course_column, type_column, block_ids = array(_INDEX_TYPECODE), array(_INDEX_TYPECODE), []
+
+    for usage_key in usage_keys:
+        try:
+            course_key, block_type, block_id = usage_key.course_key, usage_key.block_type, usage_key.block_id
+        except AttributeError:
+            raise BlockStructureSerializationError('Block key {!r} is not a usage key.'.format(usage_key))
+        if course_key.make_usage_key(block_type, block_id) != usage_key:
+            raise BlockStructureSerializationError('Usage key {} cannot be interned.'.format(usage_key))
+
+        course_column.append(_intern(course_key, course_keys, course_key_indices))
+        type_column.append(_intern(block_type, block_types, block_type_indices))
+        block_ids.append(block_id)
+
+    return course_keys, course_column.tostring(), block_types, type_column.tostring(), block_ids
+
+
+def _decode_usage_keys(encoded_keys):
+    """
+    Returns the list of usage keys encoded by _encode_usage_keys.
+    """
+    course_keys, course_column, block_types, type_column, block_ids = encoded_keys
+    return [
+        course_keys[course_index].make_usage_key(block_types[type_index], block_id)
+        for course_index, type_index, block_id in izip(
+            _decode_indices(course_column), _decode_indices(type_column), block_ids,
+        )
+    ]
+
+
+def _intern(value, table, table_indices):
+    """
+    Returns the index of value in table, adding it to the table if needed.
+    """
+    try:
+        return table_indices[value]
+    except KeyError:
+        table_indices[value] = len(table)
+        table.append(value)
+        return table_indices[value]
+
+
+def _encode_adjacency(adjacency_lists, index_of):
+    """
+    Encodes the given lists of usage keys as integer arrays of list offsets
+    and of the flattened indices of the keys.
+    """
+    offsets, values = array(_INDEX_TYPECODE, [0]), array(_INDEX_TYPECODE)
+    for usage_keys in adjacency_lists:
+        values.extend(index_of[usage_key] for usage_key in usage_keys)
+        offsets.append(len(values))
+    return offsets.tostring(), values.tostring()
+
+
+def _decode_adjacency(encoded_adjacency, usage_keys):
+    """
+    Returns the lists of usage keys encoded by _encode_adjacency.
+    """
+    offsets, values = [_decode_indices(encoded) for encoded in encoded_adjacency]
+    adjacent_keys = [usage_keys[index] for index in values]
+    return [adjacent_keys[start:end] for start, end in izip(offsets, offsets[1:])]
+
+
+def _encode_indices(indices):
+    """
+    Encodes the given iterable of block indices as bytes.
+    """
+    return array(_INDEX_TYPECODE, indices).tostring()
+
+
+def _decode_indices(encoded_indices):
+    """
+    Returns the integer array of block indices encoded by _encode_indices.
+    """
+    indices = array(_INDEX_TYPECODE)
+    indices.fromstring(encoded_indices)
+    return indices
+
+
+def _encode_block_data(block_data_map, index_of):
+    """
+    Returns the columns of the xBlock fields and block-specific transformer
+    fields of the given block data map.
+    """
+    field_columns = {}
+    transformer_blocks = {}
+    transformer_columns = {}
+
+    for usage_key, block_data in block_data_map.iteritems():
+        index = index_of[usage_key]
+        _add_to_columns(field_columns, index, block_data.fields)
+        for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+            transformer_blocks.setdefault(transformer_name, array(_INDEX_TYPECODE)).append(index)
+            _add_to_columns(transformer_columns.setdefault(transformer_name, {}), index, transformer_data.fields)
+
+    return {
+        'fields': _encode_columns(field_columns),
+        'transformer_blocks': {name: indices.tostring() for name, indices in transformer_blocks.iteritems()},
+        'transformer_fields': {
+            transformer_name: _encode_columns(columns)
+            for transformer_name, columns in transformer_columns.iteritems()
+        },
+    }
+
+
+def _add_to_columns(columns, index, fields):
+    """
+    Appends the given block's fields to their (indices, values) columns.
+    """
+    for field_name, value in fields.iteritems():
+        indices, values = columns.setdefault(field_name, (array(_INDEX_TYPECODE), []))
+        indices.append(index)
+        values.append(value)
+
+
+def _encode_columns(columns):
+    """
+    Encodes the index arrays of the given (indices, values) columns as bytes.
+    """
+    return {field_name: (indices.tostring(), values) for field_name, (indices, values) in columns.iteritems()}
+
+
+def _decode_column(encoded_column):
+    """
+    Returns a map of block index to value for the given encoded column.
+    """
+    indices, values = encoded_column
+    return dict(izip(_decode_indices(indices), values))
+
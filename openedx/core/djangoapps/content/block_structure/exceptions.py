@@ -40,3 +40,11 @@ class BlockStructureNotFound(BlockStructureException):
         super(BlockStructureNotFound, self).__init__(
             'Block structure not found; data_usage_key: {}'.format(root_block_usage_key)
         )
+
+
+class BlockStructureSerializationError(BlockStructureException):
+    """
+    Exception for when a Block Structure cannot be serialized to, or
+    deserialized from, a storage format.
+    """
+    pass
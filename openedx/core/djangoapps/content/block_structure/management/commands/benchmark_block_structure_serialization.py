@@ -0,0 +1,141 @@
+"""
+Command to compare the serialization formats of block structures.
+"""
+from datetime import datetime, timedelta
+from functools import partial
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.locator import CourseLocator
+from pytz import UTC
+
+from openedx.core.djangoapps.content.block_structure import columnar
+from openedx.core.djangoapps.content.block_structure.block_structure import BlockStructureBlockData
+from openedx.core.djangoapps.content.block_structure.store import BlockStructureStore
+
+
+# Number of children of each block, from the course down to the verticals.
+# Verticals get as many problems as needed to reach the requested size.
+BRANCHING = (('chapter', 10), ('sequential', 10), ('vertical', 5))
+
+
+class Command(BaseCommand):
+    """
+    Generates a large course's collected block structure in memory and reports
+    the size and load times of its zpickle and columnar serializations.
+
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization --num_blocks 5000 --settings=devstack
+    """
+    help = u'Compares the zpickle and columnar serialization formats of a generated block structure.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--num_blocks',
+            help=u'Approximate number of blocks in the generated course.',
+            default=5000,
+            type=int,
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times each format is loaded; the best time is reported.',
+            default=5,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        block_structure = generate_block_structure(options['num_blocks'])
+        root_block_usage_key = block_structure.root_block_usage_key
+        store = BlockStructureStore(cache=None)
+
+        formats = (
+            ('zpickle', store._zpickle_serialize(block_structure)),  # pylint: disable=protected-access
+            ('columnar', columnar.serialize(block_structure)),
+        )
+
+        self.stdout.write(u'Blocks: {}'.format(len(block_structure)))
+        self.stdout.write(u'{:<10} {:>12} {:>12} {:>14}'.format(u'format', u'bytes', u'load (ms)', u'load all (ms)'))
+        for name, serialized_data in formats:
+            load = partial(store._deserialize, serialized_data, root_block_usage_key)  # pylint: disable=protected-access
+            load_time = _best_time(options['iterations'], load)
+            load_all_time = _best_time(options['iterations'], partial(_load_all_block_data, load))
+            self.stdout.write(u'{:<10} {:>12} {:>12.1f} {:>14.1f}'.format(
+                name, len(serialized_data), load_time * 1000, load_all_time * 1000,
+            ))
+
+
+def generate_block_structure(num_blocks):
+    """
+    Returns a collected block structure of a generated course with
+    approximately num_blocks blocks, with xBlock fields and transformer data
+    similar to those collected for real courses.
+    """
+    course_key = CourseLocator('BenchmarkX', 'Serialization', 'run')
+    root_block_usage_key = course_key.make_usage_key('course', 'course')
+    block_structure = BlockStructureBlockData(root_block_usage_key)
+
+    num_problems = max(num_blocks - sum(_num_blocks_at_depth(depth) for depth in range(len(BRANCHING) + 1)), 0)
+    problems_per_vertical = max(num_problems // _num_blocks_at_depth(len(BRANCHING)), 1)
+    branching = BRANCHING + (('problem', problems_per_vertical),)
+
+    parents = [root_block_usage_key]
+    for block_type, num_children in branching:
+        children = []
+        for parent in parents:
+            for index in range(num_children):
+                child = course_key.make_usage_key(block_type, u'{}_{}'.format(parent.block_id, index))
+                block_structure._add_relation(parent, child)  # pylint: disable=protected-access
+                children.append(child)
+        parents = children
+
+    start = datetime(2017, 1, 1, tzinfo=UTC)
+    for index, usage_key in enumerate(block_structure):
+        block_data = block_structure._get_or_create_block(usage_key)  # pylint: disable=protected-access
+        block_data.display_name = u'Block {}'.format(usage_key.block_id)
+        block_data.category = usage_key.block_type
+        block_data.start = start + timedelta(days=index % 100)
+        block_data.due = None
+        block_data.graded = usage_key.block_type in ('sequential', 'problem')
+        block_data.format = u'Homework' if block_data.graded else None
+        block_data.weight = 1.0
+        block_data.visible_to_staff_only = False
+        block_data.group_access = {}
+        block_structure.set_transformer_block_field(usage_key, 'visibility', 'merged_visible_to_staff_only', False)
+        block_structure.set_transformer_block_field(usage_key, 'start_date', 'merged_start_date', block_data.start)
+        block_structure.set_transformer_block_field(
+            usage_key, 'user_partitions', 'merged_group_access', {'partitions': {}},
+        )
+    block_structure.set_transformer_data('user_partitions', '_version', 1)
+    return block_structure
+
+
+def _num_blocks_at_depth(depth):
+    """
+    Returns the number of blocks at the given depth of the generated course.
+    """
+    count = 1
+    for _, num_children in BRANCHING[:depth]:
+        count *= num_children
+    return count
+
+
+def _load_all_block_data(load):
+    """
+    Loads a block structure with the given function and accesses the data
+    of every block in it.
+    """
+    block_structure = load()
+    for usage_key in block_structure.topological_traversal():
+        block_structure.get_xblock_field(usage_key, 'display_name')
+
+
+def _best_time(iterations, func):
+    """
+    Returns the shortest duration, in seconds, of calling func iterations times.
+    """
+    durations = []
+    for _ in range(iterations):
+        start = default_timer()
+        func()
+        durations.append(default_timer() - start)
+    return min(durations)
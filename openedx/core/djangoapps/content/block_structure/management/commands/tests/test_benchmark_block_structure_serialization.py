@@ -0,0 +1,27 @@
+"""
+Tests for benchmark_block_structure_serialization management command.
+"""
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import benchmark_block_structure_serialization
+
+
+class TestBenchmarkBlockStructureSerialization(TestCase):
+    """
+    Tests benchmark block structure serialization management command.
+    """
+    def test_generate_block_structure(self):
+        block_structure = benchmark_block_structure_serialization.generate_block_structure(1000)
+        self.assertGreaterEqual(len(block_structure), 1000)
+        for usage_key in block_structure:
+            self.assertIsNotNone(block_structure.get_xblock_field(usage_key, 'display_name'))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('benchmark_block_structure_serialization', num_blocks=600, iterations=1, stdout=out)
+        output = out.getvalue()
+        self.assertIn('zpickle', output)
+        self.assertIn('columnar', output)
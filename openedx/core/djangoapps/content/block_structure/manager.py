@@ -54,13 +54,18 @@ class BlockStructureManager(object):
             collected_block_structure (BlockStructureBlockData) - A
                 block structure retrieved from a prior call to
                 get_collected.  Can be optionally provided if already available,
-                for optimization.
+                for optimization.  It is not modified by this method.
 
         Returns:
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        if collected_block_structure:
+            # Transform an overlay rather than a deep copy, so that the
+            # collected data is shared instead of copied on every call.
+            block_structure = collected_block_structure.create_overlay()
+        else:
+            block_structure = self.get_collected()
 
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
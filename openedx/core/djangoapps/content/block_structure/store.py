@@ -6,9 +6,9 @@ from logging import getLogger
 
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from . import config
+from . import columnar, config
 from .block_structure import BlockStructureBlockData
-from .exceptions import BlockStructureNotFound
+from .exceptions import BlockStructureNotFound, BlockStructureSerializationError
 from .factory import BlockStructureFactory
 from .models import BlockStructureModel
 from .transformer_registry import TransformerRegistry
@@ -192,6 +192,28 @@ class BlockStructureStore(object):
     def _serialize(self, block_structure):
         """
         Serializes the data for the given block_structure.
+
+        The columnar format is used when the corresponding waffle switch
+        is enabled and the structure supports it; otherwise, the
+        structure's data is pickled and compressed.
+        """
+        if config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION):
+            try:
+                return columnar.serialize(block_structure)
+            except BlockStructureSerializationError as error:
+                logger.warning(
+                    "BlockStructure: Falling back to zpickle serialization; %s: %s",
+                    block_structure.root_block_usage_key,
+                    error,
+                )
+
+        return self._zpickle_serialize(block_structure)
+
+    @staticmethod
+    def _zpickle_serialize(block_structure):
+        """
+        Serializes the data for the given block_structure by pickling
+        and compressing it.
         """
         data_to_cache = (
             block_structure._block_relations,
@@ -203,7 +225,18 @@ class BlockStructureStore(object):
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Raises:
+             BlockStructureNotFound if the data is in an unsupported
+             version of the columnar format.
         """
+        if columnar.is_columnar(serialized_data):
+            try:
+                return columnar.deserialize(serialized_data, root_block_usage_key)
+            except BlockStructureSerializationError as error:
+                logger.info("BlockStructure: Unable to deserialize; %s: %s", root_block_usage_key, error)
+                raise BlockStructureNotFound(root_block_usage_key)
+
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
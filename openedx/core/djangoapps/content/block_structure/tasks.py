@@ -12,7 +12,7 @@ from edxval.api import ValInternalError
 from opaque_keys.edx.keys import CourseKey
 
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from openedx.core.djangoapps.content.block_structure import api
+from openedx.core.djangoapps.content.block_structure import api, warmer
 from openedx.core.djangoapps.content.block_structure.config import STORAGE_BACKING_FOR_CACHE, waffle
 
 log = logging.getLogger('edx.celery.task')
@@ -92,6 +92,33 @@ def _get_course_in_cache(self, **kwargs):
     _call_and_retry_if_needed(self, api.get_course_in_cache, **kwargs)
 
 
+@task()
+def warm_stale_block_structures(routing_key=None):
+    """
+    Enqueues the recollection of the stale block structures of the courses
+    with the most recent enrollments, keeping no more than the configured
+    number of recollections in flight.  Meant to be run periodically, until
+    no block structures are stale.
+
+    Keyword Arguments:
+        routing_key (string) - Routing key to use for the recollection tasks.
+
+    Returns:
+        dict - The progress of the warmer.
+    """
+    course_keys, progress = warmer.get_course_keys_to_warm(
+        settings.BLOCK_STRUCTURES_SETTINGS.get('WARMER_CONCURRENCY', 10),
+        settings.BLOCK_STRUCTURES_SETTINGS.get('WARMER_ENROLLMENT_WINDOW_DAYS', 7),
+    )
+    task_options = {'routing_key': routing_key} if routing_key else {}
+    for course_key in course_keys:
+        update_course_in_cache_v2.apply_async(
+            kwargs=dict(course_id=unicode(course_key), with_storage=True),
+            **task_options
+        )
+    return progress
+
+
 def _call_and_retry_if_needed(self, api_method, **kwargs):
     """
     Calls the given api_method with the given course_id, retrying task_method upon failure.
@@ -207,16 +207,20 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
                 ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
                 ChildrenMapTestMixin.DAG_CHILDREN_MAP,
             ],
+            [True, False],
         )
     )
     @ddt.unpack
-    def test_remove_block(self, keep_descendants, block_to_remove, children_map):
+    def test_remove_block(self, keep_descendants, block_to_remove, children_map, use_overlay):
         ### skip test if invalid
         if (block_to_remove >= len(children_map)) or (keep_descendants and block_to_remove == 0):
             return
 
         ### create structure
         block_structure = self.create_block_structure(children_map)
+        if use_overlay:
+            collected_block_structure = block_structure
+            block_structure = collected_block_structure.create_overlay()
         parents_map = self.get_parents_map(children_map)
 
         ### verify blocks pre-exist
@@ -260,6 +264,11 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
                     pruned_children_map[block] = []
 
         self.assert_block_structure(block_structure, pruned_children_map, missing_blocks)
+        self.assertEqual(len(block_structure), len(children_map) - len(set(missing_blocks)))
+
+        ### verify the overlaid structure is unchanged
+        if use_overlay:
+            self.assert_block_structure(collected_block_structure, children_map)
 
     def test_remove_block_traversal(self):
         block_structure = self.create_block_structure(ChildrenMapTestMixin.LINEAR_CHILDREN_MAP)
@@ -310,3 +319,61 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         self.assertEquals(_get_value(block_structure), 'edit1')
         self.assertEquals(_get_value(new_copy), 'edit2')
+
+    def test_overlay(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        block_structure.set_transformer_block_field(1, 'transformer', 'test_key', 'original_value')
+        block_structure.set_transformer_data('transformer', 'test_key', 'original_value')
+        block_structure.override_xblock_field(1, 'display_name', 'original_name')
+        block_structure._get_or_create_block(3)
+        block_structure.set_transformer_block_field(4, 'transformer', 'test_key', 'original_value')
+        block_structure.set_transformer_block_field(4, 'other_transformer', 'test_key', 'original_value')
+        block_structure.override_xblock_field(4, 'display_name', 'original_name')
+
+        overlay = block_structure.create_overlay()
+        self.assertEquals(block_structure.root_block_usage_key, overlay.root_block_usage_key)
+        self.assert_block_structure(overlay, ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+
+        # verify edits to the overlay do not affect the original
+        overlay.set_transformer_block_field(1, 'transformer', 'test_key', 'edit')
+        overlay.set_transformer_block_field(2, 'transformer', 'test_key', 'new_value')
+        overlay.set_transformer_data('transformer', 'test_key', 'edit')
+        overlay.override_xblock_field(1, 'display_name', 'overridden_name')
+        overlay.remove_transformer_block_field(1, 'transformer', 'test_key')
+        overlay.set_root_block(1)
+        overlay._prune_unreachable()
+
+        self.assert_block_structure(overlay, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+        self.assertEquals(overlay.get_xblock_field(1, 'display_name'), 'overridden_name')
+        self.assertIsNone(overlay.get_transformer_block_field(1, 'transformer', 'test_key'))
+        self.assertEquals(overlay.get_transformer_data('transformer', 'test_key'), 'edit')
+
+        self.assert_block_structure(block_structure, ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        self.assertEquals(block_structure.get_xblock_field(1, 'display_name'), 'original_name')
+        self.assertEquals(block_structure.get_transformer_block_field(1, 'transformer', 'test_key'), 'original_value')
+        self.assertIsNone(block_structure.get_transformer_block_field(2, 'transformer', 'test_key'))
+        self.assertEquals(block_structure.get_transformer_data('transformer', 'test_key'), 'original_value')
+
+        # verify unmodified blocks are shared rather than copied
+        self.assertIs(overlay[3], block_structure[3])
+        self.assertIsNot(overlay[1], block_structure[1])
+
+        # verify only the data being updated is copied
+        overlay.set_transformer_block_field(3, 'transformer', 'test_key', 'new_value')
+        self.assertIs(overlay[3].fields, block_structure[3].fields)
+        self.assertIsNone(block_structure.get_transformer_block_field(3, 'transformer', 'test_key'))
+        overlay.set_transformer_block_field(4, 'transformer', 'test_key', 'edit')
+        self.assertIs(overlay[4].fields, block_structure[4].fields)
+        self.assertIs(
+            overlay[4].transformer_data['other_transformer'],
+            block_structure[4].transformer_data['other_transformer'],
+        )
+        self.assertEquals(block_structure.get_transformer_block_field(4, 'transformer', 'test_key'), 'original_value')
+        overlay.override_xblock_field(4, 'display_name', 'overridden_name')
+        self.assertEquals(block_structure.get_xblock_field(4, 'display_name'), 'original_name')
+        self.assertEquals(overlay.get_xblock_field(4, 'display_name'), 'overridden_name')
+
+        # verify the overlay can still be deep-copied
+        new_copy = overlay.copy()
+        self.assert_block_structure(new_copy, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+        self.assertEquals(new_copy.get_xblock_field(1, 'display_name'), 'overridden_name')
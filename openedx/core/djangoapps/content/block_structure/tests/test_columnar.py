@@ -0,0 +1,157 @@
+"""
+Tests for block_structure/columnar.py
+"""
+import threading
+import time
+from copy import deepcopy
+
+import ddt
+from django.test import TestCase
+from mock import patch
+
+from .. import columnar
+from ..block_structure import BlockStructureBlockData
+from ..exceptions import BlockStructureSerializationError
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar serialization of block structures.
+    """
+    shard = 2
+
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map, with
+        xBlock fields and transformer data set on its blocks.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        block_structure.set_transformer_data(MockTransformer, 'structure_key', {'some': 'data'})
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+            block_data.display_name = u'Block {}'.format(block_id)
+            if block_id % 2:
+                block_data.graded = True
+                block_structure.set_transformer_block_field(block_key, MockTransformer, 'odd', block_id)
+        return block_structure
+
+    def assert_block_data_equal(self, block_structure, expected_block_structure):
+        """
+        Verifies that the collected data of both block structures is equal.
+        """
+        self.assertEqual(
+            block_structure.get_transformer_data(MockTransformer, 'structure_key'),
+            expected_block_structure.get_transformer_data(MockTransformer, 'structure_key'),
+        )
+        self.assertEqual(
+            set(key for key, _ in block_structure.iteritems()),
+            set(key for key, _ in expected_block_structure.iteritems()),
+        )
+        for block_key, expected_block_data in expected_block_structure.iteritems():
+            block_data = block_structure[block_key]
+            self.assertEqual(block_data.location, block_key)
+            self.assertEqual(block_data.fields, expected_block_data.fields)
+            self.assertEqual(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'odd'),
+                expected_block_structure.get_transformer_block_field(block_key, MockTransformer, 'odd'),
+            )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        serialized_data = columnar.serialize(block_structure)
+        self.assertTrue(columnar.is_columnar(serialized_data))
+
+        deserialized = columnar.deserialize(serialized_data, block_structure.root_block_usage_key)
+        self.assert_block_structure(deserialized, children_map)
+        self.assert_block_data_equal(deserialized, block_structure)
+
+    def test_lazy_block_data(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = columnar.deserialize(
+            columnar.serialize(block_structure), block_structure.root_block_usage_key,
+        )
+        block_data_map = deserialized._block_data_map  # pylint: disable=protected-access
+        self.assertIsInstance(block_data_map, columnar.ColumnarBlockDataMap)
+        self.assertEqual(block_data_map._block_data, [None] * len(self.SIMPLE_CHILDREN_MAP))  # pylint: disable=protected-access
+
+        self.assertEqual(deserialized.get_xblock_field(self.block_key_factory(1), 'display_name'), u'Block 1')
+        self.assertEqual(
+            len([block_data for block_data in block_data_map._block_data if block_data]),  # pylint: disable=protected-access
+            1,
+        )
+
+    def test_mutations(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = columnar.deserialize(
+            columnar.serialize(block_structure), block_structure.root_block_usage_key,
+        )
+        deserialized.override_xblock_field(self.block_key_factory(2), 'display_name', u'Overridden')
+        deserialized.remove_block(self.block_key_factory(1), keep_descendants=False)
+        deserialized._prune_unreachable()  # pylint: disable=protected-access
+
+        self.assert_block_structure(deserialized, [[2], [], [], [], []], missing_blocks=[1, 3, 4])
+        self.assertEqual(deserialized.get_xblock_field(self.block_key_factory(2), 'display_name'), u'Overridden')
+        self.assertIsNone(deserialized.get_xblock_field(self.block_key_factory(1), 'display_name'))
+
+        copied = deepcopy(deserialized._block_data_map)  # pylint: disable=protected-access
+        self.assertEqual(copied[self.block_key_factory(2)].display_name, u'Overridden')
+        self.assertNotIn(self.block_key_factory(1), copied)
+
+    def test_concurrent_reads(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = columnar.deserialize(
+            columnar.serialize(block_structure), block_structure.root_block_usage_key,
+        )
+        block_keys = [self.block_key_factory(block_id) for block_id in range(len(self.SIMPLE_CHILDREN_MAP))]
+        decode_column = columnar._decode_column  # pylint: disable=protected-access
+
+        def slow_decode_column(encoded_column):
+            """
+            Decodes the column slowly, so that all the threads read the map before it is decoded.
+            """
+            time.sleep(0.01)
+            return decode_column(encoded_column)
+
+        read_block_data = []
+
+        def read_blocks():
+            """
+            Reads the data of all the blocks.
+            """
+            read_block_data.append([deserialized[block_key] for block_key in block_keys])
+
+        with patch.object(columnar, '_decode_column', side_effect=slow_decode_column) as mock_decode_column:
+            threads = [threading.Thread(target=read_blocks) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Each column was decoded once, and each thread got the same BlockData.
+        self.assertEqual(mock_decode_column.call_count, 3)
+        self.assertEqual(len(read_block_data), 4)
+        for block_data in read_block_data[1:]:
+            for block_data_of_thread, expected_block_data in zip(block_data, read_block_data[0]):
+                self.assertIs(block_data_of_thread, expected_block_data)
+        self.assert_block_data_equal(deserialized.copy(), block_structure)
+
+    def test_unsupported_block_keys(self):
+        block_structure = BlockStructureBlockData(root_block_usage_key=0)
+        with self.assertRaises(BlockStructureSerializationError):
+            columnar.serialize(block_structure)
+
+    def test_unsupported_version(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = columnar.serialize(block_structure)
+        serialized_data = columnar.MAGIC + chr(columnar.VERSION + 1) + serialized_data[len(columnar.MAGIC) + 1:]
+        with self.assertRaises(BlockStructureSerializationError):
+            columnar.deserialize(serialized_data, block_structure.root_block_usage_key)
@@ -71,6 +71,43 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.transformers.transform(block_structure=MagicMock())
             self.assertTrue(mock_transform_call.called)
 
+    def test_transform_timing(self):
+        self.add_mock_transformer()
+
+        with patch('openedx.core.djangoapps.content.block_structure.transformers.accumulate') as mock_accumulate:
+            self.transformers.transform(block_structure=MagicMock())
+
+        metric_names = set(call[0][0] for call in mock_accumulate.call_args_list)
+        self.assertEquals(
+            metric_names,
+            {
+                'block_structure.transform.{}'.format(name)
+                for name in ['MockTransformer', 'MockFilteringTransformer', 'filter_traversal', 'prune_unreachable']
+            },
+        )
+
+    def test_compile_filters(self):
+        calls = []
+
+        def create_filter(name, result):
+            """
+            Returns a filter function that records its calls.
+            """
+            def filter_func(block_key):  # pylint: disable=missing-docstring
+                calls.append((name, block_key))
+                return result
+            return filter_func
+
+        combined_filter = BlockStructureTransformers._compile_filters(  # pylint: disable=protected-access
+            [create_filter('first', True), create_filter('second', False), create_filter('third', True)]
+        )
+        self.assertFalse(combined_filter(1))
+        self.assertEquals(calls, [('first', 1), ('second', 1)])
+
+        single_filter = create_filter('single', True)
+        self.assertIs(BlockStructureTransformers._compile_filters([single_filter]), single_filter)  # pylint: disable=protected-access
+        self.assertTrue(BlockStructureTransformers._compile_filters([])(1))  # pylint: disable=protected-access
+
     def test_verify_versions(self):
         block_structure = self.create_block_structure(
             self.SIMPLE_CHILDREN_MAP,
@@ -0,0 +1,107 @@
+"""
+Unit tests for the warmer of stale block structures.
+"""
+from datetime import datetime, timedelta
+
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+from pytz import UTC
+
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from student.tests.factories import CourseEnrollmentFactory
+
+from .. import warmer
+from ..block_structure import BlockStructureBlockData
+from ..models import BlockStructureModel
+from ..tasks import warm_stale_block_structures
+from ..transformer_registry import TransformerRegistry
+
+
+class BlockStructureWarmerTestCase(CacheIsolationTestCase):
+    """
+    Tests for detecting and recollecting stale block structures.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(BlockStructureWarmerTestCase, self).setUp()
+        self.up_to_date_course_key = self._create_model('up_to_date')
+        self.stale_course_keys = [
+            self._create_model('stale_{}'.format(index), transformers_schema_version=u'outdated')
+            for index in range(3)
+        ]
+        self.stale_course_keys.append(
+            self._create_model('stale_schema', block_structure_schema_version=u'outdated')
+        )
+
+    def _create_model(self, run, **version_fields):
+        """
+        Creates a BlockStructureModel for a new course with the given
+        version fields, which are up to date by default, and returns the
+        key of the course.
+        """
+        course_key = CourseLocator('org', 'course', run)
+        fields = dict(
+            transformers_schema_version=TransformerRegistry.get_write_version_hash(),
+            block_structure_schema_version=unicode(BlockStructureBlockData.VERSION),
+        )
+        fields.update(version_fields)
+        BlockStructureModel.objects.create(data_usage_key=course_key.make_usage_key('course', 'course'), **fields)
+        return course_key
+
+    def _enroll(self, course_key, num_enrollments):
+        """
+        Enrolls num_enrollments new learners in the given course.
+        """
+        for _ in range(num_enrollments):
+            CourseEnrollmentFactory(course_id=unicode(course_key))
+
+    def test_get_stale_course_keys(self):
+        self.assertItemsEqual(warmer.get_stale_course_keys(), self.stale_course_keys)
+
+    def test_prioritize(self):
+        self._enroll(self.stale_course_keys[2], 2)
+        self._enroll(self.stale_course_keys[1], 1)
+        self.assertEqual(
+            warmer.prioritize(self.stale_course_keys, enrollment_window_days=7),
+            [self.stale_course_keys[index] for index in (2, 1, 0, 3)],
+        )
+
+    def test_concurrency(self):
+        course_keys, progress = warmer.get_course_keys_to_warm(concurrency=2, enrollment_window_days=7)
+        self.assertEqual(course_keys, self.stale_course_keys[:2])
+        self.assertEqual(progress, {u'stale': 4, u'in_flight': 2, u'enqueued': 2})
+
+        # nothing else is enqueued while both are in flight
+        course_keys, progress = warmer.get_course_keys_to_warm(concurrency=2, enrollment_window_days=7)
+        self.assertEqual(course_keys, [])
+        self.assertEqual(progress, {u'stale': 4, u'in_flight': 2, u'enqueued': 0})
+
+        # once recollected, the next ones are enqueued
+        BlockStructureModel.objects.filter(
+            data_usage_key=self.stale_course_keys[0].make_usage_key('course', 'course'),
+        ).update(transformers_schema_version=TransformerRegistry.get_write_version_hash())
+        course_keys, progress = warmer.get_course_keys_to_warm(concurrency=2, enrollment_window_days=7)
+        self.assertEqual(course_keys, self.stale_course_keys[2:3])
+        self.assertEqual(progress, {u'stale': 3, u'in_flight': 2, u'enqueued': 1})
+
+    def test_in_flight_timeout(self):
+        warmer.get_course_keys_to_warm(concurrency=1, enrollment_window_days=7)
+        expired = datetime.now(UTC) + warmer.IN_FLIGHT_TIMEOUT + timedelta(minutes=1)
+        with patch.object(warmer, 'datetime') as mock_datetime:
+            mock_datetime.now.return_value = expired
+            course_keys, _ = warmer.get_course_keys_to_warm(concurrency=1, enrollment_window_days=7)
+        self.assertEqual(course_keys, self.stale_course_keys[:1])
+
+    @patch('openedx.core.djangoapps.content.block_structure.tasks.update_course_in_cache_v2.apply_async')
+    def test_task(self, mock_apply_async):
+        with self.settings(BLOCK_STRUCTURES_SETTINGS=dict(WARMER_CONCURRENCY=3, WARMER_ENROLLMENT_WINDOW_DAYS=7)):
+            progress = warm_stale_block_structures.apply(kwargs=dict(routing_key='warmer')).get()
+
+        self.assertEqual(progress, {u'stale': 4, u'in_flight': 3, u'enqueued': 3})
+        self.assertEqual(
+            [call[1]['kwargs'] for call in mock_apply_async.call_args_list],
+            [dict(course_id=unicode(course_key), with_storage=True) for course_key in self.stale_course_keys[:3]],
+        )
+        for call in mock_apply_async.call_args_list:
+            self.assertEqual(call[1]['routing_key'], 'warmer')
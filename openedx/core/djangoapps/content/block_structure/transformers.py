@@ -1,8 +1,12 @@
 """
 Module for a collection of BlockStructureTransformers.
 """
-import functools
-from logging import getLogger
+from collections import defaultdict
+from contextlib import contextmanager
+from logging import DEBUG, getLogger
+from time import time
+
+from edx_django_utils.monitoring import accumulate
 
 from .exceptions import TransformerException, TransformerDataIncompatible
 from .transformer import FilteringTransformerMixin
@@ -111,14 +115,30 @@ class BlockStructureTransformers(object):
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
         the order that they were added.
+
+        The time spent in each transformer is accumulated in the
+        "block_structure.transform.<transformer name>" custom metrics. The
+        time spent evaluating the filters of filtering transformers, which
+        share a single traversal, is only broken down per transformer when
+        debug logging is enabled, since timing every filter call is costly.
         """
-        self._transform_with_filters(block_structure)
-        self._transform_without_filters(block_structure)
+        durations = defaultdict(float)
+        self._transform_with_filters(block_structure, durations)
+        self._transform_without_filters(block_structure, durations)
 
         # Prune the block structure to remove any unreachable blocks.
-        block_structure._prune_unreachable()  # pylint: disable=protected-access
+        with _timer(durations, 'prune_unreachable'):
+            block_structure._prune_unreachable()  # pylint: disable=protected-access
+
+        for name, duration in durations.iteritems():
+            accumulate(u'block_structure.transform.{}'.format(name), duration)
+        logger.debug(
+            u'BlockStructure: Transformed %s in %s.',
+            block_structure.root_block_usage_key,
+            u', '.join(u'{}: {:.2f}ms'.format(name, duration * 1000) for name, duration in sorted(durations.items())),
+        )
 
-    def _transform_with_filters(self, block_structure):
+    def _transform_with_filters(self, block_structure, durations):
         """
         Transforms the given block_structure using the transform_block_filters
         method from the given transformers.
@@ -126,28 +146,82 @@ class BlockStructureTransformers(object):
         if not self._transformers['supports_filter']:
             return
 
+        time_filters = logger.isEnabledFor(DEBUG)
         filters = []
         for transformer in self._transformers['supports_filter']:
-            filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
+            with _timer(durations, transformer.name()):
+                transformer_filters = transformer.transform_block_filters(self.usage_info, block_structure)
+            if time_filters:
+                transformer_filters = [
+                    _timed_filter(filter_func, durations, transformer.name()) for filter_func in transformer_filters
+                ]
+            filters.extend(transformer_filters)
 
-        combined_filters = functools.reduce(
-            self._filter_chain,
-            filters,
-            block_structure.create_universal_filter()
-        )
-        block_structure.filter_topological_traversal(combined_filters)
+        if filters:
+            with _timer(durations, 'filter_traversal'):
+                block_structure.filter_topological_traversal(self._compile_filters(filters))
 
-    def _filter_chain(self, accumulated, additional):
+    @staticmethod
+    def _compile_filters(filters):
         """
-        Given two functions that take a block_key and return a boolean, yield
-        a function that takes a block key, and 'ands' the functions together
+        Given a list of functions that take a block_key and return a boolean,
+        returns a single function that 'ands' them together, evaluating them
+        in order and short-circuiting at the first one that returns False.
+
+        Unlike chaining the functions pairwise, this doesn't nest a closure
+        per filter function, so each block is evaluated in a single loop.
         """
-        return lambda block_key: accumulated(block_key) and additional(block_key)
+        if len(filters) == 1:
+            return filters[0]
 
-    def _transform_without_filters(self, block_structure):
+        filters = tuple(filters)
+
+        def combined_filter(block_key):
+            """
+            Returns whether all filters retain the given block.
+            """
+            for filter_func in filters:
+                if not filter_func(block_key):
+                    return False
+            return True
+
+        return combined_filter
+
+    def _transform_without_filters(self, block_structure, durations):
         """
         Transforms the given block_structure using the transform
         method from the given transformers.
         """
         for transformer in self._transformers['no_filter']:
-            transformer.transform(self.usage_info, block_structure)
+            with _timer(durations, transformer.name()):
+                transformer.transform(self.usage_info, block_structure)
+
+
+@contextmanager
+def _timer(durations, name):
+    """
+    Context manager that adds the time spent in its block to
+    durations[name].
+    """
+    start = time()
+    try:
+        yield
+    finally:
+        durations[name] += time() - start
+
+
+def _timed_filter(filter_func, durations, name):
+    """
+    Returns a filter function that adds the time spent in the given
+    filter_func to durations[name].
+    """
+    def timed_filter(block_key):
+        """
+        Evaluates and times the wrapped filter function.
+        """
+        start = time()
+        try:
+            return filter_func(block_key)
+        finally:
+            durations[name] += time() - start
+    return timed_filter
@@ -0,0 +1,99 @@
+"""
+Detection of stored block structures that are outdated because the schema of
+the transformers or of the block structure changed, so that they can be
+recollected ahead of the first requests for them.
+"""
+from datetime import datetime, timedelta
+from logging import getLogger
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from pytz import UTC
+
+from student.models import CourseEnrollment
+
+from .block_structure import BlockStructureBlockData
+from .models import BlockStructureModel
+from .transformer_registry import TransformerRegistry
+
+
+log = getLogger(__name__)
+
+# Cache key of the courses whose recollection was enqueued by the warmer and
+# hasn't been seen to complete yet, mapped to the time they were enqueued.
+IN_FLIGHT_CACHE_KEY = u'block_structure.warmer.in_flight'
+
+# Courses still not recollected this long after being enqueued are assumed to
+# have failed, and are enqueued again.
+IN_FLIGHT_TIMEOUT = timedelta(hours=1)
+
+
+def get_stale_course_keys():
+    """
+    Returns the keys of the courses whose stored block structures were
+    collected with a different schema than the current one.
+    """
+    stale_models = BlockStructureModel.objects.filter(
+        ~Q(transformers_schema_version=TransformerRegistry.get_write_version_hash()) |
+        ~Q(block_structure_schema_version=unicode(BlockStructureBlockData.VERSION))
+    )
+    return [usage_key.course_key for usage_key in stale_models.values_list('data_usage_key', flat=True)]
+
+
+def prioritize(course_keys, enrollment_window_days):
+    """
+    Returns the given course keys ordered by decreasing number of
+    enrollments in the last enrollment_window_days days.
+    """
+    since = datetime.now(UTC) - timedelta(days=enrollment_window_days)
+    recent_enrollments = {
+        unicode(enrollment['course_id']): enrollment['num_enrollments']
+        for enrollment in CourseEnrollment.objects.filter(
+            course_id__in=course_keys,
+            created__gte=since,
+        ).values('course_id').annotate(num_enrollments=Count('id'))
+    }
+    return sorted(
+        course_keys,
+        key=lambda course_key: (-recent_enrollments.get(unicode(course_key), 0), unicode(course_key)),
+    )
+
+
+def get_course_keys_to_warm(concurrency, enrollment_window_days):
+    """
+    Returns the keys of the stale courses to recollect next, in priority
+    order, so that no more than concurrency of them are being recollected
+    at once, and records them as being recollected.
+
+    Returns:
+        (list of CourseKey, dict) - The keys of the courses to recollect,
+            and the progress of the warmer.
+    """
+    stale_course_keys = prioritize(get_stale_course_keys(), enrollment_window_days)
+    stale_course_ids = set(unicode(course_key) for course_key in stale_course_keys)
+
+    # Courses that are no longer stale were recollected.
+    now = datetime.now(UTC)
+    in_flight = {
+        course_id: enqueued_at
+        for course_id, enqueued_at in cache.get(IN_FLIGHT_CACHE_KEY, {}).iteritems()
+        if course_id in stale_course_ids and now - enqueued_at < IN_FLIGHT_TIMEOUT
+    }
+
+    course_keys_to_warm = [
+        course_key for course_key in stale_course_keys if unicode(course_key) not in in_flight
+    ][:max(concurrency - len(in_flight), 0)]
+    for course_key in course_keys_to_warm:
+        in_flight[unicode(course_key)] = now
+    cache.set(IN_FLIGHT_CACHE_KEY, in_flight, None)
+
+    progress = {
+        u'stale': len(stale_course_keys),
+        u'in_flight': len(in_flight),
+        u'enqueued': len(course_keys_to_warm),
+    }
+    log.info(
+        u'BlockStructure: Warmer found %(stale)d stale courses, enqueued %(enqueued)d, %(in_flight)d in flight.',
+        progress,
+    )
+    return course_keys_to_warm, progress
@@ -3,9 +3,14 @@ Declaration of CourseOverview model
 """
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from copy import copy
 from urlparse import urlparse, urlunparse
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models.fields import BooleanField, DateTimeField, DecimalField, TextField, FloatField, IntegerField
 from django.db.utils import IntegrityError
@@ -21,6 +26,7 @@ from lms.djangoapps import django_comment_client
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
 from openedx.core.djangoapps.lang_pref.api import get_closest_released_language
 from openedx.core.djangoapps.models.course_details import CourseDetails
+from openedx.core.lib.cache_utils import CacheVersion
 from static_replace.models import AssetBaseUrlConfig
 from xmodule import course_metadata_utils, block_metadata_utils
 from xmodule.course_module import CourseDescriptor, DEFAULT_START_DATE
@@ -264,15 +270,22 @@ class CourseOverview(TimeStampedModel):
             else:
                 raise cls.DoesNotExist()
 
+    # The course overviews loaded by this process, least recently used first,
+    # by course id and version, with the versions of their cache entries.
+    _process_cache = OrderedDict()
+    _process_cache_lock = threading.Lock()
+    # Versions of the course overviews kept by processes, by course id.
+    cache_versions = CacheVersion(u'course_overviews.cache_version')
+
     @classmethod
     def get_from_id(cls, course_id):
         """
         Load a CourseOverview object for a given course ID.
 
-        First, we try to load the CourseOverview from the database. If it
-        doesn't exist, we load the entire course from the modulestore, create a
-        CourseOverview object from it, and then cache it in the database for
-        future use.
+        First, we try to load the CourseOverview from the memory of the
+        process, then from the database. If it doesn't exist, we load the
+        entire course from the modulestore, create a CourseOverview object from
+        it, and then cache it in the database for future use.
 
         Arguments:
             course_id (CourseKey): the ID of the course overview to be loaded.
@@ -286,22 +299,90 @@ class CourseOverview(TimeStampedModel):
             - IOError if some other error occurs while trying to load the
                 course from the module store.
         """
+        process_cache_size = settings.COURSE_OVERVIEWS_SETTINGS['PROCESS_CACHE_SIZE']
+        if not process_cache_size:
+            return cls._get_from_db_or_module_store(course_id)
+
+        # The cache version is read first, so that an overview updated in the
+        # meantime isn't kept under the new version.
+        cache_version = cls.cache_versions.get(course_id)
+        process_cache_key = (course_id, cls.VERSION)
+        with cls._process_cache_lock:
+            cached = cls._process_cache.pop(process_cache_key, None)
+            if cached is not None and cached[0] == cache_version:
+                cls._process_cache[process_cache_key] = cached
+                return cached[1]._copy()  # pylint: disable=protected-access
+
+        course_overview = cls._get_from_db_or_module_store(course_id)
+        # Without a shared cache version, e.g. with a dummy cache, overviews can't be kept.
+        if cache_version is not None and course_overview.version >= cls.VERSION:
+            with cls._process_cache_lock:
+                cls._process_cache[process_cache_key] = (cache_version, course_overview)
+                while len(cls._process_cache) > process_cache_size:
+                    cls._process_cache.popitem(last=False)
+        return course_overview._copy()  # pylint: disable=protected-access
+
+    def _copy(self):
+        """
+        Returns a copy of this CourseOverview, with its own model state, that
+        can be updated without affecting the one kept by the process.
+        """
+        course_overview = copy(self)
+        course_overview._state = copy(self._state)  # pylint: disable=protected-access
+        return course_overview
+
+    @classmethod
+    def _get_from_db_or_module_store(cls, course_id):
+        """
+        Load a CourseOverview object for a given course ID from the database,
+        or generate it from the modulestore if it doesn't exist or is outdated.
+        """
         try:
             course_overview = cls.objects.select_related('image_set').get(id=course_id)
-            if course_overview.version < cls.VERSION:
-                # Throw away old versions of CourseOverview, as they might contain stale data.
-                course_overview.delete()
-                course_overview = None
         except cls.DoesNotExist:
             course_overview = None
 
+        if course_overview is None or course_overview.version < cls.VERSION:
+            return cls._regenerate(course_id, course_overview)
+
         # Regenerate the thumbnail images if they're missing (either because
         # they were never generated, or because they were flushed out after
         # a change to CourseOverviewImageConfig.
-        if course_overview and not hasattr(course_overview, 'image_set'):
+        if not hasattr(course_overview, 'image_set'):
             CourseOverviewImageSet.create(course_overview)
 
-        return course_overview or cls.load_from_module_store(course_id)
+        return course_overview
+
+    @classmethod
+    def _regenerate(cls, course_id, outdated_course_overview):
+        """
+        Load the CourseOverview of the given course from the modulestore,
+        unless another process is already doing so.
+
+        While another process generates it, the outdated CourseOverview is
+        returned if there is one; otherwise the new one is waited for.
+        """
+        overviews_settings = settings.COURSE_OVERVIEWS_SETTINGS
+        lock_key = u'course_overviews.regenerating.{}'.format(course_id)
+        if not cache.add(lock_key, True, overviews_settings['REGENERATION_LOCK_TIMEOUT']):
+            if outdated_course_overview is not None:
+                return outdated_course_overview
+
+            deadline = time.time() + overviews_settings['REGENERATION_WAIT']
+            while cache.get(lock_key) is not None and time.time() < deadline:
+                time.sleep(0.1)
+            course_overview = cls.get_from_id_if_exists(course_id)
+            if course_overview is not None:
+                return course_overview
+            log.info('Course overview of %s not generated by another process, generating it.', unicode(course_id))
+            return cls.load_from_module_store(course_id)
+
+        try:
+            # The outdated CourseOverview is updated in place, so that other
+            # processes keep serving it until the new one is saved.
+            return cls.load_from_module_store(course_id)
+        finally:
+            cache.delete(lock_key)
 
     @classmethod
     def get_from_ids_if_exists(cls, course_ids):
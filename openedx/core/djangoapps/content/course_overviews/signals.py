@@ -3,10 +3,11 @@ Signal handler for invalidating cached course overviews
 """
 import logging
 
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import Signal
 from django.dispatch.dispatcher import receiver
 
-from .models import CourseOverview
+from .models import CourseOverview, CourseOverviewImageSet
 from xmodule.modulestore.django import SignalHandler
 
 LOG = logging.getLogger(__name__)
@@ -40,6 +41,19 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     CourseAboutSearchIndexer.remove_deleted_items(course_key)
 
 
+@receiver(post_save, sender=CourseOverview)
+@receiver(post_delete, sender=CourseOverview)
+@receiver(post_save, sender=CourseOverviewImageSet)
+@receiver(post_delete, sender=CourseOverviewImageSet)
+def _listen_for_course_overview_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Catches the changes of CourseOverviews, including when their course is
+    published or deleted, and invalidates the copies kept by processes.
+    """
+    course_key = instance.id if sender is CourseOverview else instance.course_overview_id
+    CourseOverview.cache_versions.change(course_key)
+
+
 def _check_for_course_changes(previous_course_overview, updated_course_overview):
     if previous_course_overview:
         _check_for_course_date_changes(previous_course_overview, updated_course_overview)
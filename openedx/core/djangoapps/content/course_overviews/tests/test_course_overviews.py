@@ -10,9 +10,11 @@ import mock
 import pytz
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db.utils import IntegrityError
 from django.test.utils import override_settings
 from django.utils import timezone
+from edx_django_utils.cache import RequestCache
 from PIL import Image
 
 from lms.djangoapps.certificates.api import get_active_web_certificate
@@ -432,8 +434,8 @@ class CourseOverviewTestCase(CatalogIntegrationMixin, ModuleStoreTestCase, Cache
             overview_v10.save()
 
             # Now we're going to ask for it again. Because 9 < 10, we expect
-            # that this entry will be deleted() and that we'll get back a new
-            # entry with version = 10 again.
+            # that this entry will be updated and that we'll get it back with
+            # version = 10 again.
             updated_overview = CourseOverview.get_from_id(course.id)
             self.assertEqual(updated_overview.version, 10)
 
@@ -1073,3 +1075,146 @@ class CourseOverviewTabTestCase(ModuleStoreTestCase):
             actual_tabs = {tab.tab_id for tab in course_overview.tabs.all()}
             self.assertEqual(actual_tabs, expected_tabs)
             self.assertNotEqual(course_overview.display_name, course.display_name)
+
+
+@override_settings(COURSE_OVERVIEWS_SETTINGS=dict(
+    PROCESS_CACHE_SIZE=2,
+    REGENERATION_LOCK_TIMEOUT=60,
+    REGENERATION_WAIT=10,
+))
+class CourseOverviewProcessCacheTestCase(ModuleStoreTestCase):
+    """
+    Tests for keeping CourseOverviews in the memory of the process, and for
+    generating them in a single process at once.
+    """
+    shard = 3
+
+    ENABLED_SIGNALS = ['course_published']
+
+    def setUp(self):
+        super(CourseOverviewProcessCacheTestCase, self).setUp()
+        self.course = CourseFactory.create()
+        CourseOverview.load_from_module_store(self.course.id)
+        CourseOverview._process_cache.clear()  # pylint: disable=protected-access
+        self.addCleanup(CourseOverview._process_cache.clear)  # pylint: disable=protected-access
+        RequestCache.clear_all_namespaces()
+
+    def _regeneration_lock_key(self, course_key):
+        """
+        Returns the cache key of the lock held while generating the overview of a course.
+        """
+        return u'course_overviews.regenerating.{}'.format(course_key)
+
+    def test_kept_in_process(self):
+        course_overview = CourseOverview.get_from_id(self.course.id)
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(0):
+            cached_course_overview = CourseOverview.get_from_id(self.course.id)
+        self.assertEqual(cached_course_overview.display_name, course_overview.display_name)
+        self.assertIsNot(cached_course_overview, course_overview)
+        self.assertIsNot(cached_course_overview._state, course_overview._state)  # pylint: disable=protected-access
+
+    def test_copy_state_not_shared(self):
+        course_overview = CourseOverview.get_from_id(self.course.id)
+        course_overview._state.db = 'other'  # pylint: disable=protected-access
+        RequestCache.clear_all_namespaces()
+        cached_course_overview = CourseOverview.get_from_id(self.course.id)
+        self.assertEqual(cached_course_overview._state.db, 'default')  # pylint: disable=protected-access
+
+    def test_invalidated_on_save(self):
+        course_overview = CourseOverview.get_from_id(self.course.id)
+        course_overview.display_name = u'Saved display name'
+        course_overview.save()
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, u'Saved display name')
+
+    def test_invalidated_on_publish(self):
+        CourseOverview.get_from_id(self.course.id)
+        self.course.display_name = u'Published display name'
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            self.store.update_item(self.course, ModuleStoreEnum.UserID.test)
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, u'Published display name')
+
+    def test_least_recently_used_evicted(self):
+        other_course_keys = [CourseFactory.create().id for __ in range(2)]
+        for course_key in other_course_keys:
+            CourseOverview.load_from_module_store(course_key)
+        RequestCache.clear_all_namespaces()
+
+        with mock.patch.object(
+            CourseOverview, '_get_from_db_or_module_store', wraps=CourseOverview._get_from_db_or_module_store
+        ) as mock_get:
+            for course_key in [self.course.id, other_course_keys[0], self.course.id, other_course_keys[1]]:
+                CourseOverview.get_from_id(course_key)
+            self.assertEqual(mock_get.call_count, 3)
+
+            CourseOverview.get_from_id(self.course.id)
+            self.assertEqual(mock_get.call_count, 3)
+            CourseOverview.get_from_id(other_course_keys[0])
+            self.assertEqual(mock_get.call_count, 4)
+
+    def test_outdated_served_while_regenerating(self):
+        course_overview = CourseOverview.get_from_id(self.course.id)
+        course_overview.version = CourseOverview.VERSION - 1
+        course_overview.save()
+        cache.add(self._regeneration_lock_key(self.course.id), True)
+
+        with mock.patch.object(CourseOverview, 'load_from_module_store') as mock_load:
+            outdated_course_overview = CourseOverview.get_from_id(self.course.id)
+        self.assertEqual(outdated_course_overview.version, CourseOverview.VERSION - 1)
+        self.assertFalse(mock_load.called)
+
+        cache.delete(self._regeneration_lock_key(self.course.id))
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).version, CourseOverview.VERSION)
+
+    def test_outdated_kept_while_regenerating(self):
+        course_overview = CourseOverview.get_from_id(self.course.id)
+        course_overview.version = CourseOverview.VERSION - 1
+        course_overview.save()
+        load_from_module_store = CourseOverview.load_from_module_store
+
+        def _load_while_other_process_reads(course_id):
+            """
+            Checks that the outdated overview can still be read while the new one is loaded.
+            """
+            self.assertEqual(
+                CourseOverview.objects.get(id=course_id).version, CourseOverview.VERSION - 1
+            )
+            return load_from_module_store(course_id)
+
+        with mock.patch.object(CourseOverview, 'load_from_module_store') as mock_load:
+            mock_load.side_effect = _load_while_other_process_reads
+            self.assertEqual(CourseOverview.get_from_id(self.course.id).version, CourseOverview.VERSION)
+        self.assertTrue(mock_load.called)
+        self.assertEqual(CourseOverview.objects.get(id=self.course.id).version, CourseOverview.VERSION)
+
+    def test_missing_waited_for_while_regenerating(self):
+        CourseOverview.objects.filter(id=self.course.id).delete()
+        lock_key = self._regeneration_lock_key(self.course.id)
+        cache.add(lock_key, True)
+        load_from_module_store = CourseOverview.load_from_module_store
+
+        def _regenerate_in_other_process(_delay):
+            """
+            Generates the overview as another process would, and releases the lock.
+            """
+            load_from_module_store(self.course.id)
+            cache.delete(lock_key)
+
+        with mock.patch('openedx.core.djangoapps.content.course_overviews.models.time.sleep') as mock_sleep:
+            mock_sleep.side_effect = _regenerate_in_other_process
+            with mock.patch.object(CourseOverview, 'load_from_module_store') as mock_load:
+                course_overview = CourseOverview.get_from_id(self.course.id)
+        self.assertEqual(course_overview.id, self.course.id)
+        self.assertFalse(mock_load.called)
+
+    @override_settings(COURSE_OVERVIEWS_SETTINGS=dict(
+        PROCESS_CACHE_SIZE=2,
+        REGENERATION_LOCK_TIMEOUT=60,
+        REGENERATION_WAIT=0,
+    ))
+    def test_missing_generated_after_waiting(self):
+        CourseOverview.objects.filter(id=self.course.id).delete()
+        cache.add(self._regeneration_lock_key(self.course.id), True)
+        self.assertEqual(CourseOverview.get_from_id(self.course.id).id, self.course.id)
@@ -0,0 +1,153 @@
+"""
+A local disk cache of the contents of course assets.
+
+Files are named after the digests of their contents, so they never need to be
+invalidated: an asset whose contents change gets a new digest, and the files
+of old digests are eventually pruned as the least recently used ones.
+
+Enabled by setting CONTENTSERVER_DISK_CACHE['DIRECTORY'].
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+
+from xmodule.assetstore.assetmgr import AssetManager
+
+log = logging.getLogger(__name__)
+
+# Asset digests are the md5 of their contents, as stored by GridFS.
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Minimum number of seconds between two prunings of the cache by a process.
+PRUNE_INTERVAL = 300
+
+_last_pruned_at = 0
+
+
+def _get_setting(name, default=None):
+    """
+    Returns the value of the CONTENTSERVER_DISK_CACHE setting `name`.
+    """
+    return getattr(settings, 'CONTENTSERVER_DISK_CACHE', {}).get(name, default)
+
+
+def is_enabled():
+    """
+    Returns whether the disk cache is configured.
+    """
+    return bool(_get_setting('DIRECTORY'))
+
+
+def get_content_path(content):
+    """
+    Returns the path of a local file holding the contents of the given asset,
+    copying them from the contentstore if needed.
+
+    Returns None if the disk cache is disabled, or can't hold this asset.
+    """
+    digest = getattr(content, 'content_digest', None)
+    if not is_enabled() or not digest or not DIGEST_PATTERN.match(digest):
+        return None
+
+    path = _path_for_digest(digest)
+    try:
+        # Record the access, for pruning.
+        os.utime(path, None)
+        return path
+    except OSError:
+        # Not cached yet, or pruned in the meantime.
+        pass
+
+    try:
+        return _copy_to_disk(content, path)
+    except (IOError, OSError):
+        log.exception(u"Couldn't copy %s to the disk cache", content.location)
+        return None
+
+
+def _path_for_digest(digest):
+    """
+    Returns the path of the file holding the contents with the given digest.
+    """
+    return os.path.join(_get_setting('DIRECTORY'), digest[:2], digest)
+
+
+def _copy_to_disk(content, path):
+    """
+    Copies the contents of the given asset from the contentstore to `path`,
+    and returns it, or None if they don't match the digest of the asset.
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+
+    stream = AssetManager.find(content.location, as_stream=True)
+    md5 = hashlib.md5()
+    # Write to a temporary file first, so that no process serves a partial file.
+    temp_file = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+    try:
+        with temp_file:
+            for chunk in stream.stream_data():
+                md5.update(chunk)
+                temp_file.write(chunk)
+
+        if md5.hexdigest() != content.content_digest:
+            # The asset changed since its metadata was cached.
+            log.info(u"Contents of %s don't match digest %s", content.location, content.content_digest)
+            return None
+        os.rename(temp_file.name, path)
+    finally:
+        stream.close()
+        if os.path.exists(temp_file.name):
+            os.remove(temp_file.name)
+
+    _maybe_prune()
+    return path
+
+
+def _maybe_prune():
+    """
+    Prunes the cache, unless this process did so recently.
+    """
+    global _last_pruned_at  # pylint: disable=global-statement
+    now = time.time()
+    if now - _last_pruned_at >= PRUNE_INTERVAL:
+        _last_pruned_at = now
+        prune(_get_setting('MAX_SIZE'))
+
+
+def prune(max_size):
+    """
+    Deletes the least recently used files of the cache until it holds at most
+    `max_size` bytes.
+    """
+    if not max_size:
+        return
+
+    files = []
+    for dirpath, _, filenames in os.walk(_get_setting('DIRECTORY')):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    total_size = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
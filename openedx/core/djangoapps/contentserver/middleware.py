@@ -4,23 +4,27 @@ Middleware to serve assets.
 
 import logging
 import datetime
+from io import BytesIO
+from uuid import uuid4
 log = logging.getLogger(__name__)
 try:
     import newrelic.agent
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse)
+from django.utils.http import parse_etags, quote_etag
 from six import text_type
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
+from . import disk_cache
 from .caching import get_cached_content, set_cached_content
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
@@ -32,6 +36,10 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Maximum number of ranges served from a Range header, once merged: the full
+# content is served to requests with more.
+MAX_RANGES = 10
+
 
 class StaticContentServer(object):
     """
@@ -108,9 +116,16 @@ class StaticContentServer(object):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
-            # if this asset has changed since then.
+            # if this asset has changed since then.  The digest of the asset, when
+            # known, is a stronger validator than its modification date.
+            etag = self.get_etag(content)
             last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            if etag is not None and 'HTTP_IF_NONE_MATCH' in request.META:
+                if self.etag_matches(request.META['HTTP_IF_NONE_MATCH'], etag):
+                    response = HttpResponseNotModified()
+                    response['ETag'] = etag
+                    return response
+            elif 'HTTP_IF_MODIFIED_SINCE' in request.META:
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
@@ -122,55 +137,59 @@ class StaticContentServer(object):
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
-            if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
-                header_value = request.META['HTTP_RANGE']
-                try:
-                    unit, ranges = parse_range_header(header_value, content.length)
-                except ValueError as exception:
-                    # If the header field is syntactically invalid it should be ignored.
-                    log.exception(
-                        u"%s in Range header: %s for content: %s", text_type(exception), header_value, unicode(loc)
-                    )
-                else:
-                    if unit != 'bytes':
-                        # Only accept ranges in bytes
-                        log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, text_type(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
-                        log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, text_type(loc)
+            try:
+                if request.META.get('HTTP_RANGE'):
+                    header_value = request.META['HTTP_RANGE']
+                    try:
+                        unit, ranges = parse_range_header(header_value, content.length)
+                    except ValueError as exception:
+                        # If the header field is syntactically invalid it should be ignored.
+                        log.exception(
+                            u"%s in Range header: %s for content: %s", text_type(exception), header_value, unicode(loc)
                         )
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
-                            response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
-                                first=first, last=last, length=content.length
-                            )
-                            response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
-                        else:
+                        if unit != 'bytes':
+                            # Only accept ranges in bytes
                             log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s",
-                                header_value, text_type(loc)
+                                u"Unknown unit in Range header: %s for content: %s", header_value, text_type(loc)
                             )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
-
-            # If Range header is absent or syntactically invalid return a full content response.
-            if response is None:
-                response = HttpResponse(content.stream_data())
-                response['Content-Length'] = content.length
+                        else:
+                            # Unsatisfiable ranges are left out of the response.
+                            ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                            if not ranges:
+                                log.warning(
+                                    u"Cannot satisfy ranges in Range header: %s for content: %s",
+                                    header_value, text_type(loc)
+                                )
+                                return HttpResponse(status=416)  # Requested Range Not Satisfiable
+
+                            ranges = merge_ranges(ranges)
+                            if len(ranges) > MAX_RANGES:
+                                log.warning(
+                                    u"Too many ranges in Range header: %s for content: %s",
+                                    header_value, text_type(loc)
+                                )
+                            else:
+                                response = self.get_range_response(self.open_content_stream(content, loc), ranges)
+                                if newrelic:
+                                    newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+
+                # If Range header is absent, syntactically invalid or has too many ranges,
+                # return a full content response.
+                if response is None:
+                    content_path = disk_cache.get_content_path(content)
+                    if content_path is not None:
+                        # Lets the WSGI server send the file without reading it into Python.
+                        response = FileResponse(open(content_path, 'rb'), content_type=content.content_type)
+                    else:
+                        if content.data is None and not isinstance(content, StaticContentStream):
+                            # Only the metadata of this asset was cached.
+                            content = AssetManager.find(loc, as_stream=True)
+                        response = HttpResponse(content.stream_data(), content_type=content.content_type)
+                    response['Content-Length'] = content.length
+            except (ItemNotFoundError, NotFoundError):
+                # The asset was deleted since its metadata was cached.
+                return HttpResponseNotFound()
 
             if newrelic:
                 newrelic.agent.add_custom_parameter('contentserver.content_len', content.length)
@@ -178,7 +197,6 @@ class StaticContentServer(object):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
             response['X-Frame-Options'] = 'ALLOW'
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
@@ -215,6 +233,9 @@ class StaticContentServer(object):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        etag = self.get_etag(content)
+        if etag is not None:
+            response['ETag'] = etag
 
         # Force the Vary header to only vary responses on Origin, so that XHR and browser requests get cached
         # separately and don't screw over one another. i.e. a browser request that doesn't send Origin, and
@@ -243,6 +264,86 @@ class StaticContentServer(object):
         expire_dt = now + datetime.timedelta(seconds=cache_ttl)
         return expire_dt.strftime(HTTP_DATE_FORMAT)
 
+    @staticmethod
+    def get_etag(content):
+        """
+        Returns the ETag of the given content, based on its digest, or None if
+        its digest is unknown.
+        """
+        content_digest = getattr(content, "content_digest", None)
+        if not content_digest:
+            return None
+        return quote_etag(content_digest)
+
+    @staticmethod
+    def etag_matches(if_none_match, etag):
+        """
+        Determines whether an If-None-Match header value matches the given ETag.
+
+        If-None-Match uses the weak comparison: W/ prefixes are ignored.
+        """
+        etags = parse_etags(if_none_match)
+        if etags == ['*']:
+            return True
+        return etag in [candidate[2:] if candidate.startswith('W/') else candidate for candidate in etags]
+
+    def open_content_stream(self, content, location):
+        """
+        Returns a StaticContentStream of the given content, to read ranges of it from.
+
+        The contents are read from the local disk cache when it's enabled, from memory
+        if they were cached there, and from the contentstore otherwise.
+        """
+        content_path = disk_cache.get_content_path(content)
+        if content_path is not None:
+            stream = open(content_path, 'rb')
+        elif isinstance(content, StaticContentStream):
+            return content
+        elif content.data is not None:
+            stream = BytesIO(content.data)
+        else:
+            return AssetManager.find(location, as_stream=True)
+
+        return StaticContentStream(
+            content.location, content.name, content.content_type, stream,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+
+    def get_range_response(self, content, ranges):
+        """
+        Returns a 206 Partial Content response with the given satisfiable ranges
+        of the given content stream.
+
+        Several ranges are sent as a multipart/byteranges message.
+        http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+        """
+        if len(ranges) == 1:
+            first, last = ranges[0]
+            response = StreamingHttpResponse(
+                stream_ranges(content, ranges), status=206, content_type=content.content_type
+            )
+            response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
+                first=first, last=last, length=content.length
+            )
+            response['Content-Length'] = str(last - first + 1)
+            return response
+
+        boundary = uuid4().hex
+        response = StreamingHttpResponse(
+            stream_ranges(content, ranges, boundary),
+            status=206,
+            content_type='multipart/byteranges; boundary={}'.format(boundary),
+        )
+        response['Content-Length'] = str(
+            sum(
+                len(get_part_header(boundary, content, first, last)) + (last - first + 1) + len(b'\r\n')
+                for first, last in ranges
+            ) + len(get_closing_boundary(boundary))
+        )
+        return response
+
     def is_content_locked(self, content):
         """
         Determines whether or not the given content is locked.
@@ -283,16 +384,88 @@ class StaticContentServer(object):
             except (ItemNotFoundError, NotFoundError):
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            # Now that we fetched it, let's go ahead and try to cache it. With the local
+            # disk cache enabled, contents are served from disk, so only their metadata is
+            # cached. Otherwise, we cap this at 1MB because it's the default for memcached
+            # and also we don't want to do too much buffering in memory when we're serving
+            # an actual request.
+            if disk_cache.is_enabled():
+                set_cached_content(get_content_metadata(content))
+            elif content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
 
         return content
 
 
+def get_content_metadata(content):
+    """
+    Returns a StaticContent with the metadata of the given content, but not its data.
+    """
+    return StaticContent(
+        content.location, content.name, content.content_type, None,
+        last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+        import_path=content.import_path, length=content.length, locked=content.locked,
+        content_digest=content.content_digest,
+    )
+
+
+def get_part_header(boundary, content, first, last):
+    """
+    Returns the header of the part of a multipart/byteranges message holding the
+    given range of the given content.
+    """
+    return (
+        u'--{boundary}\r\n'
+        u'Content-Type: {content_type}\r\n'
+        u'Content-Range: bytes {first}-{last}/{length}\r\n'
+        u'\r\n'
+    ).format(
+        boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+    ).encode('utf-8')
+
+
+def get_closing_boundary(boundary):
+    """
+    Returns the end of a multipart/byteranges message.
+    """
+    return u'--{boundary}--\r\n'.format(boundary=boundary).encode('utf-8')
+
+
+def stream_ranges(content, ranges, boundary=None):
+    """
+    Streams the given ranges of the given content stream, then closes it.
+
+    Ranges are sent as the parts of a multipart/byteranges message if a boundary is given.
+    """
+    try:
+        for first, last in ranges:
+            if boundary:
+                yield get_part_header(boundary, content, first, last)
+            for chunk in content.stream_data_in_range(first, last):
+                yield chunk
+            if boundary:
+                yield b'\r\n'
+        if boundary:
+            yield get_closing_boundary(boundary)
+    finally:
+        content.close()
+
+
+def merge_ranges(ranges):
+    """
+    Returns the given list of (start, end) tuples of ranges sorted, with the
+    overlapping or adjacent ones merged.
+    """
+    merged_ranges = []
+    for first, last in sorted(ranges):
+        if merged_ranges and first <= merged_ranges[-1][1] + 1:
+            merged_ranges[-1] = (merged_ranges[-1][0], max(last, merged_ranges[-1][1]))
+        else:
+            merged_ranges.append((first, last))
+    return merged_ranges
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
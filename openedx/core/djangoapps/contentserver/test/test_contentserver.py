@@ -6,6 +6,9 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
 
@@ -27,7 +30,8 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
-from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from ..caching import del_cached_content, get_cached_content
+from ..middleware import merge_ranges, parse_range_header, HTTP_DATE_FORMAT, MAX_RANGES, StaticContentServer
 
 log = logging.getLogger(__name__)
 
@@ -100,6 +104,8 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         cls.url_unlocked_versioned = get_versioned_asset_url(cls.url_unlocked)
         cls.url_unlocked_versioned_old_style = get_old_style_versioned_asset_url(cls.url_unlocked)
         cls.length_unlocked = cls.contentstore.get_attr(cls.unlocked_asset, 'length')
+        cls.data_unlocked = cls.contentstore.find(cls.unlocked_asset).data
+        cls.etag_unlocked = '"{}"'.format(cls.contentstore.find(cls.unlocked_asset).content_digest)
 
     def setUp(self):
         """
@@ -239,16 +245,62 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         self.assertEqual(resp['Content-Range'], 'bytes {first}-{last}/{length}'.format(
             first=first_byte, last=last_byte, length=self.length_unlocked))
         self.assertEqual(resp['Content-Length'], str(last_byte - first_byte + 1))
+        self.assertEqual(''.join(resp.streaming_content), self.data_unlocked[first_byte:last_byte + 1])
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request output a multipart/byteranges message.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = resp['Content-Type'].split('boundary=')[1]
+
+        body = ''.join(resp.streaming_content)
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        parts = body.split('--{}'.format(boundary))
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        for part, (first, last) in zip(parts[1:-1], [(first_byte, last_byte), (self.length_unlocked - 100, None)]):
+            headers, data = part.split('\r\n\r\n', 1)
+            last = last or self.length_unlocked - 1
+            self.assertIn('Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked), headers)
+            self.assertEqual(data, self.data_unlocked[first:last + 1] + '\r\n')
+
+    def test_range_request_unsatisfiable_range_left_out(self):
+        """
+        Test that unsatisfiable ranges are left out of a request with multiple ranges.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={length}-, 0-9'.format(
+            length=self.length_unlocked))
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{}'.format(self.length_unlocked))
+        self.assertEqual(''.join(resp.streaming_content), self.data_unlocked[:10])
+
+    def test_range_request_overlapping_ranges_merged(self):
+        """
+        Test that overlapping and adjacent ranges are sent as a single range.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=10-19, 0-9, 5-14')
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-19/{}'.format(self.length_unlocked))
+        self.assertEqual(''.join(resp.streaming_content), self.data_unlocked[:20])
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that a request with too many ranges results in a 200 OK full content response.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=' + ', '.join(
+            '{0}-{0}'.format(index * 2) for index in range(MAX_RANGES + 1)
+        ))
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
@@ -285,6 +337,41 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_etag_sent(self):
+        """
+        Test that the digest of an asset is sent as its ETag.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], self.etag_unlocked)
+
+    @ddt.data(
+        ('{etag}', 304),
+        ('W/{etag}', 304),
+        ('"ffff", {etag}', 304),
+        ('*', 304),
+        ('"ffff"', 200),
+    )
+    @ddt.unpack
+    def test_if_none_match(self, header_value, expected_status_code):
+        """
+        Test that conditional requests on the ETag of an asset are answered with 304 Not Modified
+        if it matches.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=header_value.format(etag=self.etag_unlocked))
+        self.assertEqual(resp.status_code, expected_status_code)
+        self.assertEqual(resp['ETag'], self.etag_unlocked)
+
+    def test_if_none_match_takes_precedence(self):
+        """
+        Test that If-Modified-Since is ignored when If-None-Match is sent.
+        """
+        resp = self.client.get(self.url_unlocked)
+        resp = self.client.get(
+            self.url_unlocked, HTTP_IF_NONE_MATCH='"ffff"', HTTP_IF_MODIFIED_SINCE=resp['Last-Modified']
+        )
+        self.assertEqual(resp.status_code, 200)
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -403,6 +490,73 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         self.assertEqual(is_from_cdn, True)
 
 
+@override_settings(CONTENTSTORE=TEST_DATA_CONTENTSTORE)
+class ContentStoreDiskCacheTest(SharedModuleStoreTestCase):
+    """
+    Tests serving assets of the toy course from the local disk cache.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(ContentStoreDiskCacheTest, cls).setUpClass()
+
+        cls.contentstore = contentstore()
+        cls.modulestore = modulestore()
+        cls.course_key = cls.modulestore.make_course_key('edX', 'toy', '2012_Fall')
+        import_course_from_xml(
+            cls.modulestore, 1, TEST_DATA_DIR, ['toy'],
+            static_content_store=cls.contentstore, verbose=True
+        )
+
+        cls.unlocked_asset = cls.course_key.make_asset_key('asset', 'another_static.txt')
+        cls.url_unlocked = unicode(cls.unlocked_asset)
+        cls.content_unlocked = cls.contentstore.find(cls.unlocked_asset)
+
+    def setUp(self):
+        super(ContentStoreDiskCacheTest, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        settings_override = override_settings(CONTENTSERVER_DISK_CACHE={'DIRECTORY': self.cache_dir, 'MAX_SIZE': None})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        del_cached_content(self.unlocked_asset)
+        self.addCleanup(del_cached_content, self.unlocked_asset)
+        self.client = Client()
+
+    def test_full_content_from_disk(self):
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(''.join(resp.streaming_content), self.content_unlocked.data)
+        self.assertEqual(resp['Content-Length'], str(self.content_unlocked.length))
+
+        digest = self.content_unlocked.content_digest
+        with open(os.path.join(self.cache_dir, digest[:2], digest), 'rb') as cached_file:
+            self.assertEqual(cached_file.read(), self.content_unlocked.data)
+
+    def test_only_metadata_cached(self):
+        self.client.get(self.url_unlocked)
+        cached_content = get_cached_content(self.unlocked_asset)
+        self.assertIsNone(cached_content.data)
+        self.assertEqual(cached_content.content_digest, self.content_unlocked.content_digest)
+
+    def test_range_from_disk(self):
+        # The second request is served from the cached metadata and file.
+        for _ in range(2):
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=5-9')
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(''.join(resp.streaming_content), self.content_unlocked.data[5:10])
+
+    def test_contents_not_matching_digest(self):
+        with patch.object(self.content_unlocked, 'content_digest', FAKE_MD5_HASH):
+            with patch('openedx.core.djangoapps.contentserver.middleware.AssetManager.find') as mock_find:
+                mock_find.return_value = self.content_unlocked
+                resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.content, self.content_unlocked.data)
+        self.assertEqual(os.listdir(os.path.join(self.cache_dir, 'ff')), [])
+
+
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
     """
@@ -447,3 +601,22 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegexp(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+@ddt.ddt
+class MergeRangesTestCase(unittest.TestCase):
+    """
+    Tests for the merge_ranges function.
+    """
+
+    @ddt.data(
+        ([(100, 199)], [(100, 199)]),
+        ([(200, 299), (100, 199)], [(100, 299)]),
+        ([(100, 199), (150, 249)], [(100, 249)]),
+        ([(100, 199), (120, 149)], [(100, 199)]),
+        ([(100, 199), (201, 299)], [(100, 199), (201, 299)]),
+        ([(9900, 9999), (9800, 9999), (0, 0)], [(0, 0), (9800, 9999)]),
+    )
+    @ddt.unpack
+    def test_merge_ranges(self, ranges, expected_ranges):
+        self.assertEqual(merge_ranges(ranges), expected_ranges)
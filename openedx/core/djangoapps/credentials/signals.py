@@ -34,7 +34,7 @@ def is_course_run_in_a_program(course_run_key):
     sites = Site.objects.all()
     str_key = str(course_run_key)
     for site in sites:
-        for program in get_programs(site):
+        for program in get_programs(site, course_run_keys=[str_key]):
             for course in program['courses']:
                 for course_run in course['course_runs']:
                     if str_key == course_run['key']:
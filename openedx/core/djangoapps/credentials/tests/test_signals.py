@@ -138,6 +138,7 @@ class TestCredentialsSignalsUtils(TestCase):
         mock_get_programs.return_value = self.data
         self.assertTrue(is_course_run_in_a_program(self.course_run['key']))
         self.assertEqual(mock_get_programs.call_args[0], (self.site,))
+        self.assertEqual(mock_get_programs.call_args[1], {'course_run_keys': [self.course_run['key']]})
 
     def test_is_course_run_in_a_program_failure(self, mock_get_programs):
         mock_get_programs.return_value = self.data
@@ -107,11 +107,25 @@ class ProgramProgressMeter(object):
         self.course_uuids = [str(entitlement.course_uuid) for entitlement in self.entitlements]
 
         self.course_grade_factory = CourseGradeFactory()
+        self.uuid = uuid
 
-        if uuid:
-            self.programs = [get_programs(self.site, uuid=uuid)]
-        else:
-            self.programs = attach_program_detail_url(get_programs(self.site), self.mobile_only)
+    @cached_property
+    def programs(self):
+        """The programs inspected by the meter: the one requested, or all the programs of the site."""
+        if self.uuid:
+            return [get_programs(self.site, uuid=self.uuid)]
+        return attach_program_detail_url(get_programs(self.site), self.mobile_only)
+
+    @cached_property
+    def enrolled_programs(self):
+        """
+        The programs inspected by the meter containing one of the user's
+        enrolled course runs or entitled courses, read without reading all of them.
+        """
+        if self.uuid:
+            return self.programs
+        programs = get_programs(self.site, course_run_keys=self.course_run_ids, course_uuids=self.course_uuids)
+        return attach_program_detail_url(programs, self.mobile_only)
 
     def invert_programs(self):
         """Intersect programs and enrollments.
@@ -124,17 +138,19 @@ class ProgramProgressMeter(object):
             defaultdict, programs keyed by course run ID
         """
         inverted_programs = defaultdict(list)
+        course_uuids = set(self.course_uuids)
+        course_run_ids = set(self.course_run_ids)
 
-        for program in self.programs:
+        for program in self.enrolled_programs:
             for course in program['courses']:
                 course_uuid = course['uuid']
-                if course_uuid in self.course_uuids:
+                if course_uuid in course_uuids:
                     program_list = inverted_programs[course_uuid]
                     if program not in program_list:
                         program_list.append(program)
                 for course_run in course['course_runs']:
                     course_run_id = course_run['key']
-                    if course_run_id in self.course_run_ids:
+                    if course_run_id in course_run_ids:
                         program_list = inverted_programs[course_run_id]
                         if program not in program_list:
                             program_list.append(program)
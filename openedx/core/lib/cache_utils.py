@@ -6,7 +6,10 @@ import cPickle as pickle
 import functools
 import itertools
 import zlib
+from uuid import uuid4
 
+from django.core.cache import cache as django_cache
+from django.db import transaction
 from django.utils.encoding import force_text
 from edx_django_utils.cache import RequestCache
 
@@ -172,3 +175,56 @@ def get_cache(name):
     """
     assert name is not None
     return RequestCache(name).data
+
+
+class CacheVersion(object):
+    """
+    Versions of data kept by processes, by key, shared through the django
+    cache and read from it once per request.
+
+    Processes keep the data of a key along with its version, and load it
+    again once the version changes.
+    """
+    def __init__(self, name):
+        """
+        Arguments:
+            name (str): Prefix of the cache keys of the versions, also naming
+                the request cache keeping them.
+        """
+        self.name = name
+
+    def get(self, key):
+        """
+        Returns the current version of the data of ``key``, or None if the
+        cache doesn't keep it, e.g. with a dummy cache.
+        """
+        versions = get_cache(self.name)
+        if key not in versions:
+            cache_key = self._get_cache_key(key)
+            version = django_cache.get(cache_key)
+            if version is None:
+                django_cache.add(cache_key, uuid4().hex, None)
+                version = django_cache.get(cache_key)
+            versions[key] = version
+        return versions[key]
+
+    def change(self, key):
+        """
+        Gives a new version to the data of ``key``, now and once the current
+        transaction is committed.
+        """
+        self._change(key)
+        # Processes loading the data before the change is committed would
+        # keep the previous data under the new version: change it again.
+        transaction.on_commit(lambda: self._change(key))
+
+    def _change(self, key):
+        """
+        Gives a new version to the data of ``key``.
+        """
+        version = uuid4().hex
+        django_cache.set(self._get_cache_key(key), version, None)
+        get_cache(self.name)[key] = version
+
+    def _get_cache_key(self, key):
+        return u'{}.{}'.format(self.name, key)
@@ -8,7 +8,8 @@ import ddt
 from mock import Mock
 
 from edx_django_utils.cache import RequestCache
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.cache_utils import CacheVersion, request_cached
 
 
 @ddt.ddt
@@ -295,3 +296,50 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestCacheVersion(CacheIsolationTestCase):
+    """
+    Test the versions of data kept by processes.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(TestCacheVersion, self).setUp()
+        RequestCache.clear_all_namespaces()
+        self.cache_version = CacheVersion('test.version')
+
+    def test_get(self):
+        version = self.cache_version.get('key')
+        self.assertIsNotNone(version)
+        self.assertNotEqual(self.cache_version.get('other_key'), version)
+
+        # in a later request, the version is read from the cache
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(self.cache_version.get('key'), version)
+
+    def test_change(self):
+        version = self.cache_version.get('key')
+        other_version = self.cache_version.get('other_key')
+        self.cache_version.change('key')
+        changed_version = self.cache_version.get('key')
+        self.assertNotEqual(changed_version, version)
+        self.assertEqual(self.cache_version.get('other_key'), other_version)
+
+        # other requests, and processes, read the changed version
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(self.cache_version.get('key'), changed_version)
+
+
+class TestCacheVersionWithoutCache(CacheIsolationTestCase):
+    """
+    Test the versions of data kept by processes, without a cache keeping them.
+    """
+    ENABLED_CACHES = []
+
+    def setUp(self):
+        super(TestCacheVersionWithoutCache, self).setUp()
+        RequestCache.clear_all_namespaces()
+
+    def test_get(self):
+        self.assertIsNone(CacheVersion('test.version').get('key'))
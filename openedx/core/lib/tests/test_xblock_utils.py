@@ -15,6 +15,7 @@ from openedx.core.lib.xblock_utils import (
     replace_course_urls,
     replace_jump_to_id_urls,
     replace_static_urls,
+    replace_urls,
     request_token,
     sanitize_html_id,
     wrap_fragment,
@@ -170,6 +171,31 @@ class TestXblockUtils(SharedModuleStoreTestCase):
         self.assertIsInstance(test_replace, Fragment)
         self.assertEqual(test_replace.content, anchor_tag)
 
+    @ddt.data(
+        ('course_mongo', '/c4x/TestX/TS01/asset/id', '/courses/TestX/TS01/2015/id'),
+        ('course_split', '/asset-v1:TestX+TS02+2015+type@asset+block/id', '/courses/course-v1:TestX+TS02+2015/id')
+    )
+    @ddt.unpack
+    def test_replace_urls(self, course_id, static_url, course_url):
+        """
+        Verify that the static, course and jump-to URLs have all been replaced.
+        """
+        course = getattr(self, course_id)
+        test_replace = replace_urls(
+            course_id=course.id,
+            data_dir=None,
+            jump_to_id_base_url='/base_url/',
+            block=course,
+            view='baseview',
+            frag=Fragment('<a href="/static/id"><a href="/course/id"><a href="/jump_to_id/id">'),
+            context=None
+        )
+        self.assertIsInstance(test_replace, Fragment)
+        self.assertEqual(
+            test_replace.content,
+            '<a href="{}"><a href="{}"><a href="/base_url/id">'.format(static_url, course_url)
+        )
+
     def test_sanitize_html_id(self):
         """
         Verify that colons and dashes are replaced.